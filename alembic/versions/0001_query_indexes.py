@@ -0,0 +1,117 @@
+"""add composite and partial indexes for hot story, page and task queries
+
+Revision ID: 0001_query_indexes
+Revises:
+Create Date: 2026-10-19 09:00:00.000000
+"""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0001_query_indexes'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def _visible_stories_where() -> sa.TextClause:
+    """Return the partial-index predicate for the current dialect."""
+
+    if op.get_bind().dialect.name == "sqlite":
+        return sa.text("is_deleted = 0 AND is_hidden = 0")
+    return sa.text("is_deleted = false AND is_hidden = false")
+
+
+def upgrade() -> None:
+    """Apply the schema upgrade."""
+
+    visible = _visible_stories_where()
+
+    op.create_index(
+        "ix_stories_owner_created",
+        "stories",
+        ["owner_id", "created_at"],
+        if_not_exists=True,
+    )
+    op.create_index(
+        "ix_stories_owner_draft_created",
+        "stories",
+        ["owner_id", "is_draft", "created_at"],
+        if_not_exists=True,
+    )
+    op.create_index(
+        "ix_stories_owner_title",
+        "stories",
+        ["owner_id", "title"],
+        if_not_exists=True,
+    )
+    op.create_index(
+        "ix_stories_visible_created",
+        "stories",
+        ["created_at"],
+        sqlite_where=visible,
+        postgresql_where=visible,
+        if_not_exists=True,
+    )
+    op.create_index(
+        "ix_pages_story_page_number",
+        "pages",
+        ["story_id", "page_number"],
+        if_not_exists=True,
+    )
+    op.create_index(
+        "ix_story_generation_tasks_status_created",
+        "story_generation_tasks",
+        ["status", "created_at"],
+        if_not_exists=True,
+    )
+    op.create_index(
+        "ix_story_generation_tasks_created_status",
+        "story_generation_tasks",
+        ["created_at", "status"],
+        if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    """Revert the schema upgrade."""
+
+    op.drop_index(
+        "ix_story_generation_tasks_created_status",
+        table_name="story_generation_tasks",
+        if_exists=True,
+    )
+    op.drop_index(
+        "ix_story_generation_tasks_status_created",
+        table_name="story_generation_tasks",
+        if_exists=True,
+    )
+    op.drop_index(
+        "ix_pages_story_page_number",
+        table_name="pages",
+        if_exists=True,
+    )
+    op.drop_index(
+        "ix_stories_visible_created",
+        table_name="stories",
+        if_exists=True,
+    )
+    op.drop_index(
+        "ix_stories_owner_title",
+        table_name="stories",
+        if_exists=True,
+    )
+    op.drop_index(
+        "ix_stories_owner_draft_created",
+        table_name="stories",
+        if_exists=True,
+    )
+    op.drop_index(
+        "ix_stories_owner_created",
+        table_name="stories",
+        if_exists=True,
+    )
@@ -0,0 +1,67 @@
+"""add denormalized cover image path and page count to stories
+
+Revision ID: 0002_story_library_summary
+Revises: 0001_query_indexes
+Create Date: 2026-10-19 10:00:00.000000
+"""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0002_story_library_summary'
+down_revision = '0001_query_indexes'
+branch_labels = None
+depends_on = None
+
+
+BACKFILL_SQL = """
+UPDATE stories SET
+    page_count = (
+        SELECT COUNT(*) FROM pages WHERE pages.story_id = stories.id
+    ),
+    cover_image_path = (
+        SELECT pages.image_path FROM pages
+        WHERE pages.story_id = stories.id AND pages.image_path IS NOT NULL
+        ORDER BY pages.page_number ASC, pages.id ASC
+        LIMIT 1
+    )
+"""
+
+
+def upgrade() -> None:
+    """Apply the schema upgrade."""
+
+    existing = {
+        column["name"]
+        for column in sa.inspect(op.get_bind()).get_columns("stories")
+    }
+    if {"cover_image_path", "page_count"} <= existing:
+        # Already added (and backfilled) by the app's SQLite bootstrap.
+        return
+
+    with op.batch_alter_table("stories") as batch_op:
+        if "cover_image_path" not in existing:
+            batch_op.add_column(
+                sa.Column("cover_image_path", sa.String(), nullable=True))
+        if "page_count" not in existing:
+            batch_op.add_column(
+                sa.Column(
+                    "page_count",
+                    sa.Integer(),
+                    nullable=False,
+                    server_default="0",
+                )
+            )
+    op.execute(BACKFILL_SQL)
+
+
+def downgrade() -> None:
+    """Revert the schema upgrade."""
+
+    with op.batch_alter_table("stories") as batch_op:
+        batch_op.drop_column("page_count")
+        batch_op.drop_column("cover_image_path")
@@ -0,0 +1,92 @@
+"""add hourly rollup table for finished story generation tasks
+
+Revision ID: 0003_task_stats_hourly
+Revises: 0002_story_library_summary
+Create Date: 2026-10-19 11:00:00.000000
+"""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0003_task_stats_hourly'
+down_revision = '0002_story_library_summary'
+branch_labels = None
+depends_on = None
+
+
+def _backfill_sql(dialect_name: str) -> str | None:
+    """Return the rollup backfill statement for the current dialect."""
+
+    if dialect_name == "sqlite":
+        bucket = "strftime('%Y-%m-%d %H:00:00.000000', finished_at)"
+        elapsed = (
+            "(julianday(COALESCE(completed_at, updated_at))"
+            " - julianday(created_at)) * 86400.0"
+        )
+    elif dialect_name == "postgresql":
+        bucket = "date_trunc('hour', finished_at)"
+        elapsed = (
+            "EXTRACT(EPOCH FROM COALESCE(completed_at, updated_at) - created_at)"
+        )
+    else:
+        return None
+
+    return f"""
+INSERT INTO task_stats_hourly (
+    bucket_start, completed_count, failed_count,
+    duration_seconds_sum, duration_samples, attempts_sum
+)
+SELECT
+    {bucket} AS bucket_start,
+    SUM(CASE WHEN status = 'completed' THEN 1 ELSE 0 END),
+    SUM(CASE WHEN status = 'failed' THEN 1 ELSE 0 END),
+    COALESCE(SUM(CASE WHEN status = 'completed' THEN duration_seconds END), 0),
+    SUM(CASE WHEN status = 'completed' AND duration_seconds IS NOT NULL
+        THEN 1 ELSE 0 END),
+    SUM(CASE WHEN status = 'completed' THEN COALESCE(attempts, 0) ELSE 0 END)
+FROM (
+    SELECT
+        status,
+        attempts,
+        COALESCE(completed_at, updated_at) AS finished_at,
+        CASE WHEN duration_ms > 0 THEN duration_ms / 1000.0
+             ELSE {elapsed}
+        END AS duration_seconds
+    FROM story_generation_tasks
+    WHERE status IN ('completed', 'failed')
+      AND COALESCE(completed_at, updated_at) IS NOT NULL
+) AS finished_tasks
+GROUP BY 1
+"""
+
+
+def upgrade() -> None:
+    """Apply the schema upgrade."""
+
+    bind = op.get_bind()
+    if sa.inspect(bind).has_table("task_stats_hourly"):
+        # Already created (and backfilled) by the app's create_all bootstrap.
+        return
+
+    op.create_table(
+        "task_stats_hourly",
+        sa.Column("bucket_start", sa.DateTime(timezone=True), primary_key=True),
+        sa.Column("completed_count", sa.Integer(), nullable=False),
+        sa.Column("failed_count", sa.Integer(), nullable=False),
+        sa.Column("duration_seconds_sum", sa.Float(), nullable=False),
+        sa.Column("duration_samples", sa.Integer(), nullable=False),
+        sa.Column("attempts_sum", sa.Integer(), nullable=False),
+    )
+    backfill = _backfill_sql(bind.dialect.name)
+    if backfill:
+        op.execute(backfill)
+
+
+def downgrade() -> None:
+    """Revert the schema upgrade."""
+
+    op.drop_table("task_stats_hourly", if_exists=True)
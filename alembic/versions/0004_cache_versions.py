@@ -0,0 +1,38 @@
+"""add cache version counters for process-wide caches
+
+Revision ID: 0004_cache_versions
+Revises: 0003_task_stats_hourly
+Create Date: 2026-10-19 12:00:00.000000
+"""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0004_cache_versions'
+down_revision = '0003_task_stats_hourly'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Apply the schema upgrade."""
+
+    if sa.inspect(op.get_bind()).has_table("cache_versions"):
+        # Already created by the app's create_all bootstrap.
+        return
+
+    op.create_table(
+        "cache_versions",
+        sa.Column("name", sa.String(), primary_key=True),
+        sa.Column("version", sa.Integer(), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    """Revert the schema upgrade."""
+
+    op.drop_table("cache_versions", if_exists=True)
@@ -0,0 +1,41 @@
+"""index story genre and image style for dynamic list usage counts
+
+Revision ID: 0005_story_usage_indexes
+Revises: 0004_cache_versions
+Create Date: 2026-10-19 13:00:00.000000
+"""
+
+from __future__ import annotations
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '0005_story_usage_indexes'
+down_revision = '0004_cache_versions'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Apply the schema upgrade."""
+
+    op.create_index(
+        "ix_stories_genre",
+        "stories",
+        ["genre"],
+        if_not_exists=True,
+    )
+    op.create_index(
+        "ix_stories_image_style",
+        "stories",
+        ["image_style"],
+        if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    """Revert the schema upgrade."""
+
+    op.drop_index("ix_stories_image_style", table_name="stories", if_exists=True)
+    op.drop_index("ix_stories_genre", table_name="stories", if_exists=True)
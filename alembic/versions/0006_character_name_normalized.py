@@ -0,0 +1,80 @@
+"""add normalized character name with a per-user unique index
+
+Revision ID: 0006_character_name_normalized
+Revises: 0005_story_usage_indexes
+Create Date: 2026-10-19 14:00:00.000000
+"""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0006_character_name_normalized'
+down_revision = '0005_story_usage_indexes'
+branch_labels = None
+depends_on = None
+
+
+def _backfill(conn) -> None:
+    """Key existing rows in id order; later per-user duplicates stay NULL.
+
+    Mirrors backend.database.backfill_character_name_normalized.
+    """
+
+    taken = {
+        (row[0], row[1])
+        for row in conn.execute(sa.text(
+            "SELECT user_id, name_normalized FROM characters "
+            "WHERE name_normalized IS NOT NULL"))
+    }
+    updates = []
+    for char_id, user_id, name in conn.execute(sa.text(
+            "SELECT id, user_id, name FROM characters "
+            "WHERE name_normalized IS NULL ORDER BY id")):
+        key = str(name).strip().lower() if name is not None else ""
+        if not key or (user_id, key) in taken:
+            continue
+        taken.add((user_id, key))
+        updates.append({"id": char_id, "key": key})
+    if updates:
+        conn.execute(
+            sa.text("UPDATE characters SET name_normalized = :key WHERE id = :id"),
+            updates,
+        )
+
+
+def upgrade() -> None:
+    """Apply the schema upgrade."""
+
+    bind = op.get_bind()
+    existing = {
+        column["name"] for column in sa.inspect(bind).get_columns("characters")
+    }
+    if "name_normalized" not in existing:
+        with op.batch_alter_table("characters") as batch_op:
+            batch_op.add_column(
+                sa.Column("name_normalized", sa.String(), nullable=True))
+        _backfill(bind)
+
+    op.create_index(
+        "uq_characters_user_name_normalized",
+        "characters",
+        ["user_id", "name_normalized"],
+        unique=True,
+        if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    """Revert the schema upgrade."""
+
+    op.drop_index(
+        "uq_characters_user_name_normalized",
+        table_name="characters",
+        if_exists=True,
+    )
+    with op.batch_alter_table("characters") as batch_op:
+        batch_op.drop_column("name_normalized")
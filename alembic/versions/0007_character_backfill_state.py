@@ -0,0 +1,54 @@
+"""track incremental character backfill progress per user
+
+Revision ID: 0007_character_backfill_state
+Revises: 0006_character_name_normalized
+Create Date: 2026-10-19 15:00:00.000000
+"""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0007_character_backfill_state'
+down_revision = '0006_character_name_normalized'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Apply the schema upgrade."""
+
+    op.create_index(
+        "ix_stories_owner_updated",
+        "stories",
+        ["owner_id", "updated_at"],
+        if_not_exists=True,
+    )
+
+    if sa.inspect(op.get_bind()).has_table("character_backfill_state"):
+        # Already created by the app's create_all bootstrap.
+        return
+
+    op.create_table(
+        "character_backfill_state",
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"),
+                  primary_key=True),
+        sa.Column("include_drafts", sa.Boolean(), primary_key=True),
+        sa.Column("stories_updated_through", sa.DateTime(timezone=True),
+                  nullable=True),
+        sa.Column("resume_after_story_id", sa.Integer(), nullable=True),
+        sa.Column("pending_updated_through", sa.DateTime(timezone=True),
+                  nullable=True),
+        sa.Column("updated_at", sa.DateTime(timezone=True),
+                  server_default=sa.func.now(), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    """Revert the schema upgrade."""
+
+    op.drop_table("character_backfill_state", if_exists=True)
+    op.drop_index("ix_stories_owner_updated", table_name="stories", if_exists=True)
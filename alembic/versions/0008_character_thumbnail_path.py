@@ -0,0 +1,82 @@
+"""add denormalized public thumbnail path to characters
+
+Revision ID: 0008_character_thumbnail_path
+Revises: 0007_character_backfill_state
+Create Date: 2026-10-19 16:00:00.000000
+"""
+
+from __future__ import annotations
+
+import os
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0008_character_thumbnail_path'
+down_revision = '0007_character_backfill_state'
+branch_labels = None
+depends_on = None
+
+
+def _is_public_thumbnail(path, user_id, char_id) -> bool:
+    if not path:
+        return False
+    normalized = os.path.normpath(str(path).replace("\\", "/").lstrip("/"))
+    if normalized in ("", ".") or normalized.startswith(".."):
+        return False
+    unix_style = normalized.replace(os.sep, "/")
+    return unix_style.startswith(f"images/user_{user_id}/characters/{char_id}/")
+
+
+def _backfill(conn) -> None:
+    """Current image first, then newest image, under the character's public folder.
+
+    Mirrors backend.database.backfill_character_thumbnail_paths.
+    """
+
+    images = {}
+    for char_id, file_path in conn.execute(sa.text(
+            "SELECT character_id, file_path FROM character_images "
+            "ORDER BY character_id, created_at IS NULL, created_at DESC, id DESC")):
+        images.setdefault(char_id, []).append(file_path)
+
+    updates = []
+    for char_id, user_id, current_path in conn.execute(sa.text(
+            "SELECT characters.id, characters.user_id, character_images.file_path "
+            "FROM characters LEFT JOIN character_images "
+            "ON character_images.id = characters.current_image_id "
+            "WHERE characters.thumbnail_path IS NULL")):
+        for path in [current_path, *images.get(char_id, [])]:
+            if _is_public_thumbnail(path, user_id, char_id):
+                updates.append({"id": char_id, "path": path})
+                break
+    if updates:
+        conn.execute(
+            sa.text("UPDATE characters SET thumbnail_path = :path WHERE id = :id"),
+            updates,
+        )
+
+
+def upgrade() -> None:
+    """Apply the schema upgrade."""
+
+    bind = op.get_bind()
+    existing = {
+        column["name"] for column in sa.inspect(bind).get_columns("characters")
+    }
+    if "thumbnail_path" in existing:
+        # Already added (and backfilled) by the app's SQLite bootstrap.
+        return
+
+    with op.batch_alter_table("characters") as batch_op:
+        batch_op.add_column(sa.Column("thumbnail_path", sa.String(), nullable=True))
+    _backfill(bind)
+
+
+def downgrade() -> None:
+    """Revert the schema upgrade."""
+
+    with op.batch_alter_table("characters") as batch_op:
+        batch_op.drop_column("thumbnail_path")
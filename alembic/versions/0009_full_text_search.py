@@ -0,0 +1,141 @@
+"""add full-text search indexes for stories, pages and characters
+
+SQLite: FTS5 tables maintained by triggers, filled from existing rows.
+PostgreSQL: GIN indexes over weighted tsvector expressions.
+
+Revision ID: 0009_full_text_search
+Revises: 0008_character_thumbnail_path
+Create Date: 2026-10-19 17:00:00.000000
+"""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0009_full_text_search'
+down_revision = '0008_character_thumbnail_path'
+branch_labels = None
+depends_on = None
+
+
+# Frozen copy of backend.database.SEARCH_INDEX_SQLITE_DDL / _REBUILD.
+_TOKENIZER = "unicode61 remove_diacritics 2"
+
+_REFRESH_STORY = """
+    DELETE FROM story_search_fts WHERE rowid = {story_id};
+    INSERT INTO story_search_fts (rowid, title, story_outline, page_text)
+    SELECT stories.id, stories.title, stories.story_outline,
+           (SELECT group_concat(pages.text, ' ') FROM pages
+            WHERE pages.story_id = stories.id)
+    FROM stories WHERE stories.id = {story_id};
+"""
+
+_REFRESH_CHARACTER = """
+    DELETE FROM character_search_fts WHERE rowid = {character_id};
+    INSERT INTO character_search_fts (rowid, name, description, key_traits)
+    SELECT id, name, description, key_traits FROM characters
+    WHERE id = {character_id};
+"""
+
+SQLITE_DDL = [
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS story_search_fts USING fts5("
+    f"title, story_outline, page_text, tokenize='{_TOKENIZER}')",
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS character_search_fts USING fts5("
+    f"name, description, key_traits, tokenize='{_TOKENIZER}')",
+    "CREATE TRIGGER IF NOT EXISTS stories_search_ai AFTER INSERT ON stories BEGIN"
+    + _REFRESH_STORY.format(story_id="NEW.id") + "END",
+    "CREATE TRIGGER IF NOT EXISTS stories_search_au "
+    "AFTER UPDATE OF title, story_outline ON stories BEGIN"
+    + _REFRESH_STORY.format(story_id="NEW.id") + "END",
+    "CREATE TRIGGER IF NOT EXISTS stories_search_ad AFTER DELETE ON stories BEGIN "
+    "DELETE FROM story_search_fts WHERE rowid = OLD.id; END",
+    "CREATE TRIGGER IF NOT EXISTS pages_search_ai AFTER INSERT ON pages BEGIN"
+    + _REFRESH_STORY.format(story_id="NEW.story_id") + "END",
+    "CREATE TRIGGER IF NOT EXISTS pages_search_au "
+    "AFTER UPDATE OF text, story_id ON pages BEGIN"
+    + _REFRESH_STORY.format(story_id="OLD.story_id")
+    + _REFRESH_STORY.format(story_id="NEW.story_id") + "END",
+    "CREATE TRIGGER IF NOT EXISTS pages_search_ad AFTER DELETE ON pages BEGIN"
+    + _REFRESH_STORY.format(story_id="OLD.story_id") + "END",
+    "CREATE TRIGGER IF NOT EXISTS characters_search_ai AFTER INSERT ON characters BEGIN"
+    + _REFRESH_CHARACTER.format(character_id="NEW.id") + "END",
+    "CREATE TRIGGER IF NOT EXISTS characters_search_au "
+    "AFTER UPDATE OF name, description, key_traits ON characters BEGIN"
+    + _REFRESH_CHARACTER.format(character_id="NEW.id") + "END",
+    "CREATE TRIGGER IF NOT EXISTS characters_search_ad AFTER DELETE ON characters BEGIN "
+    "DELETE FROM character_search_fts WHERE rowid = OLD.id; END",
+]
+
+SQLITE_REBUILD = [
+    "DELETE FROM story_search_fts",
+    "INSERT INTO story_search_fts (rowid, title, story_outline, page_text) "
+    "SELECT stories.id, stories.title, stories.story_outline, "
+    "(SELECT group_concat(pages.text, ' ') FROM pages WHERE pages.story_id = stories.id) "
+    "FROM stories",
+    "DELETE FROM character_search_fts",
+    "INSERT INTO character_search_fts (rowid, name, description, key_traits) "
+    "SELECT id, name, description, key_traits FROM characters",
+]
+
+SQLITE_TRIGGERS = [
+    "stories_search_ai", "stories_search_au", "stories_search_ad",
+    "pages_search_ai", "pages_search_au", "pages_search_ad",
+    "characters_search_ai", "characters_search_au", "characters_search_ad",
+]
+
+
+def _tsv(column: str, weight: str) -> str:
+    return (f"setweight(to_tsvector('simple', coalesce({column}, '')), "
+            f"'{weight}')")
+
+
+# Must match backend.database.*_search_vector() for the planner to use them.
+POSTGRESQL_INDEXES = {
+    "ix_stories_search_tsv": (
+        "stories", f"({_tsv('title', 'A')} || {_tsv('story_outline', 'B')})"),
+    "ix_pages_search_tsv": ("pages", _tsv("text", "C")),
+    "ix_characters_search_tsv": (
+        "characters",
+        f"(({_tsv('name', 'A')} || {_tsv('description', 'B')}) "
+        f"|| {_tsv('key_traits', 'B')})"),
+}
+
+
+def upgrade() -> None:
+    """Apply the schema upgrade."""
+
+    bind = op.get_bind()
+    if bind.dialect.name == "sqlite":
+        existing = {
+            row[0] for row in bind.execute(sa.text(
+                "SELECT name FROM sqlite_master WHERE name IN "
+                "('story_search_fts', 'character_search_fts')"))
+        }
+        for statement in SQLITE_DDL:
+            op.execute(statement)
+        if existing != {"story_search_fts", "character_search_fts"}:
+            # Otherwise already created and filled by the app's bootstrap.
+            for statement in SQLITE_REBUILD:
+                op.execute(statement)
+    elif bind.dialect.name == "postgresql":
+        for name, (table, expression) in POSTGRESQL_INDEXES.items():
+            op.execute(
+                f"CREATE INDEX IF NOT EXISTS {name} ON {table} "
+                f"USING gin ({expression})")
+
+
+def downgrade() -> None:
+    """Revert the schema upgrade."""
+
+    bind = op.get_bind()
+    if bind.dialect.name == "sqlite":
+        for trigger in SQLITE_TRIGGERS:
+            op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        op.execute("DROP TABLE IF EXISTS story_search_fts")
+        op.execute("DROP TABLE IF EXISTS character_search_fts")
+    elif bind.dialect.name == "postgresql":
+        for name in POSTGRESQL_INDEXES:
+            op.execute(f"DROP INDEX IF EXISTS {name}")
@@ -0,0 +1,48 @@
+"""add asset tombstones for background deletion of story files
+
+Revision ID: 0011_asset_tombstones
+Revises: 0010_retention
+Create Date: 2026-10-19 21:00:00.000000
+"""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0011_asset_tombstones'
+down_revision = '0010_retention'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Apply the schema upgrade."""
+
+    if sa.inspect(op.get_bind()).has_table("asset_tombstones"):
+        # Already created by the app's create_all bootstrap.
+        return
+
+    op.create_table(
+        "asset_tombstones",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("store", sa.String(), nullable=False),
+        sa.Column("prefix", sa.String(), nullable=False),
+        sa.Column("reason", sa.String(), nullable=True),
+        sa.Column("attempts", sa.Integer(), nullable=False),
+        sa.Column("last_error", sa.String(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True),
+                  server_default=sa.func.now(), nullable=True),
+        sa.Column("next_attempt_at", sa.DateTime(timezone=True), nullable=False),
+    )
+    op.create_index("ix_asset_tombstones_id", "asset_tombstones", ["id"])
+    op.create_index("ix_asset_tombstones_next_attempt_at",
+                    "asset_tombstones", ["next_attempt_at"])
+
+
+def downgrade() -> None:
+    """Revert the schema upgrade."""
+
+    op.drop_table("asset_tombstones", if_exists=True)
@@ -0,0 +1,59 @@
+"""drop the per-page story search triggers
+
+Page writes now refresh a story's FTS5 document once per flush (see
+backend.full_text_search.refresh_story_search) instead of once per row.
+
+Revision ID: 0012_story_search_page_refresh
+Revises: 0011_asset_tombstones
+Create Date: 2026-10-19 22:00:00.000000
+"""
+
+from __future__ import annotations
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '0012_story_search_page_refresh'
+down_revision = '0011_asset_tombstones'
+branch_labels = None
+depends_on = None
+
+
+# Frozen copy of the triggers from 0009_full_text_search.
+_REFRESH_STORY = """
+    DELETE FROM story_search_fts WHERE rowid = {story_id};
+    INSERT INTO story_search_fts (rowid, title, story_outline, page_text)
+    SELECT stories.id, stories.title, stories.story_outline,
+           (SELECT group_concat(pages.text, ' ') FROM pages
+            WHERE pages.story_id = stories.id)
+    FROM stories WHERE stories.id = {story_id};
+"""
+
+PAGE_TRIGGERS = {
+    "pages_search_ai": "AFTER INSERT ON pages BEGIN"
+    + _REFRESH_STORY.format(story_id="NEW.story_id") + "END",
+    "pages_search_au": "AFTER UPDATE OF text, story_id ON pages BEGIN"
+    + _REFRESH_STORY.format(story_id="OLD.story_id")
+    + _REFRESH_STORY.format(story_id="NEW.story_id") + "END",
+    "pages_search_ad": "AFTER DELETE ON pages BEGIN"
+    + _REFRESH_STORY.format(story_id="OLD.story_id") + "END",
+}
+
+
+def upgrade() -> None:
+    """Apply the schema upgrade."""
+
+    if op.get_bind().dialect.name != "sqlite":
+        return
+    for name in PAGE_TRIGGERS:
+        op.execute(f"DROP TRIGGER IF EXISTS {name}")
+
+
+def downgrade() -> None:
+    """Revert the schema upgrade."""
+
+    if op.get_bind().dialect.name != "sqlite":
+        return
+    for name, body in PAGE_TRIGGERS.items():
+        op.execute(f"CREATE TRIGGER IF NOT EXISTS {name} {body}")
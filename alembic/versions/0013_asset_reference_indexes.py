@@ -0,0 +1,52 @@
+"""index the columns the orphaned asset collector reads
+
+Revision ID: 0013_asset_reference_indexes
+Revises: 0012_story_search_page_refresh
+Create Date: 2026-10-19 23:00:00.000000
+"""
+
+from __future__ import annotations
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '0013_asset_reference_indexes'
+down_revision = '0012_story_search_page_refresh'
+branch_labels = None
+depends_on = None
+
+
+# Must match backend.database.asset_reference_keys() for the planner to use them.
+_ORIGINAL_IMAGE_PATH = {
+    "sqlite": "json_extract(editor_state, '$.original_image_path')",
+    "postgresql": "(editor_state ->> 'original_image_path')",
+}
+
+INDEXES = {
+    "ix_pages_image_path": ("pages", "image_path"),
+    "ix_pages_original_image_path": ("pages", None),
+    "ix_stories_cover_image_path": ("stories", "cover_image_path"),
+    "ix_character_images_file_path": ("character_images", "file_path"),
+    "ix_characters_thumbnail_path": ("characters", "thumbnail_path"),
+}
+
+
+def upgrade() -> None:
+    """Apply the schema upgrade."""
+
+    dialect = op.get_bind().dialect.name
+    for name, (table, column) in INDEXES.items():
+        expression = column or _ORIGINAL_IMAGE_PATH.get(
+            dialect, _ORIGINAL_IMAGE_PATH["sqlite"])
+        if dialect == "postgresql":
+            # Byte order, as in storage listings.
+            expression = f'({expression} COLLATE "C")'
+        op.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({expression})")
+
+
+def downgrade() -> None:
+    """Revert the schema upgrade."""
+
+    for name, (table, _column) in INDEXES.items():
+        op.drop_index(name, table_name=table, if_exists=True)
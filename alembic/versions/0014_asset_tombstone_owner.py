@@ -0,0 +1,45 @@
+"""record the story or user an asset tombstone's folder is named after
+
+Revision ID: 0014_asset_tombstone_owner
+Revises: 0013_asset_reference_indexes
+Create Date: 2026-10-20 00:00:00.000000
+"""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0014_asset_tombstone_owner'
+down_revision = '0013_asset_reference_indexes'
+branch_labels = None
+depends_on = None
+
+COLUMNS = ("story_id", "user_id")
+
+
+def upgrade() -> None:
+    """Apply the schema upgrade."""
+
+    existing = {
+        column["name"]
+        for column in sa.inspect(op.get_bind()).get_columns("asset_tombstones")
+    }
+    missing = [name for name in COLUMNS if name not in existing]
+    if not missing:
+        # Already added by the app's SQLite bootstrap.
+        return
+
+    with op.batch_alter_table("asset_tombstones") as batch_op:
+        for name in missing:
+            batch_op.add_column(sa.Column(name, sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    """Revert the schema upgrade."""
+
+    with op.batch_alter_table("asset_tombstones") as batch_op:
+        for name in COLUMNS:
+            batch_op.drop_column(name)
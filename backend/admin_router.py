@@ -1,112 +1,68 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from sqlalchemy.orm import Session
 from typing import List, Optional
 
-from backend import crud, schemas, database
+from backend import crud, schemas, database, task_stats
 from backend.auth import get_current_admin_user
 from backend.logging_config import app_logger, error_logger
 from backend.database import get_db
-from sqlalchemy import func, and_
-from datetime import datetime, timedelta, timezone
+from backend.pagination import NEXT_CURSOR_HEADER
+from backend.response_cache import admin_cache, apply_cache_headers
+from backend.settings import get_settings
+from datetime import datetime
 
 admin_router = APIRouter(
     dependencies=[Depends(get_current_admin_user)]
 )
 
 
+def _with_own_session(bind, load):
+    """Wrap `load(session)` to run on a fresh session (for background refreshes)."""
+
+    def _load():
+        with Session(bind=bind) as session:
+            return load(session)
+    return _load
+
+
+def _cached_admin_stats(request: Request, response: Response, db: Session, key, load):
+    """Serve `load(db)` through the admin cache with ETag/304 support."""
+
+    settings = get_settings()
+    entry = admin_cache.get(
+        key,
+        loader=lambda: load(db),
+        ttl=settings.admin_stats_cache_ttl,
+        stale_ttl=settings.admin_cache_stale_seconds,
+        refresh=_with_own_session(db.get_bind(), load),
+    )
+    not_modified = apply_cache_headers(request, response, entry.etag)
+    return not_modified if not_modified is not None else entry.value
+
+
 @admin_router.get("/stats", response_model=schemas.AdminStats)
-def get_admin_stats(db: Session = Depends(get_db)):
+def get_admin_stats(request: Request, response: Response, db: Session = Depends(get_db)):
     """Aggregate high-level application stats for the admin dashboard.
 
-    Now leverages precise task tracking fields (duration_ms, attempts) when available.
-    Falls back gracefully if legacy rows lack new fields.
+    Computed with a single aggregated SQL query; task durations prefer precise
+    duration_ms and fall back to timestamps for legacy rows. Cached briefly
+    (ADMIN_STATS_CACHE_TTL_SECONDS) and revalidated with ETags.
     """
-    # Import models locally to avoid circular import issues
-    from backend.database import User, Story, Character, StoryGenerationTask
+    return _cached_admin_stats(
+        request, response, db, ("admin_stats",), task_stats.get_live_admin_stats)
 
-    # Time window
-    now = datetime.now(timezone.utc)
-    since_24h = now - timedelta(hours=24)
 
-    # Users
-    total_users = db.query(func.count(User.id)).scalar() or 0
-    active_users = db.query(func.count(User.id)).filter(
-        User.is_active == True).scalar() or 0
-
-    # Stories
-    total_stories = db.query(func.count(Story.id)).scalar() or 0
-    generated_stories = db.query(func.count(Story.id)).filter(
-        Story.is_draft == False).scalar() or 0
-    draft_stories = total_stories - generated_stories
-
-    # Characters
-    try:
-        total_characters = db.query(func.count(Character.id)).scalar() or 0
-    except Exception:
-        total_characters = 0
-
-    # Tasks last 24h
-    tasks_24h_q = db.query(StoryGenerationTask).filter(
-        StoryGenerationTask.created_at >= since_24h)
-    tasks_last_24h = tasks_24h_q.count()
-    tasks_completed_last_24h = tasks_24h_q.filter(
-        StoryGenerationTask.status
-        == schemas.GenerationTaskStatus.COMPLETED.value).count()
-    tasks_failed_last_24h = tasks_24h_q.filter(
-        StoryGenerationTask.status
-        == schemas.GenerationTaskStatus.FAILED.value).count()
-    tasks_in_progress = db.query(StoryGenerationTask).filter(
-        StoryGenerationTask.status.in_([
-            schemas.GenerationTaskStatus.PENDING.value,
-            schemas.GenerationTaskStatus.IN_PROGRESS.value,
-        ])).count()
-
-    # Precise avg duration (prefer duration_ms; fallback to updated_at-created_at)
-    durations = []
-    total_attempts = 0
-    completed_tasks = []
-    if tasks_completed_last_24h:
-        completed_tasks = tasks_24h_q.filter(
-            StoryGenerationTask.status
-            == schemas.GenerationTaskStatus.COMPLETED.value).all()
-        for t in completed_tasks:
-            try:
-                # Prefer explicit duration_ms
-                if getattr(t, 'duration_ms', None):
-                    durations.append(t.duration_ms / 1000.0)
-                elif t.created_at and t.updated_at:
-                    durations.append(
-                        (t.updated_at - t.created_at).total_seconds())
-                # Sum attempts if present
-                total_attempts += getattr(t, 'attempts', 0) or 0
-            except Exception:
-                pass
-    avg_duration = round(sum(durations) / len(durations),
-                         2) if durations else None
-    avg_attempts = round(total_attempts / len(completed_tasks),
-                         2) if completed_tasks else None
-
-    success_rate = None
-    denom = tasks_completed_last_24h + tasks_failed_last_24h
-    if denom > 0:
-        success_rate = tasks_completed_last_24h / denom
-
-    return schemas.AdminStats(
-        total_users=total_users,
-        active_users=active_users,
-        total_stories=total_stories,
-        generated_stories=generated_stories,
-        draft_stories=draft_stories,
-        total_characters=total_characters,
-        tasks_last_24h=tasks_last_24h,
-        tasks_in_progress=tasks_in_progress,
-        tasks_failed_last_24h=tasks_failed_last_24h,
-        tasks_completed_last_24h=tasks_completed_last_24h,
-        avg_task_duration_seconds_last_24h=avg_duration,
-        success_rate_last_24h=success_rate,
-        # New metric: average attempts over completed tasks in the last 24h
-        avg_attempts_last_24h=avg_attempts,
-    )
+@admin_router.get("/stats/history", response_model=schemas.AdminTaskStatsHistory)
+def get_admin_stats_history(
+    request: Request,
+    response: Response,
+    hours: int = Query(24 * 7, ge=1, le=24 * 90),
+    db: Session = Depends(get_db),
+):
+    """Finished-task stats for the last `hours` hours, read from hourly rollups."""
+    return _cached_admin_stats(
+        request, response, db, ("admin_stats_history", hours),
+        lambda session: task_stats.get_task_stats_history(session, hours=hours))
 
 # DynamicList Endpoints
 
@@ -169,22 +125,18 @@ def delete_dynamic_list_endpoint(
     list_name: str,
     db: Session = Depends(get_db)
 ):
-    # Check if any items from this list are in use before deleting the list
-    # This is a more complex check, as it involves iterating through all items.
-    # For simplicity, we'll rely on the frontend to manage this, or add more detailed checks if required.
-    # The cascade delete will remove items, but won't prevent deletion if items are "in use" conceptually.
-    # A more robust check would iterate all items in the list and call is_dynamic_list_item_in_use for each.
-
-    # For now, let's check if the list has items that are in use.
-    items = crud.get_dynamic_list_items(
-        db, list_name=list_name, limit=1000)  # Get all items
-    for item in items:
-        usage_info = crud.is_dynamic_list_item_in_use(db, item_id=item.id)
-        if usage_info["is_in_use"]:  # Explicitly check the 'is_in_use' key
-            raise HTTPException(
-                status_code=status.HTTP_409_CONFLICT,
-                detail=f"Cannot delete list '{list_name}'. Item '{item.item_label}' (ID: {item.id}) is currently in use."
-            )
+    # The cascade delete removes items, so refuse while any item is referenced
+    # by a story. One grouped count covers every item of the list.
+    usage_counts = crud.get_dynamic_list_usage_counts(db, list_name=list_name)
+    if usage_counts:
+        items = crud.get_dynamic_list_items(
+            db, list_name=list_name, limit=1000)  # Get all items
+        for item in items:
+            if usage_counts.get(item.item_value):
+                raise HTTPException(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail=f"Cannot delete list '{list_name}'. Item '{item.item_label}' (ID: {item.id}) is currently in use."
+                )
 
     if not crud.delete_dynamic_list(db, list_name=list_name):
         raise HTTPException(
@@ -225,11 +177,13 @@ def create_dynamic_list_item_endpoint(
 @admin_router.get("/dynamic-lists/{list_name}/items", response_model=List[schemas.DynamicListItem])
 def read_dynamic_list_items_endpoint(
     list_name: str,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
     db: Session = Depends(get_db),
     # Admin can choose to see all or only active
-    only_active: Optional[bool] = None
+    only_active: Optional[bool] = None,
+    cursor: Optional[str] = None,
 ):
     db_list = crud.get_dynamic_list(db, list_name=list_name)
     if not db_list:
@@ -238,13 +192,29 @@ def read_dynamic_list_items_endpoint(
 
     if only_active is not None:
         items = crud.get_dynamic_list_items(
-            db, list_name=list_name, skip=skip, limit=limit, only_active=only_active)
+            db, list_name=list_name, skip=skip, limit=limit, only_active=only_active, cursor=cursor)
     else:
         items = crud.get_dynamic_list_items(
-            db, list_name=list_name, skip=skip, limit=limit)
+            db, list_name=list_name, skip=skip, limit=limit, cursor=cursor)
+    next_cursor = crud.next_page_cursor("dynamic_list_items", items, limit)
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
     return items
 
 
+@admin_router.get("/dynamic-lists/{list_name}/usage", response_model=List[schemas.DynamicListItemUsageSummary])
+def read_dynamic_list_usage_endpoint(
+    list_name: str,
+    db: Session = Depends(get_db)
+):
+    """In-use status of every item in a list, computed with grouped queries."""
+    db_list = crud.get_dynamic_list(db, list_name=list_name)
+    if not db_list:
+        raise HTTPException(
+            status_code=404, detail=f"Dynamic list '{list_name}' not found.")
+    return crud.get_dynamic_list_items_usage(db, list_name=list_name)
+
+
 # Changed path for clarity
 @admin_router.get("/dynamic-lists/items/{item_id}", response_model=schemas.DynamicListItem)
 def read_single_dynamic_list_item_endpoint(
@@ -403,11 +373,15 @@ def admin_update_user_endpoint(user_id: int, user_update: schemas.AdminUserUpdat
 
 
 @admin_router.get("/management/users/", response_model=List[schemas.User], dependencies=[Depends(get_current_admin_user)])
-def admin_get_users_endpoint(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+def admin_get_users_endpoint(response: Response, skip: int = 0, limit: int = 100, cursor: Optional[str] = None, db: Session = Depends(get_db)):
     """
     Retrieve all users, excluding soft-deleted accounts by default.
+    Pass the `X-Next-Cursor` header value as `cursor` to fetch the next page.
     """
-    users = crud.admin_get_users(db, skip=skip, limit=limit)
+    users = crud.admin_get_users(db, skip=skip, limit=limit, cursor=cursor)
+    next_cursor = crud.next_page_cursor("admin_users", users, limit)
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
     return users
 
 
@@ -456,6 +430,8 @@ def admin_list_stories(
     created_to: Optional[datetime] = None,
     include_hidden: bool = False,
     include_deleted: bool = False,
+    cursor: Optional[str] = None,
+    include_total: bool = False,
     db: Session = Depends(get_db)
 ) -> dict:
     total, items = crud.list_stories_admin(
@@ -468,6 +444,8 @@ def admin_list_stories(
         created_to=created_to,
         include_hidden=include_hidden,
         include_deleted=include_deleted,
+        cursor=cursor,
+        include_total=include_total,
     )
     # Normalize legacy enum values for response validation (e.g., short text_density labels)
     legacy_text_density_map = {
@@ -488,6 +466,7 @@ def admin_list_stories(
         "total": total,
         "page": page,
         "page_size": page_size,
+        "next_cursor": crud.next_page_cursor("admin_stories", items, page_size),
     }
 
 
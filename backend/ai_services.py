@@ -11,13 +11,15 @@ import sys
 from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception
 from sqlalchemy.orm import Session
 import asyncio
+import anyio
 import io
 import time
+from contextlib import ExitStack
 
 # Import loggers
 from .logging_config import api_logger, error_logger, app_logger, warning_logger
 from .settings import get_settings
-from . import crud, schemas
+from . import crud, image_variants, schemas, storage
 from .schemas import CharacterDetail, WordToPictureRatio, ImageStyle, TextDensity
 from .image_style_mapping import get_openai_image_style, resolve_image_style
 from .metrics import observe_openai_text_call
@@ -686,6 +688,9 @@ def generate_character_image_from_description(character_name: str, description:
 async def generate_character_reference_image(character: CharacterDetail, story_input: schemas.StoryCreate, db: Session, user_id: int, story_id: int, image_save_path_on_disk: str = None, image_path_for_db: str = None) -> Optional[Dict[str, Any]]:
     """
     Generates a reference image for a character, saves it, and returns the updated character details as a dict.
+
+    The image and its prompt are written to asset storage under `image_path_for_db`;
+    `image_save_path_on_disk` is only used in log messages.
     """
     if not db:
         error_logger.error(
@@ -738,20 +743,18 @@ async def generate_character_reference_image(character: CharacterDetail, story_i
 
     char_dict = character.model_dump(exclude_none=True)
 
-    if image_bytes and image_save_path_on_disk and image_path_for_db:
+    if image_bytes and image_path_for_db:
         try:
-            os.makedirs(os.path.dirname(
-                image_save_path_on_disk), exist_ok=True)
-            with open(image_save_path_on_disk, "wb") as f:
-                f.write(image_bytes)
+            asset_storage = storage.get_storage()
+            asset_storage.put(image_path_for_db, image_bytes, "image/png")
             app_logger.info(
-                f"Downloaded and saved character reference image for {character.name} at {image_save_path_on_disk}")
+                f"Downloaded and saved character reference image for {character.name} at {image_path_for_db}")
 
             # Save the prompt to a text file
-            prompt_path = os.path.splitext(image_save_path_on_disk)[
+            prompt_path = os.path.splitext(image_path_for_db)[
                 0].replace('_ref_', '_ref_prompt_') + ".txt"
-            with open(prompt_path, "w", encoding="utf-8") as f:
-                f.write(prompt)
+            asset_storage.put(prompt_path, prompt.encode("utf-8"),
+                              "text/plain; charset=utf-8")
             app_logger.info(
                 f"Saved character reference prompt to {prompt_path}")
 
@@ -770,7 +773,7 @@ async def generate_character_reference_image(character: CharacterDetail, story_i
 @api_retry
 async def generate_image_for_page(page_content: str, style_reference: str, db: Session, user_id: int, story_id: int, page_number: int, image_save_path_on_disk: str = None, image_path_for_db: str = None, reference_image_paths: Optional[List[str]] = None, characters_in_scene: Optional[List[str]] = None) -> Optional[str]:
     """
-    Generates an image for a story page using the configured AI image model, saves it to disk, and returns the relative path.
+    Generates an image for a story page using the configured AI image model, saves it to asset storage, and returns the relative path.
     """
     if not db:
         error_logger.error(
@@ -806,20 +809,19 @@ async def generate_image_for_page(page_content: str, style_reference: str, db: S
         openai_style=openai_style,
     )
 
-    if image_bytes and image_save_path_on_disk and image_path_for_db:
+    if image_bytes and image_path_for_db:
         try:
-            os.makedirs(os.path.dirname(
-                image_save_path_on_disk), exist_ok=True)
-            with open(image_save_path_on_disk, "wb") as f:
-                f.write(image_bytes)
+            asset_storage = storage.get_storage()
+            await anyio.to_thread.run_sync(
+                image_variants.save_image, image_path_for_db, image_bytes)
             app_logger.info(
-                f"Downloaded and saved image for page {page_number} of story {story_id} at {image_save_path_on_disk}")
+                f"Downloaded and saved image for page {page_number} of story {story_id} at {image_path_for_db}")
 
             # Save the prompt to a text file
-            prompt_path = os.path.splitext(image_save_path_on_disk)[
+            prompt_path = os.path.splitext(image_path_for_db)[
                 0] + "_prompt.txt"
-            with open(prompt_path, "w", encoding="utf-8") as f:
-                f.write(prompt)
+            asset_storage.put(prompt_path, prompt.encode("utf-8"),
+                              "text/plain; charset=utf-8")
             app_logger.info(f"Saved page image prompt to {prompt_path}")
 
             return image_path_for_db
@@ -864,18 +866,23 @@ def generate_image(
                 f"Using {len(reference_image_paths)} reference image(s) for image generation.")
 
             opened_files = []
+            local_copies = ExitStack()
             try:
                 for path in reference_image_paths:
-                    # Paths may be DB-relative (relative to settings.data_dir) or absolute
-                    # (used for private, non-public uploads).
-                    data_dir = get_settings().data_dir
-                    full_path = path if os.path.isabs(path) else os.path.join(
-                        data_dir, path)
-                    if os.path.exists(full_path):
+                    # Paths may be storage keys (DB-relative) or absolute local
+                    # files (e.g. a private upload fetched by the caller).
+                    full_path = path
+                    if not os.path.isabs(path):
+                        try:
+                            full_path = local_copies.enter_context(
+                                storage.get_storage().local_copy(path))
+                        except (OSError, ValueError):
+                            full_path = None
+                    if full_path and os.path.exists(full_path):
                         opened_files.append(open(full_path, "rb"))
                     else:
                         error_logger.warning(
-                            f"Reference image not found at path: {full_path}")
+                            f"Reference image not found at path: {path}")
 
                 if opened_files:
                     try:
@@ -899,6 +906,7 @@ def generate_image(
             finally:
                 for f in opened_files:
                     f.close()
+                local_copies.close()
 
         # If no references were provided, or if opening files failed, generate a new image
         if response is None:
@@ -0,0 +1,88 @@
+"""HTTP caching headers for data assets (images, prompts).
+
+- ETags are derived from the file content (SHA-256), so they survive
+  copies, restores and deploys that reset modification times. Digests are
+  cached per inode/mtime/size, so each file is hashed once per process.
+- Write-once generated assets (`storage_paths.is_fingerprinted_path`) are
+  sent with a one-year `immutable` lifetime. Everything else is
+  `no-cache`: clients revalidate with `If-None-Match` and get a 304.
+- Private assets use `private` so shared caches never store them.
+
+Range requests are handled by Starlette's `FileResponse`.
+"""
+
+from __future__ import annotations
+
+import functools
+import hashlib
+import os
+from typing import Dict, Optional
+
+import anyio
+from fastapi import Request, Response
+from fastapi.responses import FileResponse
+
+from backend import storage_paths
+from backend.response_cache import etag_matches
+
+IMMUTABLE_MAX_AGE_SECONDS = 365 * 24 * 3600
+
+_HASH_CHUNK_SIZE = 1024 * 1024
+
+
+@functools.lru_cache(maxsize=4096)
+def _file_digest(path: str, inode: int, mtime_ns: int, size: int) -> str:
+    # inode/mtime/size are part of the cache key: assets are replaced by
+    # rename, so any rewrite yields a new key.
+    digest = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(_HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def content_etag(path: str, stat_result: os.stat_result) -> str:
+    """Return a strong ETag for the file at `path`."""
+
+    digest = _file_digest(
+        path, stat_result.st_ino, stat_result.st_mtime_ns, stat_result.st_size)
+    return f'"{digest[:32]}"'
+
+
+def cache_control(rel_path: str, private: bool) -> str:
+    """Return the `Cache-Control` value for a data-relative asset path."""
+
+    scope = "private" if private else "public"
+    if storage_paths.is_fingerprinted_path(rel_path):
+        return f"{scope}, max-age={IMMUTABLE_MAX_AGE_SECONDS}, immutable"
+    return f"{scope}, no-cache"
+
+
+def asset_headers(
+    path: str,
+    stat_result: os.stat_result,
+    rel_path: str,
+    private: bool,
+    cache_control_value: Optional[str] = None,
+) -> Dict[str, str]:
+    return {
+        "ETag": content_etag(path, stat_result),
+        "Cache-Control": cache_control_value or cache_control(rel_path, private),
+    }
+
+
+async def file_response(
+    request: Request,
+    path: str,
+    rel_path: str,
+    private: bool,
+    cache_control_value: Optional[str] = None,
+) -> Response:
+    """Serve a local asset file with caching headers, answering 304 when unchanged."""
+
+    stat_result = await anyio.to_thread.run_sync(os.stat, path)
+    headers = await anyio.to_thread.run_sync(
+        asset_headers, path, stat_result, rel_path, private, cache_control_value)
+    if etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+    return FileResponse(path, headers=headers, stat_result=stat_result)
@@ -0,0 +1,223 @@
+"""Garbage collection of image files that no row references.
+
+Failed generations, regenerated and restored page images, replaced
+character images and writes interrupted by a crash leave files under
+`images/` that nothing points to. The collector finds them without loading
+either side into memory: storage keys are listed in string order, and the
+database references are read in the same order, in keyset batches of
+`ASSET_GC_BATCH_SIZE`, one stream per column, merged. A key is live when it
+equals a reference:
+
+- `pages.image_path`, `stories.cover_image_path`;
+- the original image a page can be restored to (`editor_state`);
+- `character_images.file_path`, `characters.thumbnail_path`.
+
+Image variants (`<stem>.w256.webp`, see `backend.image_variants`) and the
+prompt saved next to a page image (`<stem>_prompt.txt`) live as long as
+their original. Character reference images (`.../references/`) are also
+recorded inside story JSON, and are never collected, nor are dotfiles such
+as `.gitkeep`.
+
+Before anything is reported, each batch of candidates is checked again with
+exact lookups, and files newer than `ASSET_GC_MIN_AGE_HOURS` are skipped, as
+they may belong to a generation still in progress.
+
+`collect_orphans` reports by default and only deletes with `dry_run=False`,
+at most `ASSET_GC_MAX_DELETES_PER_SECOND`. Run `scripts/collect_orphaned_assets.py`,
+or let retention run it (`ASSET_GC_MODE`).
+"""
+
+from __future__ import annotations
+
+import heapq
+import os
+import time
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Set, Tuple
+
+from sqlalchemy import and_, or_, select
+from sqlalchemy.orm import Session
+
+from . import image_variants, storage
+from .database import asset_reference_keys
+from .logging_config import app_logger, error_logger
+from .settings import get_settings
+
+IMAGES_PREFIX = "images"
+
+# Stems per variant lookup query.
+_STEMS_PER_QUERY = 100
+
+# Appended to a page image's stem by ai_services.generate_image_for_page.
+PROMPT_SUFFIX = "_prompt.txt"
+
+
+def _reference_columns(db: Session) -> List:
+    # Each has an index (see backend.database.ASSET_REFERENCE_INDEX_NAMES).
+    return asset_reference_keys(db.get_bind().dialect.name)
+
+
+def _sorted_references(db: Session, column, batch_size: int) -> Iterator[str]:
+    """Yield the distinct values of `column` in order, one batch per query."""
+
+    last = None
+    while True:
+        query = select(column).where(column.is_not(None))
+        if last is not None:
+            query = query.where(column > last)
+        values = db.scalars(query.order_by(column).limit(batch_size)).all()
+        yield from values
+        if len(values) < batch_size:
+            return
+        last = values[-1]
+
+
+def _is_protected(key: str) -> bool:
+    name = key.rsplit("/", 1)[-1]
+    if name.startswith(".") and not name.endswith(".tmp"):
+        return True  # e.g. .gitkeep; hidden .tmp files are partial writes
+    # Character reference images: referenced from stories.main_characters.
+    return "/references/" in key
+
+
+def _referenced(db: Session, keys: Sequence[str]) -> Set[str]:
+    found = set()
+    for column in _reference_columns(db):
+        found.update(db.scalars(select(column).where(column.in_(keys))))
+    return found
+
+
+def _source_stem(key: str) -> Optional[str]:
+    """Return the original's stem if `key` is a variant or a prompt."""
+
+    if key.endswith(PROMPT_SUFFIX):
+        return key[:-len(PROMPT_SUFFIX)]
+    return image_variants.source_stem(key)
+
+
+def _live_stems(db: Session, stems: Sequence[str]) -> Set[str]:
+    """Return the stems that are the extensionless key of some reference."""
+
+    live = set()
+    for start in range(0, len(stems), _STEMS_PER_QUERY):
+        chunk = stems[start:start + _STEMS_PER_QUERY]
+        for column in _reference_columns(db):
+            # "/" sorts right after ".": the range holds "<stem>.<anything>".
+            query = select(column).where(or_(*(
+                and_(column >= stem + ".", column < stem + "/") for stem in chunk)))
+            live.update(os.path.splitext(value)[0] for value in db.scalars(query))
+    return live
+
+
+def _confirmed_orphans(
+    db: Session,
+    asset_storage: storage.AssetStorage,
+    keys: Sequence[str],
+    cutoff: float,
+) -> Iterator[Tuple[str, int]]:
+    referenced = _referenced(db, keys)
+    stems = {key: _source_stem(key) for key in keys}
+    live_stems = _live_stems(db, sorted({stem for stem in stems.values() if stem}))
+    for key in keys:
+        if key in referenced or stems[key] in live_stems:
+            continue
+        try:
+            size, modified = asset_storage.stat(key)
+        except FileNotFoundError:
+            continue
+        if modified > cutoff:
+            continue
+        yield key, size
+
+
+def find_orphans(
+    db: Session,
+    asset_storage: storage.AssetStorage,
+    prefix: str = IMAGES_PREFIX,
+    batch_size: int = 500,
+    min_age_seconds: float = 0,
+    counts: Optional[Dict[str, int]] = None,
+) -> Iterator[Tuple[str, int]]:
+    """Yield `(key, size)` for each unreferenced file under `prefix`.
+
+    `counts["scanned"]` is incremented for every key listed, if given.
+    """
+
+    cutoff = time.time() - min_age_seconds
+    references = heapq.merge(*(
+        _sorted_references(db, column, batch_size)
+        for column in _reference_columns(db)))
+    reference = next(references, None)
+    candidates: List[str] = []
+    for key in asset_storage.list_keys(prefix, include_partial=True):
+        if counts is not None:
+            counts["scanned"] += 1
+        while reference is not None and reference < key:
+            reference = next(references, None)
+        if reference == key or _is_protected(key):
+            continue
+        candidates.append(key)
+        if len(candidates) >= batch_size:
+            yield from _confirmed_orphans(db, asset_storage, candidates, cutoff)
+            candidates = []
+    if candidates:
+        yield from _confirmed_orphans(db, asset_storage, candidates, cutoff)
+
+
+def collect_orphans(
+    db: Session,
+    asset_storage: Optional[storage.AssetStorage] = None,
+    dry_run: bool = True,
+    report: Optional[Callable[[str, int], None]] = None,
+    max_deletes_per_second: Optional[float] = None,
+    min_age_hours: Optional[float] = None,
+) -> Dict[str, int]:
+    """Find, report and (unless `dry_run`) delete orphaned image files.
+
+    `report` is called with each orphan's key and size. Returns how many
+    keys were scanned, orphans found with their total bytes, and deleted.
+    """
+
+    settings = get_settings()
+    asset_storage = asset_storage or storage.get_storage()
+    if max_deletes_per_second is None:
+        max_deletes_per_second = settings.asset_gc_max_deletes_per_second
+    if min_age_hours is None:
+        min_age_hours = settings.asset_gc_min_age_hours
+    interval = 1 / max_deletes_per_second if max_deletes_per_second > 0 else 0
+
+    counts = {"scanned": 0, "orphans": 0, "bytes": 0, "deleted": 0}
+    next_delete_at = time.monotonic()
+    for key, size in find_orphans(
+        db,
+        asset_storage,
+        batch_size=max(1, settings.asset_gc_batch_size),
+        min_age_seconds=min_age_hours * 3600,
+        counts=counts,
+    ):
+        counts["orphans"] += 1
+        counts["bytes"] += size
+        if report is not None:
+            report(key, size)
+        if dry_run:
+            continue
+
+        delay = next_delete_at - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        try:
+            asset_storage.delete(key)
+        except OSError as exc:
+            error_logger.warning("Could not delete orphaned asset %s: %s", key, exc)
+        else:
+            counts["deleted"] += 1
+        next_delete_at = time.monotonic() + interval
+
+    if counts["deleted"]:
+        # The deleted files may have held the last links to their blobs.
+        asset_storage.collect_garbage()
+    app_logger.info(
+        "Orphaned asset %s finished: %s",
+        "report" if dry_run else "collection",
+        counts,
+    )
+    return counts
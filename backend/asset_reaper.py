@@ -0,0 +1,194 @@
+"""Background deletion of asset folders recorded as tombstones.
+
+Deleting a story's image folder can take seconds for stories with dozens of
+large images (and longer on remote storage), so requests no longer do it
+inline. Instead they add an `AssetTombstone` in the same transaction that
+deletes the rows, and return. The reaper then removes the folders in batches
+of `ASSET_REAPER_BATCH_SIZE`:
+
+- right after the response, via a background task (`reap_in_background`);
+- every `ASSET_REAPER_INTERVAL_SECONDS` in each app process (`run_forever`),
+  which also retries failures;
+- at the end of each retention run.
+
+A failed deletion stays recorded and is retried with exponential backoff
+(`ASSET_REAPER_RETRY_BASE_SECONDS`, capped at an hour). Deleting a folder
+twice is harmless, so concurrent reapers need no coordination.
+
+Folders are named after row ids, which SQLite reuses: once the story or user
+with the highest id is deleted, the next one created gets its id, and its
+folder. A tombstone whose story or user id is taken again is therefore
+dropped without deleting anything; files left over from the deleted row are
+unreferenced and go to `backend.asset_gc`.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Set
+
+import anyio
+from sqlalchemy import delete, func, select
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from . import storage
+from .database import AssetTombstone, SessionLocal, Story, User
+from .logging_config import app_logger, error_logger
+from .metrics import (
+    ASSET_REAPER_BATCH_SECONDS,
+    ASSET_TOMBSTONES_PENDING,
+    ASSET_TOMBSTONES_PROCESSED_TOTAL,
+)
+from .settings import get_settings
+
+PUBLIC_STORE = "public"
+PRIVATE_STORE = "private"
+
+_MAX_RETRY_DELAY_SECONDS = 3600
+
+# Longest error message kept on a tombstone.
+_ERROR_LENGTH = 500
+
+
+def add_tombstone(
+    db: Session,
+    prefix: str,
+    store: str = PUBLIC_STORE,
+    reason: Optional[str] = None,
+    story_id: Optional[int] = None,
+    user_id: Optional[int] = None,
+) -> AssetTombstone:
+    """Record `prefix` for deletion; the caller's commit makes it durable.
+
+    Pass the id of the story or user the folder is named after, so that the
+    folder is kept if the id is reused before the reaper runs.
+    """
+
+    tombstone = AssetTombstone(
+        store=store,
+        prefix=prefix,
+        reason=reason,
+        story_id=story_id,
+        user_id=user_id,
+        attempts=0,
+        next_attempt_at=datetime.now(timezone.utc),
+    )
+    db.add(tombstone)
+    return tombstone
+
+
+def _retry_delay(attempts: int) -> timedelta:
+    base = max(1, get_settings().asset_reaper_retry_base_seconds)
+    return timedelta(seconds=min(base * 2 ** (attempts - 1), _MAX_RETRY_DELAY_SECONDS))
+
+
+def _store(name: str) -> storage.AssetStorage:
+    if name == PRIVATE_STORE:
+        return storage.get_private_storage()
+    return storage.get_storage()
+
+
+def _reused(db: Session, tombstones: List[AssetTombstone]) -> Set[int]:
+    """Return the ids of the tombstones whose story or user id is live again."""
+
+    reused = set()
+    for model, attribute in ((Story, "story_id"), (User, "user_id")):
+        owners: Dict[int, List[int]] = {}
+        for tombstone in tombstones:
+            owner_id = getattr(tombstone, attribute)
+            if owner_id is not None:
+                owners.setdefault(owner_id, []).append(tombstone.id)
+        if owners:
+            for owner_id in db.scalars(select(model.id).where(model.id.in_(owners))):
+                reused.update(owners[owner_id])
+    return reused
+
+
+def reap_tombstones(
+    db: Session,
+    batch_size: Optional[int] = None,
+    now: Optional[datetime] = None,
+) -> Dict[str, int]:
+    """Delete the folders of due tombstones, batch by batch, until none are due.
+
+    Returns the number of folders deleted, of tombstones skipped because
+    their folder's id was reused, and of attempts that failed.
+    """
+
+    batch_size = max(1, batch_size or get_settings().asset_reaper_batch_size)
+    now = now or datetime.now(timezone.utc)
+    counts = {"deleted": 0, "skipped": 0, "failed": 0}
+    retried = set()
+    while True:
+        started_at = time.perf_counter()
+        tombstones = db.scalars(
+            select(AssetTombstone)
+            .where(AssetTombstone.next_attempt_at <= now,
+                   AssetTombstone.id.not_in(retried))
+            .order_by(AssetTombstone.id)
+            .limit(batch_size)
+        ).all()
+        if not tombstones:
+            break
+
+        done = []
+        reused = _reused(db, tombstones)
+        for tombstone in tombstones:
+            if tombstone.id in reused:
+                done.append(tombstone.id)
+                counts["skipped"] += 1
+                ASSET_TOMBSTONES_PROCESSED_TOTAL.labels(outcome="skipped").inc()
+                app_logger.info(
+                    "Kept assets %s: their id belongs to a new row", tombstone.prefix)
+                continue
+            try:
+                _store(tombstone.store).delete_prefix(tombstone.prefix)
+            except Exception as exc:
+                tombstone.attempts += 1
+                tombstone.last_error = str(exc)[:_ERROR_LENGTH]
+                tombstone.next_attempt_at = now + _retry_delay(tombstone.attempts)
+                retried.add(tombstone.id)
+                counts["failed"] += 1
+                ASSET_TOMBSTONES_PROCESSED_TOTAL.labels(outcome="failed").inc()
+                error_logger.warning(
+                    "Could not delete assets %s (attempt %d): %s",
+                    tombstone.prefix, tombstone.attempts, exc)
+            else:
+                done.append(tombstone.id)
+                counts["deleted"] += 1
+                ASSET_TOMBSTONES_PROCESSED_TOTAL.labels(outcome="deleted").inc()
+        if done:
+            db.execute(delete(AssetTombstone).where(AssetTombstone.id.in_(done)),
+                       execution_options={"synchronize_session": False})
+        db.commit()
+        ASSET_REAPER_BATCH_SECONDS.observe(time.perf_counter() - started_at)
+        if len(tombstones) < batch_size:
+            break
+
+    ASSET_TOMBSTONES_PENDING.set(
+        db.scalar(select(func.count()).select_from(AssetTombstone)) or 0)
+    if any(counts.values()):
+        app_logger.info("Asset reaper finished a run: %s", counts)
+    return counts
+
+
+def reap_in_background(bind: Engine) -> None:
+    """Run the reaper in a fresh session on `bind` (used as a background task)."""
+
+    with Session(bind=bind) as db:
+        try:
+            reap_tombstones(db)
+        except Exception as exc:
+            # Whatever is left is picked up by the next run.
+            error_logger.error("Asset reaper run failed: %s", exc, exc_info=True)
+
+
+async def run_forever(interval_seconds: int) -> None:
+    """Reap periodically until cancelled (started by the app lifespan)."""
+
+    while True:
+        await asyncio.sleep(interval_seconds)
+        await anyio.to_thread.run_sync(reap_in_background, SessionLocal.kw["bind"])
@@ -5,15 +5,15 @@ from typing import Optional
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
-from passlib.context import CryptContext
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
 from dotenv import load_dotenv
 
-from . import crud, schemas
+from . import auth_cache, crud, password_hashing, schemas
 # Import the logger
 from .logging_config import error_logger, app_logger
 from .database import SessionLocal, get_db
+from .metrics import PASSWORD_REHASHES_TOTAL
 
 load_dotenv()  # Load environment variables from .env file
 
@@ -22,7 +22,7 @@ SECRET_KEY = os.getenv(
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60  # 1 hour
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = password_hashing.pwd_context
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
 
@@ -50,12 +50,12 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     return encoded_jwt
 
 
-async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
+def _token_subject(token: str, credentials_exception: HTTPException) -> str:
+    """Return the verified token's subject, skipping re-verification when cached."""
+
+    subject = auth_cache.get_cached_token_subject(token)
+    if subject is not None:
+        return subject
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         username: str = payload.get("sub")
@@ -65,11 +65,34 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = De
     except JWTError as e:
         error_logger.error(f"JWT Error: {e}")
         raise credentials_exception
+    exp = payload.get("exp")
+    auth_cache.cache_token_subject(
+        token, token_data.username, exp if isinstance(exp, (int, float)) else None)
+    return token_data.username
+
+
+async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+    """Resolve the bearer token to an `auth_cache.AuthenticatedUser`.
+
+    The principal is cached per username for AUTH_USER_CACHE_TTL_SECONDS, so
+    most requests need no database round trip.
+    """
+    credentials_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Could not validate credentials",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+    username = _token_subject(token, credentials_exception)
 
-    user = crud.get_user_by_username(db, username=token_data.username)
+    principal = auth_cache.get_cached_principal(username)
+    if principal is not None:
+        return principal
+    user = crud.get_user_by_username(db, username=username)
     if user is None:
         raise credentials_exception
-    return user
+    principal = auth_cache.AuthenticatedUser.from_user(user)
+    auth_cache.cache_principal(principal)
+    return principal
 
 
 async def get_current_active_user(current_user: schemas.User = Depends(get_current_user)):
@@ -87,10 +110,40 @@ async def get_current_admin_user(current_user: schemas.User = Depends(get_curren
     return current_user
 
 
+def _apply_rehash(db: Session, user, new_hash: Optional[str]) -> None:
+    """Store a re-computed hash (configured cost changed) after a successful login."""
+
+    if not new_hash:
+        return
+    try:
+        user.hashed_password = new_hash
+        db.commit()
+        PASSWORD_REHASHES_TOTAL.inc()
+    except Exception as e:
+        db.rollback()
+        error_logger.error(f"Failed to store rehashed password for user {user.id}: {e}")
+
+
 def authenticate_user(db: Session, username: str, password: str):
     user = crud.get_user_by_username(db, username=username)
     if not user:
         return None
-    if not verify_password(password, user.hashed_password):
+    valid, new_hash = pwd_context.verify_and_update(password, user.hashed_password)
+    if not valid:
+        return None
+    _apply_rehash(db, user, new_hash)
+    return user
+
+
+async def authenticate_user_async(db: Session, username: str, password: str):
+    """Like `authenticate_user`, with bcrypt run in the password executor."""
+
+    user = crud.get_user_by_username(db, username=username)
+    if not user:
+        return None
+    valid, new_hash = await password_hashing.verify_password(
+        password, user.hashed_password)
+    if not valid:
         return None
+    _apply_rehash(db, user, new_hash)
     return user
@@ -0,0 +1,172 @@
+"""Per-process caches for request authentication.
+
+Every authenticated request used to verify the JWT and load its `User` row.
+Status polling and page image loads make that the hottest query in the app,
+so each worker keeps two small bounded LRU caches:
+
+- verified tokens -> subject, until the token's own expiry;
+- subject (username) -> `AuthenticatedUser`, a detached snapshot of the
+  columns request handlers read, for `AUTH_USER_CACHE_TTL_SECONDS`.
+
+ORM flushes that touch a `User` evict that user's principal when the
+transaction commits, so admin changes to `is_active`, role or deletion apply
+immediately in the worker that made them. Other workers (and raw SQL writes)
+pick them up within the TTL.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from itertools import chain
+from typing import Any, Callable, Generic, Hashable, Optional, TypeVar
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from backend.database import User
+from backend.settings import get_settings
+
+_PENDING_USER_IDS_KEY = "_auth_cache_user_ids"
+
+V = TypeVar("V")
+
+
+class LRUTTLCache(Generic[V]):
+    """Thread-safe LRU cache whose entries also expire at a given time."""
+
+    def __init__(self, maxsize: int, clock: Callable[[], float] = time.time):
+        self.maxsize = maxsize
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, tuple[float, V]]" = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[V]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= self._clock():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: V, ttl: float) -> None:
+        if ttl <= 0 or self.maxsize <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (self._clock() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def pop(self, key: Hashable) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def discard_where(self, predicate: Callable[[V], bool]) -> None:
+        """Drop every entry whose value matches `predicate`."""
+        with self._lock:
+            for key in [k for k, (_, v) in self._entries.items() if predicate(v)]:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+@dataclass(frozen=True)
+class AuthenticatedUser:
+    """Detached snapshot of the `User` columns used by request handlers.
+
+    Not bound to any session; load the `User` row when it must be modified.
+    """
+
+    id: int
+    username: str
+    email: Optional[str]
+    is_active: bool
+    is_deleted: bool
+    role: str
+    created_at: Optional[datetime]
+    updated_at: Optional[datetime]
+
+    @classmethod
+    def from_user(cls, user: User) -> "AuthenticatedUser":
+        return cls(
+            id=user.id,
+            username=user.username,
+            email=user.email,
+            is_active=bool(user.is_active),
+            is_deleted=bool(user.is_deleted),
+            role=user.role,
+            created_at=user.created_at,
+            updated_at=user.updated_at,
+        )
+
+
+_settings = get_settings()
+token_cache: LRUTTLCache[str] = LRUTTLCache(_settings.auth_token_cache_size)
+principal_cache: LRUTTLCache[AuthenticatedUser] = LRUTTLCache(
+    _settings.auth_user_cache_size)
+
+
+def get_cached_token_subject(token: str) -> Optional[str]:
+    """Return the subject of a previously verified, unexpired token."""
+    return token_cache.get(token)
+
+
+def cache_token_subject(token: str, subject: str, expires_at: Optional[float]) -> None:
+    """Remember a verified token until its `exp` claim (epoch seconds)."""
+    if expires_at is None:
+        return
+    token_cache.set(token, subject, expires_at - time.time())
+
+
+def get_cached_principal(username: str) -> Optional[AuthenticatedUser]:
+    return principal_cache.get(username)
+
+
+def cache_principal(principal: AuthenticatedUser) -> None:
+    principal_cache.set(
+        principal.username, principal, get_settings().auth_user_cache_ttl)
+
+
+def invalidate_user(user_id: int) -> None:
+    """Evict a user's cached principal (under any username)."""
+    principal_cache.discard_where(lambda principal: principal.id == user_id)
+
+
+def clear() -> None:
+    token_cache.clear()
+    principal_cache.clear()
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_flushed_users(session: Session, flush_context: Any) -> None:
+    user_ids = {
+        obj.id
+        for obj in chain(session.dirty, session.deleted)
+        if isinstance(obj, User) and obj.id is not None
+    }
+    if user_ids:
+        session.info.setdefault(_PENDING_USER_IDS_KEY, set()).update(user_ids)
+
+
+@event.listens_for(Session, "after_commit")
+def _evict_committed_users(session: Session) -> None:
+    for user_id in session.info.pop(_PENDING_USER_IDS_KEY, ()):
+        invalidate_user(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_rolled_back_users(session: Session) -> None:
+    session.info.pop(_PENDING_USER_IDS_KEY, None)
@@ -1,14 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, Response, status, Query, UploadFile, File
 from sqlalchemy.orm import Session
-from typing import Optional
+from typing import List, Optional
 import shutil
 import os
+import tempfile
 import uuid
 from PIL import Image as PILImage
 
-from . import schemas, auth, crud, database, ai_services, storage_paths
+from . import schemas, auth, crud, database, ai_services, image_variants, storage, storage_paths
 from .settings import get_settings
 from .logging_config import app_logger, error_logger
+from .pagination import NEXT_CURSOR_HEADER
 
 router = APIRouter(prefix="/characters", tags=["characters"])
 
@@ -99,15 +101,11 @@ async def create_character(
             prompt = f"Character portrait of {ch.name}, " + ", ".join(details)
 
             # Map storage paths
-            base_dir_for_db = os.path.join(
-                "images", f"user_{current_user.id}", "characters", f"{ch.id}")
-            settings = get_settings()
-            base_dir_on_disk = os.path.join(settings.data_dir, base_dir_for_db)
-            os.makedirs(base_dir_on_disk, exist_ok=True)
+            base_dir_for_db = storage_paths.character_images_rel(
+                current_user.id, ch.id)
             img_id = str(uuid.uuid4())
             file_name = f"{img_id}.png"
             img_path_for_db = os.path.join(base_dir_for_db, file_name)
-            img_path_on_disk = os.path.join(base_dir_on_disk, file_name)
 
             # Generate
             # generate_image is sync; run in a thread
@@ -116,8 +114,8 @@ async def create_character(
                 ai_services.generate_image, prompt, None, "1024x1024"
             )
             if image_bytes:
-                with open(img_path_on_disk, "wb") as f:
-                    f.write(image_bytes)
+                await ai_services.asyncio.to_thread(
+                    image_variants.save_image, img_path_for_db, image_bytes)
                 crud.add_character_image(
                     db, current_user.id, ch.id, img_path_for_db, prompt, ch.image_style)
         except Exception as e:
@@ -132,20 +130,46 @@ def list_characters(
     q: Optional[str] = Query(None),
     page: int = Query(1, ge=1),
     page_size: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None),
+    include_total: bool = Query(False),
     db: Session = Depends(database.get_db),
     current_user: database.User = Depends(auth.get_current_active_user)
 ):
     total, items = crud.list_characters(
-        db, current_user.id, q=q, page=page, page_size=page_size)
+        db, current_user.id, q=q, page=page, page_size=page_size, cursor=cursor,
+        include_total=include_total)
     list_items = []
     for ch in items:
         list_items.append(schemas.CharacterListItem(
             id=ch.id,
             name=ch.name,
             updated_at=ch.updated_at,
-            thumbnail_path=crud.get_public_character_thumbnail_path(ch),
+            thumbnail_path=ch.thumbnail_path,
         ))
-    return schemas.PaginatedCharacters(items=list_items, total=total, page=page, page_size=page_size)
+    return schemas.PaginatedCharacters(
+        items=list_items,
+        total=total,
+        page=page,
+        page_size=page_size,
+        next_cursor=crud.next_page_cursor("characters", items, page_size),
+    )
+
+
+@router.get("/search", response_model=List[schemas.CharacterSearchItem])
+def search_characters(
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None),
+    db: Session = Depends(database.get_db),
+    current_user: database.User = Depends(auth.get_current_active_user)
+):
+    """Ranked full-text search over the user's characters (name, description, traits)."""
+    items = crud.search_characters(db, current_user.id, q, limit=limit, cursor=cursor)
+    next_cursor = crud.search_page_cursor("character_search", items, limit)
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return items
 
 
 @router.post(
@@ -202,20 +226,13 @@ async def upload_character_photo(
     settings = get_settings()
     ext = _ext_from_upload(photo)
 
-    upload_dir = storage_paths.character_uploads_abs(current_user.id, ch.id)
-    final_path = os.path.join(upload_dir, f"photo.{ext}")
+    private_storage = storage.get_private_storage()
+    upload_dir = storage_paths.character_uploads_rel(current_user.id, ch.id)
+    final_key = os.path.join(upload_dir, f"photo.{ext}")
 
-    # Remove any previous uploaded photo regardless of extension.
-    for candidate in storage_paths.character_uploaded_photo_candidates_abs(
-        current_user.id, ch.id
-    ):
-        if os.path.exists(candidate):
-            try:
-                os.remove(candidate)
-            except OSError:
-                pass
-
-    tmp_path = os.path.join(upload_dir, f"upload_{uuid.uuid4().hex}.tmp")
+    # Validate in a local temp file before anything reaches storage.
+    fd, tmp_path = tempfile.mkstemp(suffix=".upload")
+    os.close(fd)
     try:
         size_bytes = await _write_upload_to_path(photo, tmp_path, settings.max_upload_bytes)
         try:
@@ -227,7 +244,18 @@ async def upload_character_photo(
                 status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
                 detail="Uploaded file is not a valid image.",
             )
-        os.replace(tmp_path, final_path)
+
+        # Remove any previous uploaded photo regardless of extension.
+        for candidate in storage_paths.character_uploaded_photo_candidates_rel(
+            current_user.id, ch.id
+        ):
+            if candidate != final_key:
+                try:
+                    private_storage.delete(candidate)
+                except OSError:
+                    pass
+        with open(tmp_path, "rb") as fh:
+            private_storage.put(final_key, fh, photo.content_type or None)
     finally:
         # Ensure temp file is cleaned up if anything failed.
         if os.path.exists(tmp_path):
@@ -276,15 +304,10 @@ async def regenerate_character_image(char_id: int, payload: schemas.RegenerateIm
     prompt = ", ".join(parts)
 
     # Storage paths
-    base_dir_for_db = os.path.join(
-        "images", f"user_{current_user.id}", "characters", f"{ch.id}")
-    settings = get_settings()
-    base_dir_on_disk = os.path.join(settings.data_dir, base_dir_for_db)
-    os.makedirs(base_dir_on_disk, exist_ok=True)
+    base_dir_for_db = storage_paths.character_images_rel(current_user.id, ch.id)
     img_id = str(uuid.uuid4())
     file_name = f"{img_id}.png"
     img_path_for_db = os.path.join(base_dir_for_db, file_name)
-    img_path_on_disk = os.path.join(base_dir_on_disk, file_name)
 
     try:
         try:
@@ -298,8 +321,8 @@ async def regenerate_character_image(char_id: int, payload: schemas.RegenerateIm
             # OpenAI auth failed (bad/expired API key)
             raise HTTPException(status_code=401, detail=str(pe))
         if image_bytes:
-            with open(img_path_on_disk, "wb") as f:
-                f.write(image_bytes)
+            await ai_services.asyncio.to_thread(
+                image_variants.save_image, img_path_for_db, image_bytes)
             crud.add_character_image(
                 db, current_user.id, ch.id, img_path_for_db, prompt, style)
         else:
@@ -338,14 +361,15 @@ async def generate_reference_image_from_photo(
     ch = crud.update_character(db, current_user.id, ch.id, update) or ch
 
     # Find the private uploaded photo.
-    photo_path = None
-    for candidate in storage_paths.character_uploaded_photo_candidates_abs(
+    private_storage = storage.get_private_storage()
+    photo_key = None
+    for candidate in storage_paths.character_uploaded_photo_candidates_rel(
         current_user.id, ch.id
     ):
-        if os.path.exists(candidate):
-            photo_path = candidate
+        if private_storage.exists(candidate):
+            photo_key = candidate
             break
-    if not photo_path:
+    if not photo_key:
         raise HTTPException(
             status_code=400,
             detail="No uploaded photo found for this character. Upload a photo first.",
@@ -410,27 +434,23 @@ async def generate_reference_image_from_photo(
         "No text, no labels, no watermark."
     )
 
-    # Storage paths for the generated reference image (public under DATA_DIR).
-    settings = get_settings()
-    base_dir_for_db = os.path.join(
-        "images", f"user_{current_user.id}", "characters", f"{ch.id}"
-    )
-    base_dir_on_disk = os.path.join(settings.data_dir, base_dir_for_db)
-    os.makedirs(base_dir_on_disk, exist_ok=True)
+    # Storage key for the generated reference image (public).
+    base_dir_for_db = storage_paths.character_images_rel(current_user.id, ch.id)
     img_id = str(uuid.uuid4())
     file_name = f"{img_id}.png"
     img_path_for_db = os.path.join(base_dir_for_db, file_name)
-    img_path_on_disk = os.path.join(base_dir_on_disk, file_name)
 
     try:
         try:
-            image_bytes = await ai_services.asyncio.to_thread(
-                ai_services.generate_image,
-                prompt=prompt,
-                reference_image_paths=[photo_path],
-                size="1024x1536",
-                openai_style=openai_style,
-            )
+            # The image API needs a real file; remote uploads are fetched to a temp file.
+            with private_storage.local_copy(photo_key) as photo_path:
+                image_bytes = await ai_services.asyncio.to_thread(
+                    ai_services.generate_image,
+                    prompt=prompt,
+                    reference_image_paths=[photo_path],
+                    size="1024x1536",
+                    openai_style=openai_style,
+                )
         except ValueError as ve:
             raise HTTPException(status_code=503, detail=str(ve))
         except PermissionError as pe:
@@ -452,8 +472,8 @@ async def generate_reference_image_from_photo(
         if not image_bytes:
             raise HTTPException(
                 status_code=500, detail="Image generation failed")
-        with open(img_path_on_disk, "wb") as f:
-            f.write(image_bytes)
+        await ai_services.asyncio.to_thread(
+            image_variants.save_image, img_path_for_db, image_bytes)
         crud.add_character_image(
             db, current_user.id, ch.id, img_path_for_db, prompt, business_style
         )
@@ -1,21 +1,22 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import and_, case, func, insert, or_, select, update
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session, selectinload
 from . import schemas
 from backend.logging_config import error_logger
 # Added DynamicList, DynamicListItem
-from .database import User, Story, Page, DynamicList, DynamicListItem, StoryGenerationTask, Character, CharacterImage
-from passlib.context import CryptContext
+from .database import User, Story, Page, DynamicList, DynamicListItem, StoryGenerationTask, Character, CharacterBackfillState, CharacterImage, normalize_character_name
 from typing import Any, Dict, List, Optional
 from fastapi import HTTPException, status
 from fastapi.encoders import jsonable_encoder  # Added for JSON conversion
 # Ensure datetime and timezone are imported
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 import os
-import shutil
 import uuid  # Import uuid for generating task IDs
 
-from . import storage_paths
+from . import asset_reaper, dynamic_list_cache, full_text_search, image_variants, pagination, password_hashing, storage, storage_paths, task_stats
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = password_hashing.pwd_context
 
 
 _STORY_DYNAMIC_LIST_NAMES: Dict[str, str] = {
@@ -33,6 +34,47 @@ _STORY_FIELD_DEFAULTS: Dict[str, str] = {
 }
 
 
+# Keyset sort keys per paginated list: (column, descending). The primary key is
+# appended as the final tie-breaker by `pagination.apply_keyset`.
+_KEYSET_SORT_KEYS: Dict[str, pagination.SortKey] = {
+    "stories": ((Story.created_at, True),),
+    "admin_stories": ((Story.created_at, True),),
+    "admin_users": ((User.created_at, False),),
+    "characters": ((Character.updated_at, True),),
+    "dynamic_list_items": (
+        (DynamicListItem.sort_order, False),
+        (DynamicListItem.item_label, False),
+    ),
+}
+
+_KEYSET_ID_COLUMNS: Dict[str, Any] = {
+    "stories": Story.id,
+    "admin_stories": Story.id,
+    "admin_users": User.id,
+    "characters": Character.id,
+    "dynamic_list_items": DynamicListItem.id,
+}
+
+
+def _apply_keyset(query, list_key: str, cursor: Optional[str]):
+    """Order a list query by its keyset and seek past `cursor` when given."""
+
+    return pagination.apply_keyset(
+        query,
+        _KEYSET_ID_COLUMNS[list_key],
+        _KEYSET_SORT_KEYS[list_key],
+        list_key,
+        cursor,
+    )
+
+
+def next_page_cursor(list_key: str, items: List[Any], limit: int) -> Optional[str]:
+    """Return the opaque cursor for the page following `items`, if any."""
+
+    return pagination.next_cursor(
+        items, limit, list_key, _KEYSET_SORT_KEYS[list_key])
+
+
 def _coerce_story_field_value(value: Any, default: Optional[str] = None) -> Optional[str]:
     """Normalize incoming story field values to persisted strings."""
 
@@ -171,8 +213,10 @@ def get_user_by_username(db: Session, username: str):
         User.username == username).first()
 
 
-def create_user(db: Session, user: schemas.UserCreate):
-    hashed_password = pwd_context.hash(user.password)
+def create_user(db: Session, user: schemas.UserCreate, hashed_password: Optional[str] = None):
+    """Create a user; async callers pass a `hashed_password` computed off the event loop."""
+    if hashed_password is None:
+        hashed_password = pwd_context.hash(user.password)
     db_user = User(
         username=user.username,
         email=user.email,
@@ -189,9 +233,17 @@ def create_user(db: Session, user: schemas.UserCreate):
 # Admin CRUD for Users
 
 
-def admin_get_users(db: Session, skip: int = 0, limit: int = 100) -> List[User]:
-    """List users excluding soft-deleted ones by default."""
-    return db.query(User).filter(User.is_deleted == False).offset(skip).limit(limit).all()
+def admin_get_users(db: Session, skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> List[User]:
+    """List users excluding soft-deleted ones by default.
+
+    When `cursor` is given, `skip` is ignored and the page starts after the
+    cursor's anchor row.
+    """
+    query = _apply_keyset(
+        db.query(User).filter(User.is_deleted == False), "admin_users", cursor)
+    if cursor:
+        return query.limit(limit).all()
+    return query.offset(skip).limit(limit).all()
 
 
 def admin_update_user(db: Session, user_id: int, user_update: schemas.AdminUserUpdate) -> Optional[User]:
@@ -346,26 +398,124 @@ def finalize_story_draft(db: Session, story_id: int, user_id: int, title: str) -
 
 def update_story_with_pages(db: Session, story_id: int, pages_data: List[schemas.PageCreate], image_paths: List[Optional[str]]):
     """
-    Adds pages to an existing story.
+    Adds pages to an existing story with a single bulk INSERT.
     """
-    for i, page_data in enumerate(pages_data):
-        image_path = image_paths[i] if i < len(image_paths) else None
-        db_page = Page(
-            **page_data.model_dump(),  # Changed from .dict()
-            story_id=story_id,
-            image_path=image_path
-        )
-        db.add(db_page)
+    rows = [
+        {
+            **page_data.model_dump(),
+            "story_id": story_id,
+            "image_path": image_paths[i] if i < len(image_paths) else None,
+        }
+        for i, page_data in enumerate(pages_data)
+    ]
+    if rows:
+        db.execute(insert(Page.__table__), rows)
+        full_text_search.refresh_story_search(db, [story_id])
+    refresh_story_library_summary(db, story_id)
     db.commit()
 
 
 # Increased limit, added include_drafts
-def get_stories_by_user(db: Session, user_id: int, skip: int = 0, limit: int = 100, include_drafts: bool = True):
+def get_stories_by_user(db: Session, user_id: int, skip: int = 0, limit: int = 100, include_drafts: bool = True, cursor: Optional[str] = None):
     query = db.query(Story).filter(Story.owner_id == user_id)
     if not include_drafts:
         query = query.filter(Story.is_draft == False)
-    # Order by creation
-    return query.order_by(Story.created_at.desc()).offset(skip).limit(limit).all()
+    # Order by creation (newest first); a cursor replaces the offset
+    query = _apply_keyset(query, "stories", cursor)
+    if cursor:
+        return query.limit(limit).all()
+    return query.offset(skip).limit(limit).all()
+
+
+# Characters of the outline returned in story library rows.
+STORY_LIBRARY_OUTLINE_SNIPPET_CHARS = 150
+
+
+def _story_library_columns():
+    """Columns selected for story library rows (no JSON or full-outline columns)."""
+
+    snippet_len = STORY_LIBRARY_OUTLINE_SNIPPET_CHARS
+    outline_snippet = case(
+        (
+            func.length(Story.story_outline) > snippet_len,
+            func.substr(Story.story_outline, 1, snippet_len) + "...",
+        ),
+        else_=Story.story_outline,
+    ).label("outline_snippet")
+    return (
+        Story.id,
+        Story.owner_id,
+        Story.title,
+        Story.genre,
+        Story.num_pages,
+        Story.image_style,
+        Story.is_draft,
+        Story.created_at,
+        Story.updated_at,
+        Story.generated_at,
+        Story.cover_image_path,
+        Story.page_count,
+        outline_snippet,
+    )
+
+
+def get_story_library_by_user(db: Session, user_id: int, skip: int = 0, limit: int = 100, include_drafts: bool = True, cursor: Optional[str] = None):
+    """
+    Lists a user's stories for the library view as lightweight projection rows.
+    Same filtering, ordering and cursors as `get_stories_by_user`, but only the
+    columns rendered by the library are selected, and pages are never loaded.
+    """
+    query = db.query(*_story_library_columns()).filter(Story.owner_id == user_id)
+    if not include_drafts:
+        query = query.filter(Story.is_draft == False)
+    query = _apply_keyset(query, "stories", cursor)
+    if cursor:
+        return query.limit(limit).all()
+    return query.offset(skip).limit(limit).all()
+
+
+def search_stories(db: Session, user_id: int, q: str, limit: int = 20, include_drafts: bool = True, cursor: Optional[str] = None):
+    """
+    Ranked full-text search over a user's stories (title, outline and page
+    text). Returns story library rows carrying a `rank` (lower is better),
+    best match first; pass `search_page_cursor("story_search", ...)` back as
+    `cursor` for the next page.
+    """
+    terms = full_text_search.parse_search_terms(q)
+    if not terms:
+        return []
+    ranking = full_text_search.story_ranking(db, user_id, terms)
+    query = db.query(*_story_library_columns(), ranking.c.rank)\
+        .join(ranking, ranking.c.id == Story.id)\
+        .filter(Story.owner_id == user_id)
+    if not include_drafts:
+        query = query.filter(Story.is_draft == False)
+    query = full_text_search.apply_rank_keyset(
+        query, ranking, Story.id, "story_search", cursor)
+    return query.limit(limit).all()
+
+
+def search_page_cursor(list_key: str, items: List[Any], limit: int) -> Optional[str]:
+    """Return the opaque cursor for the ranked search page following `items`."""
+
+    return full_text_search.next_rank_cursor(items, limit, list_key)
+
+
+def refresh_story_library_summary(db: Session, story_id: int) -> None:
+    """
+    Recomputes a story's denormalized `page_count` and `cover_image_path`.
+    Call after adding, removing or re-imaging pages; the caller commits.
+    """
+    db.flush()
+    db_story = db.query(Story).filter(Story.id == story_id).first()
+    if not db_story:
+        return
+    db_story.page_count = db.query(func.count(Page.id)).filter(
+        Page.story_id == story_id).scalar() or 0
+    db_story.cover_image_path = db.query(Page.image_path).filter(
+        Page.story_id == story_id,
+        Page.image_path.isnot(None),
+    ).order_by(Page.page_number.asc(), Page.id.asc()).limit(1).scalar()
 
 
 def get_story_draft(db: Session, story_id: int, user_id: int) -> Optional[Story]:
@@ -375,11 +525,17 @@ def get_story_draft(db: Session, story_id: int, user_id: int) -> Optional[Story]
     return db.query(Story).filter(Story.id == story_id, Story.owner_id == user_id, Story.is_draft == True).first()
 
 
-def get_story(db: Session, story_id: int, user_id: int) -> Optional[Story]:
+def get_story(db: Session, story_id: int, user_id: int, with_pages: bool = False) -> Optional[Story]:
     """
     Retrieves a single story by its ID and owner.
+    With `with_pages`, pages are eager-loaded in one extra SELECT instead of
+    being lazy-loaded on first access.
     """
-    return db.query(Story).filter(Story.id == story_id, Story.owner_id == user_id).first()
+    query = db.query(Story).filter(
+        Story.id == story_id, Story.owner_id == user_id)
+    if with_pages:
+        query = query.options(selectinload(Story.pages))
+    return query.first()
 
 
 def get_story_by_title_and_owner(db: Session, title: str, user_id: int) -> Optional[Story]:
@@ -415,21 +571,34 @@ def save_story_editor(
     user_id: int,
     editor_update: schemas.StoryEditorUpdate,
 ) -> Optional[Story]:
-    """Persist story editor title/defaults/page text and override changes."""
+    """Persist story editor title/defaults/page text and override changes.
 
-    db_story = get_story(db, story_id=story_id, user_id=user_id)
+    Pages are eager-loaded with the story and all page changes are written in
+    a single executemany UPDATE, so the statement count does not grow with the
+    number of edited pages.
+    """
+
+    db_story = get_story(db, story_id=story_id,
+                         user_id=user_id, with_pages=True)
     if not db_story:
         return None
 
+    pages_by_id = {page.id: page for page in db_story.pages}
+    page_values: Dict[int, Dict[str, Any]] = {}
+
+    def _values_for(db_page: Page) -> Dict[str, Any]:
+        return page_values.setdefault(db_page.id, {
+            "id": db_page.id,
+            "text": db_page.text,
+            "editor_state": get_page_editor_state(db_page),
+        })
+
     if editor_update.title is not None:
         db_story.title = editor_update.title.strip() or db_story.title
-        title_page = db.query(Page).filter(
-            Page.story_id == story_id,
-            Page.page_number == 0,
-        ).first()
+        title_page = next(
+            (page for page in db_story.pages if page.page_number == 0), None)
         if title_page:
-            title_page.text = db_story.title
-            title_page.editor_state = get_page_editor_state(title_page)
+            _values_for(title_page)["text"] = db_story.title
 
     if editor_update.editor_settings is not None:
         current_settings = get_story_editor_settings(db_story)
@@ -438,10 +607,6 @@ def save_story_editor(
         )
         db_story.editor_settings = current_settings
 
-    pages_by_id = {
-        page.id: page
-        for page in db.query(Page).filter(Page.story_id == story_id).all()
-    }
     for page_update in editor_update.pages:
         db_page = pages_by_id.get(page_update.id)
         if not db_page:
@@ -450,20 +615,21 @@ def save_story_editor(
                 detail="Page not found",
             )
 
+        values = _values_for(db_page)
         if page_update.text is not None:
-            db_page.text = page_update.text
+            values["text"] = page_update.text
             if db_page.page_number == 0:
                 db_story.title = page_update.text.strip() or db_story.title
 
-        state = get_page_editor_state(db_page)
         if page_update.editor_state is not None:
-            state.update(
+            values["editor_state"].update(
                 page_update.editor_state.model_dump(exclude_none=True))
-        db_page.editor_state = state
 
+    if page_values:
+        db.execute(update(Page), list(page_values.values()))
+        full_text_search.refresh_story_search(db, [story_id])
     db.commit()
-    db.refresh(db_story)
-    return db_story
+    return get_story(db, story_id=story_id, user_id=user_id, with_pages=True)
 
 
 def restore_page_text(
@@ -514,6 +680,7 @@ def restore_page_image(
     original_image_path = state.get("original_image_path")
     db_page.image_path = original_image_path
     db_page.editor_state = state
+    refresh_story_library_summary(db, story_id)
     db.commit()
     db.refresh(db_page)
     return db_page
@@ -525,6 +692,7 @@ def create_story_page(db: Session, page: schemas.PageCreate, story_id: int, imag
     db_page = Page(**page.model_dump(), story_id=story_id,
                    image_path=image_path)  # Changed from .dict()
     db.add(db_page)
+    refresh_story_library_summary(db, story_id)
     db.commit()
     db.refresh(db_page)
     return db_page
@@ -532,7 +700,8 @@ def create_story_page(db: Session, page: schemas.PageCreate, story_id: int, imag
 
 def delete_story_db_entry(db: Session, story_id: int) -> bool:
     """
-    Deletes a story and all its associated pages from the database.
+    Deletes a story and all its associated pages from the database, recording
+    its image folder for the asset reaper in the same transaction.
     Returns True if deletion was successful, False otherwise.
     """
     db_story = db.query(Story).filter(Story.id == story_id).first()
@@ -540,6 +709,10 @@ def delete_story_db_entry(db: Session, story_id: int) -> bool:
         # Delete associated pages first to maintain foreign key integrity
         db.query(Page).filter(Page.story_id == story_id).delete(
             synchronize_session=False)
+        if db_story.owner_id is not None:
+            asset_reaper.add_tombstone(
+                db, storage_paths.story_images_rel(db_story.owner_id, story_id),
+                reason="story deleted", story_id=story_id)
         db.delete(db_story)
         db.commit()
         return True
@@ -553,6 +726,7 @@ def update_page_image_path(db: Session, page_id: int, image_path: str) -> Option
     db_page = db.query(Page).filter(Page.id == page_id).first()
     if db_page:
         db_page.image_path = image_path
+        refresh_story_library_summary(db, db_page.story_id)
         db.commit()
         db.refresh(db_page)
         return db_page
@@ -610,6 +784,7 @@ def soft_delete_user_admin(db: Session, user_id: int) -> bool:
     if not db_user:
         return False
     db_user.is_deleted = True
+    db_user.deleted_at = datetime.now(timezone.utc)
     db_user.is_active = False
     db.commit()
     return True
@@ -627,8 +802,15 @@ def list_stories_admin(
     created_to: Optional[datetime] = None,
     include_hidden: bool = False,
     include_deleted: bool = False,
+    cursor: Optional[str] = None,
+    include_total: bool = False,
 ):
-    """List stories with filters for admin moderation."""
+    """List stories with filters for admin moderation.
+
+    When `cursor` is given, `page` is ignored and the page starts after the
+    cursor's anchor row, and the total is only counted (None otherwise) with
+    `include_total`, so following pages cost one indexed range read.
+    """
     query = db.query(Story)
     if not include_deleted:
         query = query.filter(Story.is_deleted == False)
@@ -645,9 +827,11 @@ def list_stories_admin(
         query = query.filter(Story.created_at >= created_from)
     if created_to is not None:
         query = query.filter(Story.created_at <= created_to)
-    total = query.count()
-    items = query.order_by(Story.created_at.desc()).offset(
-        (page - 1) * page_size).limit(page_size).all()
+    total = query.count() if include_total or not cursor else None
+    query = _apply_keyset(query, "admin_stories", cursor)
+    if cursor:
+        return total, query.limit(page_size).all()
+    items = query.offset((page - 1) * page_size).limit(page_size).all()
     return total, items
 
 
@@ -668,6 +852,7 @@ def soft_delete_story_admin(db: Session, story_id: int) -> bool:
     if not story:
         return False
     story.is_deleted = True
+    story.deleted_at = datetime.now(timezone.utc)
     db.commit()
     return True
 
@@ -747,52 +932,50 @@ def get_dynamic_list_items(
     list_name: str,
     skip: int = 0,
     limit: int = 100,
-    only_active: Optional[bool] = None
+    only_active: Optional[bool] = None,
+    cursor: Optional[str] = None,
 ) -> List[DynamicListItem]:
     query = db.query(DynamicListItem).filter(
         DynamicListItem.list_name == list_name)
     if only_active is not None:
         query = query.filter(DynamicListItem.is_active == only_active)
-    return query.order_by(DynamicListItem.sort_order, DynamicListItem.item_label).offset(skip).limit(limit).all()
+    query = _apply_keyset(query, "dynamic_list_items", cursor)
+    if cursor:
+        return query.limit(limit).all()
+    return query.offset(skip).limit(limit).all()
 
 
-def get_public_list_items(db: Session, list_name: str) -> List[schemas.DynamicListItemPublic]:
+def get_public_list_items(
+    db: Session, list_name: str
+) -> List[dynamic_list_cache.CachedDynamicListItem]:
     """
     Gets all active, public-facing items for a list, sorted by sort_order.
-    Returns only the item_value and item_label.
+    Served from the process-wide dynamic list cache; endpoints expose only
+    item_value and item_label via `schemas.DynamicListItemPublic`.
     """
-    return db.query(DynamicListItem).filter(DynamicListItem.list_name == list_name, DynamicListItem.is_active == True).order_by(DynamicListItem.sort_order, DynamicListItem.item_label).all()
+    return list(dynamic_list_cache.get_dynamic_list_snapshot(db).active_items(list_name))
 
 
-def get_active_dynamic_list_items(db: Session, list_name: str, skip: int = 0, limit: int = 1000) -> List[DynamicListItem]:
-    """Gets all active items for a list, sorted."""
-    return db.query(DynamicListItem)\
-        .filter(DynamicListItem.list_name == list_name, DynamicListItem.is_active == True)\
-        .order_by(DynamicListItem.sort_order, DynamicListItem.item_label)\
-        .offset(skip)\
-        .limit(limit)\
-        .all()
+def get_active_dynamic_list_items(
+    db: Session, list_name: str, skip: int = 0, limit: int = 1000
+) -> List[dynamic_list_cache.CachedDynamicListItem]:
+    """Gets all active items for a list, sorted (served from the list cache)."""
+    items = dynamic_list_cache.get_dynamic_list_snapshot(db).active_items(list_name)
+    return list(items[skip:skip + limit])
 
 
 def get_active_dynamic_list_item_by_value(
     db: Session,
     list_name: str,
     item_value: str,
-) -> Optional[DynamicListItem]:
-    """Get a single active DynamicListItem by its value.
+) -> Optional[dynamic_list_cache.CachedDynamicListItem]:
+    """Get a single active dynamic list item by its value.
 
     This is useful for lightweight lookups (e.g., mapping business enums to
-    provider-specific parameters).
+    provider-specific parameters). Served from the list cache.
     """
-    return (
-        db.query(DynamicListItem)
-        .filter(
-            DynamicListItem.list_name == list_name,
-            DynamicListItem.item_value == item_value,
-            DynamicListItem.is_active == True,
-        )
-        .first()
-    )
+    return dynamic_list_cache.get_dynamic_list_snapshot(db).item_by_value(
+        list_name, item_value)
 
 
 def update_dynamic_list_item(db: Session, item_id: int, item_update: schemas.DynamicListItemUpdate) -> Optional[DynamicListItem]:
@@ -833,6 +1016,83 @@ def delete_dynamic_list_item(db: Session, item_id: int) -> bool:
     return False
 
 
+# Story columns that reference dynamic list values, with the label used in
+# usage details. Both are indexed (ix_stories_genre, ix_stories_image_style).
+_DYNAMIC_LIST_USAGE_COLUMNS: Dict[str, Any] = {
+    "genres": (Story.genre, "Genre"),
+    "image_styles": (Story.image_style, "Image Style"),
+}
+
+
+def get_dynamic_list_usage_counts(
+    db: Session,
+    list_name: str,
+    values: Optional[List[str]] = None,
+) -> Dict[str, int]:
+    """
+    Count referencing stories per item value of a list with one grouped query.
+    Only the list's item values (or `values`, when the caller already has
+    them) are looked up, so the query reads just those entries of the
+    column's index instead of grouping every story.
+    Values with no stories are absent; lists not tied to a Story field return {}.
+    """
+    usage = _DYNAMIC_LIST_USAGE_COLUMNS.get(list_name)
+    if usage is None:
+        return {}
+    if values is None:
+        values = select(DynamicListItem.item_value)\
+            .where(DynamicListItem.list_name == list_name)
+    elif not values:
+        return {}
+    column = usage[0]
+    rows = db.query(column, func.count(Story.id))\
+        .filter(column.in_(values))\
+        .group_by(column)\
+        .all()
+    return {value: count for value, count in rows}
+
+
+def get_dynamic_list_items_usage(db: Session, list_name: str) -> List[Dict[str, Any]]:
+    """
+    Usage of every item in a list, in the same shape as is_dynamic_list_item_in_use
+    plus item_id/item_value/usage_count. Runs three queries regardless of the
+    number of items (items, grouped counts, titles of referencing stories).
+    """
+    items = db.query(DynamicListItem.id, DynamicListItem.item_value)\
+        .filter(DynamicListItem.list_name == list_name)\
+        .order_by(DynamicListItem.sort_order, DynamicListItem.item_label)\
+        .all()
+    counts = get_dynamic_list_usage_counts(
+        db, list_name, values=[item.item_value for item in items])
+
+    titles_by_value: Dict[str, List[str]] = {}
+    used_values = [item.item_value for item in items if counts.get(item.item_value)]
+    if used_values:
+        column = _DYNAMIC_LIST_USAGE_COLUMNS[list_name][0]
+        rows = db.query(column, Story.id, Story.title)\
+            .filter(column.in_(used_values))\
+            .order_by(Story.id)\
+            .all()
+        for value, story_id, title in rows:
+            titles_by_value.setdefault(value, []).append(title or f'ID {story_id}')
+
+    usage = []
+    for item in items:
+        titles = titles_by_value.get(item.item_value)
+        details = []
+        if titles:
+            label = _DYNAMIC_LIST_USAGE_COLUMNS[list_name][1]
+            details.append(f"{label} in Stories: {', '.join(titles)}")
+        usage.append({
+            "item_id": item.id,
+            "item_value": item.item_value,
+            "usage_count": counts.get(item.item_value, 0),
+            "is_in_use": bool(titles),
+            "details": details,
+        })
+    return usage
+
+
 def is_dynamic_list_item_in_use(db: Session, item_id: int) -> dict:
     """
     Checks if a DynamicListItem is referenced in any existing Stories.
@@ -842,40 +1102,66 @@ def is_dynamic_list_item_in_use(db: Session, item_id: int) -> dict:
     if not item:
         return {"is_in_use": False, "details": ["Item not found."]}
 
-    usage_details = []
-
-    # Only check specific story fields if the list name matches known special lists
-    if item.list_name == "genres":
-        stories_using_genre = db.query(Story.id, Story.title).filter(
-            Story.genre == item.item_value).all()
-        if stories_using_genre:
-            usage_details.append(
-                f"Genre in Stories: {', '.join([s.title or f'ID {s.id}' for s in stories_using_genre])}")
-
-    elif item.list_name == "image_styles":
-        stories_using_style = db.query(Story.id, Story.title).filter(
-            Story.image_style == item.item_value).all()
-        if stories_using_style:
-            usage_details.append(
-                f"Image Style in Stories: {', '.join([s.title or f'ID {s.id}' for s in stories_using_style])}")
-
-    # Add more checks here for other specific dynamic lists and how they are used.
-    # For generic lists not tied to specific Story fields, they are considered not in use by default
-    # unless a more generic check (e.g., in a hypothetical UserPreferences.favorite_color_item_id) is added.
-
-    if usage_details:
-        return {"is_in_use": True, "details": usage_details}
-
-    # If no specific usage is found for known list types, or if it's a generic list,
-    # assume not in use by default for this specific check.
-    # The frontend might show a generic "Not in direct use" or similar.
+    # Only specific lists are tied to Story fields; generic lists are
+    # considered not in use.
+    usage = _DYNAMIC_LIST_USAGE_COLUMNS.get(item.list_name)
+    if usage is None:
+        return {"is_in_use": False, "details": []}
+
+    column, label = usage
+    # Indexed equality lookup on the referencing column.
+    stories_using_item = db.query(Story.id, Story.title).filter(
+        column == item.item_value).all()
+    if stories_using_item:
+        return {
+            "is_in_use": True,
+            "details": [
+                f"{label} in Stories: {', '.join([s.title or f'ID {s.id}' for s in stories_using_item])}"
+            ],
+        }
     return {"is_in_use": False, "details": []}
 
 
+def _coerce_generated_page_number(raw_page_num: Any) -> int:
+    """Coerce an AI page number: "Title" (or anything unparsable) is page 0."""
+
+    if isinstance(raw_page_num, str) and raw_page_num.lower() == 'title':
+        return 0
+    try:
+        return int(raw_page_num) if raw_page_num is not None else 0
+    except (TypeError, ValueError):
+        return 0
+
+
+def build_generated_page_rows(story_id: int, pages: List[dict]) -> List[Dict[str, Any]]:
+    """
+    Converts AI page dicts into `pages` row mappings for a bulk insert.
+    Every mapping has the same keys so the insert runs as one executemany.
+    """
+    rows: List[Dict[str, Any]] = []
+    for page_data in pages:
+        text = page_data.get('Text')
+        image_url = page_data.get('image_url')
+        rows.append({
+            "story_id": story_id,
+            "page_number": _coerce_generated_page_number(
+                page_data.get('Page_number')),
+            "text": text,
+            "image_description": page_data.get('Image_description'),
+            "image_path": image_url,
+            "editor_state": {
+                "original_text": text,
+                "original_image_path": image_url,
+            },
+        })
+    return rows
+
+
 def update_story_with_generated_content(db: Session, story_id: int, story_content: dict) -> Optional[Story]:
     """
     Updates a story with the content generated by the AI service.
-    This includes updating the title and creating all the pages.
+    This includes updating the title and replacing all the pages, which are
+    written with a single bulk INSERT however long the story is.
     """
     db_story = db.query(Story).filter(Story.id == story_id).first()
     if not db_story:
@@ -888,47 +1174,27 @@ def update_story_with_generated_content(db: Session, story_id: int, story_conten
         db_story.title = story_content['Title']
     db_story.editor_settings = get_story_editor_settings(db_story)
 
+    pages = story_content.get('Pages')
+    rows = build_generated_page_rows(
+        story_id, pages if isinstance(pages, list) else [])
+
     # Delete existing pages to prevent duplicates
     db.query(Page).filter(Page.story_id == story_id).delete(
         synchronize_session=False)
-
-    # Create new pages
-    if 'Pages' in story_content and isinstance(story_content['Pages'], list):
-        for page_data in story_content['Pages']:
-            # Coerce page number: use 0 for title page, else integer
-            raw_page_num = page_data.get('Page_number')
-            page_number: int
-            if isinstance(raw_page_num, str):
-                if raw_page_num.lower() == 'title':
-                    page_number = 0
-                else:
-                    try:
-                        page_number = int(raw_page_num)
-                    except (TypeError, ValueError):
-                        page_number = 0
-            else:
-                try:
-                    page_number = int(
-                        raw_page_num) if raw_page_num is not None else 0
-                except (TypeError, ValueError):
-                    page_number = 0
-
-            new_page = Page(
-                story_id=story_id,
-                page_number=page_number,
-                text=page_data.get('Text'),
-                image_description=page_data.get('Image_description'),
-                image_path=page_data.get('image_url'),
-                editor_state={
-                    "original_text": page_data.get('Text'),
-                    "original_image_path": page_data.get('image_url'),
-                },
-            )
-            db.add(new_page)
-
+    if rows:
+        # Core insert: the ORM bulk path would split rows whose None columns differ.
+        db.execute(insert(Page.__table__), rows)
+    full_text_search.refresh_story_search(db, [story_id])
+
+    # The new rows are known up front, so the library summary needs no query.
+    # min() keeps insertion (id) order on ties, matching the SQL refresh.
+    image_rows = [row for row in rows if row["image_path"] is not None]
+    db_story.page_count = len(rows)
+    db_story.cover_image_path = min(
+        image_rows, key=lambda row: row["page_number"]
+    )["image_path"] if image_rows else None
     db_story.generated_at = datetime.now(timezone.utc)
     db.commit()
-    db.refresh(db_story)
     return db_story
 
 
@@ -1029,11 +1295,36 @@ def update_story_generation_task(
             task.attempts = (task.attempts or 0) + 1
         # If marking failed, don't increment attempts yet; attempts represent retry cycles after failure
 
+    # Roll the task into the hourly admin stats the first time it finishes
+    terminal_statuses = (
+        schemas.GenerationTaskStatus.COMPLETED.value,
+        schemas.GenerationTaskStatus.FAILED.value,
+    )
+    if task.status in terminal_statuses and previous_status not in terminal_statuses:
+        task_stats.record_task_outcome(
+            db,
+            status=task.status,
+            finished_at=_coerce_datetime_to_utc(task.completed_at or now),
+            duration_seconds=_task_duration_seconds(task, now),
+            attempts=task.attempts,
+        )
+
     db.commit()
     db.refresh(task)
     return task
 
 
+def _task_duration_seconds(task: StoryGenerationTask, now: datetime) -> Optional[float]:
+    """Duration for stats: duration_ms when set, else finish time - created_at."""
+
+    if task.duration_ms:
+        return task.duration_ms / 1000.0
+    if task.created_at is None:
+        return None
+    finished_at = _coerce_datetime_to_utc(task.completed_at or now)
+    return max(0.0, (finished_at - _coerce_datetime_to_utc(task.created_at)).total_seconds())
+
+
 def update_story_generated_at(db: Session, story_id: int) -> Optional[Story]:
     story = db.query(Story).filter(Story.id == story_id).first()
     if story:
@@ -1066,11 +1357,13 @@ def create_character(db: Session, user_id: int, payload: schemas.CharacterCreate
 
 def get_character_by_name_ci(db: Session, user_id: int, name: str) -> Optional[Character]:
     """Find a character by case-insensitive name for a given user."""
-    if not name:
+    key = normalize_character_name(name)
+    if not key:
         return None
+    # Served by the (user_id, name_normalized) unique index.
     return db.query(Character).filter(
         Character.user_id == user_id,
-        Character.name.ilike(name)
+        Character.name_normalized == key
     ).first()
 
 
@@ -1078,22 +1371,58 @@ def get_character(db: Session, user_id: int, char_id: int) -> Optional[Character
     return db.query(Character).filter(Character.id == char_id, Character.user_id == user_id).first()
 
 
-def list_characters(db: Session, user_id: int, q: Optional[str] = None, page: int = 1, page_size: int = 20):
+def list_characters(db: Session, user_id: int, q: Optional[str] = None, page: int = 1, page_size: int = 20, cursor: Optional[str] = None, include_total: bool = False):
+    """List a user's characters; on cursor pages the total is None unless `include_total`."""
     query = db.query(Character).filter(Character.user_id == user_id)
     if q:
-        like = f"%{q}%"
-        query = query.filter(Character.name.ilike(like))
-    total = query.count()
-    items = query.order_by(Character.updated_at.desc()).offset(
-        (page - 1) * page_size).limit(page_size).all()
+        # Word-prefix match on name, description and traits via the search index.
+        terms = full_text_search.parse_search_terms(q)
+        if not terms:
+            return 0, []
+        ranking = full_text_search.character_ranking(db, user_id, terms)
+        query = query.filter(Character.id.in_(select(ranking.c.id)))
+    total = query.count() if include_total or not cursor else None
+    query = _apply_keyset(query, "characters", cursor)
+    if cursor:
+        return total, query.limit(page_size).all()
+    items = query.offset((page - 1) * page_size).limit(page_size).all()
     return total, items
 
 
+def search_characters(db: Session, user_id: int, q: str, limit: int = 20, cursor: Optional[str] = None):
+    """
+    Ranked full-text search over a user's characters (name, description and
+    key traits). Returns list rows carrying a `rank`, best match first.
+    """
+    terms = full_text_search.parse_search_terms(q)
+    if not terms:
+        return []
+    ranking = full_text_search.character_ranking(db, user_id, terms)
+    query = db.query(
+        Character.id,
+        Character.name,
+        Character.updated_at,
+        Character.thumbnail_path,
+        ranking.c.rank,
+    ).join(ranking, ranking.c.id == Character.id)\
+        .filter(Character.user_id == user_id)
+    query = full_text_search.apply_rank_keyset(
+        query, ranking, Character.id, "character_search", cursor)
+    return query.limit(limit).all()
+
+
 def update_character(db: Session, user_id: int, char_id: int, payload: schemas.CharacterUpdate) -> Optional[Character]:
     ch = get_character(db, user_id, char_id)
     if not ch:
         return None
     data = payload.model_dump(exclude_unset=True)
+    if data.get("name"):
+        other = get_character_by_name_ci(db, user_id, data["name"])
+        if other is not None and other.id != ch.id:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"A character named '{other.name}' already exists.",
+            )
     for k, v in data.items():
         setattr(ch, k, v)
     ch.updated_at = datetime.now(timezone.utc)
@@ -1121,7 +1450,8 @@ def add_character_image(db: Session, user_id: int, char_id: int, file_path: str,
     db.commit()
     db.refresh(img)
     # set current image
-    ch.current_image_id = img.id
+    ch.current_image = img
+    sync_character_thumbnail_path(ch)
     ch.updated_at = datetime.now(timezone.utc)
     db.commit()
     db.refresh(ch)
@@ -1190,10 +1520,25 @@ def get_public_character_thumbnail_path(character: Character) -> Optional[str]:
     return None
 
 
+def sync_character_thumbnail_path(character: Character) -> Optional[str]:
+    """Recompute the denormalized `Character.thumbnail_path`; the caller commits.
+
+    Must run whenever a character's current image or image set changes.
+    """
+
+    character.thumbnail_path = get_public_character_thumbnail_path(character)
+    return character.thumbnail_path
+
+
 def repair_public_character_thumbnail(db: Session, character: Character) -> str:
     """Materialize one public character thumbnail from a valid same-user story asset."""
 
-    if get_public_character_thumbnail_path(character):
+    public_path = get_public_character_thumbnail_path(character)
+    if public_path:
+        if character.thumbnail_path != public_path:
+            # Heal a stale denormalized column.
+            character.thumbnail_path = public_path
+            db.commit()
         return "already_public"
 
     saw_private_story_asset = False
@@ -1215,40 +1560,37 @@ def repair_public_character_thumbnail(db: Session, character: Character) -> str:
 
         saw_private_story_asset = True
 
+        asset_storage = storage.get_storage()
         try:
-            source_abs = storage_paths.resolve_data_path(normalized)
+            if not asset_storage.exists(normalized):
+                saw_missing_source = True
+                continue
         except ValueError:
             continue
-        if not os.path.isfile(source_abs):
-            saw_missing_source = True
-            continue
 
-        ext = os.path.splitext(source_abs)[1].lower() or ".png"
-        dest_rel_dir = os.path.join(
-            "images", f"user_{character.user_id}", "characters", str(character.id)
-        )
+        ext = os.path.splitext(normalized)[1].lower() or ".png"
+        dest_rel_dir = storage_paths.character_images_rel(
+            character.user_id, character.id)
         dest_rel_path = os.path.join(dest_rel_dir, f"{uuid.uuid4()}{ext}")
 
         try:
-            dest_abs_path = storage_paths.resolve_data_path(dest_rel_path)
-            os.makedirs(os.path.dirname(dest_abs_path), exist_ok=True)
-            shutil.copy2(source_abs, dest_abs_path)
-            add_character_image(
-                db,
-                character.user_id,
-                character.id,
-                dest_rel_path,
-                prompt_used=None,
-                image_style=character.image_style,
-            )
+            asset_storage.copy(normalized, dest_rel_path)
         except OSError:
             saw_copy_failure = True
             try:
-                if "dest_abs_path" in locals() and os.path.exists(dest_abs_path):
-                    os.remove(dest_abs_path)
+                asset_storage.delete(dest_rel_path)
             except OSError:
                 pass
             continue
+        image_variants.generate_variants_for_key(asset_storage, dest_rel_path)
+        add_character_image(
+            db,
+            character.user_id,
+            character.id,
+            dest_rel_path,
+            prompt_used=None,
+            image_style=character.image_style,
+        )
 
         return "repaired"
 
@@ -1286,89 +1628,242 @@ def backfill_public_character_thumbnails(
     return counts
 
 
-def upsert_character_from_detail(db: Session, user_id: int, char_detail: dict) -> Character:
+_CHARACTER_DETAIL_FIELDS = (
+    'description', 'age', 'gender', 'clothing_style', 'key_traits', 'image_style',
+)
+
+
+def _merge_character_details(char_details: List[dict]) -> Dict[str, dict]:
+    """Collapse details by normalized name; later non-None values win.
+
+    Entries that are not dicts or lack a name are skipped.
     """
-    Create or update a Character for the given user based on a character detail dict
-    coming from story input or generation. If a reference image path is present,
-    attach it as the current CharacterImage.
+    merged: Dict[str, dict] = {}
+    for detail in char_details:
+        if not isinstance(detail, dict):
+            continue
+        name = (detail.get('name') or '').strip()
+        key = normalize_character_name(name)
+        if not key:
+            continue
+        if key in merged:
+            merged[key].update(
+                {k: v for k, v in detail.items() if v is not None and k != 'name'})
+        else:
+            merged[key] = {**detail, 'name': name}
+    return merged
 
-    Expected keys in char_detail: name (required), description, age, gender,
-    clothing_style, key_traits, image_style (optional), reference_image_path (optional).
+
+def upsert_characters_from_details(db: Session, user_id: int, char_details: List[dict]) -> List[Character]:
+    """
+    Create or update a user's Characters from character detail dicts (a story's
+    cast) with a single INSERT ... ON CONFLICT (user_id, name_normalized) DO
+    UPDATE. Existing characters keep their name and only take provided
+    (non-None) fields. Reference image paths are attached as the current
+    CharacterImage when they differ from it.
+
+    Expected keys per detail: name (required), description, age, gender,
+    clothing_style, key_traits, image_style (optional), reference_image_path
+    (optional). Details without a name are skipped. Returns the characters in
+    input order, one per distinct name.
+    """
+    merged = _merge_character_details(char_details)
+    if not merged:
+        return []
+
+    now = datetime.now(timezone.utc)
+    rows = [
+        {
+            'user_id': user_id,
+            'name': detail['name'],
+            'name_normalized': key,
+            **{field: detail.get(field) for field in _CHARACTER_DETAIL_FIELDS},
+            'updated_at': now,
+        }
+        for key, detail in merged.items()
+    ]
+
+    try:
+        dialect_name = db.get_bind().dialect.name
+        if dialect_name in ("sqlite", "postgresql"):
+            dialect_insert = (
+                sqlite_insert if dialect_name == "sqlite" else postgresql_insert
+            )
+            statement = dialect_insert(Character).values(rows)
+            statement = statement.on_conflict_do_update(
+                index_elements=[Character.user_id, Character.name_normalized],
+                set_={
+                    **{
+                        field: func.coalesce(
+                            statement.excluded[field], getattr(Character, field))
+                        for field in _CHARACTER_DETAIL_FIELDS
+                    },
+                    'updated_at': statement.excluded.updated_at,
+                },
+            )
+            db.execute(statement)
+        else:
+            for row in rows:
+                existing = get_character_by_name_ci(db, user_id, row['name'])
+                if existing is None:
+                    db.add(Character(**{k: v for k, v in row.items()
+                                        if k != 'name_normalized'}))
+                    continue
+                for field in _CHARACTER_DETAIL_FIELDS:
+                    if row[field] is not None:
+                        setattr(existing, field, row[field])
+                existing.updated_at = now
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+    characters = db.query(Character)\
+        .options(selectinload(Character.current_image))\
+        .filter(Character.user_id == user_id,
+                Character.name_normalized.in_(list(merged)))\
+        .all()
+    by_key = {ch.name_normalized: ch for ch in characters}
+
+    # Attach reference images, skipping ones that are already current.
+    attached = False
+    for key, detail in merged.items():
+        ch = by_key.get(key)
+        ref_path = detail.get('reference_image_path')
+        if ch is None or not ref_path:
+            continue
+        if ch.current_image is not None and ch.current_image.file_path == ref_path:
+            continue
+        ch.current_image = CharacterImage(
+            character_id=ch.id, file_path=ref_path, prompt_used=None,
+            image_style=detail.get('image_style'))
+        sync_character_thumbnail_path(ch)
+        ch.updated_at = now
+        attached = True
+    if attached:
+        db.commit()
+
+    return [by_key[key] for key in merged if key in by_key]
+
+
+def upsert_character_from_detail(db: Session, user_id: int, char_detail: dict) -> Character:
+    """
+    Create or update a single Character from a character detail dict; see
+    upsert_characters_from_details for the accepted keys.
     """
     name = (char_detail.get('name') or '').strip()
     if not name:
         raise ValueError("Character detail missing required 'name'.")
+    return upsert_characters_from_details(db, user_id, [char_detail])[0]
 
-    # Try to find existing character by name (case-insensitive) and user
-    existing = db.query(Character).filter(
-        Character.user_id == user_id,
-        Character.name.ilike(name)
-    ).first()
 
-    if existing:
-        # Update fields if provided
-        for key in ['description', 'age', 'gender', 'clothing_style', 'key_traits', 'image_style']:
-            if key in char_detail and char_detail[key] is not None:
-                setattr(existing, key, char_detail[key])
-        existing.updated_at = datetime.now(timezone.utc)
-        db.commit()
-        db.refresh(existing)
-        ch = existing
-    else:
-        ch = Character(
-            user_id=user_id,
-            name=name,
-            description=char_detail.get('description'),
-            age=char_detail.get('age'),
-            gender=char_detail.get('gender'),
-            clothing_style=char_detail.get('clothing_style'),
-            key_traits=char_detail.get('key_traits'),
-            image_style=char_detail.get('image_style'),
-        )
-        db.add(ch)
-        db.commit()
-        db.refresh(ch)
-
-    # Attach reference image if provided
-    ref_path = char_detail.get('reference_image_path')
-    if ref_path:
-        # Avoid duplicating if current image already points to this path
-        already_has = False
-        if ch.current_image:
-            try:
-                already_has = (ch.current_image.file_path == ref_path)
-            except Exception:
-                already_has = False
-        if not already_has:
-            add_character_image(db, user_id, ch.id, ref_path, prompt_used=None,
-                                image_style=char_detail.get('image_style'))
+# Server-side timestamps have second resolution on SQLite, so stories updated
+# in the same second as the mark are re-read on the next run (upserts are
+# idempotent).
+_CHARACTER_BACKFILL_OVERLAP = timedelta(seconds=1)
 
-    return ch
 
+def _backfill_resume_anchor(db: Session, state: CharacterBackfillState):
+    """Return the `Story.updated_at` value to resume a backfill run after.
 
-def upsert_characters_from_user_stories(db: Session, user_id: int, include_drafts: bool = True) -> int:
+    On SQLite the server default stores "YYYY-MM-DD HH:MM:SS" text, while a
+    bound datetime renders with microseconds, so the two never compare equal
+    and same-second stories would be skipped. As in `pagination.apply_keyset`,
+    the value stored on the resume story is used instead, as long as it still
+    is the instant that was read. If that story has been edited since, the
+    mark minus a microsecond re-reads the stories of that instant rather than
+    skipping any.
     """
-    Scan all stories for the given user and upsert characters from their main_characters
-    into the Characters library. Returns the number of upsert attempts performed.
+    pending = state.pending_updated_through
+    if db.get_bind().dialect.name == "sqlite":
+        # julianday() parses both text formats.
+        same_instant = func.julianday(Story.updated_at) == func.julianday(pending)
+    else:
+        same_instant = Story.updated_at == pending
+    stored = (
+        select(Story.updated_at)
+        .where(Story.id == state.resume_after_story_id, same_instant)
+        .scalar_subquery()
+    )
+    return func.coalesce(stored, pending - timedelta(microseconds=1))
+
+
+def upsert_characters_from_user_stories(
+    db: Session,
+    user_id: int,
+    include_drafts: bool = True,
+    batch_size: int = 100,
+    full: bool = False,
+) -> Dict[str, int]:
     """
-    query = db.query(Story).filter(Story.owner_id == user_id)
+    Upsert characters from the main_characters of a user's stories into their
+    Characters library, reading only stories updated since the previous run.
+
+    Stories are read in batches of `batch_size` in (updated_at, id) keyset
+    order through the (owner_id, updated_at) index; each batch is upserted in
+    one statement and the (updated_at, id) of its last story is committed to
+    CharacterBackfillState, so an interrupted run resumes with the next batch.
+    A story edited after it was read moves past the resume point and is read
+    again, in this run or the next. `full=True` discards the high-water mark
+    and rescans every story.
+
+    Returns counts: stories scanned and character details submitted.
+    """
+    state = db.get(CharacterBackfillState, (user_id, include_drafts))
+    if state is None:
+        state = CharacterBackfillState(
+            user_id=user_id, include_drafts=include_drafts)
+        db.add(state)
+    if full:
+        state.stories_updated_through = None
+        state.resume_after_story_id = None
+        state.pending_updated_through = None
+
+    # updated_at has a server default, so every story has one.
+    query = db.query(Story.id, Story.updated_at, Story.main_characters)\
+        .filter(Story.owner_id == user_id, Story.updated_at.isnot(None))
     if not include_drafts:
         query = query.filter(Story.is_draft == False)
-    stories = query.all()
-    count = 0
-    for s in stories:
-        try:
-            chars = s.main_characters or []
+    if state.stories_updated_through is not None:
+        query = query.filter(
+            Story.updated_at >= state.stories_updated_through - _CHARACTER_BACKFILL_OVERLAP)
+
+    scanned = 0
+    upserted = 0
+    while True:
+        batch_query = query
+        if state.pending_updated_through is not None:
+            # Resume after the last committed story of this run.
+            anchor = _backfill_resume_anchor(db, state)
+            batch_query = batch_query.filter(or_(
+                Story.updated_at > anchor,
+                and_(Story.updated_at == anchor,
+                     Story.id > state.resume_after_story_id),
+            ))
+        rows = batch_query.order_by(Story.updated_at, Story.id)\
+            .limit(batch_size).all()
+        if not rows:
+            break
+
+        details: List[dict] = []
+        for _, _, chars in rows:
             if isinstance(chars, list):
-                for ch in chars:
-                    try:
-                        # ch is expected to be a dict already (json stored)
-                        upsert_character_from_detail(db, user_id, ch)
-                        count += 1
-                    except Exception:
-                        # continue on individual character failures
-                        pass
-        except Exception:
-            # continue on story failures
-            pass
-    return count
+                # entries are expected to be dicts already (json stored)
+                details.extend(ch for ch in chars if isinstance(ch, dict))
+        if details:
+            upsert_characters_from_details(db, user_id, details)
+
+        state.resume_after_story_id, state.pending_updated_through = rows[-1][:2]
+        db.commit()
+
+        scanned += len(rows)
+        upserted += len(details)
+        if len(rows) < batch_size:
+            break
+
+    if state.pending_updated_through is not None:
+        state.stories_updated_through = state.pending_updated_through
+    state.resume_after_story_id = None
+    state.pending_updated_through = None
+    db.commit()
+    return {"stories_scanned": scanned, "upserted": upserted}
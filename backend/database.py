@@ -1,7 +1,8 @@
 import os
-from sqlalchemy import CheckConstraint, create_engine, Column, Integer, String, Text, ForeignKey, JSON, DateTime, Boolean, UniqueConstraint, Enum, text  # Added Boolean and text
+from sqlalchemy import CheckConstraint, DDL, create_engine, Column, Float, Integer, String, Text, ForeignKey, JSON, DateTime, Boolean, UniqueConstraint, Enum, Index, and_, event, literal_column, text  # Added Boolean and text
 # Import declarative_base from sqlalchemy.orm
-from sqlalchemy.orm import sessionmaker, relationship, declarative_base
+from sqlalchemy.orm import sessionmaker, relationship, declarative_base, validates
+from sqlalchemy.schema import CreateIndex
 from sqlalchemy.sql import func
 from dotenv import load_dotenv
 
@@ -39,6 +40,8 @@ class User(Base):
     is_active = Column(Boolean, default=True)  # New field
     # Soft delete flag for admin-controlled deletions
     is_deleted = Column(Boolean, default=False)
+    # When is_deleted was set; retention purges the user after a grace period.
+    deleted_at = Column(DateTime(timezone=True), nullable=True)
     role = Column(String, default="user")  # New field (e.g., "user", "admin")
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True),
@@ -83,12 +86,46 @@ class Story(Base):
     # Admin moderation flags
     is_hidden = Column(Boolean, default=False, nullable=False)
     is_deleted = Column(Boolean, default=False, nullable=False)
+    # When is_deleted was set; retention purges the story after a grace period.
+    deleted_at = Column(DateTime(timezone=True), nullable=True)
     editor_settings = Column(JSON, nullable=True)
+    # Denormalized library summary (see crud.refresh_story_library_summary) so the
+    # story list never has to load pages.
+    cover_image_path = Column(String, nullable=True)
+    page_count = Column(Integer, nullable=False, default=0, server_default="0")
 
     owner = relationship("User", back_populates="stories")
     pages = relationship("Page", back_populates="story",
                          cascade="all, delete-orphan")
 
+    __table_args__ = (
+        # Library listing: owner filter (+ draft flag) ordered by newest first.
+        Index("ix_stories_owner_created", "owner_id", "created_at"),
+        Index("ix_stories_owner_draft_created",
+              "owner_id", "is_draft", "created_at"),
+        # Duplicate-title check performed on every story create.
+        Index("ix_stories_owner_title", "owner_id", "title"),
+        # Incremental character backfill: a user's stories changed since a mark.
+        Index("ix_stories_owner_updated", "owner_id", "updated_at"),
+        # Dynamic list usage counts (crud.get_dynamic_list_usage_counts).
+        Index("ix_stories_genre", "genre"),
+        Index("ix_stories_image_style", "image_style"),
+        # Admin moderation defaults to visible (non-deleted, non-hidden) stories.
+        Index(
+            "ix_stories_visible_created",
+            "created_at",
+            sqlite_where=and_(is_deleted == False, is_hidden == False),
+            postgresql_where=and_(is_deleted == False, is_hidden == False),
+        ),
+        # Retention purge of soft-deleted stories past their grace period.
+        Index(
+            "ix_stories_deleted_at",
+            "deleted_at",
+            sqlite_where=is_deleted == True,
+            postgresql_where=is_deleted == True,
+        ),
+    )
+
 
 class Page(Base):
     __tablename__ = "pages"
@@ -104,6 +141,10 @@ class Page(Base):
                         server_default=func.now(), onupdate=func.now())
     story = relationship("Story", back_populates="pages")
 
+    __table_args__ = (
+        Index("ix_pages_story_page_number", "story_id", "page_number"),
+    )
+
 # New Models for Dynamic Lists (FR-ADM-05)
 
 
@@ -151,6 +192,12 @@ class StoryGenerationTask(Base):
             "status IN ('pending', 'in_progress', 'completed', 'failed')",
             name="ck_story_generation_task_status",
         ),
+        # Status-filtered windows (startup recovery, completed/failed counts).
+        Index("ix_story_generation_tasks_status_created",
+              "status", "created_at"),
+        # Admin stats count every task in a recent created_at window.
+        Index("ix_story_generation_tasks_created_status",
+              "created_at", "status"),
     )
 
     id = Column(String, primary_key=True, index=True)
@@ -182,9 +229,96 @@ class StoryGenerationTask(Base):
     user = relationship("User")
 
 
+class AssetTombstone(Base):
+    """A folder of assets waiting to be deleted by `backend.asset_reaper`.
+
+    Recorded in the same transaction that removes the rows referencing the
+    files, so no deletion is lost if the process dies before the reaper runs.
+    """
+
+    __tablename__ = "asset_tombstones"
+
+    id = Column(Integer, primary_key=True, index=True)
+    # "public" (get_storage) or "private" (get_private_storage)
+    store = Column(String, nullable=False, default="public")
+    prefix = Column(String, nullable=False)
+    reason = Column(String, nullable=True)
+    # The deleted story or user the folder is named after. SQLite hands the
+    # highest id out again once its row is gone, so while a row with that id
+    # exists the folder belongs to it and is not deleted.
+    story_id = Column(Integer, nullable=True)
+    user_id = Column(Integer, nullable=True)
+    attempts = Column(Integer, nullable=False, default=0)
+    last_error = Column(String, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    next_attempt_at = Column(DateTime(timezone=True), nullable=False, index=True)
+
+
+class StoryGenerationTaskArchive(Base):
+    """Compact summary of a generation task removed by `backend.retention`.
+
+    No foreign keys: archived rows outlive the stories and users they name.
+    """
+
+    __tablename__ = "story_generation_task_archive"
+
+    id = Column(String, primary_key=True)
+    story_id = Column(Integer, nullable=False, index=True)
+    user_id = Column(Integer, nullable=False, index=True)
+    status = Column(String, nullable=False)
+    attempts = Column(Integer, nullable=True)
+    total_retries = Column(Integer, nullable=True)
+    failed_pages_count = Column(Integer, nullable=True)
+    duration_ms = Column(Integer, nullable=True)
+    # last_error (else error_message), truncated
+    error = Column(String, nullable=True)
+    created_at = Column(DateTime(timezone=True), nullable=True)
+    completed_at = Column(DateTime(timezone=True), nullable=True)
+    archived_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+class TaskStatsHourly(Base):
+    """Hourly rollup of finished story generation tasks for historical stats.
+
+    One row per UTC hour (by completion time), incremented by
+    `task_stats.record_task_outcome` as tasks reach a terminal status.
+    """
+
+    __tablename__ = "task_stats_hourly"
+
+    bucket_start = Column(DateTime(timezone=True), primary_key=True)
+    completed_count = Column(Integer, nullable=False, default=0)
+    failed_count = Column(Integer, nullable=False, default=0)
+    # Sum/count of known durations (seconds) over completed tasks
+    duration_seconds_sum = Column(Float, nullable=False, default=0.0)
+    duration_samples = Column(Integer, nullable=False, default=0)
+    # Sum of attempts over completed tasks
+    attempts_sum = Column(Integer, nullable=False, default=0)
+
+
+class CacheVersion(Base):
+    """Monotonic version counters for process-wide caches.
+
+    Writers bump a row in the same transaction as the data it guards, so every
+    worker can detect staleness with a single primary-key lookup.
+    """
+
+    __tablename__ = "cache_versions"
+
+    name = Column(String, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+
+
 # --- Characters Domain (Phase 2) ---
 
 
+def normalize_character_name(name):
+    """Return the per-user lookup key for a character name (trimmed, lowercase)."""
+    if name is None:
+        return None
+    return str(name).strip().lower() or None
+
+
 class Character(Base):
     __tablename__ = "characters"
 
@@ -192,12 +326,19 @@ class Character(Base):
     user_id = Column(Integer, ForeignKey("users.id"),
                      nullable=False, index=True)
     name = Column(String, nullable=False, index=True)
+    # Case-insensitive lookup key, kept in sync with `name` by
+    # `_sync_name_normalized`. NULL only for legacy duplicates (see
+    # `_ensure_character_name_normalized`).
+    name_normalized = Column(String, nullable=True)
     description = Column(Text, nullable=True)
     age = Column(Integer, nullable=True)
     gender = Column(String, nullable=True)
     clothing_style = Column(String, nullable=True)
     key_traits = Column(Text, nullable=True)
     image_style = Column(String, nullable=True)
+    # Denormalized public thumbnail (see crud.sync_character_thumbnail_path) so
+    # the character list never loads images.
+    thumbnail_path = Column(String, nullable=True)
     # use_alter=True marks this FK as part of a known cycle so metadata.drop/create won't warn
     current_image_id = Column(
         Integer,
@@ -225,6 +366,18 @@ class Character(Base):
         uselist=False,
     )
 
+    __table_args__ = (
+        # One character per normalized name per user; also the ON CONFLICT
+        # target of crud.upsert_characters_from_details.
+        Index("uq_characters_user_name_normalized",
+              "user_id", "name_normalized", unique=True),
+    )
+
+    @validates("name")
+    def _sync_name_normalized(self, key, value):
+        self.name_normalized = normalize_character_name(value)
+        return value
+
 
 class CharacterImage(Base):
     __tablename__ = "character_images"
@@ -252,12 +405,240 @@ class CharacterImage(Base):
     )
 
 
+class CharacterBackfillState(Base):
+    """Progress of `crud.upsert_characters_from_user_stories` for one user.
+
+    `stories_updated_through` is the high-water mark on `Story.updated_at` of
+    the last completed run. While a run is in progress,
+    `(pending_updated_through, resume_after_story_id)` is the (updated_at, id)
+    keyset position of the last committed batch, so an interrupted run
+    continues where it stopped.
+    """
+
+    __tablename__ = "character_backfill_state"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    # Runs with and without drafts see different stories; track them apart.
+    include_drafts = Column(Boolean, primary_key=True)
+    stories_updated_through = Column(DateTime(timezone=True), nullable=True)
+    resume_after_story_id = Column(Integer, nullable=True)
+    pending_updated_through = Column(DateTime(timezone=True), nullable=True)
+    updated_at = Column(DateTime(timezone=True),
+                        server_default=func.now(), onupdate=func.now())
+
+
+# --- Full-text search (see backend/full_text_search.py) ---
+#
+# SQLite: FTS5 tables keyed by story/character id, kept in sync by triggers so
+# raw SQL writes are covered too. A story's document is its title, outline and
+# the concatenated text of its pages. Page writes are the exception: a per-row
+# trigger would rebuild the whole document once per page, so they refresh it
+# once per story (`backend.full_text_search.refresh_story_search`, run after
+# every ORM flush). PostgreSQL: GIN indexes over the tsvector expressions
+# below; no extra tables or sync needed.
+
+STORY_SEARCH_FTS = "story_search_fts"
+CHARACTER_SEARCH_FTS = "character_search_fts"
+
+_FTS_TOKENIZER = "unicode61 remove_diacritics 2"
+
+_REFRESH_STORY_SEARCH_SQL = """
+    DELETE FROM story_search_fts WHERE rowid = {story_id};
+    INSERT INTO story_search_fts (rowid, title, story_outline, page_text)
+    SELECT stories.id, stories.title, stories.story_outline,
+           (SELECT group_concat(pages.text, ' ') FROM pages
+            WHERE pages.story_id = stories.id)
+    FROM stories WHERE stories.id = {story_id};
+"""
+
+_REFRESH_CHARACTER_SEARCH_SQL = """
+    DELETE FROM character_search_fts WHERE rowid = {character_id};
+    INSERT INTO character_search_fts (rowid, name, description, key_traits)
+    SELECT id, name, description, key_traits FROM characters
+    WHERE id = {character_id};
+"""
+
+# Kept in sync with alembic/versions/0009_full_text_search.py.
+SEARCH_INDEX_SQLITE_DDL = {
+    "stories": [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS story_search_fts USING fts5("
+        f"title, story_outline, page_text, tokenize='{_FTS_TOKENIZER}')",
+        "CREATE TRIGGER IF NOT EXISTS stories_search_ai AFTER INSERT ON stories BEGIN"
+        + _REFRESH_STORY_SEARCH_SQL.format(story_id="NEW.id") + "END",
+        "CREATE TRIGGER IF NOT EXISTS stories_search_au "
+        "AFTER UPDATE OF title, story_outline ON stories BEGIN"
+        + _REFRESH_STORY_SEARCH_SQL.format(story_id="NEW.id") + "END",
+        "CREATE TRIGGER IF NOT EXISTS stories_search_ad AFTER DELETE ON stories BEGIN "
+        "DELETE FROM story_search_fts WHERE rowid = OLD.id; END",
+    ],
+    "characters": [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS character_search_fts USING fts5("
+        f"name, description, key_traits, tokenize='{_FTS_TOKENIZER}')",
+        "CREATE TRIGGER IF NOT EXISTS characters_search_ai AFTER INSERT ON characters BEGIN"
+        + _REFRESH_CHARACTER_SEARCH_SQL.format(character_id="NEW.id") + "END",
+        "CREATE TRIGGER IF NOT EXISTS characters_search_au "
+        "AFTER UPDATE OF name, description, key_traits ON characters BEGIN"
+        + _REFRESH_CHARACTER_SEARCH_SQL.format(character_id="NEW.id") + "END",
+        "CREATE TRIGGER IF NOT EXISTS characters_search_ad AFTER DELETE ON characters BEGIN "
+        "DELETE FROM character_search_fts WHERE rowid = OLD.id; END",
+    ],
+}
+
+# Rebuilds the documents of the stories in :story_ids.
+STORY_SEARCH_SQLITE_REFRESH = [
+    "DELETE FROM story_search_fts WHERE rowid IN :story_ids",
+    "INSERT INTO story_search_fts (rowid, title, story_outline, page_text) "
+    "SELECT stories.id, stories.title, stories.story_outline, "
+    "(SELECT group_concat(pages.text, ' ') FROM pages WHERE pages.story_id = stories.id) "
+    "FROM stories WHERE stories.id IN :story_ids",
+]
+
+# Page triggers created before page writes refreshed once per story.
+STORY_SEARCH_SQLITE_PAGE_TRIGGERS = (
+    "pages_search_ai", "pages_search_au", "pages_search_ad")
+
+# Rebuilds both FTS tables from their source tables.
+SEARCH_INDEX_SQLITE_REBUILD = [
+    "DELETE FROM story_search_fts",
+    "INSERT INTO story_search_fts (rowid, title, story_outline, page_text) "
+    "SELECT stories.id, stories.title, stories.story_outline, "
+    "(SELECT group_concat(pages.text, ' ') FROM pages WHERE pages.story_id = stories.id) "
+    "FROM stories",
+    "DELETE FROM character_search_fts",
+    "INSERT INTO character_search_fts (rowid, name, description, key_traits) "
+    "SELECT id, name, description, key_traits FROM characters",
+]
+
+# Triggers go away with their tables; the FTS tables must be dropped explicitly.
+_SEARCH_INDEX_SQLITE_DROP = {
+    "stories": "DROP TABLE IF EXISTS story_search_fts",
+    "characters": "DROP TABLE IF EXISTS character_search_fts",
+}
+
+for _table_name, _statements in SEARCH_INDEX_SQLITE_DDL.items():
+    for _statement in _statements:
+        event.listen(
+            Base.metadata.tables[_table_name],
+            "after_create",
+            DDL(_statement).execute_if(dialect="sqlite"),
+        )
+for _table_name, _statement in _SEARCH_INDEX_SQLITE_DROP.items():
+    event.listen(
+        Base.metadata.tables[_table_name],
+        "after_drop",
+        DDL(_statement).execute_if(dialect="sqlite"),
+    )
+
+
+def _tsvector(column, weight: str):
+    # Literal config/weight/default keep the expression identical between the
+    # index DDL and queries, so PostgreSQL can match it to the index.
+    return func.setweight(
+        func.to_tsvector(literal_column("'simple'"),
+                         func.coalesce(column, literal_column("''"))),
+        literal_column(f"'{weight}'"),
+    )
+
+
+def story_search_vector():
+    """PostgreSQL tsvector of a story's title (A) and outline (B)."""
+    return _tsvector(Story.title, "A").op("||")(_tsvector(Story.story_outline, "B"))
+
+
+def page_search_vector():
+    """PostgreSQL tsvector of a page's text."""
+    return _tsvector(Page.text, "C")
+
+
+def character_search_vector():
+    """PostgreSQL tsvector of a character's name (A), description and traits (B)."""
+    return (
+        _tsvector(Character.name, "A")
+        .op("||")(_tsvector(Character.description, "B"))
+        .op("||")(_tsvector(Character.key_traits, "B"))
+    )
+
+
+for _model, _index_name, _vector in (
+    (Story, "ix_stories_search_tsv", story_search_vector),
+    (Page, "ix_pages_search_tsv", page_search_vector),
+    (Character, "ix_characters_search_tsv", character_search_vector),
+):
+    # Expression indexes are not bound to a table automatically.
+    _model.__table__.append_constraint(
+        Index(_index_name, _vector(), postgresql_using="gin")
+        .ddl_if(dialect="postgresql"))
+
+
+# --- Asset references (see backend/asset_gc.py) ---
+#
+# The orphan collector reads every column holding a storage key in key order
+# and looks keys up by value, so each gets an index. On PostgreSQL keys are
+# compared in byte ("C") order, as in storage listings, and the indexes use
+# the same collation. The original image of a page lives in its editor state,
+# indexed by expression; the JSON path is a literal, since SQLite does not
+# match an expression index against a bound parameter.
+
+ASSET_REFERENCE_INDEX_NAMES = (
+    "ix_pages_image_path",
+    "ix_pages_original_image_path",
+    "ix_stories_cover_image_path",
+    "ix_character_images_file_path",
+    "ix_characters_thumbnail_path",
+)
+
+
+def asset_reference_keys(dialect_name: str) -> list:
+    """Expressions for every storage key a row references, in index order."""
+
+    if dialect_name == "postgresql":
+        original_image_path = Page.editor_state.op(
+            "->>", return_type=String)(literal_column("'original_image_path'"))
+    else:
+        original_image_path = func.json_extract(
+            Page.editor_state, literal_column("'$.original_image_path'"),
+            type_=String)
+    keys = [
+        Page.image_path,
+        original_image_path,
+        Story.cover_image_path,
+        CharacterImage.file_path,
+        Character.thumbnail_path,
+    ]
+    if dialect_name == "postgresql":
+        keys = [key.collate("C") for key in keys]
+    return keys
+
+
+_ASSET_REFERENCE_TABLES = (Page, Page, Story, CharacterImage, Character)
+
+# Per dialect, for the bootstrap (`_ensure_asset_reference_indexes`).
+ASSET_REFERENCE_INDEXES = {}
+for _dialect in ("sqlite", "postgresql"):
+    ASSET_REFERENCE_INDEXES[_dialect] = []
+    for _model, _index_name, _key in zip(
+        _ASSET_REFERENCE_TABLES, ASSET_REFERENCE_INDEX_NAMES,
+        asset_reference_keys(_dialect),
+    ):
+        _index = Index(_index_name, _key).ddl_if(dialect=_dialect)
+        _model.__table__.append_constraint(_index)
+        ASSET_REFERENCE_INDEXES[_dialect].append(_index)
+
+
 def create_db_and_tables():
     Base.metadata.create_all(bind=engine)
     _ensure_story_generation_task_new_columns()
     _ensure_soft_delete_and_moderation_columns()
     _ensure_story_metadata_columns()
     _ensure_story_editor_columns()
+    _ensure_story_library_columns()
+    _ensure_query_indexes()
+    _ensure_asset_reference_indexes()
+    _ensure_task_stats_rollups()
+    _ensure_character_name_normalized()
+    _ensure_character_thumbnail_path()
+    _ensure_asset_tombstone_owner_columns()
+    _ensure_search_index()
 
 
 def _ensure_story_generation_task_new_columns():
@@ -309,10 +690,12 @@ def _ensure_soft_delete_and_moderation_columns():
     tables_required_cols = {
         "users": {
             "is_deleted": "BOOLEAN DEFAULT 0",
+            "deleted_at": "TIMESTAMP NULL",
         },
         "stories": {
             "is_hidden": "BOOLEAN DEFAULT 0",
             "is_deleted": "BOOLEAN DEFAULT 0",
+            "deleted_at": "TIMESTAMP NULL",
         },
     }
     with engine.connect() as conn:
@@ -328,6 +711,12 @@ def _ensure_soft_delete_and_moderation_columns():
                                 text(
                                     f"ALTER TABLE {table_name} ADD COLUMN {col} {ddl}")
                             )
+                            if col == "deleted_at":
+                                # Start the grace period of earlier deletions now.
+                                conn.execute(text(
+                                    f"UPDATE {table_name} SET deleted_at = CURRENT_TIMESTAMP "
+                                    "WHERE is_deleted = 1"))
+                                conn.commit()
                         except Exception:
                             # Ignore if racing or not supported
                             pass
@@ -400,3 +789,307 @@ def _ensure_story_editor_columns():
                             pass
             except Exception:
                 pass
+
+
+# Backfills the denormalized story library summary from the pages table.
+# Kept in sync with alembic/versions/0002_story_library_summary.py.
+STORY_LIBRARY_SUMMARY_BACKFILL_SQL = """
+UPDATE stories SET
+    page_count = (
+        SELECT COUNT(*) FROM pages WHERE pages.story_id = stories.id
+    ),
+    cover_image_path = (
+        SELECT pages.image_path FROM pages
+        WHERE pages.story_id = stories.id AND pages.image_path IS NOT NULL
+        ORDER BY pages.page_number ASC, pages.id ASC
+        LIMIT 1
+    )
+"""
+
+
+def _ensure_story_library_columns():
+    """Idempotently add and backfill the story library summary columns for SQLite."""
+
+    if not DATABASE_URL.startswith("sqlite"):
+        return
+
+    required_cols = {
+        "cover_image_path": "TEXT NULL",
+        "page_count": "INTEGER NOT NULL DEFAULT 0",
+    }
+
+    with engine.begin() as conn:
+        try:
+            existing = set()
+            for row in conn.execute(text("PRAGMA table_info(stories)")):
+                existing.add(row[1])
+            missing = [col for col in required_cols if col not in existing]
+            for col in missing:
+                conn.execute(
+                    text(
+                        f"ALTER TABLE stories ADD COLUMN {col} {required_cols[col]}")
+                )
+            if missing:
+                conn.execute(text(STORY_LIBRARY_SUMMARY_BACKFILL_SQL))
+        except Exception:
+            pass
+
+
+# Composite/partial indexes backing the hot story, page and task queries.
+# Kept in sync with alembic/versions/0001_query_indexes.py.
+QUERY_INDEX_NAMES = (
+    "ix_stories_owner_created",
+    "ix_stories_owner_draft_created",
+    "ix_stories_owner_title",
+    "ix_stories_owner_updated",
+    "ix_stories_visible_created",
+    "ix_stories_genre",
+    "ix_stories_image_style",
+    "ix_pages_story_page_number",
+    "ix_story_generation_tasks_status_created",
+    "ix_story_generation_tasks_created_status",
+    "ix_stories_deleted_at",
+)
+
+
+def _ensure_query_indexes():
+    """Idempotently create the query indexes on pre-existing SQLite databases.
+
+    `create_all` only emits indexes alongside tables it creates, so databases
+    bootstrapped before these indexes existed would otherwise never get them.
+    """
+
+    if not DATABASE_URL.startswith("sqlite"):
+        return
+
+    indexes = {
+        index.name: index
+        for table in Base.metadata.sorted_tables
+        for index in table.indexes
+    }
+    with engine.begin() as conn:
+        for name in QUERY_INDEX_NAMES:
+            index = indexes.get(name)
+            if index is None:
+                continue
+            try:
+                index.create(bind=conn, checkfirst=True)
+            except Exception:
+                pass
+
+
+def _ensure_asset_reference_indexes():
+    """Idempotently create the asset reference indexes on pre-existing SQLite databases."""
+
+    if not DATABASE_URL.startswith("sqlite"):
+        return
+
+    with engine.begin() as conn:
+        for index in ASSET_REFERENCE_INDEXES["sqlite"]:
+            try:
+                conn.execute(CreateIndex(index, if_not_exists=True))
+            except Exception:
+                pass
+
+
+# Rebuilds task_stats_hourly from story_generation_tasks on SQLite.
+# Kept in sync with alembic/versions/0003_task_stats_hourly.py.
+TASK_STATS_HOURLY_BACKFILL_SQL = """
+INSERT INTO task_stats_hourly (
+    bucket_start, completed_count, failed_count,
+    duration_seconds_sum, duration_samples, attempts_sum
+)
+SELECT
+    strftime('%Y-%m-%d %H:00:00.000000', finished_at) AS bucket_start,
+    SUM(CASE WHEN status = 'completed' THEN 1 ELSE 0 END),
+    SUM(CASE WHEN status = 'failed' THEN 1 ELSE 0 END),
+    COALESCE(SUM(CASE WHEN status = 'completed' THEN duration_seconds END), 0),
+    SUM(CASE WHEN status = 'completed' AND duration_seconds IS NOT NULL
+        THEN 1 ELSE 0 END),
+    SUM(CASE WHEN status = 'completed' THEN COALESCE(attempts, 0) ELSE 0 END)
+FROM (
+    SELECT
+        status,
+        attempts,
+        COALESCE(completed_at, updated_at) AS finished_at,
+        CASE WHEN duration_ms > 0 THEN duration_ms / 1000.0
+             ELSE (julianday(COALESCE(completed_at, updated_at))
+                   - julianday(created_at)) * 86400.0
+        END AS duration_seconds
+    FROM story_generation_tasks
+    WHERE status IN ('completed', 'failed')
+      AND COALESCE(completed_at, updated_at) IS NOT NULL
+)
+GROUP BY bucket_start
+"""
+
+
+def _ensure_task_stats_rollups():
+    """Backfill the hourly task rollups once on SQLite databases that predate them."""
+
+    if not DATABASE_URL.startswith("sqlite"):
+        return
+
+    with engine.begin() as conn:
+        try:
+            has_rollups = conn.execute(
+                text("SELECT 1 FROM task_stats_hourly LIMIT 1")).first()
+            if has_rollups is None:
+                conn.execute(text(TASK_STATS_HOURLY_BACKFILL_SQL))
+        except Exception:
+            pass
+
+
+def backfill_character_name_normalized(conn) -> None:
+    """Fill `characters.name_normalized` for rows that lack it.
+
+    Rows are keyed in id order; a later row whose key is already taken by the
+    same user (a duplicate from before names were unique) keeps NULL so the
+    unique index can still be created. Kept in sync with
+    alembic/versions/0006_character_name_normalized.py.
+    """
+
+    taken = {
+        (row[0], row[1])
+        for row in conn.execute(text(
+            "SELECT user_id, name_normalized FROM characters "
+            "WHERE name_normalized IS NOT NULL"))
+    }
+    updates = []
+    for char_id, user_id, name in conn.execute(text(
+            "SELECT id, user_id, name FROM characters "
+            "WHERE name_normalized IS NULL ORDER BY id")):
+        key = normalize_character_name(name)
+        if key is None or (user_id, key) in taken:
+            continue
+        taken.add((user_id, key))
+        updates.append({"id": char_id, "key": key})
+    if updates:
+        conn.execute(
+            text("UPDATE characters SET name_normalized = :key WHERE id = :id"),
+            updates,
+        )
+
+
+def _ensure_character_name_normalized():
+    """Idempotently add, backfill and uniquely index `characters.name_normalized` on SQLite."""
+
+    if not DATABASE_URL.startswith("sqlite"):
+        return
+
+    with engine.begin() as conn:
+        try:
+            existing = {
+                row[1] for row in conn.execute(text("PRAGMA table_info(characters)"))
+            }
+            if "name_normalized" not in existing:
+                conn.execute(
+                    text("ALTER TABLE characters ADD COLUMN name_normalized TEXT NULL"))
+                backfill_character_name_normalized(conn)
+            conn.execute(text(
+                "CREATE UNIQUE INDEX IF NOT EXISTS uq_characters_user_name_normalized "
+                "ON characters (user_id, name_normalized)"))
+        except Exception:
+            pass
+
+
+def backfill_character_thumbnail_paths(conn) -> None:
+    """Fill `characters.thumbnail_path` for rows that lack it.
+
+    Uses the same rule as crud.get_public_character_thumbnail_path: the current
+    image, then the newest image, that lives in the character's public folder.
+    Kept in sync with alembic/versions/0008_character_thumbnail_path.py.
+    """
+
+    # Imported here: crud imports this module.
+    from backend.crud import is_public_character_thumbnail_path
+
+    images = {}
+    for char_id, file_path in conn.execute(text(
+            "SELECT character_id, file_path FROM character_images "
+            "ORDER BY character_id, created_at IS NULL, created_at DESC, id DESC")):
+        images.setdefault(char_id, []).append(file_path)
+
+    updates = []
+    for char_id, user_id, current_path in conn.execute(text(
+            "SELECT characters.id, characters.user_id, character_images.file_path "
+            "FROM characters LEFT JOIN character_images "
+            "ON character_images.id = characters.current_image_id "
+            "WHERE characters.thumbnail_path IS NULL")):
+        for path in [current_path, *images.get(char_id, [])]:
+            if is_public_character_thumbnail_path(path, user_id, char_id):
+                updates.append({"id": char_id, "path": path})
+                break
+    if updates:
+        conn.execute(
+            text("UPDATE characters SET thumbnail_path = :path WHERE id = :id"),
+            updates,
+        )
+
+
+def _ensure_character_thumbnail_path():
+    """Idempotently add and backfill `characters.thumbnail_path` on SQLite."""
+
+    if not DATABASE_URL.startswith("sqlite"):
+        return
+
+    with engine.begin() as conn:
+        try:
+            existing = {
+                row[1] for row in conn.execute(text("PRAGMA table_info(characters)"))
+            }
+            if "thumbnail_path" not in existing:
+                conn.execute(
+                    text("ALTER TABLE characters ADD COLUMN thumbnail_path TEXT NULL"))
+                backfill_character_thumbnail_paths(conn)
+        except Exception:
+            pass
+
+
+def _ensure_asset_tombstone_owner_columns():
+    """Idempotently add `asset_tombstones.story_id` / `user_id` on SQLite."""
+
+    if not DATABASE_URL.startswith("sqlite"):
+        return
+
+    with engine.begin() as conn:
+        try:
+            existing = {
+                row[1] for row in conn.execute(text("PRAGMA table_info(asset_tombstones)"))
+            }
+            for column in ("story_id", "user_id"):
+                if column not in existing:
+                    conn.execute(text(
+                        f"ALTER TABLE asset_tombstones ADD COLUMN {column} INTEGER NULL"))
+        except Exception:
+            pass
+
+
+def _ensure_search_index():
+    """Idempotently create and populate the FTS5 search tables on SQLite.
+
+    `create_all` only runs the search DDL for tables it creates, so databases
+    bootstrapped earlier get it here; a newly created index is filled from the
+    existing rows. Per-page triggers from earlier schemas are dropped.
+    """
+
+    if not DATABASE_URL.startswith("sqlite"):
+        return
+
+    with engine.begin() as conn:
+        try:
+            existing = {
+                row[0] for row in conn.execute(text(
+                    "SELECT name FROM sqlite_master WHERE name IN "
+                    "('story_search_fts', 'character_search_fts')"))
+            }
+            for statements in SEARCH_INDEX_SQLITE_DDL.values():
+                for statement in statements:
+                    conn.execute(text(statement))
+            for trigger in STORY_SEARCH_SQLITE_PAGE_TRIGGERS:
+                conn.execute(text(f"DROP TRIGGER IF EXISTS {trigger}"))
+            if existing != {STORY_SEARCH_FTS, CHARACTER_SEARCH_FTS}:
+                for statement in SEARCH_INDEX_SQLITE_REBUILD:
+                    conn.execute(text(statement))
+        except Exception:
+            pass
@@ -2,6 +2,7 @@ import os
 from sqlalchemy.orm import Session
 from sqlalchemy import text
 from backend.database import SessionLocal, DynamicList, DynamicListItem
+from backend.dynamic_list_cache import mark_dynamic_lists_changed
 from backend.logging_config import app_logger
 
 
@@ -164,6 +165,7 @@ def _run_seeding_logic(db: Session):
                                     if cmd.strip()]
                     for command in sql_commands:
                         db.execute(text(command))
+                mark_dynamic_lists_changed(db)
                 db.commit()
                 app_logger.info("SQL seed script applied.")
             else:
@@ -0,0 +1,280 @@
+"""Process-wide cache of active dynamic list items.
+
+Dynamic lists (genres, image styles, text densities, ...) are read on almost
+every request: story validation, image style resolution and the public list
+endpoints. They change only through admin writes and seeding. Each worker
+therefore keeps one immutable snapshot of every active item and serves reads
+from memory.
+
+Invalidation is versioned:
+
+- Any ORM flush that touches `DynamicList`/`DynamicListItem` bumps the
+  `dynamic_lists` row of `cache_versions` in the same transaction. The commit
+  drops this process's snapshot immediately.
+- Other workers compare their snapshot version with that counter (one
+  primary-key lookup) at most every `DYNAMIC_LIST_CACHE_CHECK_SECONDS`, and
+  reload when it moved.
+
+Writers that bypass the ORM (raw SQL) must call `mark_dynamic_lists_changed`.
+
+Each snapshot also carries the `/dynamic-lists/bootstrap` payload (every
+list's public items), serialized and gzip-compressed once per load.
+"""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import threading
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from itertools import chain
+from typing import Any, Callable, Dict, FrozenSet, Mapping, Optional, Tuple
+
+from sqlalchemy import event, insert, select, update
+from sqlalchemy.orm import Session
+
+from backend.database import CacheVersion, DynamicList, DynamicListItem
+from backend.response_cache import compute_etag
+from backend.settings import get_settings
+
+DYNAMIC_LISTS_VERSION_KEY = "dynamic_lists"
+_PENDING_INVALIDATION_KEY = "_dynamic_lists_changed"
+# Lists are identical for every client; browsers revalidate via ETag.
+PUBLIC_LIST_CACHE_CONTROL = "public, no-cache"
+
+
+@dataclass(frozen=True)
+class CachedDynamicListItem:
+    """Detached copy of an active `DynamicListItem` row.
+
+    Shared by every request in the process; treat `additional_config` as
+    read-only.
+    """
+
+    id: int
+    list_name: str
+    item_value: str
+    item_label: Optional[str]
+    is_active: bool
+    sort_order: Optional[int]
+    additional_config: Optional[dict]
+    created_at: Optional[datetime]
+    updated_at: Optional[datetime]
+
+
+@dataclass(frozen=True)
+class DynamicListsBootstrap:
+    """Precomputed JSON body of the bootstrap endpoint."""
+
+    version: str
+    body: bytes
+    gzip_body: bytes
+
+    @property
+    def etag(self) -> str:
+        return f'W/"{self.version}"'
+
+
+def _build_bootstrap(
+    list_names: FrozenSet[str],
+    items: Mapping[str, Tuple[CachedDynamicListItem, ...]],
+) -> DynamicListsBootstrap:
+    lists = {
+        name: [
+            {"item_value": item.item_value, "item_label": item.item_label}
+            for item in items.get(name, ())
+        ]
+        for name in sorted(list_names)
+    }
+    encoded_lists = json.dumps(
+        lists, ensure_ascii=False, separators=(",", ":"))
+    version = hashlib.sha256(encoded_lists.encode("utf-8")).hexdigest()[:16]
+    body = (
+        f'{{"version":"{version}","lists":{encoded_lists}}}'.encode("utf-8"))
+    return DynamicListsBootstrap(
+        version=version,
+        body=body,
+        # mtime=0 keeps the compressed bytes identical across workers.
+        gzip_body=gzip.compress(body, mtime=0),
+    )
+
+
+@dataclass(frozen=True)
+class DynamicListSnapshot:
+    """All active dynamic list items at one `cache_versions` version."""
+
+    version: int
+    list_names: FrozenSet[str]
+    items: Mapping[str, Tuple[CachedDynamicListItem, ...]]
+    etags: Mapping[str, str]
+    by_value: Mapping[Tuple[str, str], CachedDynamicListItem]
+    bootstrap: DynamicListsBootstrap
+
+    def has_list(self, list_name: str) -> bool:
+        return list_name in self.list_names
+
+    def active_items(self, list_name: str) -> Tuple[CachedDynamicListItem, ...]:
+        """Active items of `list_name`, ordered by sort order then label."""
+        return self.items.get(list_name, ())
+
+    def item_by_value(
+        self, list_name: str, item_value: str
+    ) -> Optional[CachedDynamicListItem]:
+        return self.by_value.get((list_name, item_value))
+
+    def etag(self, list_name: str) -> str:
+        """Weak ETag of the list's active items."""
+        return self.etags.get(list_name) or compute_etag([])
+
+
+def _read_version(db: Session) -> int:
+    version = db.execute(
+        select(CacheVersion.version).where(
+            CacheVersion.name == DYNAMIC_LISTS_VERSION_KEY)
+    ).scalar()
+    return int(version or 0)
+
+
+def _load_snapshot(db: Session, version: int) -> DynamicListSnapshot:
+    """Load every active item; `version` must be read before the items."""
+
+    list_names = frozenset(db.execute(select(DynamicList.list_name)).scalars())
+    rows = db.execute(
+        select(
+            DynamicListItem.id,
+            DynamicListItem.list_name,
+            DynamicListItem.item_value,
+            DynamicListItem.item_label,
+            DynamicListItem.is_active,
+            DynamicListItem.sort_order,
+            DynamicListItem.additional_config,
+            DynamicListItem.created_at,
+            DynamicListItem.updated_at,
+        )
+        .where(DynamicListItem.is_active == True)
+        .order_by(
+            DynamicListItem.list_name,
+            DynamicListItem.sort_order,
+            DynamicListItem.item_label,
+        )
+    ).all()
+
+    grouped: Dict[str, list] = {}
+    for row in rows:
+        item = CachedDynamicListItem(**row._asdict())
+        grouped.setdefault(item.list_name, []).append(item)
+
+    items = {name: tuple(group) for name, group in grouped.items()}
+    return DynamicListSnapshot(
+        version=version,
+        list_names=list_names,
+        items=items,
+        etags={
+            name: compute_etag([asdict(item) for item in group])
+            for name, group in items.items()
+        },
+        by_value={
+            (item.list_name, item.item_value): item
+            for group in items.values()
+            for item in group
+        },
+        bootstrap=_build_bootstrap(list_names, items),
+    )
+
+
+class DynamicListCache:
+    """Holds the current snapshot and reloads it when the version moves."""
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        self._clock = clock
+        self._state_lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        self._snapshot: Optional[DynamicListSnapshot] = None
+        self._checked_at = 0.0
+        self._generation = 0
+
+    def get(self, db: Session) -> DynamicListSnapshot:
+        """Return the current snapshot, using `db` for version checks/loads."""
+
+        snapshot = self._snapshot
+        now = self._clock()
+        check_interval = get_settings().dynamic_list_cache_check_seconds
+        if snapshot is not None and now - self._checked_at < check_interval:
+            return snapshot
+
+        version = _read_version(db)
+        if snapshot is not None and snapshot.version == version:
+            self._checked_at = now
+            return snapshot
+
+        # Single-flight: concurrent misses share one reload.
+        with self._load_lock:
+            current = self._snapshot
+            if current is not None and current.version == version:
+                return current
+            with self._state_lock:
+                generation = self._generation
+            snapshot = _load_snapshot(db, version)
+            with self._state_lock:
+                # Don't resurrect data loaded before a concurrent invalidation.
+                if generation == self._generation:
+                    self._snapshot = snapshot
+                    self._checked_at = now
+        return snapshot
+
+    def invalidate(self) -> None:
+        """Drop the snapshot so the next lookup reloads it."""
+
+        with self._state_lock:
+            self._generation += 1
+            self._snapshot = None
+
+
+dynamic_list_cache = DynamicListCache()
+
+
+def get_dynamic_list_snapshot(db: Session) -> DynamicListSnapshot:
+    """Return the process-wide snapshot of active dynamic list items."""
+    return dynamic_list_cache.get(db)
+
+
+def _bump_version(connection: Any) -> None:
+    result = connection.execute(
+        update(CacheVersion)
+        .where(CacheVersion.name == DYNAMIC_LISTS_VERSION_KEY)
+        .values(version=CacheVersion.version + 1)
+    )
+    if result.rowcount == 0:
+        connection.execute(
+            insert(CacheVersion).values(
+                name=DYNAMIC_LISTS_VERSION_KEY, version=1)
+        )
+
+
+def mark_dynamic_lists_changed(db: Session) -> None:
+    """Bump the shared version for writes that bypass the ORM (e.g. raw SQL)."""
+
+    _bump_version(db.connection())
+    db.info[_PENDING_INVALIDATION_KEY] = True
+
+
+@event.listens_for(Session, "after_flush")
+def _bump_on_dynamic_list_flush(session: Session, flush_context: Any) -> None:
+    # new/dirty/deleted still describe the pre-flush state here.
+    if any(
+        isinstance(obj, (DynamicList, DynamicListItem))
+        for obj in chain(session.new, session.dirty, session.deleted)
+    ):
+        mark_dynamic_lists_changed(session)
+
+
+@event.listens_for(Session, "after_commit")
+@event.listens_for(Session, "after_rollback")
+def _invalidate_after_transaction(session: Session) -> None:
+    # A rollback also invalidates: the snapshot may have been loaded through
+    # this session while it held uncommitted list changes.
+    if session.info.pop(_PENDING_INVALIDATION_KEY, False):
+        dynamic_list_cache.invalidate()
@@ -0,0 +1,234 @@
+"""Ranked full-text search over stories (with their pages) and characters.
+
+The index itself is schema (see `backend.database`): FTS5 tables maintained by
+triggers on SQLite, GIN expression indexes on PostgreSQL. This module turns a
+free-text query into a ranked subquery of `(id, rank)` rows for the dialect in
+use, and pages through ranked results with keyset cursors.
+
+On SQLite, page writes are indexed here rather than by triggers: each flush
+refreshes the document of every story whose pages it inserted, changed or
+deleted, once. Core statements on `pages` bypass the flush and must call
+`refresh_story_search` themselves.
+
+Ranks are ascending (lower is better): FTS5 `bm25()` is already negative for
+better matches, PostgreSQL `ts_rank()` is negated. Ties are broken by id.
+Ranks depend on the whole corpus, so results may shift between pages when
+documents change while a client is paging.
+"""
+
+from __future__ import annotations
+
+import re
+from itertools import chain
+from typing import Any, Iterable, List, Optional, Sequence
+
+from sqlalchemy import (
+    and_, bindparam, column, event, exists, func, inspect, literal, literal_column,
+    or_, select, table, text,
+)
+from sqlalchemy.orm import Query, Session
+
+from backend import pagination
+from backend.database import (
+    CHARACTER_SEARCH_FTS,
+    STORY_SEARCH_FTS,
+    STORY_SEARCH_SQLITE_REFRESH,
+    Character,
+    Page,
+    Story,
+    character_search_vector,
+    page_search_vector,
+    story_search_vector,
+)
+
+# Terms beyond this are ignored; each one adds work to every match.
+MAX_SEARCH_TERMS = 8
+
+# bm25 column weights, in FTS table column order.
+_STORY_FTS_WEIGHTS = (10.0, 4.0, 1.0)  # title, story_outline, page_text
+_CHARACTER_FTS_WEIGHTS = (10.0, 3.0, 3.0)  # name, description, key_traits
+
+_TERM_RE = re.compile(r"[^\W_]+", re.UNICODE)
+
+
+def parse_search_terms(q: Optional[str]) -> List[str]:
+    """Split a user query into lowercase word terms (punctuation is dropped)."""
+
+    return _TERM_RE.findall((q or "").lower())[:MAX_SEARCH_TERMS]
+
+
+def refresh_story_search(db: Session, story_ids: Iterable[int]) -> None:
+    """Rebuild the SQLite search documents of `story_ids` (a no-op elsewhere)."""
+
+    story_ids = sorted({story_id for story_id in story_ids if story_id is not None})
+    if not story_ids or db.get_bind().dialect.name != "sqlite":
+        return
+    connection = db.connection()
+    for statement in STORY_SEARCH_SQLITE_REFRESH:
+        connection.execute(
+            text(statement).bindparams(bindparam("story_ids", expanding=True)),
+            {"story_ids": story_ids},
+        )
+
+
+@event.listens_for(Session, "after_flush")
+def _refresh_flushed_stories(session: Session, flush_context: Any) -> None:
+    # new/dirty/deleted still describe the pre-flush state here.
+    story_ids = set()
+    for obj in chain(session.new, session.deleted):
+        if isinstance(obj, Page):
+            story_ids.add(obj.story_id)
+    for obj in session.dirty:
+        if not isinstance(obj, Page):
+            continue
+        attrs = inspect(obj).attrs
+        if attrs.text.history.has_changes() or attrs.story_id.history.has_changes():
+            # A moved page leaves its old story as well.
+            story_ids.add(obj.story_id)
+            story_ids.update(attrs.story_id.history.deleted)
+    refresh_story_search(session, story_ids)
+
+
+def _fts5_match(terms: Sequence[str]) -> str:
+    # Quoted prefix terms, implicitly ANDed; quoting disables FTS5 operators.
+    return " ".join(f'"{term}"*' for term in terms)
+
+
+def _tsquery(terms: Sequence[str]):
+    return func.to_tsquery(
+        literal_column("'simple'"), " & ".join(f"{term}:*" for term in terms))
+
+
+def _like_all(terms: Sequence[str], *columns: Any):
+    """Fallback predicate: every term appears in at least one column."""
+
+    return and_(*(
+        or_(*(col.ilike(f"%{term}%") for col in columns)) for term in terms
+    ))
+
+
+def story_ranking(db: Session, user_id: int, terms: Sequence[str]):
+    """Subquery of `(id, rank)` for stories whose title, outline or pages match.
+
+    FTS5 rows carry no owner, so on SQLite callers must still filter by
+    `Story.owner_id`; elsewhere the subquery is restricted to `user_id`.
+    """
+
+    dialect_name = db.get_bind().dialect.name
+    if dialect_name == "sqlite":
+        fts = table(STORY_SEARCH_FTS, column("rowid"))
+        fts_ref = literal_column(STORY_SEARCH_FTS)
+        return (
+            select(
+                fts.c.rowid.label("id"),
+                func.bm25(fts_ref, *_STORY_FTS_WEIGHTS).label("rank"),
+            )
+            .where(fts_ref.op("MATCH")(_fts5_match(terms)))
+            .subquery()
+        )
+
+    if dialect_name == "postgresql":
+        query = _tsquery(terms)
+        story_vector = story_search_vector()
+        page_vector = page_search_vector()
+        page_rank = (
+            select(func.max(func.ts_rank(page_vector, query)))
+            .where(Page.story_id == Story.id, page_vector.op("@@")(query))
+            .scalar_subquery()
+        )
+        return (
+            select(
+                Story.id.label("id"),
+                (-(func.ts_rank(story_vector, query)
+                   + func.coalesce(page_rank, 0))).label("rank"),
+            )
+            .where(Story.owner_id == user_id, or_(
+                story_vector.op("@@")(query),
+                exists().where(Page.story_id == Story.id,
+                               page_vector.op("@@")(query)),
+            ))
+            .subquery()
+        )
+
+    page_match = exists().where(
+        Page.story_id == Story.id, _like_all(terms, Page.text))
+    return (
+        select(Story.id.label("id"), literal(0.0).label("rank"))
+        .where(Story.owner_id == user_id,
+               or_(_like_all(terms, Story.title, Story.story_outline), page_match))
+        .subquery()
+    )
+
+
+def character_ranking(db: Session, user_id: int, terms: Sequence[str]):
+    """Subquery of `(id, rank)` for characters whose name, description or traits match.
+
+    Same owner caveat as `story_ranking`.
+    """
+
+    dialect_name = db.get_bind().dialect.name
+    if dialect_name == "sqlite":
+        fts = table(CHARACTER_SEARCH_FTS, column("rowid"))
+        fts_ref = literal_column(CHARACTER_SEARCH_FTS)
+        return (
+            select(
+                fts.c.rowid.label("id"),
+                func.bm25(fts_ref, *_CHARACTER_FTS_WEIGHTS).label("rank"),
+            )
+            .where(fts_ref.op("MATCH")(_fts5_match(terms)))
+            .subquery()
+        )
+
+    if dialect_name == "postgresql":
+        query = _tsquery(terms)
+        vector = character_search_vector()
+        return (
+            select(
+                Character.id.label("id"),
+                (-func.ts_rank(vector, query)).label("rank"),
+            )
+            .where(Character.user_id == user_id, vector.op("@@")(query))
+            .subquery()
+        )
+
+    return (
+        select(Character.id.label("id"), literal(0.0).label("rank"))
+        .where(Character.user_id == user_id,
+               _like_all(terms, Character.name, Character.description,
+                         Character.key_traits))
+        .subquery()
+    )
+
+
+def apply_rank_keyset(
+    query: Query,
+    ranking: Any,
+    id_column: Any,
+    list_key: str,
+    cursor: Optional[str],
+) -> Query:
+    """Order ranked results best-first and, given a cursor, seek past its row."""
+
+    query = query.order_by(ranking.c.rank.asc(), id_column.asc())
+    if not cursor:
+        return query
+
+    payload = pagination.decode_cursor(cursor, list_key)
+    values = payload["v"]
+    if len(values) != 1 or not isinstance(values[0], (int, float)):
+        raise pagination.InvalidCursorError(
+            "Pagination cursor does not match this list.")
+    rank = values[0]
+    return query.filter(or_(
+        ranking.c.rank > rank,
+        and_(ranking.c.rank == rank, id_column > payload["id"]),
+    ))
+
+
+def next_rank_cursor(items: Sequence[Any], limit: int, list_key: str) -> Optional[str]:
+    """Return the cursor for the ranked page after `items`, or None on a short page."""
+
+    if not items or len(items) < limit:
+        return None
+    last = items[-1]
+    return pagination.encode_cursor(list_key, last.id, [last.rank])
@@ -18,7 +18,6 @@ DEFAULT_IMAGE_STYLE_MAP: Dict[str, str] = {
 }
 
 IMAGE_STYLES_LIST_NAME = "image_styles"
-_STYLE_CACHE_KEY = "_image_style_mapping_cache"
 
 
 @dataclass(frozen=True)
@@ -49,60 +48,39 @@ def _normalize_style_value(business_style: str | None) -> str | None:
     return normalized or None
 
 
-def _get_session_style_cache(db: Any) -> Dict[str, Any]:
-    """Return a per-session cache for dynamic image style lookups."""
-
-    info = getattr(db, "info", None)
-    if isinstance(info, dict):
-        return info.setdefault(_STYLE_CACHE_KEY, {})
-    return {}
-
-
 def _get_active_image_style_items(db: Any) -> list[Any]:
-    """Load active image styles once for the current DB session."""
+    """Return active image styles from the process-wide dynamic list cache."""
 
-    cache = _get_session_style_cache(db)
-    items = cache.get("active_items")
-    if items is None:
-        from . import crud
+    from . import crud
 
-        items = crud.get_active_dynamic_list_items(db, IMAGE_STYLES_LIST_NAME)
-        cache["active_items"] = items
-    return items
+    return crud.get_active_dynamic_list_items(db, IMAGE_STYLES_LIST_NAME)
 
 
 def _get_active_image_style_lookup(db: Any) -> Dict[str, Any]:
     """Build a value lookup for active image style items."""
 
-    cache = _get_session_style_cache(db)
-    lookup = cache.get("active_lookup")
-    if lookup is None:
-        lookup = {}
-        for item in _get_active_image_style_items(db):
-            item_value = _normalize_style_value(getattr(item, "item_value", None))
-            if item_value:
-                lookup[item_value] = item
-        cache["active_lookup"] = lookup
+    lookup = {}
+    for item in _get_active_image_style_items(db):
+        item_value = _normalize_style_value(getattr(item, "item_value", None))
+        if item_value:
+            lookup[item_value] = item
     return lookup
 
 
 def _get_default_image_style_item(db: Any) -> Any | None:
-    """Return the default active image style item for the current session."""
-
-    cache = _get_session_style_cache(db)
-    if "default_item" not in cache:
-        active_items = _get_active_image_style_items(db)
-        default_item = next(
-            (
-                item
-                for item in active_items
-                if isinstance(getattr(item, "additional_config", None), dict)
-                and item.additional_config.get("is_default") is True
-            ),
-            None,
-        )
-        cache["default_item"] = default_item or (active_items[0] if active_items else None)
-    return cache["default_item"]
+    """Return the default active image style item."""
+
+    active_items = _get_active_image_style_items(db)
+    default_item = next(
+        (
+            item
+            for item in active_items
+            if isinstance(getattr(item, "additional_config", None), dict)
+            and item.additional_config.get("is_default") is True
+        ),
+        None,
+    )
+    return default_item or (active_items[0] if active_items else None)
 
 
 def resolve_image_style(
@@ -0,0 +1,203 @@
+"""Resized, re-encoded variants of generated images.
+
+Generated page and character images are 1024px PNGs of several hundred KB,
+while the library shows them as small thumbnails and the reader at about
+half that size. When an image is saved, `save_image` also stores smaller
+WebP/AVIF renditions beside it:
+
+    images/user_1/characters/3/<uuid>.png           original (used for print/PDF)
+    images/user_1/characters/3/<uuid>.w256.webp     thumbnail
+    images/user_1/characters/3/<uuid>.w768.avif     reader
+
+Widths come from `IMAGE_VARIANT_WIDTHS` and formats from
+`IMAGE_VARIANT_FORMATS` (formats Pillow cannot encode are skipped).
+Variants live in the same folder as the original, so folder deletes and
+retention remove them too.
+
+Serving code calls `negotiate` with the request's `Accept` header and `w`
+parameter to pick the smallest suitable variant that exists, falling back
+to the original. Such responses must carry `Vary: Accept`. Requests without
+`w` always get the original.
+Variant generation is best effort: a failure is logged, never raised.
+"""
+
+from __future__ import annotations
+
+import io
+import mimetypes
+import os
+import re
+from typing import List, Optional, Sequence, Tuple
+
+from PIL import Image, features
+
+from backend import storage
+from backend.logging_config import error_logger
+from backend.settings import get_settings
+
+# Encoder per format: (content type, Pillow format, save options).
+_ENCODERS = {
+    "avif": ("image/avif", "AVIF", {"quality": 60, "speed": 8}),
+    "webp": ("image/webp", "WEBP", {"quality": 80, "method": 4}),
+}
+
+# So responses get the right Content-Type on systems without these mappings.
+for _content_type, _pil_format, _options in _ENCODERS.values():
+    mimetypes.add_type(_content_type, "." + _pil_format.lower())
+
+_VARIANT_SOURCE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".webp")
+
+_VARIANT_RE = re.compile(r"\.w\d+\.[a-z0-9]+$")
+
+
+def configured_formats() -> List[str]:
+    """Return the configured variant formats this Pillow build can encode."""
+    available = []
+    for name in get_settings().image_variant_formats:
+        if name in _ENCODERS and features.check(_ENCODERS[name][1].lower()):
+            available.append(name)
+    return available
+
+
+def configured_widths() -> List[int]:
+    return sorted(get_settings().image_variant_widths)
+
+
+def has_variants(key: str) -> bool:
+    """Return whether `key` is an original image that variants are made for."""
+
+    return (
+        os.path.splitext(key)[1].lower() in _VARIANT_SOURCE_EXTENSIONS
+        and not _VARIANT_RE.search(key)
+    )
+
+
+def source_stem(key: str) -> Optional[str]:
+    """Return the original's key without its extension if `key` is a variant."""
+
+    match = _VARIANT_RE.search(key)
+    return key[:match.start()] if match else None
+
+
+def variant_key(key: str, width: int, fmt: str) -> str:
+    return f"{os.path.splitext(key)[0]}.w{width}.{fmt}"
+
+
+def content_type(fmt: str) -> str:
+    return _ENCODERS[fmt][0]
+
+
+def encode(image: Image.Image, fmt: str) -> bytes:
+    _content_type, pil_format, options = _ENCODERS[fmt]
+    buffer = io.BytesIO()
+    image.save(buffer, pil_format, **options)
+    return buffer.getvalue()
+
+
+def generate_variants(
+    asset_storage: storage.AssetStorage, key: str, image_bytes: bytes
+) -> List[str]:
+    """Store the configured variants of an image; return the keys written."""
+
+    if not has_variants(key):
+        return []
+    written = []
+    try:
+        with Image.open(io.BytesIO(image_bytes)) as source:
+            source.load()
+            image = source.convert("RGBA" if "A" in source.getbands() else "RGB")
+        for width in configured_widths():
+            if width >= image.width:
+                continue  # never upscale; the original serves larger widths
+            height = max(1, round(image.height * width / image.width))
+            resized = image.resize((width, height), Image.Resampling.LANCZOS)
+            for fmt in configured_formats():
+                dest = variant_key(key, width, fmt)
+                asset_storage.put(dest, encode(resized, fmt), _ENCODERS[fmt][0])
+                written.append(dest)
+    except Exception as exc:
+        error_logger.error("Could not create image variants for %s: %s", key, exc)
+    return written
+
+
+def save_image(key: str, image_bytes: bytes, content_type: str = "image/png") -> None:
+    """Store a generated image and its variants in the public store.
+
+    CPU-bound; async callers should run it in a thread.
+    """
+
+    asset_storage = storage.get_storage()
+    asset_storage.put(key, image_bytes, content_type)
+    generate_variants(asset_storage, key, image_bytes)
+
+
+def generate_variants_for_key(asset_storage: storage.AssetStorage, key: str) -> List[str]:
+    """Create variants for an image already in storage (best effort)."""
+
+    try:
+        image_bytes = asset_storage.get(key)
+    except (OSError, ValueError) as exc:
+        error_logger.error("Could not read %s for variants: %s", key, exc)
+        return []
+    return generate_variants(asset_storage, key, image_bytes)
+
+
+def accepted_formats(accept: Optional[str]) -> List[str]:
+    """Return the variant formats an `Accept` header allows (q > 0)."""
+    accepted = []
+    for part in (accept or "").split(","):
+        media_type, *params = part.split(";")
+        quality = 1.0
+        for param in params:
+            name, _, value = param.strip().partition("=")
+            if name == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if quality <= 0:
+            continue
+        media_type = media_type.strip().lower()
+        for fmt, (content_type, _pil, _opts) in _ENCODERS.items():
+            if media_type == content_type:
+                accepted.append(fmt)
+    return accepted
+
+
+def candidates(key: str, accept: Optional[str], width: Optional[int]) -> Sequence[Tuple[str, str]]:
+    """Return (variant key, content type) pairs to try, best first.
+
+    Only requests with a width get variants: the smallest configured width
+    at least as large. Without a width, or above every configured width,
+    the original is served.
+    """
+
+    if not width or not has_variants(key):
+        return []
+    chosen = next((w for w in configured_widths() if w >= width), None)
+    if chosen is None:
+        return []
+    accepted = accepted_formats(accept)
+    # AVIF before WebP: smaller at the same quality.
+    return [
+        (variant_key(key, chosen, fmt), _ENCODERS[fmt][0])
+        for fmt in configured_formats()
+        if fmt in accepted
+    ]
+
+
+def negotiate(
+    asset_storage: storage.AssetStorage,
+    key: str,
+    accept: Optional[str],
+    width: Optional[int],
+) -> str:
+    """Return the key of the best existing variant for a request, or `key`."""
+
+    for candidate, _content_type in candidates(key, accept, width):
+        try:
+            if asset_storage.exists(candidate):
+                return candidate
+        except (OSError, ValueError):
+            break
+    return key
@@ -1,22 +1,48 @@
+import asyncio
 import os
+import time
 from contextlib import asynccontextmanager
 from time import perf_counter
-from typing import List
+from typing import List, Optional
+from urllib.parse import quote
 
-from fastapi import Depends, FastAPI, HTTPException, status
+import anyio
+from fastapi import Depends, FastAPI, HTTPException, Query, Request, Response, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import PlainTextResponse
+from fastapi.responses import (
+    FileResponse,
+    JSONResponse,
+    PlainTextResponse,
+    RedirectResponse,
+    StreamingResponse,
+)
 from fastapi.staticfiles import StaticFiles
+from PIL import UnidentifiedImageError
 from slowapi import _rate_limit_exceeded_handler
 from slowapi.errors import RateLimitExceeded
 from sqlalchemy.orm import Session
+from starlette.datastructures import Headers
 from starlette.exceptions import HTTPException as StarletteHTTPException
-
-from backend import auth, crud, database, schemas, storage_paths
+from starlette.staticfiles import NotModifiedResponse
+
+from backend import (
+    asset_caching,
+    asset_reaper,
+    auth,
+    crud,
+    database,
+    image_variants,
+    schemas,
+    signed_urls,
+    storage,
+    storage_paths,
+    thumbnails,
+)
 from backend.admin_router import admin_router
 from backend.characters_router import router as characters_router
 from backend.database import SessionLocal, get_db
 from backend.database_seeding import seed_database
+from backend.dynamic_list_cache import PUBLIC_LIST_CACHE_CONTROL, get_dynamic_list_snapshot
 from backend.logging_config import app_logger, error_logger
 from backend.metrics import (
     HTTP_REQUEST_DURATION_SECONDS,
@@ -24,8 +50,11 @@ from backend.metrics import (
     normalize_http_path,
 )
 from backend.monitoring_router import monitoring_router
+from backend.pagination import NEXT_CURSOR_HEADER, InvalidCursorError
+from backend.password_hashing import PasswordHasherBusy
 from backend.public_router import public_router
 from backend.rate_limiting import limiter
+from backend.response_cache import apply_cache_headers, etag_matches
 from backend.settings import get_settings
 
 
@@ -35,7 +64,7 @@ settings = get_settings()
 
 
 class PublicStaticContentFiles(StaticFiles):
-    """Serve public data assets while withholding private story image paths."""
+    """Serve public data assets with caching headers, withholding private story paths."""
 
     async def get_response(self, path, scope):
         try:
@@ -46,7 +75,165 @@ class PublicStaticContentFiles(StaticFiles):
         if storage_paths.is_private_story_asset_path(normalized_path):
             raise StarletteHTTPException(status_code=404)
 
-        return await super().get_response(normalized_path, scope)
+        request = Request(scope)
+        width = _requested_width(request)
+        if width is None:
+            return await self._cached_file_response(normalized_path, scope)
+
+        normalized_path = await anyio.to_thread.run_sync(
+            image_variants.negotiate,
+            storage.LocalStorage(str(self.directory)),
+            normalized_path,
+            request.headers.get("accept"),
+            width,
+        )
+        response = await self._cached_file_response(normalized_path, scope)
+        response.headers["Vary"] = "Accept"
+        return response
+
+    async def _cached_file_response(self, path, scope):
+        response = await super().get_response(path, scope)
+        # The content ETag hashes the file on first use, so it is computed
+        # in a worker thread rather than in the synchronous `file_response`.
+        rel_path = os.path.relpath(response.path, self.directory)
+        headers = await anyio.to_thread.run_sync(
+            asset_caching.asset_headers,
+            str(response.path), response.stat_result, rel_path, False)
+        response.headers.update(headers)
+        if self.is_not_modified(response.headers, Headers(scope=scope)):
+            return NotModifiedResponse(response.headers)
+        return response
+
+    def file_response(self, full_path, stat_result, scope, status_code=200):
+        # Caching headers and 304s are added by `_cached_file_response`.
+        return FileResponse(full_path, status_code=status_code, stat_result=stat_result)
+
+
+def _requested_width(request: Request) -> Optional[int]:
+    """Return the `w` query parameter (requested image width), if valid."""
+
+    try:
+        width = int(request.query_params.get("w", ""))
+    except ValueError:
+        return None
+    return width if width > 0 else None
+
+
+async def remote_static_content(request: Request, path: str):
+    """Redirect public assets kept in remote storage to a presigned URL."""
+
+    try:
+        normalized_path = storage_paths.normalize_data_relative_path(path)
+    except ValueError as exc:
+        raise HTTPException(status_code=404) from exc
+
+    if storage_paths.is_private_story_asset_path(normalized_path):
+        raise HTTPException(status_code=404)
+
+    asset_storage = storage.get_storage()
+    width = _requested_width(request)
+    if width is not None:
+        normalized_path = await anyio.to_thread.run_sync(
+            image_variants.negotiate, asset_storage, normalized_path,
+            request.headers.get("accept"), width)
+    url = asset_storage.presign(normalized_path)
+    if url is None:
+        raise HTTPException(status_code=404)
+    response = RedirectResponse(url, status_code=status.HTTP_307_TEMPORARY_REDIRECT)
+    if width is not None:
+        response.headers["Vary"] = "Accept"
+    return response
+
+
+async def signed_static_content(
+    request: Request, path: str, expires: int = 0, signature: str = ""
+):
+    """Serve a data asset to the holder of a valid signed URL (no auth, no DB)."""
+
+    if not signed_urls.verify(path, expires, signature):
+        raise HTTPException(status_code=403, detail="Invalid or expired link")
+    normalized_path = storage_paths.normalize_data_relative_path(path).replace(os.sep, "/")
+    headers = {"Cache-Control": f"private, max-age={max(0, expires - int(time.time()))}"}
+    asset_storage = storage.get_storage()
+    # Variants of an image carry the same authorization as the original.
+    width = _requested_width(request)
+    if width is not None:
+        normalized_path = await anyio.to_thread.run_sync(
+            image_variants.negotiate, asset_storage, normalized_path,
+            request.headers.get("accept"), width)
+        headers["Vary"] = "Accept"
+
+    accel_prefix = get_settings().signed_url_accel_prefix
+    if accel_prefix:
+        # The proxy serves the file from an internal location.
+        headers["X-Accel-Redirect"] = accel_prefix.rstrip("/") + "/" + quote(normalized_path)
+        return Response(headers=headers)
+
+    try:
+        file_path = asset_storage.local_path(normalized_path)
+        if file_path is None:
+            url = asset_storage.presign(normalized_path)
+            if url is not None:
+                return RedirectResponse(url, status_code=status.HTTP_307_TEMPORARY_REDIRECT)
+            return StreamingResponse(
+                asset_storage.stream(normalized_path),
+                media_type=storage.guess_content_type(normalized_path),
+                headers=headers,
+            )
+    except (OSError, ValueError) as exc:
+        raise HTTPException(status_code=404) from exc
+
+    if not os.path.isfile(file_path):
+        raise HTTPException(status_code=404)
+    # The URL expires, so it is cached until then rather than as immutable.
+    response = await asset_caching.file_response(
+        request, file_path, normalized_path, private=True,
+        cache_control_value=headers["Cache-Control"])
+    if width is not None:
+        response.headers["Vary"] = "Accept"
+    return response
+
+
+async def thumbnail_content(
+    request: Request,
+    path: str,
+    w: int = Query(..., ge=1),
+    expires: int = 0,
+    signature: str = "",
+):
+    """Serve a data image resized on demand (see `backend.thumbnails`).
+
+    Public images need no credentials. Private story images need the
+    `expires`/`signature` pair of their signed URL (`pages[].image_url`).
+    """
+
+    try:
+        normalized_path = storage_paths.normalize_data_relative_path(path).replace(os.sep, "/")
+    except ValueError as exc:
+        raise HTTPException(status_code=404) from exc
+    private = storage_paths.is_private_story_asset_path(normalized_path)
+    if private and not signed_urls.verify(normalized_path, expires, signature):
+        raise HTTPException(status_code=403, detail="Invalid or expired link")
+    if not image_variants.has_variants(normalized_path):
+        raise HTTPException(status_code=404)
+
+    fmt = thumbnails.choose_format(request.headers.get("accept"))
+    try:
+        cache_path, cache_key = await thumbnails.get_thumbnail_service().get(
+            storage.get_storage(), normalized_path, thumbnails.normalize_width(w), fmt)
+    except UnidentifiedImageError as exc:
+        raise HTTPException(status_code=422, detail="Not a readable image") from exc
+    except (OSError, ValueError) as exc:
+        raise HTTPException(status_code=404) from exc
+
+    if private:
+        cache_control = f"private, max-age={max(0, expires - int(time.time()))}"
+    else:
+        cache_control = asset_caching.cache_control(normalized_path, private=False)
+    headers = {"Cache-Control": cache_control, "ETag": f'"{cache_key[:32]}"', "Vary": "Accept"}
+    if etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+    return FileResponse(cache_path, media_type=thumbnails.content_type(fmt), headers=headers)
 
 
 def _recover_stuck_generation_tasks(db: Session) -> int:
@@ -97,18 +284,48 @@ async def lifespan(app: FastAPI):
         _assert_secure_secret_key()
     finally:
         db.close()
-    yield
+
+    reaper = None
+    if settings.asset_reaper_interval_seconds > 0:
+        reaper = asyncio.create_task(
+            asset_reaper.run_forever(settings.asset_reaper_interval_seconds))
+    try:
+        yield
+    finally:
+        if reaper is not None:
+            reaper.cancel()
 
 
 app = FastAPI(lifespan=lifespan)
 app.state.limiter = limiter
 app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
+
+
+@app.exception_handler(InvalidCursorError)
+async def invalid_cursor_handler(request, exc: InvalidCursorError):
+    """Reject malformed or foreign pagination cursors as a client error."""
+
+    return JSONResponse(status_code=400, content={"detail": str(exc)})
+
+
+@app.exception_handler(PasswordHasherBusy)
+async def password_hasher_busy_handler(request, exc: PasswordHasherBusy):
+    """Shed login/sign-up load when the password hashing queue is full."""
+
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Too many concurrent sign-ins; please retry shortly."},
+        headers={"Retry-After": "1"},
+    )
+
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.cors_origins,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
 
@@ -175,7 +392,31 @@ if settings.mount_frontend_static:
             frontend_dir,
         )
 
-if settings.mount_data_static:
+app.add_api_route(
+    signed_urls.SIGNED_CONTENT_PREFIX + "/{path:path}",
+    signed_static_content,
+    methods=["GET", "HEAD"],
+    include_in_schema=False,
+)
+app.add_api_route(
+    "/thumbnails/{path:path}",
+    thumbnail_content,
+    methods=["GET", "HEAD"],
+    include_in_schema=False,
+)
+
+if settings.mount_data_static and settings.storage_backend != "local":
+    app.add_api_route(
+        "/static_content/{path:path}",
+        remote_static_content,
+        methods=["GET", "HEAD"],
+        include_in_schema=False,
+    )
+    app_logger.info(
+        "Serving static content from %s storage via presigned redirects.",
+        settings.storage_backend,
+    )
+elif settings.mount_data_static:
     data_dir = settings.data_dir
     if not os.path.exists(data_dir) or not os.path.isdir(data_dir):
         app_logger.warning(
@@ -390,24 +631,44 @@ async def get_story_generation_task(
     return task
 
 
+def _cached_list_items(
+    list_name: str,
+    request: Request,
+    response: Response,
+    db: Session,
+):
+    """Serve a list's active items from the list cache, honouring ETags."""
+
+    snapshot = get_dynamic_list_snapshot(db)
+    if not snapshot.has_list(list_name):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Dynamic list '{list_name}' not found.",
+        )
+    not_modified = apply_cache_headers(
+        request,
+        response,
+        snapshot.etag(list_name),
+        cache_control=PUBLIC_LIST_CACHE_CONTROL,
+    )
+    if not_modified is not None:
+        return not_modified
+    return list(snapshot.active_items(list_name))
+
+
 @app.get(
     "/dynamic-lists/{list_name}/items",
     response_model=List[schemas.DynamicListItemPublic],
 )
 def get_public_list_items_endpoint(
     list_name: str,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
 ):
     """Fetch public-facing items for a dynamic list."""
 
-    db_list = crud.get_dynamic_list(db, list_name=list_name)
-    if not db_list:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Dynamic list '{list_name}' not found.",
-        )
-
-    return crud.get_public_list_items(db, list_name=list_name)
+    return _cached_list_items(list_name, request, response, db)
 
 
 @app.get(
@@ -416,15 +677,10 @@ def get_public_list_items_endpoint(
 )
 def get_active_list_items(
     list_name: str,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
 ):
     """Fetch active sorted items for a dynamic list."""
 
-    db_list = crud.get_dynamic_list(db, list_name=list_name)
-    if not db_list:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Dynamic list '{list_name}' not found.",
-        )
-
-    return crud.get_active_dynamic_list_items(db, list_name=list_name)
+    return _cached_list_items(list_name, request, response, db)
@@ -55,6 +55,74 @@ PAGE_IMAGE_FAILURES_TOTAL = Counter(
     "Total page image generation failures after retries are exhausted.",
 )
 
+PASSWORD_HASH_QUEUE_DEPTH = Gauge(
+    "app_password_hash_queue_depth",
+    "Password hash/verify calls waiting for a hashing thread.",
+)
+
+PASSWORD_HASH_IN_FLIGHT = Gauge(
+    "app_password_hash_in_flight",
+    "Password hash/verify calls currently running.",
+)
+
+PASSWORD_HASH_QUEUE_WAIT_SECONDS = Histogram(
+    "app_password_hash_queue_wait_seconds",
+    "Time password hash/verify calls waited for a hashing thread.",
+)
+
+PASSWORD_HASH_DURATION_SECONDS = Histogram(
+    "app_password_hash_duration_seconds",
+    "Time spent hashing or verifying a password.",
+    ["operation"],
+)
+
+PASSWORD_HASH_REJECTED_TOTAL = Counter(
+    "app_password_hash_rejected_total",
+    "Password hash/verify calls rejected because the queue was full.",
+)
+
+PASSWORD_REHASHES_TOTAL = Counter(
+    "app_password_rehashes_total",
+    "Stored password hashes upgraded to the configured cost on login.",
+)
+
+THUMBNAIL_CACHE_REQUESTS_TOTAL = Counter(
+    "app_thumbnail_cache_requests_total",
+    "On-demand thumbnail requests by cache result (hit, miss, coalesced).",
+    ["result"],
+)
+
+THUMBNAIL_RENDER_SECONDS = Histogram(
+    "app_thumbnail_render_seconds",
+    "Time spent reading, resizing and caching one thumbnail.",
+)
+
+THUMBNAIL_CACHE_BYTES = Gauge(
+    "app_thumbnail_cache_bytes",
+    "Bytes held in the on-disk thumbnail cache.",
+)
+
+THUMBNAIL_CACHE_EVICTIONS_TOTAL = Counter(
+    "app_thumbnail_cache_evictions_total",
+    "Thumbnails evicted from the on-disk cache.",
+)
+
+ASSET_TOMBSTONES_PROCESSED_TOTAL = Counter(
+    "app_asset_tombstones_processed_total",
+    "Asset folder tombstones processed by the reaper, by outcome (deleted, skipped, failed).",
+    ["outcome"],
+)
+
+ASSET_TOMBSTONES_PENDING = Gauge(
+    "app_asset_tombstones_pending",
+    "Asset folder deletions waiting for the reaper, as of its last batch.",
+)
+
+ASSET_REAPER_BATCH_SECONDS = Histogram(
+    "app_asset_reaper_batch_seconds",
+    "Time spent processing one batch of asset tombstones.",
+)
+
 
 OPENAI_TEXT_REQUESTS_TOTAL = Counter(
     "app_openai_text_requests_total",
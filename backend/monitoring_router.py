@@ -5,7 +5,7 @@ It includes routes for listing and retrieving log files, which are
 accessible only to authenticated admin users.
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, Request, status, Query
 import os
 from fastapi.responses import PlainTextResponse, FileResponse, Response
 from typing import List, Optional
@@ -20,6 +20,7 @@ from backend.logging_config import app_logger, error_logger
 from backend.settings import get_settings
 from backend import ai_services
 from backend.metrics import APP_LOG_FILES_TOTAL
+from backend.response_cache import admin_cache, apply_cache_headers
 
 from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
 
@@ -177,11 +178,25 @@ def download_log_file(log_file: str):
 
 
 @monitoring_router.get("/stats")
-def system_stats():
+def system_stats(request: Request, response: Response):
     """Return basic system stats for admin monitoring.
 
     Avoids external dependencies; values may be 'None' if not available on the platform.
+    Cached for MONITORING_STATS_CACHE_TTL_SECONDS so concurrent dashboards share one
+    disk/log-directory scan; clients revalidate with ETags.
     """
+    entry = admin_cache.get(
+        ("monitoring_stats", LOG_DIRECTORY),
+        loader=_compute_system_stats,
+        ttl=_settings.monitoring_stats_cache_ttl,
+        stale_ttl=_settings.admin_cache_stale_seconds,
+    )
+    not_modified = apply_cache_headers(request, response, entry.etag)
+    return not_modified if not_modified is not None else entry.value
+
+
+def _compute_system_stats() -> dict:
+    """Collect the system stats payload (disk usage, load, log file count)."""
     try:
         now = time.time()
         uptime_seconds = int(max(0, now - PROCESS_START_TIME))
@@ -0,0 +1,152 @@
+"""Opaque keyset (cursor) pagination helpers for list queries.
+
+Offset pagination makes the database walk and discard every skipped row, so
+deep pages get linearly slower. Keyset pagination instead seeks directly past
+the last row of the previous page using the list's sort key plus the primary
+key as a tie-breaker.
+
+Cursors are URL-safe base64 JSON blobs that name the list they belong to, the
+anchor row id and its sort values. Clients must treat them as opaque.
+
+The seek predicate compares against the anchor row's *stored* sort values via
+a scalar subquery (falling back to the values carried in the cursor when the
+anchor row has since been deleted). This keeps equality checks exact on SQLite,
+where rows written by `CURRENT_TIMESTAMP` and by SQLAlchemy use different
+datetime string formats.
+"""
+
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any, List, Optional, Sequence, Tuple
+
+from sqlalchemy import DateTime, and_, func, or_, select
+from sqlalchemy.orm import Query
+
+# Response header carrying the next-page cursor for endpoints returning bare lists.
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+# (ORM column attribute, descending?)
+SortKey = Sequence[Tuple[Any, bool]]
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a client-supplied cursor cannot be decoded or is for another list."""
+
+
+def encode_cursor(list_key: str, row_id: int, values: Sequence[Any]) -> str:
+    """Return an opaque cursor pointing just past the given row."""
+
+    payload = {
+        "k": list_key,
+        "id": row_id,
+        "v": [
+            value.isoformat() if isinstance(value, datetime) else value
+            for value in values
+        ],
+    }
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, list_key: str) -> dict:
+    """Decode a cursor and ensure it was issued for `list_key`."""
+
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (binascii.Error, UnicodeError, ValueError) as exc:
+        raise InvalidCursorError("Malformed pagination cursor.") from exc
+
+    if (
+        not isinstance(payload, dict)
+        or payload.get("k") != list_key
+        or not isinstance(payload.get("id"), int)
+        or not isinstance(payload.get("v"), list)
+    ):
+        raise InvalidCursorError("Pagination cursor does not match this list.")
+    return payload
+
+
+def _coerce_cursor_value(column: Any, value: Any) -> Any:
+    """Convert a JSON cursor value back into the column's Python type."""
+
+    if value is not None and isinstance(getattr(column, "type", None), DateTime):
+        try:
+            return datetime.fromisoformat(value)
+        except (TypeError, ValueError) as exc:
+            raise InvalidCursorError("Malformed pagination cursor.") from exc
+    return value
+
+
+def apply_keyset(
+    query: Query,
+    id_column: Any,
+    sort_key: SortKey,
+    list_key: str,
+    cursor: Optional[str],
+) -> Query:
+    """Order `query` by `sort_key` + id and, given a cursor, seek past its anchor row.
+
+    The id column always follows the sort key (in the direction of the last
+    sort column) so the ordering is total and pages never overlap.
+    """
+
+    id_descending = sort_key[-1][1] if sort_key else False
+    columns = list(sort_key) + [(id_column, id_descending)]
+    query = query.order_by(
+        *(column.desc() if descending else column.asc()
+          for column, descending in columns)
+    )
+    if not cursor:
+        return query
+
+    payload = decode_cursor(cursor, list_key)
+    values = payload["v"]
+    if len(values) != len(sort_key):
+        raise InvalidCursorError("Pagination cursor does not match this list.")
+
+    anchors: List[Any] = []
+    for (column, _), value in zip(sort_key, values):
+        stored = (
+            select(column)
+            .where(id_column == payload["id"])
+            .correlate(None)
+            .scalar_subquery()
+        )
+        anchors.append(func.coalesce(
+            stored, _coerce_cursor_value(column, value)))
+    anchors.append(payload["id"])
+
+    # (c1, c2, ..., id) > anchor, expanded so mixed directions are supported:
+    # c1 > a1 OR (c1 = a1 AND c2 > a2) OR ...
+    clauses = []
+    for index, (column, descending) in enumerate(columns):
+        equal_prefix = [
+            prior_column == anchors[prior_index]
+            for prior_index, (prior_column, _) in enumerate(columns[:index])
+        ]
+        seek = column < anchors[index] if descending else column > anchors[index]
+        clauses.append(and_(*equal_prefix, seek))
+    return query.filter(or_(*clauses))
+
+
+def next_cursor(
+    items: Sequence[Any],
+    limit: int,
+    list_key: str,
+    sort_key: SortKey,
+) -> Optional[str]:
+    """Return the cursor for the page after `items`, or None on a short page."""
+
+    if not items or len(items) < limit:
+        return None
+    last = items[-1]
+    return encode_cursor(
+        list_key,
+        last.id,
+        [getattr(last, column.key) for column, _ in sort_key],
+    )
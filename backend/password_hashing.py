@@ -0,0 +1,117 @@
+"""Password hashing off the event loop.
+
+bcrypt is deliberately slow (~100-300 ms per hash at the default cost), so
+running it inside an `async def` endpoint stalls every other request on the
+worker. Async callers use `hash_password` / `verify_password` here, which run
+passlib in a small dedicated thread pool:
+
+- `PASSWORD_HASH_WORKERS` threads bound the CPU spent on hashing;
+- at most `PASSWORD_HASH_MAX_QUEUE` calls may wait for a thread. Beyond that
+  `PasswordHasherBusy` is raised (mapped to 503) rather than letting a login
+  burst queue without limit.
+
+Queue depth, in-flight count, wait and run times and rejections are exported
+as Prometheus metrics (see `backend.metrics`).
+
+`BCRYPT_ROUNDS` sets the cost of new hashes. Verification reports when a
+stored hash uses another cost so callers can transparently rehash on login.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional, Tuple, TypeVar
+
+from passlib.context import CryptContext
+
+from backend.metrics import (
+    PASSWORD_HASH_DURATION_SECONDS,
+    PASSWORD_HASH_IN_FLIGHT,
+    PASSWORD_HASH_QUEUE_DEPTH,
+    PASSWORD_HASH_QUEUE_WAIT_SECONDS,
+    PASSWORD_HASH_REJECTED_TOTAL,
+)
+from backend.settings import get_settings
+
+T = TypeVar("T")
+
+_settings = get_settings()
+
+# Shared by sync callers (scripts, tests, crud) and the executor.
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__rounds=_settings.bcrypt_rounds,
+)
+
+
+class PasswordHasherBusy(RuntimeError):
+    """Raised when the password hashing queue is full."""
+
+
+class PasswordHasher:
+    """Runs passlib operations in a bounded thread pool."""
+
+    def __init__(self, max_workers: int, max_queue: int):
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="password-hash")
+        # Permits for queued + running calls.
+        self._slots = threading.BoundedSemaphore(max_workers + max_queue)
+
+    async def run(self, operation: str, func: Callable[..., T], *args) -> T:
+        if not self._slots.acquire(blocking=False):
+            PASSWORD_HASH_REJECTED_TOTAL.inc()
+            raise PasswordHasherBusy("Password hashing queue is full")
+
+        enqueued_at = time.perf_counter()
+        PASSWORD_HASH_QUEUE_DEPTH.inc()
+
+        def _job() -> T:
+            started_at = time.perf_counter()
+            PASSWORD_HASH_QUEUE_DEPTH.dec()
+            PASSWORD_HASH_QUEUE_WAIT_SECONDS.observe(started_at - enqueued_at)
+            PASSWORD_HASH_IN_FLIGHT.inc()
+            try:
+                return func(*args)
+            finally:
+                PASSWORD_HASH_IN_FLIGHT.dec()
+                PASSWORD_HASH_DURATION_SECONDS.labels(operation=operation).observe(
+                    time.perf_counter() - started_at)
+                self._slots.release()
+
+        def _on_done(future) -> None:
+            # Cancelled before a thread picked it up: _job never ran.
+            if future.cancelled():
+                PASSWORD_HASH_QUEUE_DEPTH.dec()
+                self._slots.release()
+
+        future = self._executor.submit(_job)
+        future.add_done_callback(_on_done)
+        return await asyncio.wrap_future(future)
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False)
+
+
+password_hasher = PasswordHasher(
+    max_workers=_settings.password_hash_workers,
+    max_queue=_settings.password_hash_max_queue,
+)
+
+
+async def hash_password(password: str) -> str:
+    """Hash `password` at the configured cost without blocking the event loop."""
+    return await password_hasher.run("hash", pwd_context.hash, password)
+
+
+async def verify_password(password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """Verify `password` against a stored hash without blocking the event loop.
+
+    Returns `(valid, new_hash)`; `new_hash` is set when the password is valid
+    but the stored hash uses another cost or scheme and should be replaced.
+    """
+    return await password_hasher.run(
+        "verify", pwd_context.verify_and_update, password, hashed_password)
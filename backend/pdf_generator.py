@@ -1,6 +1,6 @@
 import io
 import os
-from typing import Any, Dict, List, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 
 from reportlab.lib.pagesizes import A4, landscape, letter, portrait
 from reportlab.lib.colors import Color, HexColor
@@ -8,6 +8,7 @@ from reportlab.lib.utils import ImageReader, simpleSplit
 from reportlab.pdfbase.pdfmetrics import stringWidth
 from reportlab.pdfgen import canvas
 
+from . import storage
 from .database import Story as StoryModel
 from .logging_config import app_logger, error_logger
 from .schemas import EDITOR_DEFAULTS, LayoutMode
@@ -118,16 +119,13 @@ def _resolve_font_name(font_family: Any) -> str:
     return FONT_FAMILY_MAP.get(key, "Helvetica-Bold")
 
 
-def _resolve_image_path(image_path: str) -> str:
-    """Resolve and canonicalize an image path, ensuring it stays within data/."""
+def _load_page_image(image_path: str) -> Optional[io.BytesIO]:
+    """Read a page image from asset storage; None if missing or outside it."""
 
-    project_root = os.path.realpath(os.path.join(
-        os.path.dirname(__file__), os.pardir))
-    data_root = os.path.join(project_root, "data")
-    full_path = os.path.realpath(os.path.join(data_root, image_path))
-    if not full_path.startswith(data_root + os.sep) and full_path != data_root:
-        raise ValueError(f"Image path escapes data directory: {image_path!r}")
-    return full_path
+    try:
+        return io.BytesIO(storage.get_storage().get(image_path))
+    except (OSError, ValueError):
+        return None
 
 
 def _text_box_geometry(
@@ -220,14 +218,14 @@ def _layout_regions(
 
 def _draw_image_cover(
     pdf: canvas.Canvas,
-    full_image_path: str,
+    image_file: Any,
     region: Tuple[float, float, float, float],
 ) -> None:
-    """Draw an image cropped to fill a target region."""
+    """Draw an image (path or file object) cropped to fill a target region."""
 
     region_x, region_y, region_width, region_height = region
 
-    image = ImageReader(full_image_path)
+    image = ImageReader(image_file)
     image_width, image_height = image.getSize()
     if not image_width or not image_height:
         raise ValueError("Image has invalid dimensions")
@@ -370,19 +368,14 @@ def create_story_pdf(story_data: StoryModel) -> bytes:
                 page_settings.get("layout_mode"),
                 page_size,
             )
-            full_image_path = None
             image_path = getattr(page, "image_path", None)
-            if image_path:
-                try:
-                    full_image_path = _resolve_image_path(image_path)
-                except ValueError:
-                    full_image_path = None
+            image_file = _load_page_image(image_path) if image_path else None
 
             _draw_placeholder_background(pdf, page_size)
 
             try:
-                if full_image_path and os.path.exists(full_image_path):
-                    _draw_image_cover(pdf, full_image_path, layout_regions["image"])
+                if image_file is not None:
+                    _draw_image_cover(pdf, image_file, layout_regions["image"])
             except Exception as exc:
                 error_logger.error(
                     "Failed to draw image for story %s page %s: %s",
@@ -435,6 +428,8 @@ if __name__ == '__main__':
         os.path.dirname(__file__)), "data", "images", "test")
     os.makedirs(test_image_dir, exist_ok=True)
     test_image_path = os.path.join(test_image_dir, "sample_test_image.png")
+    # Pages reference images by their key in asset storage (relative to DATA_DIR).
+    test_image_key = "images/test/sample_test_image.png"
 
     if not os.path.exists(test_image_path):
         try:
@@ -456,12 +451,12 @@ if __name__ == '__main__':
         title="The Adventures of Sir Reginald and Sparky",
         pages=[
             MockPage(
-                1, "Once upon a time, Sir Reginald, a brave knight, met Sparky, a friendly dragon.", test_image_path),
+                1, "Once upon a time, Sir Reginald, a brave knight, met Sparky, a friendly dragon.", test_image_key),
             # Test missing image
             MockPage(
                 2, "They decided to go on an adventure to find the legendary Golden Acorn.", None),
             MockPage(
-                3, "After many trials, they found it and shared its magic with the kingdom!", test_image_path)
+                3, "After many trials, they found it and shared its magic with the kingdom!", test_image_key)
         ]
     )
 
@@ -1,22 +1,24 @@
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, Request, status, Body
-from fastapi.responses import FileResponse, StreamingResponse
+from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, Query, Request, Response, status, Body
+from fastapi.responses import StreamingResponse
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
 from typing import List, Optional
 import asyncio
 import io
 import os
-import shutil
 from datetime import timedelta
 
 from backend import crud, schemas, auth, database, pdf_generator, ai_services
 from backend.database import get_db
+from backend.dynamic_list_cache import PUBLIC_LIST_CACHE_CONTROL, get_dynamic_list_snapshot
 from backend.logging_config import app_logger, error_logger
 from backend.rate_limiting import limiter
+from backend.response_cache import accepts_gzip, apply_cache_headers, etag_matches
 from backend.settings import get_settings
-from backend import story_generation_service
-from backend import storage_paths
+from backend import password_hashing, story_generation_service
+from backend import asset_caching, asset_reaper, image_variants, storage, storage_paths
 from backend.storage_paths import page_image_paths
+from backend.pagination import NEXT_CURSOR_HEADER
 
 public_router = APIRouter()
 settings = get_settings()
@@ -115,15 +117,22 @@ def _get_story_or_404(
 
 
 def _get_story_page_or_404(
+    db: Session,
     db_story: database.Story,
     page_id: int,
 ) -> database.Page:
-    """Return a page from a story or raise a 404."""
+    """Return a page from a story or raise a 404.
+
+    Looks the page up directly instead of loading the whole `pages` collection.
+    """
 
-    for page in db_story.pages or []:
-        if page.id == page_id:
-            return page
-    raise HTTPException(status_code=404, detail="Page not found")
+    db_page = db.query(database.Page).filter(
+        database.Page.id == page_id,
+        database.Page.story_id == db_story.id,
+    ).first()
+    if db_page is None:
+        raise HTTPException(status_code=404, detail="Page not found")
+    return db_page
 
 
 def _extract_reference_image_paths(db_story: database.Story) -> List[str]:
@@ -151,7 +160,8 @@ async def register_user(
             status_code=400, detail="Username already registered")
     if user.email and crud.get_user_by_email(db, email=user.email):
         raise HTTPException(status_code=400, detail="Email already registered")
-    created = crud.create_user(db=db, user=user)
+    hashed_password = await password_hashing.hash_password(user.password)
+    created = crud.create_user(db=db, user=user, hashed_password=hashed_password)
     return created
 
 
@@ -164,7 +174,8 @@ async def login_for_access_token(
 ):
     """Authenticate a user and return an access token."""
 
-    user = auth.authenticate_user(db, form_data.username, form_data.password)
+    user = await auth.authenticate_user_async(
+        db, form_data.username, form_data.password)
 
     if not user:
         raise HTTPException(
@@ -253,26 +264,55 @@ async def get_generation_status(
     return task
 
 
-@public_router.get("/stories/", response_model=List[schemas.StoryListItem])
+@public_router.get("/stories/", response_model=List[schemas.StoryLibraryItem])
 async def read_user_stories(
+    response: Response,
     db: Session = Depends(get_db),
     current_user: database.User = Depends(auth.get_current_active_user),
     skip: int = 0,
     limit: int = 100,
-    include_drafts: bool = True
+    include_drafts: bool = True,
+    cursor: Optional[str] = None,
 ):
     """
     Fetches a list of stories for the currently authenticated user.
-    - **skip**: Number of stories to skip for pagination.
+    - **skip**: Number of stories to skip for pagination (ignored with `cursor`).
     - **limit**: Maximum number of stories to return.
     - **include_drafts**: Whether to include stories marked as drafts.
+    - **cursor**: Opaque cursor from a previous page's `X-Next-Cursor` header.
     """
     app_logger.info(
-        f"User {current_user.username} requested their stories. Skip: {skip}, Limit: {limit}, Include Drafts: {include_drafts}")
-    stories = crud.get_stories_by_user(
-        db, user_id=current_user.id, skip=skip, limit=limit, include_drafts=include_drafts)
+        f"User {current_user.username} requested their stories. Skip: {skip}, Limit: {limit}, Include Drafts: {include_drafts}, Cursor: {bool(cursor)}")
+    stories = crud.get_story_library_by_user(
+        db, user_id=current_user.id, skip=skip, limit=limit, include_drafts=include_drafts, cursor=cursor)
     if not stories:
         app_logger.info(f"No stories found for user {current_user.username}.")
+    next_cursor = crud.next_page_cursor("stories", stories, limit)
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return stories
+
+
+@public_router.get("/stories/search", response_model=List[schemas.StorySearchItem])
+async def search_user_stories(
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(20, ge=1, le=100),
+    include_drafts: bool = True,
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db),
+    current_user: database.User = Depends(auth.get_current_active_user),
+):
+    """
+    Full-text search over the current user's stories: titles, outlines and page
+    text, best match first. Words match by prefix and all must be present.
+    - **cursor**: Opaque cursor from a previous page's `X-Next-Cursor` header.
+    """
+    stories = crud.search_stories(
+        db, current_user.id, q, limit=limit, include_drafts=include_drafts, cursor=cursor)
+    next_cursor = crud.search_page_cursor("story_search", stories, limit)
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
     return stories
 
 
@@ -282,18 +322,23 @@ async def read_user_stories(
 )
 async def backfill_characters_for_user(
     include_drafts: bool = True,
+    full: bool = False,
     db: Session = Depends(get_db),
     current_user: database.User = Depends(auth.get_current_active_user),
 ):
-    """Backfill a user's character library from their existing stories."""
+    """Backfill a user's character library from stories changed since the last run.
+
+    `full=true` rescans every story.
+    """
 
     try:
-        count = crud.upsert_characters_from_user_stories(
+        return crud.upsert_characters_from_user_stories(
             db,
             current_user.id,
             include_drafts=include_drafts,
+            batch_size=get_settings().character_backfill_batch_size,
+            full=full,
         )
-        return {"upserted": count}
     except Exception as exc:
         error_logger.error(
             "Failed to backfill characters for user %s: %s",
@@ -319,7 +364,7 @@ async def read_story(
     """
     app_logger.info(
         f"User {current_user.username} requested story with ID: {story_id}")
-    db_story = crud.get_story(db, story_id=story_id, user_id=current_user.id)
+    db_story = crud.get_story(db, story_id=story_id, user_id=current_user.id, with_pages=True)
     if db_story is None:
         error_logger.warning(
             f"Story with ID {story_id} not found for user {current_user.username}.")
@@ -339,10 +384,16 @@ async def read_story(
 async def read_story_page_image_api(
     story_id: int,
     page_id: int,
+    request: Request,
+    w: Optional[int] = Query(None, ge=1),
     db: Session = Depends(get_db),
     current_user: database.User = Depends(auth.get_current_active_user),
 ):
-    """Return one generated story page image for the story owner only."""
+    """Return one generated story page image for the story owner only.
+
+    With `w`, the smallest stored variant at least that wide in a format
+    the client accepts is returned instead (see `backend.image_variants`).
+    """
 
     db_story = db.query(database.Story).filter(
         database.Story.id == story_id
@@ -355,23 +406,40 @@ async def read_story_page_image_api(
             detail="Not authorized to access this story",
         )
 
-    db_page = _get_story_page_or_404(db_story, page_id)
+    db_page = _get_story_page_or_404(db, db_story, page_id)
 
     if not db_page.image_path:
         raise HTTPException(status_code=404, detail="Page image not found")
 
+    asset_storage = storage.get_storage()
+    image_key = db_page.image_path
     try:
-        is_private_story_image = storage_paths.is_private_story_asset_path(
-            db_page.image_path
-        )
-        image_path = storage_paths.resolve_data_path(db_page.image_path)
-    except ValueError as exc:
+        if not storage_paths.is_private_story_asset_path(image_key):
+            raise HTTPException(status_code=404, detail="Page image not found")
+        if w is not None:
+            image_key = await asyncio.to_thread(
+                image_variants.negotiate, asset_storage, image_key,
+                request.headers.get("accept"), w)
+        image_path = asset_storage.local_path(image_key)
+        if image_path is None:
+            # Remote storage: stream it through, private assets get no public URL.
+            return StreamingResponse(
+                asset_storage.stream(image_key),
+                media_type=storage.guess_content_type(image_key),
+                headers={"Cache-Control": asset_caching.cache_control(
+                    image_key, private=True)},
+            )
+    except (OSError, ValueError) as exc:
         raise HTTPException(status_code=404, detail="Page image not found") from exc
 
-    if not is_private_story_image or not os.path.isfile(image_path):
+    if not os.path.isfile(image_path):
         raise HTTPException(status_code=404, detail="Page image not found")
 
-    return FileResponse(image_path)
+    response = await asset_caching.file_response(
+        request, image_path, image_key, private=True)
+    if w is not None:
+        response.headers["Vary"] = "Accept"
+    return response
 
 
 @public_router.put("/stories/{story_id}/title", response_model=schemas.Story)
@@ -476,7 +544,7 @@ async def regenerate_story_page_image_api(
 
     db_story = _get_story_or_404(
         db, story_id=story_id, user_id=current_user.id)
-    db_page = _get_story_page_or_404(db_story, page_id)
+    db_page = _get_story_page_or_404(db, db_story, page_id)
     effective_settings = crud.get_effective_page_editor_settings(
         db_story, db_page)
     text_position = str(effective_settings.get("text_position") or "bottom")
@@ -511,6 +579,7 @@ async def regenerate_story_page_image_api(
     state = crud.get_page_editor_state(db_page)
     db_page.image_path = new_image_path
     db_page.editor_state = state
+    crud.refresh_story_library_summary(db, story_id)
     db.commit()
     db.refresh(db_page)
     return db_page
@@ -519,10 +588,15 @@ async def regenerate_story_page_image_api(
 @public_router.delete("/stories/{story_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_story(
     story_id: int,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     current_user: database.User = Depends(auth.get_current_active_user)
 ):
-    """Delete a story owned by the current authenticated user."""
+    """Delete a story owned by the current authenticated user.
+
+    Its image folder is tombstoned with the rows and removed by the asset
+    reaper after the response is sent.
+    """
     app_logger.info(
         f"User {current_user.username} attempting to delete story ID: {story_id}")
     db_story = crud.get_story(db, story_id=story_id, user_id=current_user.id)
@@ -550,16 +624,7 @@ async def delete_story(
             detail="Could not delete story from database.",
         )
 
-    story_image_dir = storage_paths.story_images_abs(current_user.id, story_id)
-    try:
-        if os.path.isdir(story_image_dir):
-            shutil.rmtree(story_image_dir)
-    except OSError as exc:
-        app_logger.warning(
-            "Could not delete story images for story %s: %s",
-            story_id,
-            exc,
-        )
+    background_tasks.add_task(asset_reaper.reap_in_background, db.get_bind())
 
     app_logger.info(
         f"Story ID {story_id} successfully deleted by user {current_user.username}.")
@@ -575,20 +640,44 @@ async def read_users_me(current_user: schemas.User = Depends(auth.get_current_ac
     return current_user
 
 
+@public_router.get("/dynamic-lists/bootstrap", response_model=schemas.DynamicListsBootstrap)
+def get_dynamic_lists_bootstrap(request: Request, db: Session = Depends(get_db)):
+    """Every dynamic list's active items in one precomputed payload.
+
+    The body is serialized and gzip-compressed once per list cache reload;
+    clients revalidate with If-None-Match against the version ETag.
+    """
+    bootstrap = get_dynamic_list_snapshot(db).bootstrap
+    headers = {
+        "ETag": bootstrap.etag,
+        "Cache-Control": PUBLIC_LIST_CACHE_CONTROL,
+        "Vary": "Accept-Encoding",
+    }
+    if etag_matches(request.headers.get("if-none-match"), bootstrap.etag):
+        return Response(status_code=304, headers=headers)
+    if accepts_gzip(request.headers.get("accept-encoding")):
+        headers["Content-Encoding"] = "gzip"
+        return Response(content=bootstrap.gzip_body, media_type="application/json", headers=headers)
+    return Response(content=bootstrap.body, media_type="application/json", headers=headers)
+
+
 @public_router.get("/dynamic-lists/{list_name}/active-items", response_model=List[schemas.DynamicListItemPublic])
-def get_public_list_items(list_name: str, db: Session = Depends(get_db)):
-    items = crud.get_active_dynamic_list_items(db, list_name=list_name)
-    if not items:
-        # This is not ideal, as it could mean the list is empty or doesn't exist.
-        # For a public endpoint, we might not want to reveal which it is.
-        # However, for the purpose of this exercise, we'll make it explicit.
-        db_list = crud.get_dynamic_list(db, list_name=list_name)
-        if not db_list:
-            raise HTTPException(
-                status_code=404, detail=f"Dynamic list '{list_name}' not found.")
-        # If the list exists but is empty, return an empty list.
-        return []
-    return items
+def get_public_list_items(
+    list_name: str,
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_db),
+):
+    snapshot = get_dynamic_list_snapshot(db)
+    if not snapshot.has_list(list_name):
+        raise HTTPException(
+            status_code=404, detail=f"Dynamic list '{list_name}' not found.")
+    not_modified = apply_cache_headers(
+        request, response, snapshot.etag(list_name),
+        cache_control=PUBLIC_LIST_CACHE_CONTROL)
+    if not_modified is not None:
+        return not_modified
+    return list(snapshot.active_items(list_name))
 
 
 @public_router.get("/stories/{story_id}/pdf", status_code=status.HTTP_200_OK)
@@ -603,7 +692,10 @@ async def export_story_as_pdf_api(
     """
     app_logger.info(
         f"User {current_user.username} requested PDF for story ID: {story_id}")
-    db_story = crud.get_story(db, story_id=story_id, user_id=current_user.id)
+    # Pages are eager-loaded so the PDF worker thread never lazy-loads
+    # through the request's session.
+    db_story = crud.get_story(
+        db, story_id=story_id, user_id=current_user.id, with_pages=True)
     if not db_story or db_story.owner_id != current_user.id:
         error_logger.warning(
             f"User {current_user.username} attempted to access unauthorized or non-existent story PDF: {story_id}")
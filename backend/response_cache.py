@@ -0,0 +1,184 @@
+"""In-process TTL cache with stale-while-revalidate for polled admin endpoints.
+
+Admin dashboards poll the same aggregate endpoints every few seconds, often
+from several browser tabs at once. Caching the computed payload per endpoint
+(and query parameters) bounds database and filesystem work to one load per
+TTL, regardless of how many admins are watching:
+
+- fresh entries (age < ttl) are served directly;
+- stale entries (ttl <= age < ttl + stale_ttl) are served immediately while a
+  single background thread reloads them;
+- missing or expired entries are loaded synchronously.
+
+Each entry carries a weak ETag so clients revalidating with `If-None-Match`
+get a bodiless 304 while the payload is unchanged.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Hashable, Optional, Set
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+
+from backend.logging_config import error_logger
+
+
+@dataclass(frozen=True)
+class CachedValue:
+    value: Any
+    etag: str
+    loaded_at: float  # time.monotonic() timestamp
+
+
+def compute_etag(value: Any) -> str:
+    """Return a weak ETag for a JSON-serializable value."""
+
+    encoded = json.dumps(
+        jsonable_encoder(value), sort_keys=True, separators=(",", ":"))
+    digest = hashlib.sha256(encoded.encode("utf-8")).hexdigest()[:32]
+    return f'W/"{digest}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison of an `If-None-Match` header against `etag`."""
+
+    if not if_none_match:
+        return False
+    opaque = etag.removeprefix("W/")
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == opaque:
+            return True
+    return False
+
+
+def accepts_gzip(accept_encoding: Optional[str]) -> bool:
+    """Whether an `Accept-Encoding` header allows a gzip-encoded body."""
+
+    for part in (accept_encoding or "").split(","):
+        coding, _, params = part.strip().partition(";")
+        if coding.strip().lower() not in ("gzip", "*"):
+            continue
+        quality = params.strip().lower()
+        if quality.startswith("q="):
+            try:
+                return float(quality[2:]) > 0
+            except ValueError:
+                return False
+        return True
+    return False
+
+
+class TTLCache:
+    """Thread-safe keyed cache with per-call TTLs and background refresh."""
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        self._clock = clock
+        self._entries: Dict[Hashable, CachedValue] = {}
+        self._lock = threading.Lock()
+        self._load_locks: Dict[Hashable, threading.Lock] = {}
+        self._refreshing: Set[Hashable] = set()
+
+    def get(
+        self,
+        key: Hashable,
+        loader: Callable[[], Any],
+        ttl: float,
+        stale_ttl: float = 0.0,
+        refresh: Optional[Callable[[], Any]] = None,
+    ) -> CachedValue:
+        """Return the cached value for `key`, loading or refreshing as needed.
+
+        `loader` runs synchronously on a miss. `refresh` (default: `loader`)
+        runs on a background thread for stale hits, so it must not depend on
+        request-scoped resources such as the request's DB session. A `ttl` of
+        0 or less bypasses the cache.
+        """
+
+        if ttl <= 0:
+            value = loader()
+            return CachedValue(value=value, etag=compute_etag(value),
+                               loaded_at=self._clock())
+
+        entry = self._entries.get(key)
+        if entry is not None:
+            age = self._clock() - entry.loaded_at
+            if age < ttl:
+                return entry
+            if age < ttl + stale_ttl:
+                self._schedule_refresh(key, refresh or loader)
+                return entry
+
+        # Single-flight: concurrent misses for one key share a single load.
+        with self._load_lock(key):
+            entry = self._entries.get(key)
+            if entry is not None and self._clock() - entry.loaded_at < ttl:
+                return entry
+            return self._store(key, loader())
+
+    def clear(self) -> None:
+        """Drop every cached entry (e.g. between tests)."""
+
+        with self._lock:
+            self._entries.clear()
+
+    def _load_lock(self, key: Hashable) -> threading.Lock:
+        with self._lock:
+            return self._load_locks.setdefault(key, threading.Lock())
+
+    def _store(self, key: Hashable, value: Any) -> CachedValue:
+        entry = CachedValue(value=value, etag=compute_etag(value),
+                            loaded_at=self._clock())
+        with self._lock:
+            self._entries[key] = entry
+        return entry
+
+    def _schedule_refresh(self, key: Hashable, loader: Callable[[], Any]) -> None:
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+        threading.Thread(
+            target=self._refresh, args=(key, loader), daemon=True,
+            name=f"cache-refresh-{key}",
+        ).start()
+
+    def _refresh(self, key: Hashable, loader: Callable[[], Any]) -> None:
+        try:
+            with self._load_lock(key):
+                self._store(key, loader())
+        except Exception:
+            # Keep serving the stale entry; the next stale hit retries.
+            error_logger.exception(f"Background refresh failed for {key!r}")
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+
+def apply_cache_headers(
+    request: Request,
+    response: Response,
+    etag: str,
+    cache_control: str = "private, no-cache",
+) -> Optional[Response]:
+    """Set ETag/Cache-Control on `response`; return a 304 if the client is current.
+
+    `no-cache` lets browsers keep the body but makes them revalidate on every
+    use, which is answered with a bodiless 304.
+    """
+
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
+
+
+# Shared cache for admin dashboard endpoints.
+admin_cache = TTLCache()
@@ -0,0 +1,254 @@
+"""Retention policies for generation tasks and soft-deleted content.
+
+Three policies, each run in short batches that commit as they go so no
+single transaction holds the write lock for long:
+
+- finished generation tasks older than `TASK_RETENTION_DAYS` are moved to
+  `story_generation_task_archive`, a compact summary without the per-page
+  retry details. Hourly rollups (`task_stats_hourly`) are unaffected, so
+  historical admin stats keep working;
+- stories soft-deleted more than `DELETED_CONTENT_RETENTION_DAYS` ago are
+  removed with their pages and image folder (their tasks are archived);
+- users soft-deleted that long ago are removed with all their stories,
+  characters and files.
+
+Image folders are recorded as asset tombstones in the transaction that
+deletes their rows and removed by the asset reaper (`backend.asset_reaper`)
+at the end of the run. Image files no row references are then reported or
+deleted (`backend.asset_gc`, `ASSET_GC_MODE`), and blobs of the local store
+left unreferenced are collected.
+Run `scripts/run_retention.py` periodically (e.g. daily from cron).
+"""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional, Sequence
+
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.orm import Session
+
+from . import asset_gc, asset_reaper, auth_cache, schemas, storage, storage_paths
+from .database import (
+    Character,
+    CharacterBackfillState,
+    CharacterImage,
+    Page,
+    Story,
+    StoryGenerationTask,
+    StoryGenerationTaskArchive,
+    User,
+)
+from .logging_config import app_logger
+from .settings import get_settings
+
+_FINISHED = (
+    schemas.GenerationTaskStatus.COMPLETED.value,
+    schemas.GenerationTaskStatus.FAILED.value,
+)
+
+# Longest error message kept in the archive.
+_ARCHIVED_ERROR_LENGTH = 500
+
+# Bulk deletes bypass the session's identity map.
+_BULK = {"synchronize_session": False}
+
+
+def _cutoff(now: Optional[datetime], days: int) -> datetime:
+    return (now or datetime.now(timezone.utc)) - timedelta(days=days)
+
+
+def _archive_tasks(db: Session, *criteria: Any, limit: Optional[int] = None) -> int:
+    """Copy matching tasks into the archive and delete them (no commit)."""
+
+    query = select(StoryGenerationTask.id).where(*criteria).order_by(
+        StoryGenerationTask.created_at, StoryGenerationTask.id)
+    if limit is not None:
+        query = query.limit(limit)
+    task_ids = db.scalars(query).all()
+    if not task_ids:
+        return 0
+
+    db.execute(insert(StoryGenerationTaskArchive).from_select(
+        [
+            "id", "story_id", "user_id", "status", "attempts", "total_retries",
+            "failed_pages_count", "duration_ms", "error", "created_at",
+            "completed_at",
+        ],
+        select(
+            StoryGenerationTask.id,
+            StoryGenerationTask.story_id,
+            StoryGenerationTask.user_id,
+            StoryGenerationTask.status,
+            StoryGenerationTask.attempts,
+            StoryGenerationTask.total_retries,
+            StoryGenerationTask.failed_pages_count,
+            StoryGenerationTask.duration_ms,
+            func.substr(
+                func.coalesce(StoryGenerationTask.last_error,
+                              StoryGenerationTask.error_message),
+                1, _ARCHIVED_ERROR_LENGTH,
+            ),
+            StoryGenerationTask.created_at,
+            StoryGenerationTask.completed_at,
+        ).where(StoryGenerationTask.id.in_(task_ids)),
+    ))
+    db.execute(
+        delete(StoryGenerationTask).where(StoryGenerationTask.id.in_(task_ids)),
+        execution_options=_BULK,
+    )
+    return len(task_ids)
+
+
+def archive_generation_tasks(
+    db: Session,
+    retention_days: int,
+    batch_size: int,
+    now: Optional[datetime] = None,
+) -> int:
+    """Archive finished tasks created more than `retention_days` ago.
+
+    Pending and in-progress tasks are never archived. Returns the count.
+    """
+
+    cutoff = _cutoff(now, retention_days)
+    archived = 0
+    while True:
+        count = _archive_tasks(
+            db,
+            StoryGenerationTask.status.in_(_FINISHED),
+            StoryGenerationTask.created_at < cutoff,
+            limit=batch_size,
+        )
+        db.commit()
+        archived += count
+        if count < batch_size:
+            return archived
+
+
+def _purge_stories(db: Session, criteria: Sequence[Any], batch_size: int) -> int:
+    """Delete matching stories batch by batch, tombstoning their image folders."""
+
+    purged = 0
+    while True:
+        rows = db.execute(
+            select(Story.id, Story.owner_id).where(*criteria)
+            .order_by(Story.id).limit(batch_size)
+        ).all()
+        if not rows:
+            return purged
+
+        story_ids = [row.id for row in rows]
+        _archive_tasks(db, StoryGenerationTask.story_id.in_(story_ids))
+        db.execute(delete(Page).where(Page.story_id.in_(story_ids)),
+                   execution_options=_BULK)
+        db.execute(delete(Story).where(Story.id.in_(story_ids)),
+                   execution_options=_BULK)
+        for story_id, owner_id in rows:
+            if owner_id is not None:
+                asset_reaper.add_tombstone(
+                    db, storage_paths.story_images_rel(owner_id, story_id),
+                    reason="retention", story_id=story_id)
+        db.commit()
+        purged += len(rows)
+        if len(rows) < batch_size:
+            return purged
+
+
+def purge_deleted_stories(
+    db: Session,
+    grace_days: int,
+    batch_size: int,
+    now: Optional[datetime] = None,
+) -> int:
+    """Hard-delete stories soft-deleted more than `grace_days` ago. Returns the count."""
+
+    cutoff = _cutoff(now, grace_days)
+    return _purge_stories(
+        db, [Story.is_deleted == True, Story.deleted_at <= cutoff], batch_size)
+
+
+def purge_deleted_users(
+    db: Session,
+    grace_days: int,
+    batch_size: int,
+    now: Optional[datetime] = None,
+) -> Dict[str, int]:
+    """Hard-delete users soft-deleted more than `grace_days` ago, with all their content.
+
+    Each user's stories go in batches; the rest of the user's rows are
+    removed in one transaction per user.
+    """
+
+    cutoff = _cutoff(now, grace_days)
+    counts = {"users_purged": 0, "stories_purged": 0}
+    while True:
+        user_ids = db.scalars(
+            select(User.id)
+            .where(User.is_deleted == True, User.deleted_at <= cutoff)
+            .order_by(User.id).limit(batch_size)
+        ).all()
+        for user_id in user_ids:
+            counts["stories_purged"] += _purge_stories(
+                db, [Story.owner_id == user_id], batch_size)
+
+            _archive_tasks(db, StoryGenerationTask.user_id == user_id)
+            character_ids = select(Character.id).where(
+                Character.user_id == user_id).scalar_subquery()
+            # Break the characters <-> character_images cycle first.
+            db.execute(update(Character).where(Character.user_id == user_id)
+                       .values(current_image_id=None), execution_options=_BULK)
+            db.execute(delete(CharacterImage)
+                       .where(CharacterImage.character_id.in_(character_ids)),
+                       execution_options=_BULK)
+            db.execute(delete(Character).where(Character.user_id == user_id),
+                       execution_options=_BULK)
+            db.execute(delete(CharacterBackfillState)
+                       .where(CharacterBackfillState.user_id == user_id),
+                       execution_options=_BULK)
+            db.execute(delete(User).where(User.id == user_id),
+                       execution_options=_BULK)
+            asset_reaper.add_tombstone(
+                db, storage_paths.images_base_rel(user_id), reason="retention",
+                user_id=user_id)
+            asset_reaper.add_tombstone(
+                db, storage_paths.user_uploads_rel(user_id),
+                store=asset_reaper.PRIVATE_STORE, reason="retention",
+                user_id=user_id)
+            db.commit()
+
+            auth_cache.invalidate_user(user_id)
+            counts["users_purged"] += 1
+        if len(user_ids) < batch_size:
+            return counts
+
+
+def run_retention(db: Session, now: Optional[datetime] = None) -> Dict[str, int]:
+    """Apply every configured retention policy and return what was removed."""
+
+    settings = get_settings()
+    batch_size = max(1, settings.retention_batch_size)
+    counts = {"users_purged": 0, "stories_purged": 0, "tasks_archived": 0}
+
+    grace_days = settings.deleted_content_retention_days
+    if grace_days > 0:
+        counts.update(purge_deleted_users(db, grace_days, batch_size, now=now))
+        counts["stories_purged"] += purge_deleted_stories(
+            db, grace_days, batch_size, now=now)
+
+    if settings.task_retention_days > 0:
+        counts["tasks_archived"] = archive_generation_tasks(
+            db, settings.task_retention_days, batch_size, now=now)
+
+    asset_reaper.reap_tombstones(db)
+    if settings.asset_gc_mode in ("report", "delete"):
+        asset_gc.collect_orphans(db, dry_run=settings.asset_gc_mode != "delete")
+
+    # Purged assets may have been the last references to deduplicated blobs.
+    blobs_removed = sum(store.collect_garbage() for store in (
+        storage.get_storage(), storage.get_private_storage()))
+    if blobs_removed:
+        app_logger.info("Retention removed %d unreferenced blobs", blobs_removed)
+
+    app_logger.info("Retention run finished: %s", counts)
+    return counts
@@ -2,7 +2,9 @@ from pydantic import BaseModel, ConfigDict  # Added ConfigDict
 from typing import Any, Dict, List, Optional
 from enum import Enum  # Added for StoryGenre
 from datetime import datetime  # Ensure datetime is imported
-from pydantic import Field
+from pydantic import Field, computed_field
+
+from . import signed_urls
 
 
 class UserRole(str, Enum):  # Added UserRole Enum
@@ -149,6 +151,12 @@ class Page(PageBase):
 
     model_config = ConfigDict(from_attributes=True)  # Replaced class Config
 
+    @computed_field
+    @property
+    def image_url(self) -> Optional[str]:
+        """Signed, expiring URL for a private page image (no auth header needed)."""
+        return signed_urls.page_image_url(self.image_path)
+
 # Story Schemas
 
 
@@ -196,11 +204,43 @@ class StoryListItem(StoryBase):
     model_config = ConfigDict(from_attributes=True)
 
 
+class StoryLibraryItem(BaseModel):
+    """Lightweight row for the user's story library (no pages, outline or JSON)."""
+
+    id: int
+    owner_id: int
+    title: str
+    genre: str
+    num_pages: int
+    image_style: Optional[str] = None
+    is_draft: bool = True
+    created_at: datetime
+    updated_at: datetime
+    generated_at: Optional[datetime] = None
+    # Denormalized from the story's pages
+    cover_image_path: Optional[str] = None
+    page_count: int = 0
+    # First characters of the outline, with "..." appended when truncated
+    outline_snippet: Optional[str] = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class StorySearchItem(StoryLibraryItem):
+    """Story library row returned by full-text search."""
+
+    # Relevance; lower is a better match
+    rank: float
+
+
 class PaginatedStories(BaseModel):
     items: List[StoryListItem]
-    total: int
+    # None on cursor pages unless include_total is requested (it costs a count)
+    total: Optional[int] = None
     page: int = Field(1, ge=1)
     page_size: int = Field(20, ge=1, le=100)
+    # Opaque keyset cursor for the next page; None on the last page
+    next_cursor: Optional[str] = None
 
 
 class Story(StoryBase):  # This schema is for representing a story, including AI generated title
@@ -311,6 +351,13 @@ class DynamicListItemPublic(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
+class DynamicListsBootstrap(BaseModel):
+    """Every dynamic list's active public items, keyed by list name."""
+
+    version: str  # Content hash; changes whenever any list changes
+    lists: Dict[str, List[DynamicListItemPublic]]
+
+
 class DynamicListBase(BaseModel):
     list_name: str
     list_label: Optional[str] = None  # User-friendly label
@@ -340,6 +387,13 @@ class DynamicListItemUsage(BaseModel):
     is_in_use: bool
     details: List[str] = []
 
+
+class DynamicListItemUsageSummary(DynamicListItemUsage):
+    """Usage of one item, as returned for a whole list at once."""
+    item_id: int
+    item_value: str
+    usage_count: int = 0
+
 # Story Generation Task Schemas (New for State Management)
 
 
@@ -456,11 +510,19 @@ class CharacterListItem(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
+class CharacterSearchItem(CharacterListItem):
+    # Relevance; lower is a better match
+    rank: float
+
+
 class PaginatedCharacters(BaseModel):
     items: List[CharacterListItem]
-    total: int
+    # None on cursor pages unless include_total is requested (it costs a count)
+    total: Optional[int] = None
     page: int = Field(1, ge=1)
     page_size: int = Field(20, ge=1, le=100)
+    # Opaque keyset cursor for the next page; None on the last page
+    next_cursor: Optional[str] = None
 
 
 class CharacterThumbnailBackfillResponse(BaseModel):
@@ -513,6 +575,26 @@ class AdminStats(BaseModel):
     avg_attempts_last_24h: Optional[float] = None
 
 
+class AdminTaskStatsBucket(BaseModel):
+    bucket_start: datetime  # Start of the UTC hour
+    completed: int
+    failed: int
+
+
+class AdminTaskStatsHistory(BaseModel):
+    """Finished-task stats over a historical window, served from hourly rollups."""
+
+    hours: int
+    since: datetime
+    tasks_completed: int
+    tasks_failed: int
+    success_rate: Optional[float] = None  # 0-1 ratio
+    avg_task_duration_seconds: Optional[float] = None
+    avg_attempts: Optional[float] = None
+    # Only hours with at least one finished task are listed
+    buckets: List[AdminTaskStatsBucket] = []
+
+
 # --- Admin Moderation Requests ---
 class HideStoryRequest(BaseModel):
     is_hidden: bool
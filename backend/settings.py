@@ -50,6 +50,70 @@ class BaseSettings:
             os.getenv("PRIVATE_DATA_DIR", "private_data")
         )
 
+        # Asset storage backend (backend/storage.py): "local" keeps assets
+        # under DATA_DIR / PRIVATE_DATA_DIR; "s3" stores them in an
+        # S3-compatible bucket (requires boto3). Public and private assets use
+        # separate, non-overlapping key prefixes. Credentials come from the
+        # standard AWS environment/config chain.
+        self.storage_backend: str = os.getenv(
+            "STORAGE_BACKEND", "local").strip().lower()
+        self.s3_bucket: str = os.getenv("S3_BUCKET", "")
+        self.s3_prefix: str = os.getenv("S3_PREFIX", "data/")
+        self.s3_private_prefix: str = os.getenv("S3_PRIVATE_PREFIX", "private/")
+        self.s3_endpoint_url: str | None = os.getenv("S3_ENDPOINT_URL") or None
+        self.s3_region: str | None = os.getenv("S3_REGION") or None
+        # Lifetime of presigned download URLs.
+        self.s3_presign_expires_seconds: int = int(
+            os.getenv("S3_PRESIGN_EXPIRES_SECONDS", "900"))
+        # Local backend: keep one content-addressed copy of each distinct
+        # file under DATA_DIR/.blobs and hardlink asset paths to it.
+        self.storage_dedup: bool = os.getenv(
+            "STORAGE_DEDUP", "1").lower() in ("1", "true", "yes")
+
+        # Signed private image URLs (backend/signed_urls.py). The signing key
+        # defaults to SECRET_KEY.
+        self.signed_url_secret: str = (
+            os.getenv("SIGNED_URL_SECRET")
+            or os.getenv("SECRET_KEY", "your-default-secret-key")
+        )
+        self.signed_url_ttl_seconds: int = int(
+            os.getenv("SIGNED_URL_TTL_SECONDS", "3600"))
+        # When set (e.g. "/_protected_data/"), verified requests are handed to
+        # the reverse proxy with X-Accel-Redirect instead of being served here.
+        self.signed_url_accel_prefix: str = os.getenv("SIGNED_URL_ACCEL_PREFIX", "")
+
+        # Image variants (backend/image_variants.py) written beside each
+        # generated image, served for requests with ?w=.
+        self.image_variant_widths: List[int] = [
+            int(width) for width in os.getenv(
+                "IMAGE_VARIANT_WIDTHS", "256,768").split(",") if width.strip()
+        ]
+        self.image_variant_formats: List[str] = [
+            fmt.strip().lower() for fmt in os.getenv(
+                "IMAGE_VARIANT_FORMATS", "avif,webp").split(",") if fmt.strip()
+        ]
+
+        # On-demand thumbnails (backend/thumbnails.py). The cache lives in
+        # private storage so it is never served directly.
+        self.thumbnail_cache_dir: str = _resolve_dir(os.getenv(
+            "THUMBNAIL_CACHE_DIR",
+            os.path.join(self.private_data_dir, ".thumbnail_cache")))
+        self.thumbnail_cache_max_bytes: int = int(
+            os.getenv("THUMBNAIL_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+        self.thumbnail_workers: int = int(os.getenv("THUMBNAIL_WORKERS", "2"))
+
+        # Background deletion of asset folders (backend/asset_reaper.py).
+        # The in-app loop is off in tests; 0 disables it (use the script).
+        self.asset_reaper_interval_seconds: int = int(os.getenv(
+            "ASSET_REAPER_INTERVAL_SECONDS",
+            "0" if self.run_env == "test" else "60"))
+        self.asset_reaper_batch_size: int = int(
+            os.getenv("ASSET_REAPER_BATCH_SIZE", "100"))
+        # Failed deletions are retried after base * 2^(attempts - 1) seconds,
+        # capped at one hour.
+        self.asset_reaper_retry_base_seconds: int = int(
+            os.getenv("ASSET_REAPER_RETRY_BASE_SECONDS", "30"))
+
         # Upload limits
         self.max_upload_bytes: int = int(
             os.getenv("MAX_UPLOAD_BYTES", str(10 * 1024 * 1024)))
@@ -113,6 +177,72 @@ class BaseSettings:
             "10/minute",
         )
 
+        # bcrypt cost for new password hashes; existing hashes with another
+        # cost are rehashed on the user's next successful login.
+        self.bcrypt_rounds: int = int(os.getenv("BCRYPT_ROUNDS", "12"))
+        # Threads hashing/verifying passwords off the event loop, and how many
+        # further calls may wait for one before logins get 503.
+        self.password_hash_workers: int = int(
+            os.getenv("PASSWORD_HASH_WORKERS", "2"))
+        self.password_hash_max_queue: int = int(
+            os.getenv("PASSWORD_HASH_MAX_QUEUE", "64"))
+
+        # Per-process caches of authenticated users (seconds / entries).
+        # Admin changes evict immediately in the worker that made them; other
+        # workers see them within the TTL. A TTL of 0 disables the cache.
+        self.auth_user_cache_ttl: float = float(
+            os.getenv("AUTH_USER_CACHE_TTL_SECONDS", "30"))
+        self.auth_user_cache_size: int = int(
+            os.getenv("AUTH_USER_CACHE_SIZE", "1024"))
+        # Verified tokens, each kept until its own expiry.
+        self.auth_token_cache_size: int = int(
+            os.getenv("AUTH_TOKEN_CACHE_SIZE", "4096"))
+
+        # Admin dashboard response caching (seconds). Entries older than the
+        # TTL are still served for the stale window while refreshing in the
+        # background; 0 disables caching for that endpoint.
+        self.admin_stats_cache_ttl: float = float(
+            os.getenv("ADMIN_STATS_CACHE_TTL_SECONDS", "15"))
+        self.monitoring_stats_cache_ttl: float = float(
+            os.getenv("MONITORING_STATS_CACHE_TTL_SECONDS", "5"))
+        self.admin_cache_stale_seconds: float = float(
+            os.getenv("ADMIN_CACHE_STALE_SECONDS", "30"))
+
+        # How often (seconds) a worker re-checks the shared dynamic list
+        # version counter; writes in the same process invalidate immediately.
+        # 0 checks on every lookup.
+        self.dynamic_list_cache_check_seconds: float = float(
+            os.getenv("DYNAMIC_LIST_CACHE_CHECK_SECONDS", "2"))
+
+        # Stories loaded per batch by the incremental character backfill;
+        # progress is committed after every batch.
+        self.character_backfill_batch_size: int = int(
+            os.getenv("CHARACTER_BACKFILL_BATCH_SIZE", "100"))
+
+        # Retention (backend/retention.py). Finished generation tasks older
+        # than this many days are moved to story_generation_task_archive;
+        # soft-deleted stories and users are purged, with their files, this
+        # many days after deletion. 0 disables the policy.
+        self.task_retention_days: int = int(
+            os.getenv("TASK_RETENTION_DAYS", "30"))
+        self.deleted_content_retention_days: int = int(
+            os.getenv("DELETED_CONTENT_RETENTION_DAYS", "30"))
+        # Rows per retention transaction; keeps each write lock short.
+        self.retention_batch_size: int = int(
+            os.getenv("RETENTION_BATCH_SIZE", "500"))
+
+        # Orphaned image files (backend/asset_gc.py). Retention runs the
+        # collector as "report" (log only), "delete" or "off". Files newer
+        # than the minimum age may belong to a generation in progress.
+        self.asset_gc_mode: str = os.getenv("ASSET_GC_MODE", "report").lower()
+        self.asset_gc_min_age_hours: int = int(
+            os.getenv("ASSET_GC_MIN_AGE_HOURS", "24"))
+        self.asset_gc_batch_size: int = int(
+            os.getenv("ASSET_GC_BATCH_SIZE", "500"))
+        # 0 deletes without pausing.
+        self.asset_gc_max_deletes_per_second: float = float(
+            os.getenv("ASSET_GC_MAX_DELETES_PER_SECOND", "20"))
+
 
 _settings_instance: BaseSettings | None = None
 
@@ -0,0 +1,86 @@
+"""HMAC-signed, expiring URLs for private story images.
+
+Story responses embed a signed `/signed_content/<path>?expires=..&signature=..`
+URL for every private page image (`schemas.Page.image_url`). The URL itself is
+the credential: `/signed_content` checks the signature and expiry without
+touching the database or the auth token, so a reader opening a 20-page story
+no longer pays an auth lookup and a story query per image.
+
+Expiry times are rounded up to the next `SIGNED_URL_TTL_SECONDS` boundary
+(plus one period), so a URL stays valid for between one and two periods and
+is identical across requests within a period. Browsers can cache it.
+
+With `SIGNED_URL_ACCEL_PREFIX` set, the app only verifies the signature and
+hands the file to the reverse proxy via `X-Accel-Redirect`.
+"""
+
+from __future__ import annotations
+
+import base64
+import hashlib
+import hmac
+import time
+from typing import Optional
+from urllib.parse import quote, urlencode
+
+from .settings import get_settings
+from .storage_paths import is_private_story_asset_path, normalize_data_relative_path
+
+SIGNED_CONTENT_PREFIX = "/signed_content"
+
+
+def _key() -> bytes:
+    # Derived from, not equal to, the secret, so URL signatures can never be
+    # replayed as tokens elsewhere.
+    secret = get_settings().signed_url_secret.encode("utf-8")
+    return hmac.new(secret, b"signed-asset-url", hashlib.sha256).digest()
+
+
+def _signature(path: str, expires: int) -> str:
+    digest = hmac.new(_key(), f"{path}\n{expires}".encode("utf-8"), hashlib.sha256).digest()
+    return base64.urlsafe_b64encode(digest).rstrip(b"=").decode("ascii")
+
+
+def _normalize(path: str) -> str:
+    return normalize_data_relative_path(path).replace("\\", "/")
+
+
+def expiry_for(now: Optional[float] = None) -> int:
+    """Return the expiry timestamp for URLs signed at `now`."""
+
+    ttl = max(1, get_settings().signed_url_ttl_seconds)
+    now = time.time() if now is None else now
+    return (int(now) // ttl + 2) * ttl
+
+
+def sign_path(path: str, now: Optional[float] = None) -> str:
+    """Return a signed URL (relative to the API root) for a data-relative path."""
+
+    normalized = _normalize(path)
+    expires = expiry_for(now)
+    query = urlencode({"expires": expires, "signature": _signature(normalized, expires)})
+    return f"{SIGNED_CONTENT_PREFIX}/{quote(normalized)}?{query}"
+
+
+def verify(path: str, expires: int, signature: str, now: Optional[float] = None) -> bool:
+    """Return whether `signature` is valid for `path` and has not expired."""
+
+    now = time.time() if now is None else now
+    if expires < now:
+        return False
+    try:
+        normalized = _normalize(path)
+    except ValueError:
+        return False
+    return hmac.compare_digest(_signature(normalized, expires), signature or "")
+
+
+def page_image_url(image_path: Optional[str], now: Optional[float] = None) -> Optional[str]:
+    """Return a signed URL for a private page image, or None for other paths."""
+
+    try:
+        if not image_path or not is_private_story_asset_path(image_path):
+            return None
+    except ValueError:
+        return None
+    return sign_path(image_path, now=now)
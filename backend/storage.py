@@ -0,0 +1,521 @@
+"""Asset storage backends for generated images, prompts and uploads.
+
+Assets are addressed by keys relative to the storage root, the same
+data-relative paths stored in the database (e.g.
+``images/user_1/story_2/page_1_ab12cd34_story_2_p1.png``). Two stores exist:
+
+- `get_storage()`: public assets (DATA_DIR), served under /static_content
+  except private story folders;
+- `get_private_storage()`: private uploads (PRIVATE_DATA_DIR), never served.
+
+`STORAGE_BACKEND=local` (default) keeps them on local disk, deduplicated by
+content (`STORAGE_DEDUP`, see `LocalStorage`); `s3` puts them in an
+S3-compatible bucket under `S3_PREFIX` / `S3_PRIVATE_PREFIX`, so several app
+nodes can share assets without a shared filesystem.
+
+Keys are normalized with `storage_paths.normalize_data_relative_path`; keys
+that escape the root raise ValueError. Reading a missing key raises
+FileNotFoundError.
+"""
+
+from __future__ import annotations
+
+import abc
+import functools
+import hashlib
+import mimetypes
+import os
+import shutil
+import tempfile
+import uuid
+from contextlib import contextmanager
+from typing import BinaryIO, Dict, Iterator, Optional, Tuple, Union
+
+from .settings import get_settings
+from .storage_paths import BLOBS_DIRNAME, normalize_data_relative_path
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+Data = Union[bytes, BinaryIO]
+
+
+def guess_content_type(key: str) -> str:
+    return mimetypes.guess_type(key)[0] or "application/octet-stream"
+
+
+def normalize_key(key: str) -> str:
+    """Return `key` as a normalized, forward-slash storage key."""
+    return normalize_data_relative_path(key).replace(os.sep, "/")
+
+
+class AssetStorage(abc.ABC):
+    """Key/value blob store for assets."""
+
+    @abc.abstractmethod
+    def put(self, key: str, data: Data, content_type: Optional[str] = None) -> None:
+        """Store `data` (bytes or a binary file object) under `key`, replacing it."""
+
+    @abc.abstractmethod
+    def get(self, key: str) -> bytes:
+        """Return the full contents of `key`."""
+
+    @abc.abstractmethod
+    def stream(self, key: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[bytes]:
+        """Yield the contents of `key` in chunks (FileNotFoundError up front)."""
+
+    @abc.abstractmethod
+    def exists(self, key: str) -> bool:
+        ...
+
+    @abc.abstractmethod
+    def delete(self, key: str) -> None:
+        """Delete `key`; deleting a missing key is not an error."""
+
+    @abc.abstractmethod
+    def delete_prefix(self, prefix: str) -> None:
+        """Delete every key under the folder `prefix`."""
+
+    @abc.abstractmethod
+    def copy(self, source_key: str, dest_key: str) -> None:
+        ...
+
+    @abc.abstractmethod
+    def list_keys(self, prefix: str, include_partial: bool = False) -> Iterator[str]:
+        """Yield every key under the folder `prefix`, in string order.
+
+        `include_partial` also yields the temporary files of unfinished (or
+        crashed) writes, where the backend has any.
+        """
+
+    @abc.abstractmethod
+    def stat(self, key: str) -> Tuple[int, float]:
+        """Return `key`'s size in bytes and a Unix time no earlier than its last write."""
+
+    @abc.abstractmethod
+    def fingerprint(self, key: str) -> str:
+        """Return a cheap token that changes whenever `key` is rewritten."""
+
+    @abc.abstractmethod
+    def presign(self, key: str, expires_in: Optional[int] = None) -> Optional[str]:
+        """Return a time-limited direct download URL, or None if unsupported."""
+
+    def local_path(self, key: str) -> Optional[str]:
+        """Return the file backing `key` when stored on local disk, else None."""
+        return None
+
+    def collect_garbage(self) -> int:
+        """Remove stored data no asset references any more; return the count."""
+        return 0
+
+    @contextmanager
+    def local_copy(self, key: str) -> Iterator[str]:
+        """Yield a local file path holding `key`'s contents.
+
+        For libraries that need a real file; remote objects are downloaded to
+        a temporary file that is removed on exit.
+        """
+        suffix = os.path.splitext(key)[1]
+        fd, path = tempfile.mkstemp(suffix=suffix)
+        try:
+            with os.fdopen(fd, "wb") as fh:
+                for chunk in self.stream(key):
+                    fh.write(chunk)
+            yield path
+        finally:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+class LocalStorage(AssetStorage):
+    """Assets as files under a root directory.
+
+    With `dedup`, every stored file is content-addressed: its bytes live once
+    in `<root>/.blobs/<sha256[:2]>/<sha256>` and each asset path is a hardlink
+    to that blob. Identical images (regenerations, reused characters, copied
+    thumbnails) then take the space of one, and `copy` links instead of
+    copying bytes. The filesystem link count is the reference count: deleting
+    an asset path only drops one reference, and blobs left with no asset
+    linking to them are removed by `collect_garbage`.
+
+    Linked files share an inode, so assets must only be written through `put`
+    (which replaces the path), never modified in place. Where hardlinks are
+    unavailable the store falls back to plain files.
+    """
+
+    def __init__(self, root: str, dedup: bool = False):
+        self.root = os.path.realpath(root)
+        self.dedup = dedup
+        self.blobs_dir = os.path.join(self.root, BLOBS_DIRNAME)
+
+    def _path(self, key: str) -> str:
+        path = os.path.realpath(os.path.join(self.root, normalize_data_relative_path(key)))
+        if path != self.root and not path.startswith(self.root + os.sep):
+            raise ValueError("Storage key escapes the storage root")
+        return path
+
+    def _blob_path(self, digest: str) -> str:
+        return os.path.join(self.blobs_dir, digest[:2], digest)
+
+    def _write_temp(self, directory: str, data: Data) -> Tuple[str, str]:
+        """Write `data` to a new temporary file in `directory`; return (path, sha256)."""
+        os.makedirs(directory, exist_ok=True)
+        tmp_path = os.path.join(directory, f".{uuid.uuid4().hex}.tmp")
+        digest = hashlib.sha256()
+        try:
+            with open(tmp_path, "wb") as fh:
+                if isinstance(data, (bytes, bytearray, memoryview)):
+                    digest.update(data)
+                    fh.write(data)
+                else:
+                    for chunk in iter(lambda: data.read(DEFAULT_CHUNK_SIZE), b""):
+                        digest.update(chunk)
+                        fh.write(chunk)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        return tmp_path, digest.hexdigest()
+
+    def _link(self, source: str, path: str) -> None:
+        """Atomically make `path` a hardlink to `source`."""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        link_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        os.link(source, link_path)
+        try:
+            os.replace(link_path, path)
+        except BaseException:
+            os.remove(link_path)
+            raise
+
+    def put(self, key: str, data: Data, content_type: Optional[str] = None) -> None:
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write to a temporary file and rename, so readers never see a partial file.
+        tmp_path, digest = self._write_temp(
+            self.blobs_dir if self.dedup else os.path.dirname(path), data)
+        try:
+            if self.dedup:
+                blob = self._blob_path(digest)
+                try:
+                    if not os.path.isfile(blob):
+                        os.makedirs(os.path.dirname(blob), exist_ok=True)
+                        os.link(tmp_path, blob)
+                    self._link(blob, path)
+                    return
+                except OSError:
+                    # No hardlink support, link limit reached or the blob was
+                    # collected meanwhile: keep a plain file instead.
+                    pass
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def get(self, key: str) -> bytes:
+        with open(self._path(key), "rb") as fh:
+            return fh.read()
+
+    def stream(self, key: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[bytes]:
+        fh = open(self._path(key), "rb")
+
+        def _chunks() -> Iterator[bytes]:
+            with fh:
+                while True:
+                    chunk = fh.read(chunk_size)
+                    if not chunk:
+                        return
+                    yield chunk
+
+        return _chunks()
+
+    def exists(self, key: str) -> bool:
+        return os.path.isfile(self._path(key))
+
+    def delete(self, key: str) -> None:
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def delete_prefix(self, prefix: str) -> None:
+        path = self._path(prefix)
+        if path == self.root or path == self.blobs_dir:
+            raise ValueError("Refusing to delete the storage root")
+        if os.path.isdir(path):
+            shutil.rmtree(path)
+
+    def copy(self, source_key: str, dest_key: str) -> None:
+        source = self._path(source_key)
+        dest = self._path(dest_key)
+        if self.dedup:
+            try:
+                # Another reference to the same bytes; nothing is copied.
+                self._link(source, dest)
+                return
+            except FileNotFoundError:
+                raise
+            except OSError:
+                pass  # no hardlink support here; fall back to copying
+        os.makedirs(os.path.dirname(dest), exist_ok=True)
+        shutil.copy2(source, dest)
+
+    def fingerprint(self, key: str) -> str:
+        info = os.stat(self._path(key))
+        return f"{info.st_ino}-{info.st_mtime_ns}-{info.st_size}"
+
+    def stat(self, key: str) -> Tuple[int, float]:
+        info = os.stat(self._path(key))
+        if info.st_nlink > 1:
+            # A linked asset shares its blob's inode, whose mtime is when the
+            # bytes were first stored. Linking updates the inode's ctime, so
+            # the later of the two is no earlier than this path's last write.
+            return info.st_size, max(info.st_mtime, info.st_ctime)
+        return info.st_size, info.st_mtime
+
+    def _walk_sorted(self, directory: str) -> Iterator[os.DirEntry]:
+        try:
+            entries = list(os.scandir(directory))
+        except (FileNotFoundError, NotADirectoryError):
+            return
+        # Every key in a folder starts with "<name>/", so sorting folders by
+        # that yields keys in plain string order, like an S3 listing.
+        entries.sort(key=lambda entry: entry.name + "/"
+                     if entry.is_dir(follow_symlinks=False) else entry.name)
+        for entry in entries:
+            if not entry.is_dir(follow_symlinks=False):
+                yield entry
+            elif entry.path != self.blobs_dir:
+                yield from self._walk_sorted(entry.path)
+
+    def list_keys(self, prefix: str, include_partial: bool = False) -> Iterator[str]:
+        for entry in self._walk_sorted(self._path(prefix)):
+            if entry.name.endswith(".tmp") and not include_partial:
+                continue  # an in-progress put
+            yield os.path.relpath(entry.path, self.root).replace(os.sep, "/")
+
+    def presign(self, key: str, expires_in: Optional[int] = None) -> Optional[str]:
+        return None
+
+    def local_path(self, key: str) -> Optional[str]:
+        return self._path(key)
+
+    @contextmanager
+    def local_copy(self, key: str) -> Iterator[str]:
+        path = self._path(key)
+        if not os.path.isfile(path):
+            raise FileNotFoundError(path)
+        yield path
+
+    def deduplicate(self, prefix: str) -> Dict[str, int]:
+        """Move existing plain files under `prefix` into the blob store.
+
+        For trees written before dedup was enabled. Returns the number of
+        files scanned and linked and the bytes reclaimed.
+        """
+        counts = {"files": 0, "linked": 0, "bytes_saved": 0}
+        top = self._path(prefix)
+        for dirpath, _dirnames, filenames in os.walk(top):
+            for name in filenames:
+                path = os.path.join(dirpath, name)
+                if name.endswith(".tmp") or os.path.islink(path):
+                    continue
+                counts["files"] += 1
+                info = os.stat(path)
+                if info.st_nlink > 1:
+                    continue  # already linked to a blob
+                with open(path, "rb") as fh:
+                    tmp_path, digest = self._write_temp(self.blobs_dir, fh)
+                try:
+                    blob = self._blob_path(digest)
+                    if os.path.isfile(blob):
+                        counts["bytes_saved"] += info.st_size
+                    else:
+                        os.makedirs(os.path.dirname(blob), exist_ok=True)
+                        os.link(tmp_path, blob)
+                    self._link(blob, path)
+                    counts["linked"] += 1
+                finally:
+                    os.remove(tmp_path)
+        return counts
+
+    def collect_garbage(self) -> int:
+        if not os.path.isdir(self.blobs_dir):
+            return 0
+        removed = 0
+        for dirpath, _dirnames, filenames in os.walk(self.blobs_dir):
+            for name in filenames:
+                path = os.path.join(dirpath, name)
+                try:
+                    if name.endswith(".tmp"):
+                        continue  # an in-progress put
+                    if os.stat(path).st_nlink == 1:
+                        os.remove(path)
+                        removed += 1
+                except FileNotFoundError:
+                    continue
+        return removed
+
+
+class S3Storage(AssetStorage):
+    """Assets as objects in an S3-compatible bucket under a key prefix."""
+
+    def __init__(self, client, bucket: str, prefix: str = "", presign_expires: int = 900):
+        self.client = client
+        self.bucket = bucket
+        self.prefix = prefix
+        self.presign_expires = presign_expires
+
+    def _key(self, key: str) -> str:
+        return self.prefix + normalize_key(key)
+
+    def _is_missing(self, exc: Exception) -> bool:
+        error = getattr(exc, "response", {}).get("Error", {})
+        return error.get("Code") in ("404", "NoSuchKey", "NotFound")
+
+    def put(self, key: str, data: Data, content_type: Optional[str] = None) -> None:
+        extra = {"ContentType": content_type or guess_content_type(key)}
+        if isinstance(data, (bytes, bytearray, memoryview)):
+            self.client.put_object(
+                Bucket=self.bucket, Key=self._key(key), Body=bytes(data), **extra)
+        else:
+            self.client.upload_fileobj(
+                data, self.bucket, self._key(key), ExtraArgs=extra)
+
+    def _get_object(self, key: str):
+        try:
+            return self.client.get_object(Bucket=self.bucket, Key=self._key(key))
+        except self.client.exceptions.ClientError as exc:
+            if self._is_missing(exc):
+                raise FileNotFoundError(key) from exc
+            raise
+
+    def get(self, key: str) -> bytes:
+        return self._get_object(key)["Body"].read()
+
+    def stream(self, key: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[bytes]:
+        body = self._get_object(key)["Body"]
+
+        def _chunks() -> Iterator[bytes]:
+            try:
+                yield from body.iter_chunks(chunk_size)
+            finally:
+                body.close()
+
+        return _chunks()
+
+    def exists(self, key: str) -> bool:
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=self._key(key))
+        except self.client.exceptions.ClientError as exc:
+            if self._is_missing(exc):
+                return False
+            raise
+        return True
+
+    def delete(self, key: str) -> None:
+        self.client.delete_object(Bucket=self.bucket, Key=self._key(key))
+
+    def delete_prefix(self, prefix: str) -> None:
+        folder = self._key(prefix).rstrip("/") + "/"
+        paginator = self.client.get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=folder):
+            objects = [{"Key": item["Key"]} for item in page.get("Contents", [])]
+            if objects:
+                # A listing page holds at most 1000 keys, the delete limit.
+                self.client.delete_objects(
+                    Bucket=self.bucket, Delete={"Objects": objects, "Quiet": True})
+
+    def copy(self, source_key: str, dest_key: str) -> None:
+        try:
+            self.client.copy_object(
+                Bucket=self.bucket,
+                Key=self._key(dest_key),
+                CopySource={"Bucket": self.bucket, "Key": self._key(source_key)},
+            )
+        except self.client.exceptions.ClientError as exc:
+            if self._is_missing(exc):
+                raise FileNotFoundError(source_key) from exc
+            raise
+
+    def fingerprint(self, key: str) -> str:
+        try:
+            head = self.client.head_object(Bucket=self.bucket, Key=self._key(key))
+        except self.client.exceptions.ClientError as exc:
+            if self._is_missing(exc):
+                raise FileNotFoundError(key) from exc
+            raise
+        return head["ETag"].strip('"')
+
+    def stat(self, key: str) -> Tuple[int, float]:
+        try:
+            head = self.client.head_object(Bucket=self.bucket, Key=self._key(key))
+        except self.client.exceptions.ClientError as exc:
+            if self._is_missing(exc):
+                raise FileNotFoundError(key) from exc
+            raise
+        return head["ContentLength"], head["LastModified"].timestamp()
+
+    def list_keys(self, prefix: str, include_partial: bool = False) -> Iterator[str]:
+        # Uploads are atomic, so there are no partial objects to list.
+        folder = self._key(prefix).rstrip("/") + "/"
+        paginator = self.client.get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=folder):
+            for item in page.get("Contents", []):
+                yield item["Key"][len(self.prefix):]
+
+    def presign(self, key: str, expires_in: Optional[int] = None) -> Optional[str]:
+        return self.client.generate_presigned_url(
+            "get_object",
+            Params={"Bucket": self.bucket, "Key": self._key(key)},
+            ExpiresIn=expires_in or self.presign_expires,
+        )
+
+
+@functools.lru_cache(maxsize=None)
+def _s3_client(endpoint_url: Optional[str], region: Optional[str]):
+    try:
+        import boto3
+    except ImportError as exc:  # pragma: no cover - depends on deployment
+        raise RuntimeError(
+            "STORAGE_BACKEND=s3 requires the boto3 package") from exc
+    return boto3.client("s3", endpoint_url=endpoint_url, region_name=region)
+
+
+def _normalize_prefix(prefix: str) -> str:
+    prefix = (prefix or "").strip("/")
+    return f"{prefix}/" if prefix else ""
+
+
+def _build(private: bool) -> AssetStorage:
+    settings = get_settings()
+    if settings.storage_backend == "local":
+        return LocalStorage(settings.private_data_dir if private else settings.data_dir,
+                            dedup=settings.storage_dedup)
+    if settings.storage_backend != "s3":
+        raise ValueError(f"Unknown STORAGE_BACKEND {settings.storage_backend!r}")
+    if not settings.s3_bucket:
+        raise ValueError("STORAGE_BACKEND=s3 requires S3_BUCKET")
+
+    public_prefix = _normalize_prefix(settings.s3_prefix)
+    private_prefix = _normalize_prefix(settings.s3_private_prefix)
+    if public_prefix.startswith(private_prefix) or private_prefix.startswith(public_prefix):
+        # Otherwise private uploads would be reachable through public keys.
+        raise ValueError("S3_PREFIX and S3_PRIVATE_PREFIX must not overlap")
+    return S3Storage(
+        _s3_client(settings.s3_endpoint_url, settings.s3_region),
+        settings.s3_bucket,
+        prefix=private_prefix if private else public_prefix,
+        presign_expires=settings.s3_presign_expires_seconds,
+    )
+
+
+def get_storage() -> AssetStorage:
+    """Return the store for public assets (generated images and prompts)."""
+    return _build(private=False)
+
+
+def get_private_storage() -> AssetStorage:
+    """Return the store for private uploads."""
+    return _build(private=True)
@@ -7,6 +7,18 @@ from .settings import get_settings
 
 _PRIVATE_STORY_ASSET_RE = re.compile(r"^images/user_\d+/story_\d+(?:/|$)")
 
+# Generated asset names that are unique per write (a uuid4, or a page image's
+# random suffix), and their `.w<width>` image variants. They are never
+# overwritten in place.
+_FINGERPRINTED_NAME_RE = re.compile(
+    r"(?:^|/)(?:[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}"
+    r"|(?:cover|page_\d+)_[0-9a-f]{8}_story_\d+_p\d+)(?:\.w\d+)?\.[A-Za-z0-9]+$"
+)
+
+# Content-addressed blob store of the local storage backend (backend/storage.py).
+BLOBS_DIRNAME = ".blobs"
+_BLOBS_RE = re.compile(r"^\.blobs(?:/|$)")
+
 
 def _data_dir() -> str:
     return get_settings().data_dir
@@ -39,17 +51,44 @@ def resolve_data_path(path: str) -> str:
 
 
 def is_private_story_asset_path(path: str) -> bool:
-    """Return whether a data-relative path points into a story asset folder."""
+    """Return whether a data-relative path points into a story asset folder.
+
+    Blobs are addressed by content hash and may back private story assets,
+    so the blob store counts as private too.
+    """
 
     normalized = normalize_data_relative_path(path)
     unix_style = normalized.replace(os.sep, "/")
-    return bool(_PRIVATE_STORY_ASSET_RE.match(unix_style))
+    return bool(_PRIVATE_STORY_ASSET_RE.match(unix_style) or _BLOBS_RE.match(unix_style))
+
+
+def is_fingerprinted_path(path: str) -> bool:
+    """Return whether a data-relative path names a write-once generated asset.
+
+    Such files get a fresh name whenever their content changes, so their
+    contents at a given path never change and may be cached indefinitely.
+    """
+
+    return bool(_FINGERPRINTED_NAME_RE.search(path.replace(os.sep, "/")))
 
 
 def images_base_rel(user_id: int) -> str:
     return os.path.join("images", f"user_{user_id}")
 
 
+def user_images_abs(user_id: int) -> str:
+    return os.path.join(_data_dir(), images_base_rel(user_id))
+
+
+def user_uploads_rel(user_id: int) -> str:
+    """Return the private-storage folder holding a user's uploads."""
+    return os.path.join("uploads", f"user_{user_id}")
+
+
+def user_uploads_abs(user_id: int) -> str:
+    return os.path.join(_private_dir(), user_uploads_rel(user_id))
+
+
 def story_images_rel(user_id: int, story_id: int) -> str:
     return os.path.join(images_base_rel(user_id), f"story_{story_id}")
 
@@ -70,7 +109,6 @@ def character_ref_paths(user_id: int, story_id: int, character_name: str) -> Tup
     """
     base_rel = story_images_rel(user_id, story_id)
     ref_rel_dir = os.path.join(base_rel, "references")
-    os.makedirs(os.path.join(_data_dir(), ref_rel_dir), exist_ok=True)
     safe_name = sanitize_name(character_name) or f"char_{uuid.uuid4().hex[:8]}"
     filename = f"{safe_name}_ref_story_{story_id}.png"
     rel_path = os.path.join(ref_rel_dir, filename)
@@ -84,7 +122,6 @@ def page_image_paths(user_id: int, story_id: int, page_num_int: int) -> Tuple[st
     Uses 'cover' for page 0 else 'page_{n}' and appends a short uuid.
     """
     base_rel = story_images_rel(user_id, story_id)
-    os.makedirs(os.path.join(_data_dir(), base_rel), exist_ok=True)
     prefix = "cover" if page_num_int == 0 else f"page_{page_num_int}"
     suffix = uuid.uuid4().hex[:8]
     filename = f"{prefix}_{suffix}_story_{story_id}_p{page_num_int}.png"
@@ -93,18 +130,19 @@ def page_image_paths(user_id: int, story_id: int, page_num_int: int) -> Tuple[st
     return abs_path, rel_path
 
 
-def character_uploads_abs(user_id: int, char_id: int) -> str:
-    """Return absolute directory for a character's private uploads."""
-    rel_dir = os.path.join(
-        "uploads", f"user_{user_id}", "characters", str(char_id))
-    abs_dir = os.path.join(_private_dir(), rel_dir)
-    os.makedirs(abs_dir, exist_ok=True)
-    return abs_dir
+def character_images_rel(user_id: int, char_id: int) -> str:
+    """Return the public folder for a character's library images."""
+    return os.path.join(images_base_rel(user_id), "characters", str(char_id))
+
+
+def character_uploads_rel(user_id: int, char_id: int) -> str:
+    """Return the private-storage folder for a character's uploads."""
+    return os.path.join(user_uploads_rel(user_id), "characters", str(char_id))
 
 
-def character_uploaded_photo_candidates_abs(user_id: int, char_id: int) -> Tuple[str, ...]:
-    """Return absolute file path candidates for a character's uploaded photo."""
-    base = os.path.join(character_uploads_abs(user_id, char_id), "photo")
+def character_uploaded_photo_candidates_rel(user_id: int, char_id: int) -> Tuple[str, ...]:
+    """Return private-storage key candidates for a character's uploaded photo."""
+    base = os.path.join(character_uploads_rel(user_id, char_id), "photo")
     return (
         base + ".jpg",
         base + ".jpeg",
@@ -7,7 +7,7 @@ from sqlalchemy.orm import Session
 from tenacity import RetryError
 from . import crud, schemas, database, ai_services
 from .settings import get_settings
-from .storage_paths import character_ref_paths, page_image_paths, story_images_abs, story_images_rel
+from .storage_paths import character_ref_paths, page_image_paths, story_images_rel
 from .logging_config import app_logger, error_logger
 from .metrics import (
     PAGE_IMAGE_FAILURES_TOTAL,
@@ -92,9 +92,6 @@ async def generate_story_as_background_task(task_id: str, story_id: int, user_id
         crud.update_story_generation_task_progress(
             db, task_id, 10, schemas.GenerationTaskStep.GENERATING_CHARACTER_IMAGES)
 
-        # Ensure base story directory exists
-        os.makedirs(story_images_abs(user_id, story_id), exist_ok=True)
-
         character_details_map = {}
         for character_input in story_input.main_characters:
             existing_reference_path = getattr(
@@ -129,14 +126,8 @@ async def generate_story_as_background_task(task_id: str, story_id: int, user_id
 
         # Upsert generated/merged character details into user's library for reuse
         try:
-            upserted = 0
-            for _, ch in character_details_map.items():
-                try:
-                    crud.upsert_character_from_detail(db, user_id, ch)
-                    upserted += 1
-                except Exception as e:
-                    error_logger.error(
-                        f"Upsert of character '{ch.get('name')}' failed during background task {task_id}: {e}")
+            upserted = len(crud.upsert_characters_from_details(
+                db, user_id, list(character_details_map.values())))
             app_logger.info(
                 f"Upserted {upserted} character(s) into user {user_id}'s library during background generation.")
         except Exception as e:
@@ -280,25 +271,22 @@ async def generate_story_as_background_task(task_id: str, story_id: int, user_id
         try:
             chars = story_content.get('Main_characters') or story_content.get(
                 'main_characters') or []
-            upserted = 0
-            for ch in chars:
-                try:
-                    # Normalize keys to expected names
-                    char_detail = {
-                        'name': ch.get('name') or ch.get('Name'),
-                        'description': ch.get('description') or ch.get('Description'),
-                        'age': ch.get('age') or ch.get('Age'),
-                        'gender': ch.get('gender') or ch.get('Gender'),
-                        'clothing_style': ch.get('clothing_style') or ch.get('Clothing_style'),
-                        'key_traits': ch.get('key_traits') or ch.get('Key_traits'),
-                        'image_style': ch.get('image_style') or ch.get('Image_style'),
-                        'reference_image_path': ch.get('reference_image_path') or ch.get('Reference_image_path'),
-                    }
-                    crud.upsert_character_from_detail(db, user_id, char_detail)
-                    upserted += 1
-                except Exception as e:
-                    error_logger.error(
-                        f"Character upsert failure during background task for story {story_id}: {e}")
+            # Normalize keys to expected names
+            char_details = [
+                {
+                    'name': ch.get('name') or ch.get('Name'),
+                    'description': ch.get('description') or ch.get('Description'),
+                    'age': ch.get('age') or ch.get('Age'),
+                    'gender': ch.get('gender') or ch.get('Gender'),
+                    'clothing_style': ch.get('clothing_style') or ch.get('Clothing_style'),
+                    'key_traits': ch.get('key_traits') or ch.get('Key_traits'),
+                    'image_style': ch.get('image_style') or ch.get('Image_style'),
+                    'reference_image_path': ch.get('reference_image_path') or ch.get('Reference_image_path'),
+                }
+                for ch in chars if isinstance(ch, dict)
+            ]
+            upserted = len(crud.upsert_characters_from_details(
+                db, user_id, char_details))
             app_logger.info(
                 f"Upserted {upserted} character(s) into user {user_id}'s library from generated story {story_id}.")
         except Exception as e:
@@ -0,0 +1,240 @@
+"""Admin dashboard statistics: live aggregate query and hourly task rollups.
+
+Live numbers (users, stories, characters, last-24h task breakdown) are read
+with a single aggregated SELECT, so the dashboard costs one round trip no
+matter how many tasks exist. Historical windows are served from the
+`task_stats_hourly` rollup table, which is incremented as tasks finish and
+therefore stays proportional to the number of hours requested.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import case, func, literal, select
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from . import schemas
+from .database import Character, Story, StoryGenerationTask, TaskStatsHourly, User
+
+_COMPLETED = schemas.GenerationTaskStatus.COMPLETED.value
+_FAILED = schemas.GenerationTaskStatus.FAILED.value
+_ACTIVE = (
+    schemas.GenerationTaskStatus.PENDING.value,
+    schemas.GenerationTaskStatus.IN_PROGRESS.value,
+)
+
+# Counters incremented by each finished task.
+_ROLLUP_COUNTERS = (
+    "completed_count",
+    "failed_count",
+    "duration_seconds_sum",
+    "duration_samples",
+    "attempts_sum",
+)
+
+
+def _timestamp_diff_seconds(dialect_name: str, end: Any, start: Any) -> Any:
+    """Return a SQL expression for `end - start` in seconds (NULL if unsupported)."""
+
+    if dialect_name == "sqlite":
+        return (func.julianday(end) - func.julianday(start)) * 86400.0
+    if dialect_name == "postgresql":
+        return func.extract("epoch", end - start)
+    return literal(None)
+
+
+def _task_duration_seconds(dialect_name: str) -> Any:
+    """Task duration: precise duration_ms when set, else updated_at - created_at."""
+
+    return case(
+        (
+            StoryGenerationTask.duration_ms > 0,
+            StoryGenerationTask.duration_ms / 1000.0,
+        ),
+        else_=_timestamp_diff_seconds(
+            dialect_name,
+            StoryGenerationTask.updated_at,
+            StoryGenerationTask.created_at,
+        ),
+    )
+
+
+def _count(column: Any, *criteria: Any) -> Any:
+    return select(func.count(column)).where(*criteria).scalar_subquery()
+
+
+def get_live_admin_stats(db: Session, now: Optional[datetime] = None) -> schemas.AdminStats:
+    """Compute the admin dashboard numbers with one aggregated SELECT."""
+
+    now = now or datetime.now(timezone.utc)
+    since_24h = now - timedelta(hours=24)
+    dialect_name = db.get_bind().dialect.name
+
+    is_completed = StoryGenerationTask.status == _COMPLETED
+    is_failed = StoryGenerationTask.status == _FAILED
+    window = select(
+        func.count().label("tasks_last_24h"),
+        func.coalesce(
+            func.sum(case((is_completed, 1), else_=0)), 0
+        ).label("tasks_completed_last_24h"),
+        func.coalesce(
+            func.sum(case((is_failed, 1), else_=0)), 0
+        ).label("tasks_failed_last_24h"),
+        func.avg(
+            case((is_completed, _task_duration_seconds(dialect_name)))
+        ).label("avg_duration"),
+        func.avg(
+            case((is_completed, func.coalesce(StoryGenerationTask.attempts, 0)))
+        ).label("avg_attempts"),
+    ).where(StoryGenerationTask.created_at >= since_24h).subquery()
+
+    statement = select(
+        _count(User.id).label("total_users"),
+        _count(User.id, User.is_active == True).label("active_users"),
+        _count(Story.id).label("total_stories"),
+        _count(Story.id, Story.is_draft == False).label("generated_stories"),
+        _count(Character.id).label("total_characters"),
+        _count(
+            StoryGenerationTask.id,
+            StoryGenerationTask.status.in_(_ACTIVE),
+        ).label("tasks_in_progress"),
+        window,
+    ).select_from(window)
+    row = db.execute(statement).one()
+
+    completed = int(row.tasks_completed_last_24h or 0)
+    failed = int(row.tasks_failed_last_24h or 0)
+    success_rate = completed / (completed + failed) if completed + failed else None
+    total_stories = int(row.total_stories or 0)
+    generated_stories = int(row.generated_stories or 0)
+
+    return schemas.AdminStats(
+        total_users=int(row.total_users or 0),
+        active_users=int(row.active_users or 0),
+        total_stories=total_stories,
+        generated_stories=generated_stories,
+        draft_stories=total_stories - generated_stories,
+        total_characters=int(row.total_characters or 0),
+        tasks_last_24h=int(row.tasks_last_24h or 0),
+        tasks_in_progress=int(row.tasks_in_progress or 0),
+        tasks_failed_last_24h=failed,
+        tasks_completed_last_24h=completed,
+        avg_task_duration_seconds_last_24h=(
+            round(float(row.avg_duration), 2)
+            if row.avg_duration is not None else None
+        ),
+        success_rate_last_24h=success_rate,
+        avg_attempts_last_24h=(
+            round(float(row.avg_attempts), 2)
+            if row.avg_attempts is not None else None
+        ),
+    )
+
+
+def hour_bucket(value: datetime) -> datetime:
+    """Truncate a datetime to the start of its UTC hour (naive datetimes are UTC)."""
+
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc).replace(
+        minute=0, second=0, microsecond=0)
+
+
+def record_task_outcome(
+    db: Session,
+    status: str,
+    finished_at: datetime,
+    duration_seconds: Optional[float],
+    attempts: Optional[int],
+) -> None:
+    """Add one finished task to its hourly rollup bucket.
+
+    Runs in the caller's transaction as a single upsert; only completed tasks
+    contribute duration and attempts, mirroring the live 24h averages.
+    """
+
+    if status not in (_COMPLETED, _FAILED):
+        return
+    completed = status == _COMPLETED
+    has_duration = completed and duration_seconds is not None
+    increments: Dict[str, Any] = {
+        "completed_count": 1 if completed else 0,
+        "failed_count": 0 if completed else 1,
+        "duration_seconds_sum": float(duration_seconds) if has_duration else 0.0,
+        "duration_samples": 1 if has_duration else 0,
+        "attempts_sum": int(attempts or 0) if completed else 0,
+    }
+    bucket_start = hour_bucket(finished_at)
+
+    dialect_name = db.get_bind().dialect.name
+    if dialect_name in ("sqlite", "postgresql"):
+        dialect_insert = (
+            sqlite_insert if dialect_name == "sqlite" else postgresql_insert
+        )
+        statement = dialect_insert(TaskStatsHourly).values(
+            bucket_start=bucket_start, **increments)
+        statement = statement.on_conflict_do_update(
+            index_elements=[TaskStatsHourly.bucket_start],
+            set_={
+                name: getattr(TaskStatsHourly, name) + statement.excluded[name]
+                for name in _ROLLUP_COUNTERS
+            },
+        )
+        db.execute(statement)
+        return
+
+    bucket = db.get(TaskStatsHourly, bucket_start)
+    if bucket is None:
+        db.add(TaskStatsHourly(bucket_start=bucket_start, **increments))
+        return
+    for name, value in increments.items():
+        setattr(bucket, name, (getattr(bucket, name) or 0) + value)
+
+
+def get_task_stats_history(
+    db: Session,
+    hours: int,
+    now: Optional[datetime] = None,
+) -> schemas.AdminTaskStatsHistory:
+    """Summarize finished tasks over the last `hours` hours from the rollups."""
+
+    now = now or datetime.now(timezone.utc)
+    since = hour_bucket(now) - timedelta(hours=hours - 1)
+    rows = db.query(TaskStatsHourly).filter(
+        TaskStatsHourly.bucket_start >= since
+    ).order_by(TaskStatsHourly.bucket_start.asc()).all()
+
+    buckets: List[schemas.AdminTaskStatsBucket] = []
+    totals = dict.fromkeys(_ROLLUP_COUNTERS, 0)
+    for row in rows:
+        for name in _ROLLUP_COUNTERS:
+            totals[name] += getattr(row, name) or 0
+        buckets.append(schemas.AdminTaskStatsBucket(
+            bucket_start=hour_bucket(row.bucket_start),
+            completed=row.completed_count or 0,
+            failed=row.failed_count or 0,
+        ))
+
+    completed = int(totals["completed_count"])
+    failed = int(totals["failed_count"])
+    return schemas.AdminTaskStatsHistory(
+        hours=hours,
+        since=since,
+        tasks_completed=completed,
+        tasks_failed=failed,
+        success_rate=(
+            completed / (completed + failed) if completed + failed else None
+        ),
+        avg_task_duration_seconds=(
+            round(totals["duration_seconds_sum"] / totals["duration_samples"], 2)
+            if totals["duration_samples"] else None
+        ),
+        avg_attempts=(
+            round(totals["attempts_sum"] / completed, 2) if completed else None
+        ),
+        buckets=buckets,
+    )
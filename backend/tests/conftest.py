@@ -5,15 +5,22 @@ from datetime import timedelta  # Add this import
 from ..schemas import UserRole
 from ..auth import create_access_token, get_password_hash  # Add get_password_hash
 from fastapi.testclient import TestClient  # Add this import
-from typing import Generator
+from contextlib import contextmanager
+from io import BytesIO
+from typing import Any, Callable, ContextManager, Generator, List
+from PIL import Image
 from sqlalchemy.orm import sessionmaker, Session
-from sqlalchemy import create_engine, text  # Added text
+from sqlalchemy import create_engine, event, text  # Added text
 import pytest
 # Ensure all models are imported so Base.metadata is fully populated
 # User here is the model
 from ..database import Base, User, Story, Page, DynamicList, DynamicListItem
 from ..database import get_db as database_get_db  # Alias for database.get_db
 from ..main import app, get_db as main_get_db  # Import app's get_db and alias
+from .. import auth_cache
+from .. import settings as settings_mod
+from ..dynamic_list_cache import dynamic_list_cache
+from ..response_cache import admin_cache
 import sys  # Add sys import
 from pathlib import Path  # Add pathlib import
 
@@ -39,6 +46,75 @@ def reset_rate_limiter_state() -> Generator[None, None, None]:
         storage.reset()
 
 
+@pytest.fixture(scope="function", autouse=True)
+def reset_admin_cache() -> Generator[None, None, None]:
+    """Start every test with an empty admin dashboard response cache."""
+
+    admin_cache.clear()
+    yield
+    admin_cache.clear()
+
+
+@pytest.fixture(scope="function", autouse=True)
+def reset_dynamic_list_cache() -> Generator[None, None, None]:
+    """Drop the dynamic list snapshot; each test starts from a fresh database."""
+
+    dynamic_list_cache.invalidate()
+    yield
+    dynamic_list_cache.invalidate()
+
+
+@pytest.fixture(scope="function", autouse=True)
+def reset_auth_cache() -> Generator[None, None, None]:
+    """Forget cached principals; user ids are reused across test databases."""
+
+    auth_cache.clear()
+    yield
+    auth_cache.clear()
+
+
+@pytest.fixture(scope="function")
+def configure_settings(monkeypatch) -> Callable[..., Any]:
+    """
+    Fixture returning a function that sets environment variables and reloads
+    the settings singleton, so the next `get_settings()` sees them:
+
+        configure_settings(IMAGE_VARIANT_WIDTHS="256")
+    """
+
+    def _configure(**env: Any):
+        for name, value in env.items():
+            monkeypatch.setenv(name, str(value))
+        monkeypatch.setattr(settings_mod, "_settings_instance", None, raising=False)
+        return settings_mod.get_settings()
+
+    return _configure
+
+
+@pytest.fixture(scope="function")
+def data_dirs(tmp_path: Path, configure_settings) -> Path:
+    """Point DATA_DIR and PRIVATE_DATA_DIR at empty temporary folders.
+
+    Returns the data folder; the private one is its sibling `private`.
+    """
+
+    configure_settings(DATA_DIR=tmp_path / "data",
+                       PRIVATE_DATA_DIR=tmp_path / "private")
+    return tmp_path / "data"
+
+
+@pytest.fixture(scope="session")
+def make_png() -> Callable[..., bytes]:
+    """Fixture returning a function that encodes a solid-colour PNG."""
+
+    def _make_png(width: int = 1, height: int = 1, color=(200, 120, 40)) -> bytes:
+        buffer = BytesIO()
+        Image.new("RGB", (width, height), color).save(buffer, "PNG")
+        return buffer.getvalue()
+
+    return _make_png
+
+
 # Use an in-memory SQLite database for testing, shared across connections
 SQLALCHEMY_DATABASE_URL = "sqlite:///file:testdb?mode=memory&cache=shared&uri=true"
 
@@ -91,6 +167,41 @@ def db_session() -> Generator[Session, None, None]:
         Base.metadata.drop_all(bind=engine)  # Clean up tables
 
 
+@pytest.fixture(scope="function")
+def sql_statements(db_session: Session) -> Callable[..., ContextManager[List[Any]]]:
+    """
+    Fixture returning a context manager that records every SQL statement run on
+    the test engine while it is active. Pins endpoints to a fixed query count:
+
+        with sql_statements() as statements:
+            client.get(...)
+        assert len(statements) == 3
+
+    `sql_statements(with_parameters=True)` records `(statement, parameters)`
+    pairs instead, e.g. to EXPLAIN a captured query.
+    """
+
+    @contextmanager
+    def _capture(with_parameters: bool = False) -> Generator[List[Any], None, None]:
+        statements: List[Any] = []
+
+        def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            statements.append(
+                (statement, parameters) if with_parameters else statement)
+
+        # Expire loaded state so lazy loads are not hidden by objects left
+        # over from test setup.
+        db_session.expire_all()
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        try:
+            yield statements
+        finally:
+            event.remove(engine, "before_cursor_execute",
+                         _before_cursor_execute)
+
+    return _capture
+
+
 # Override the get_db dependency for the FastAPI app
 
 
@@ -963,3 +963,55 @@ def test_non_admin_cannot_manage_dynamic_lists(client: TestClient, regular_user_
     response_get_all = client.get(
         "/api/v1/admin/dynamic-lists/", headers={"Authorization": f"Bearer {regular_user_token}"})
     assert response_get_all.status_code == 403
+
+
+def _seed_genres_in_use(db_session: Session, item_count: int) -> None:
+    owner = db_session.query(database.User).first()
+    db_session.add(database.DynamicList(list_name="genres", list_label="Genres"))
+    for index in range(item_count):
+        db_session.add(database.DynamicListItem(
+            list_name="genres", item_value=f"genre-{index}",
+            item_label=f"Genre {index}", sort_order=index))
+    # Two stories use genre-1, none use the others.
+    for title in ("First", "Second"):
+        db_session.add(database.Story(
+            title=title, genre="genre-1", owner_id=owner.id, num_pages=1))
+    db_session.commit()
+
+
+def test_dynamic_list_usage_endpoint_reports_all_items(
+    client: TestClient, admin_token: str, db_session: Session
+):
+    _seed_genres_in_use(db_session, item_count=3)
+
+    response = client.get("/api/v1/admin/dynamic-lists/genres/usage",
+                          headers={"Authorization": f"Bearer {admin_token}"})
+    assert response.status_code == 200
+    usage = {entry["item_value"]: entry for entry in response.json()}
+    assert usage["genre-0"]["is_in_use"] is False
+    assert usage["genre-0"]["usage_count"] == 0
+    assert usage["genre-1"]["is_in_use"] is True
+    assert usage["genre-1"]["usage_count"] == 2
+    assert usage["genre-1"]["details"] == ["Genre in Stories: First, Second"]
+
+    missing = client.get("/api/v1/admin/dynamic-lists/nope/usage",
+                         headers={"Authorization": f"Bearer {admin_token}"})
+    assert missing.status_code == 404
+
+
+@pytest.mark.parametrize("item_count", [3, 30])
+def test_delete_in_use_list_query_count_independent_of_items(
+    client: TestClient, admin_token: str, db_session: Session,
+    sql_statements, item_count: int
+):
+    _seed_genres_in_use(db_session, item_count=item_count)
+    headers = {"Authorization": f"Bearer {admin_token}"}
+
+    with sql_statements() as statements:
+        response = client.delete("/api/v1/admin/dynamic-lists/genres",
+                                 headers=headers)
+    assert response.status_code == 409
+    assert "genre-1" not in response.json()["detail"]
+    assert "Genre 1" in response.json()["detail"]
+    # auth user, grouped usage count, items
+    assert len(statements) == 3
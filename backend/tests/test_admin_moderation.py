@@ -142,6 +142,7 @@ def test_moderation_list_returns_empty_paginated_envelope(
         "total": 0,
         "page": 1,
         "page_size": 20,
+        "next_cursor": None,
     }
 
 
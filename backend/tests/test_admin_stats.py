@@ -90,3 +90,137 @@ def test_admin_stats_happy_path(client, db_session, admin_auth_headers):
         assert data['avg_task_duration_seconds_last_24h'] > 0
     # Avg attempts is present (may be null if no completed tasks)
     assert 'avg_attempts_last_24h' in data
+
+
+def _count_task(db, story_id, user_id, task_id, status, **fields):
+    t = StoryGenerationTask(
+        id=task_id,
+        story_id=story_id,
+        user_id=user_id,
+        status=status,
+        progress=0,
+        current_step='finalizing',
+        **fields,
+    )
+    db.add(t)
+    db.commit()
+    return t
+
+
+@pytest.mark.parametrize("task_count", [3, 40])
+def test_admin_stats_is_one_aggregated_query(client, db_session, admin_auth_headers, sql_statements, task_count):
+    admin_user = db_session.query(User).filter(
+        User.username == "admin@example.com").first()
+    story = create_story(db_session, admin_user.id, is_draft=False)
+    for index in range(task_count):
+        _count_task(db_session, story.id, admin_user.id, f"agg-{index}",
+                    'completed' if index % 2 else 'failed',
+                    duration_ms=2000, attempts=index % 3)
+
+    with sql_statements() as statements:
+        r = client.get("/api/v1/admin/stats", headers=admin_auth_headers)
+
+    assert r.status_code == 200, r.text
+    # One SELECT authenticates the admin, one computes every stat.
+    assert len(statements) == 2, statements
+    data = r.json()
+    assert data['tasks_last_24h'] == task_count
+    assert data['tasks_completed_last_24h'] == task_count // 2
+    assert data['avg_task_duration_seconds_last_24h'] == pytest.approx(2.0)
+
+
+def test_live_stats_average_precise_durations_and_attempts(db_session):
+    from backend import task_stats
+
+    admin_user = db_session.query(User).filter(
+        User.username == "admin@example.com").first()
+    story = create_story(db_session, admin_user.id, is_draft=False)
+    _count_task(db_session, story.id, admin_user.id, "precise-1", 'completed',
+                duration_ms=1500, attempts=1)
+    _count_task(db_session, story.id, admin_user.id, "precise-2", 'completed',
+                duration_ms=4500, attempts=None)
+    _count_task(db_session, story.id, admin_user.id, "precise-3", 'failed',
+                duration_ms=99000, attempts=5)
+    _count_task(db_session, story.id, admin_user.id, "precise-4", 'pending')
+
+    stats = task_stats.get_live_admin_stats(db_session)
+
+    assert stats.avg_task_duration_seconds_last_24h == pytest.approx(3.0)
+    assert stats.avg_attempts_last_24h == pytest.approx(0.5)
+    assert stats.tasks_in_progress == 1
+    assert stats.success_rate_last_24h == pytest.approx(2 / 3)
+
+
+def test_finished_tasks_roll_up_hourly(client, db_session, admin_auth_headers):
+    from backend import crud
+    from backend.database import TaskStatsHourly
+
+    admin_user = db_session.query(User).filter(
+        User.username == "admin@example.com").first()
+    story = create_story(db_session, admin_user.id, is_draft=False)
+    for task_id in ("roll-1", "roll-2", "roll-3"):
+        _count_task(db_session, story.id, admin_user.id, task_id, 'pending')
+        crud.update_story_generation_task(
+            db_session, task_id, status=schemas.GenerationTaskStatus.IN_PROGRESS)
+
+    crud.update_story_generation_task(
+        db_session, "roll-1", status=schemas.GenerationTaskStatus.COMPLETED)
+    crud.update_story_generation_task(
+        db_session, "roll-2", status=schemas.GenerationTaskStatus.COMPLETED)
+    crud.update_story_generation_task(
+        db_session, "roll-3", status=schemas.GenerationTaskStatus.FAILED)
+    # A repeated terminal update must not be counted twice.
+    crud.update_story_generation_task(
+        db_session, "roll-2", status=schemas.GenerationTaskStatus.COMPLETED)
+
+    buckets = db_session.query(TaskStatsHourly).all()
+    assert len(buckets) == 1
+    assert buckets[0].completed_count == 2
+    assert buckets[0].failed_count == 1
+    assert buckets[0].duration_samples == 2
+
+    r = client.get("/api/v1/admin/stats/history?hours=24",
+                   headers=admin_auth_headers)
+    assert r.status_code == 200, r.text
+    history = r.json()
+    assert history['hours'] == 24
+    assert history['tasks_completed'] == 2
+    assert history['tasks_failed'] == 1
+    assert history['success_rate'] == pytest.approx(2 / 3)
+    assert [b['completed'] for b in history['buckets']] == [2]
+
+    assert client.get("/api/v1/admin/stats/history?hours=0",
+                      headers=admin_auth_headers).status_code == 422
+
+
+def test_rollup_backfill_sql_rebuilds_buckets(db_session):
+    from sqlalchemy import text
+    from backend import database, task_stats
+    from backend.database import TaskStatsHourly
+
+    admin_user = db_session.query(User).filter(
+        User.username == "admin@example.com").first()
+    story = create_story(db_session, admin_user.id, is_draft=False)
+    finished = datetime(2026, 3, 1, 9, 40, tzinfo=timezone.utc)
+    _count_task(db_session, story.id, admin_user.id, "old-1", 'completed',
+                duration_ms=6000, attempts=2, completed_at=finished,
+                created_at=finished - timedelta(minutes=5))
+    _count_task(db_session, story.id, admin_user.id, "old-2", 'failed',
+                completed_at=finished + timedelta(minutes=30),
+                created_at=finished)
+
+    db_session.execute(text(database.TASK_STATS_HOURLY_BACKFILL_SQL))
+    db_session.commit()
+
+    rows = db_session.query(TaskStatsHourly).order_by(
+        TaskStatsHourly.bucket_start).all()
+    assert [(task_stats.hour_bucket(r.bucket_start).hour, r.completed_count, r.failed_count)
+            for r in rows] == [(9, 1, 0), (10, 0, 1)]
+    assert rows[0].duration_seconds_sum == pytest.approx(6.0)
+    assert rows[0].attempts_sum == 2
+
+    history = task_stats.get_task_stats_history(
+        db_session, hours=3, now=finished + timedelta(hours=1))
+    assert history.tasks_completed == 1
+    assert history.tasks_failed == 1
+    assert history.avg_task_duration_seconds == pytest.approx(6.0)
@@ -1,9 +1,19 @@
 import base64
-from unittest.mock import patch, MagicMock, call
+from unittest.mock import patch, MagicMock
 import pytest
 import requests
 from backend import ai_services
 from backend import logging_config
+from backend import settings as settings_mod
+
+
+@pytest.fixture
+def data_dir(monkeypatch, tmp_path):
+    """Point asset storage at a temporary DATA_DIR."""
+
+    monkeypatch.setenv("DATA_DIR", str(tmp_path))
+    monkeypatch.setattr(settings_mod, "_settings_instance", None, raising=False)
+    return tmp_path
 
 
 def _build_story_input() -> dict:
@@ -308,9 +318,7 @@ async def test_generate_character_reference_image_size(mock_open, mock_makedirs,
 
 @pytest.mark.asyncio
 @patch('backend.ai_services.asyncio.to_thread')
-@patch('backend.ai_services.os.makedirs')
-@patch('builtins.open', new_callable=MagicMock)
-async def test_generate_character_reference_image_prompt_and_file_saving(mock_open, mock_makedirs, mock_to_thread):
+async def test_generate_character_reference_image_prompt_and_file_saving(mock_to_thread, data_dir):
     """
     Test that generate_character_reference_image:
     1. Constructs the prompt correctly with the style at the forefront.
@@ -338,25 +346,12 @@ async def test_generate_character_reference_image_prompt_and_file_saving(mock_op
     user_id = 1
     story_id = 1
     image_save_path = "/fake/path/Anya_ref_story_1.png"
-    image_db_path = "images/user_1/story_1/char_1.png"
+    image_db_path = "images/user_1/story_1/references/Anya_ref_story_1.png"
     fake_image_data = b"fake_image_data"
     mock_to_thread.return_value = fake_image_data
 
-    # Create separate mock handles for each file that will be opened
-    mock_image_handle = MagicMock()
-    mock_prompt_handle = MagicMock()
-
-    # When open is called, return the correct handle based on the file path
-    def open_side_effect(path, *args, **kwargs):
-        if path == image_save_path:
-            return mock_image_handle
-        else:
-            # The other call is for the prompt file
-            return mock_prompt_handle
-    mock_open.side_effect = open_side_effect
-
     # Call the function
-    await ai_services.generate_character_reference_image(
+    result = await ai_services.generate_character_reference_image(
         character=mock_character,
         story_input=mock_story_input,
         db=mock_db,
@@ -381,25 +376,17 @@ async def test_generate_character_reference_image_prompt_and_file_saving(mock_op
     assert "A mysterious sorceress." in generated_prompt
     assert "showing front, side, and back views" in generated_prompt
 
-    # 2. Assert file and prompt saving
-    prompt_save_path = "/fake/path/Anya_ref_prompt_story_1.txt"
-
-    # Check that open was called for both files
-    mock_open.assert_has_calls([
-        call(image_save_path, "wb"),
-        call(prompt_save_path, "w", encoding='utf-8')
-    ], any_order=True)
-
-    # Check that the correct data was written to each mock handle
-    mock_image_handle.__enter__().write.assert_called_once_with(fake_image_data)
-    mock_prompt_handle.__enter__().write.assert_called_once_with(generated_prompt)
+    # 2. Assert image and prompt saving (asset storage keys are DB-relative)
+    assert result["reference_image_path"] == image_db_path
+    references = data_dir / "images" / "user_1" / "story_1" / "references"
+    assert (references / "Anya_ref_story_1.png").read_bytes() == fake_image_data
+    assert (references / "Anya_ref_prompt_story_1.txt").read_text(
+        encoding="utf-8") == generated_prompt
 
 
 @pytest.mark.asyncio
 @patch('backend.ai_services.asyncio.to_thread')
-@patch('backend.ai_services.os.makedirs')
-@patch('builtins.open', new_callable=MagicMock)
-async def test_generate_image_for_page_saves_prompt(mock_open, mock_makedirs, mock_to_thread):
+async def test_generate_image_for_page_saves_prompt(mock_to_thread, data_dir):
     """
     Test that generate_image_for_page saves the prompt to a text file.
     """
@@ -409,7 +396,6 @@ async def test_generate_image_for_page_saves_prompt(mock_open, mock_makedirs, mo
     # This is the exact prompt constructed in the function
     prompt = f"A {style_reference} style image of {page_content}"
     image_save_path = "/fake/path/page_1_image.png"
-    prompt_save_path = "/fake/path/page_1_image_prompt.txt"
 
     mock_db = MagicMock()
     user_id = 1
@@ -420,20 +406,8 @@ async def test_generate_image_for_page_saves_prompt(mock_open, mock_makedirs, mo
 
     mock_to_thread.return_value = fake_image_data
 
-    # Create separate mock handles for each file that will be opened
-    mock_image_handle = MagicMock()
-    mock_prompt_handle = MagicMock()
-
-    # When open is called, return the correct handle based on the file path
-    def open_side_effect(path, *args, **kwargs):
-        if path == image_save_path:
-            return mock_image_handle
-        else:
-            return mock_prompt_handle
-    mock_open.side_effect = open_side_effect
-
     # Call the function
-    await ai_services.generate_image_for_page(
+    result = await ai_services.generate_image_for_page(
         page_content=page_content,
         style_reference=style_reference,
         db=mock_db,
@@ -444,12 +418,8 @@ async def test_generate_image_for_page_saves_prompt(mock_open, mock_makedirs, mo
         image_path_for_db=image_db_path
     )
 
-    # Assert file writing
-    mock_open.assert_has_calls([
-        call(image_save_path, "wb"),
-        call(prompt_save_path, "w", encoding='utf-8')
-    ], any_order=True)
-
-    # Check that the correct data was written to each mock handle
-    mock_image_handle.__enter__().write.assert_called_once_with(fake_image_data)
-    mock_prompt_handle.__enter__().write.assert_called_once_with(prompt)
+    # Assert image and prompt saving under the DB-relative key
+    assert result == image_db_path
+    story_dir = data_dir / "images" / "user_1" / "story_1"
+    assert (story_dir / "page_1.png").read_bytes() == fake_image_data
+    assert (story_dir / "page_1_prompt.txt").read_text(encoding="utf-8") == prompt
@@ -0,0 +1,119 @@
+import os
+import time
+
+import pytest
+
+from backend import asset_gc, storage
+from backend.database import Character, CharacterImage, Page, Story, User
+
+DAY = 24 * 3600
+
+
+@pytest.fixture
+def local_storage(data_dirs, configure_settings):
+    # Plain files, so that os.utime ages each asset on its own.
+    configure_settings(ASSET_GC_BATCH_SIZE=2, STORAGE_DEDUP="0")
+    return storage.get_storage()
+
+
+def _file(asset_storage, key, age=2 * DAY):
+    asset_storage.put(key, key.encode())
+    modified = time.time() - age
+    os.utime(asset_storage.local_path(key), (modified, modified))
+    return key
+
+
+@pytest.fixture
+def assets(db_session, local_storage):
+    owner = db_session.query(User).filter(User.username == "user@example.com").one()
+    story = Story(title="Kept", genre="fantasy", owner_id=owner.id)
+    character = Character(user_id=owner.id, name="Mira")
+    db_session.add_all([story, character])
+    db_session.flush()
+    base = f"images/user_{owner.id}/story_{story.id}"
+    live = [
+        _file(local_storage, f"{base}/page_1.png"),
+        _file(local_storage, f"{base}/page_1.w256.webp"),
+        _file(local_storage, f"{base}/page_1_original.png"),
+        _file(local_storage, f"{base}/references/Mira_ref.png"),
+        _file(local_storage, "images/.gitkeep"),
+        _file(local_storage, f"images/user_{owner.id}/characters/{character.id}/a.png"),
+    ]
+    db_session.add_all([
+        Page(story_id=story.id, page_number=1, text="Once",
+             image_path=f"{base}/page_1.png",
+             editor_state={"original_image_path": f"{base}/page_1_original.png"}),
+        CharacterImage(character_id=character.id, file_path=live[-1]),
+    ])
+    db_session.commit()
+    orphans = [
+        _file(local_storage, f"{base}/.0123abcd.tmp"),
+        _file(local_storage, f"{base}/page_1_old.png"),
+        _file(local_storage, f"{base}/page_1_old.w256.webp"),
+        _file(local_storage, f"images/user_{owner.id}/story_999/cover.png"),
+    ]
+    recent = _file(local_storage, f"{base}/page_2.png", age=60)
+    return live + [recent], orphans
+
+
+def test_dry_run_reports_orphans_without_deleting(db_session, local_storage, assets):
+    live, orphans = assets
+    reported = []
+
+    counts = asset_gc.collect_orphans(
+        db_session, report=lambda key, size: reported.append((key, size)))
+
+    assert sorted(reported) == sorted((key, len(key)) for key in orphans)
+    assert counts == {"scanned": 11, "orphans": 4,
+                      "bytes": sum(map(len, orphans)), "deleted": 0}
+    assert all(local_storage.exists(key) for key in orphans)
+
+
+def test_deletes_orphans_at_the_configured_rate(
+    db_session, local_storage, assets, monkeypatch
+):
+    live, orphans = assets
+    sleeps = []
+    monkeypatch.setattr(asset_gc.time, "sleep", sleeps.append)
+
+    counts = asset_gc.collect_orphans(
+        db_session, dry_run=False, max_deletes_per_second=2)
+
+    assert counts["deleted"] == 4
+    assert len(sleeps) == 3 and all(0 < delay <= 0.5 for delay in sleeps)
+    assert not any(os.path.exists(local_storage.local_path(key)) for key in orphans)
+    assert all(local_storage.exists(key) for key in live)
+
+
+def test_linked_copy_of_old_bytes_is_not_old(db_session, data_dirs, configure_settings):
+    configure_settings(STORAGE_DEDUP="1")
+    dedup_storage = storage.get_storage()
+    old = _file(dedup_storage, "images/user_1/story_1/page_1.png")
+    fresh = "images/user_1/story_2/page_1.png"
+    # Same bytes: linked to the two-day-old blob, sharing its mtime.
+    dedup_storage.put(fresh, old.encode())
+    assert os.stat(dedup_storage.local_path(fresh)).st_mtime < time.time() - DAY
+
+    orphans = [key for key, _size in asset_gc.find_orphans(
+        db_session, dedup_storage, min_age_seconds=3600)]
+
+    assert orphans == []
+    assert [key for key, _size in asset_gc.find_orphans(
+        db_session, dedup_storage)] == [old, fresh]
+
+
+def test_prompt_lives_as_long_as_its_page_image(db_session, local_storage):
+    owner = db_session.query(User).filter(User.username == "user@example.com").one()
+    story = Story(title="Prompted", genre="fantasy", owner_id=owner.id)
+    db_session.add(story)
+    db_session.flush()
+    stem = f"images/user_{owner.id}/story_{story.id}/page_1_abcd1234_story_{story.id}_p1"
+    db_session.add(Page(story_id=story.id, page_number=1, text="Once",
+                        image_path=_file(local_storage, f"{stem}.png")))
+    db_session.commit()
+    _file(local_storage, f"{stem}_prompt.txt")
+    stale = _file(local_storage, f"{stem}_old_prompt.txt")
+
+    orphans = [key for key, _size in asset_gc.find_orphans(db_session, local_storage)]
+
+    assert orphans == [stale]
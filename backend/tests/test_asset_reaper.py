@@ -0,0 +1,101 @@
+import os
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from backend import asset_reaper, crud, storage, storage_paths
+from backend.database import AssetTombstone, Story, User
+
+
+@pytest.fixture
+def data_dir(data_dirs, configure_settings):
+    configure_settings(ASSET_REAPER_RETRY_BASE_SECONDS=30)
+    return data_dirs
+
+
+def _folder(prefix):
+    storage.get_storage().put(f"{prefix}/page_1.png", b"png")
+    return storage_paths.resolve_data_path(prefix)
+
+
+def test_reaps_in_batches_and_removes_tombstones(db_session, data_dir):
+    folders = [_folder(f"images/user_1/story_{n}") for n in range(5)]
+    for n in range(5):
+        asset_reaper.add_tombstone(db_session, f"images/user_1/story_{n}")
+    db_session.commit()
+
+    counts = asset_reaper.reap_tombstones(db_session, batch_size=2)
+
+    assert counts == {"deleted": 5, "skipped": 0, "failed": 0}
+    assert not any(os.path.exists(folder) for folder in folders)
+    assert db_session.query(AssetTombstone).count() == 0
+
+
+def test_failed_deletion_is_retried_with_backoff(db_session, data_dir, monkeypatch):
+    asset_reaper.add_tombstone(db_session, "images/user_1/story_1")
+    db_session.commit()
+    now = datetime.now(timezone.utc)
+
+    delete_prefix = storage.LocalStorage.delete_prefix
+    unavailable = [True]
+
+    def flaky_delete_prefix(self, prefix):
+        if unavailable[0]:
+            raise OSError("disk unavailable")
+        delete_prefix(self, prefix)
+
+    monkeypatch.setattr(storage.LocalStorage, "delete_prefix", flaky_delete_prefix)
+    assert asset_reaper.reap_tombstones(db_session, now=now) == {
+        "deleted": 0, "skipped": 0, "failed": 1}
+    assert asset_reaper.reap_tombstones(db_session, now=now + timedelta(seconds=29)) == {
+        "deleted": 0, "skipped": 0, "failed": 0}
+    assert asset_reaper.reap_tombstones(db_session, now=now + timedelta(seconds=30)) == {
+        "deleted": 0, "skipped": 0, "failed": 1}
+
+    tombstone = db_session.query(AssetTombstone).one()
+    assert tombstone.attempts == 2
+    assert tombstone.last_error == "disk unavailable"
+    assert tombstone.next_attempt_at.replace(tzinfo=timezone.utc) == (
+        now + timedelta(seconds=90))
+
+    unavailable[0] = False
+    assert asset_reaper.reap_tombstones(
+        db_session, now=now + timedelta(seconds=90))["deleted"] == 1
+    assert db_session.query(AssetTombstone).count() == 0
+
+
+def test_deleting_a_story_records_a_tombstone(db_session, data_dir):
+    owner = db_session.query(User).filter(User.username == "user@example.com").one()
+    story = Story(title="Gone", genre="fantasy", owner_id=owner.id)
+    db_session.add(story)
+    db_session.commit()
+    folder = _folder(storage_paths.story_images_rel(owner.id, story.id))
+
+    assert crud.delete_story_db_entry(db_session, story.id)
+
+    tombstone = db_session.query(AssetTombstone).one()
+    assert tombstone.prefix == storage_paths.story_images_rel(owner.id, story.id)
+    assert os.path.exists(folder)
+    asset_reaper.reap_in_background(db_session.get_bind())
+    assert not os.path.exists(folder)
+
+
+def test_folder_of_a_reused_story_id_is_kept(db_session, data_dir):
+    owner = db_session.query(User).filter(User.username == "user@example.com").one()
+    story = Story(title="Gone", genre="fantasy", owner_id=owner.id)
+    db_session.add(story)
+    db_session.commit()
+    story_id = story.id
+    assert crud.delete_story_db_entry(db_session, story_id)
+
+    # Without AUTOINCREMENT, SQLite gives the next story the freed id.
+    reused = Story(title="New", genre="fantasy", owner_id=owner.id)
+    db_session.add(reused)
+    db_session.commit()
+    assert reused.id == story_id
+    folder = _folder(storage_paths.story_images_rel(owner.id, story_id))
+
+    assert asset_reaper.reap_tombstones(db_session) == {
+        "deleted": 0, "skipped": 1, "failed": 0}
+    assert os.path.exists(folder)
+    assert db_session.query(AssetTombstone).count() == 0
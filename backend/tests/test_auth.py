@@ -221,4 +221,50 @@ def test_get_current_admin_user_admin(db_session: Session) -> None:
     current_user = asyncio.run(auth.get_current_admin_user(current_user=admin_user))
 
     assert current_user.id == admin_user.id
-    assert current_user.role == "admin"
\ No newline at end of file
+    assert current_user.role == "admin"
+
+def test_login_rehashes_password_when_cost_changes(db_session: Session) -> None:
+    """A valid login replaces a hash made with another bcrypt cost."""
+
+    from passlib.context import CryptContext
+
+    user = _create_test_user(db_session, "rehash@example.com", "s3cret")
+    user.hashed_password = CryptContext(
+        schemes=["bcrypt"], bcrypt__rounds=4).hash("s3cret")
+    db_session.commit()
+
+    authenticated = asyncio.run(auth.authenticate_user_async(
+        db_session, "rehash@example.com", "s3cret"))
+
+    assert authenticated is not None
+    db_session.refresh(user)
+    rounds = auth.pwd_context.to_dict()["bcrypt__rounds"]
+    assert user.hashed_password.startswith(f"$2b${rounds:02d}$")
+    assert auth.verify_password("s3cret", user.hashed_password)
+
+
+def test_password_hasher_rejects_calls_beyond_queue_bound() -> None:
+    """Calls beyond workers + queue slots fail fast instead of piling up."""
+
+    import threading
+
+    from backend.password_hashing import PasswordHasher, PasswordHasherBusy
+
+    hasher = PasswordHasher(max_workers=1, max_queue=1)
+    release = threading.Event()
+
+    async def _scenario():
+        blocked = [asyncio.ensure_future(hasher.run("verify", release.wait))
+                   for _ in range(2)]
+        await asyncio.sleep(0)
+        with pytest.raises(PasswordHasherBusy):
+            await hasher.run("verify", release.wait)
+        release.set()
+        assert await asyncio.gather(*blocked) == [True, True]
+        # Slots are released once the calls finish.
+        assert await hasher.run("verify", lambda: "ok") == "ok"
+
+    try:
+        asyncio.run(_scenario())
+    finally:
+        hasher.shutdown()
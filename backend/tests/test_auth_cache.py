@@ -0,0 +1,67 @@
+from datetime import timedelta
+
+from backend import auth_cache
+from backend.auth import create_access_token
+from backend.auth_cache import LRUTTLCache
+from backend.database import User
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_lru_ttl_cache_expires_and_evicts_least_recent():
+    clock = FakeClock()
+    cache = LRUTTLCache(maxsize=2, clock=clock)
+    cache.set("a", 1, ttl=10)
+    cache.set("b", 2, ttl=10)
+    assert cache.get("a") == 1  # "b" is now least recently used
+    cache.set("c", 3, ttl=10)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+
+    clock.now += 10
+    assert cache.get("a") is None
+    cache.set("d", 4, ttl=0)  # a TTL of 0 disables caching
+    assert cache.get("d") is None
+
+
+def test_repeated_requests_skip_user_lookup(client, regular_user_auth_headers, sql_statements):
+    assert client.get("/api/v1/users/me/", headers=regular_user_auth_headers).status_code == 200
+
+    with sql_statements() as statements:
+        res = client.get("/api/v1/users/me/", headers=regular_user_auth_headers)
+    assert res.status_code == 200
+    assert res.json()["username"] == "user@example.com"
+    assert statements == []
+
+
+def test_admin_changes_take_effect_immediately(
+    client, db_session, regular_user_auth_headers, admin_auth_headers
+):
+    assert client.get("/api/v1/users/me/", headers=regular_user_auth_headers).status_code == 200
+    user = db_session.query(User).filter(User.username == "user@example.com").one()
+
+    res = client.put(f"/api/v1/admin/management/users/{user.id}",
+                     json={"is_active": False}, headers=admin_auth_headers)
+    assert res.status_code == 200, res.text
+    assert client.get("/api/v1/users/me/", headers=regular_user_auth_headers).status_code == 400
+
+    # Direct ORM writes (any session) evict on commit as well.
+    user.is_active = True
+    user.role = "admin"
+    db_session.commit()
+    res = client.get("/api/v1/admin/management/users/", headers=regular_user_auth_headers)
+    assert res.status_code == 200
+
+
+def test_expired_token_is_not_served_from_cache(client):
+    token = create_access_token({"sub": "user@example.com"},
+                                expires_delta=timedelta(seconds=-1))
+    res = client.get("/api/v1/users/me/", headers={"Authorization": f"Bearer {token}"})
+    assert res.status_code == 401
+    assert auth_cache.get_cached_token_subject(token) is None
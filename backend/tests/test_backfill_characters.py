@@ -1,9 +1,16 @@
+from datetime import datetime, timedelta
+
+import pytest
 from fastapi.testclient import TestClient
+from sqlalchemy import text
 from backend import crud, schemas
-from backend.database import User
+from backend.database import CharacterBackfillState, Story, User
 from backend.settings import get_settings
 import os
 
+# Character images and story assets go to a temporary DATA_DIR.
+pytestmark = pytest.mark.usefixtures("data_dirs")
+
 
 def test_backfill_characters_populates_library(client: TestClient, regular_user_auth_headers: dict):
     # Create a story with main characters
@@ -29,7 +36,7 @@ def test_backfill_characters_populates_library(client: TestClient, regular_user_
                       json={"include_drafts": True},
                       headers=regular_user_auth_headers)
     assert res.status_code == 200
-    assert "upserted" in res.json()
+    assert res.json()["upserted"] == 2
 
     # Now list characters and expect at least the two we provided
     res_list = client.get("/api/v1/characters/",
@@ -86,3 +93,135 @@ def test_backfill_character_thumbnails_repairs_only_current_users_characters(
         "copy_failed": 0,
         "skipped": 0,
     }
+
+
+def _add_story(db_session, owner_id, title, characters, updated_at):
+    story = Story(title=title, genre="Fantasy", owner_id=owner_id,
+                  main_characters=characters, num_pages=0)
+    db_session.add(story)
+    db_session.commit()
+    db_session.query(Story).filter(Story.id == story.id).update(
+        {Story.updated_at: updated_at})
+    db_session.commit()
+    return story
+
+
+def test_backfill_characters_is_incremental_and_batched(db_session):
+    user = db_session.query(User).filter(User.username == "user@example.com").one()
+    base = datetime(2026, 1, 1, 12, 0, 0)
+    for i in range(5):
+        _add_story(db_session, user.id, f"Old {i}", [{"name": f"Old{i}"}],
+                   base + timedelta(minutes=i))
+
+    first = crud.upsert_characters_from_user_stories(db_session, user.id, batch_size=2)
+    assert first == {"stories_scanned": 5, "upserted": 5}
+    state = db_session.get(CharacterBackfillState, (user.id, True))
+    assert state.stories_updated_through == base + timedelta(minutes=4)
+    assert state.resume_after_story_id is None
+
+    # Nothing changed: only stories at the mark (overlap window) are re-read.
+    again = crud.upsert_characters_from_user_stories(db_session, user.id, batch_size=2)
+    assert again["stories_scanned"] == 1
+
+    _add_story(db_session, user.id, "New", [{"name": "Newcomer"}],
+               base + timedelta(hours=1))
+    third = crud.upsert_characters_from_user_stories(db_session, user.id, batch_size=2)
+    assert third == {"stories_scanned": 2, "upserted": 2}  # new + the old mark
+    assert crud.get_character_by_name_ci(db_session, user.id, "newcomer") is not None
+
+    full = crud.upsert_characters_from_user_stories(
+        db_session, user.id, batch_size=2, full=True)
+    assert full["stories_scanned"] == 6
+
+
+def test_backfill_characters_resumes_after_interruption(db_session, monkeypatch):
+    user = db_session.query(User).filter(User.username == "user@example.com").one()
+    base = datetime(2026, 2, 1, 12, 0, 0)
+    stories = [
+        _add_story(db_session, user.id, f"Resume {i}", [{"name": f"Res{i}"}],
+                   base + timedelta(minutes=i))
+        for i in range(4)
+    ]
+
+    real_upsert = crud.upsert_characters_from_details
+    calls = []
+
+    def _fail_on_second_batch(db, user_id, details):
+        calls.append([d["name"] for d in details])
+        if len(calls) == 2:
+            raise RuntimeError("worker died")
+        return real_upsert(db, user_id, details)
+
+    monkeypatch.setattr(crud, "upsert_characters_from_details", _fail_on_second_batch)
+    with pytest.raises(RuntimeError):
+        crud.upsert_characters_from_user_stories(db_session, user.id, batch_size=2)
+    db_session.rollback()
+
+    state = db_session.get(CharacterBackfillState, (user.id, True))
+    assert state.resume_after_story_id == stories[1].id
+    assert state.stories_updated_through is None
+
+    resumed = crud.upsert_characters_from_user_stories(db_session, user.id, batch_size=2)
+    assert resumed == {"stories_scanned": 2, "upserted": 2}
+    assert calls[-1] == ["Res2", "Res3"]
+    state = db_session.get(CharacterBackfillState, (user.id, True))
+    assert state.stories_updated_through == base + timedelta(minutes=3)
+    assert state.resume_after_story_id is None
+
+
+def test_backfill_characters_rereads_stories_edited_behind_the_cursor(
+    db_session, monkeypatch
+):
+    user = db_session.query(User).filter(User.username == "user@example.com").one()
+    base = datetime(2026, 3, 1, 12, 0, 0)
+    low = _add_story(db_session, user.id, "Low", [{"name": "Before"}], base)
+    _add_story(db_session, user.id, "High", [{"name": "High"}],
+               base + timedelta(minutes=30))
+
+    real_upsert = crud.upsert_characters_from_details
+    calls = []
+
+    def _edit_low_story_during_first_batch(db, user_id, details):
+        calls.append([d["name"] for d in details])
+        if len(calls) == 1:
+            # The lower-id story is edited while the run is in progress.
+            db.query(Story).filter(Story.id == low.id).update({
+                Story.main_characters: [{"name": "After"}],
+                Story.updated_at: base + timedelta(minutes=20),
+            })
+        return real_upsert(db, user_id, details)
+
+    monkeypatch.setattr(crud, "upsert_characters_from_details",
+                        _edit_low_story_during_first_batch)
+    result = crud.upsert_characters_from_user_stories(db_session, user.id, batch_size=1)
+
+    # The edit is newer than the cursor but older than the other story:
+    # a high-water mark on updated_at alone would have skipped it.
+    assert calls == [["Before"], ["After"], ["High"]]
+    assert result["stories_scanned"] == 3
+    assert crud.get_character_by_name_ci(db_session, user.id, "after") is not None
+    state = db_session.get(CharacterBackfillState, (user.id, True))
+    assert state.stories_updated_through == base + timedelta(minutes=30)
+
+
+def test_backfill_characters_reads_every_story_of_the_same_second(db_session):
+    user = db_session.query(User).filter(User.username == "user@example.com").one()
+    stories = [
+        Story(title=f"Same {i}", genre="Fantasy", owner_id=user.id,
+              main_characters=[{"name": f"Same{i}"}], num_pages=0)
+        for i in range(5)
+    ]
+    db_session.add_all(stories)
+    db_session.commit()
+    # Server-side timestamps, as written on every insert and update: on
+    # SQLite "YYYY-MM-DD HH:MM:SS" text, all in one second here.
+    db_session.execute(text(
+        "UPDATE stories SET updated_at = CURRENT_TIMESTAMP WHERE owner_id = :owner"),
+        {"owner": user.id})
+    db_session.commit()
+
+    result = crud.upsert_characters_from_user_stories(db_session, user.id, batch_size=2)
+
+    assert result == {"stories_scanned": 5, "upserted": 5}
+    for i in range(5):
+        assert crud.get_character_by_name_ci(db_session, user.id, f"same{i}") is not None
@@ -5,12 +5,17 @@ from typing import Optional
 import pytest
 from fastapi.testclient import TestClient
 
+from backend.settings import get_settings
+
+# Generated character images go to a temporary DATA_DIR.
+pytestmark = pytest.mark.usefixtures("data_dirs")
+
 
 def _cleanup_generated_file(file_path_for_db: Optional[str]):
     """Remove any generated image file and its parent folder under data/ to keep tests tidy."""
     if not file_path_for_db:
         return
-    abs_path = os.path.join("data", file_path_for_db)
+    abs_path = os.path.join(get_settings().data_dir, file_path_for_db)
     try:
         if os.path.isfile(abs_path):
             base_dir = os.path.dirname(abs_path)
@@ -65,7 +70,7 @@ def test_create_character_with_image_generation_mocked(client: TestClient, regul
     assert file_path_for_db.endswith(".png")
 
     # Verify file exists on disk relative to data/
-    abs_path = os.path.join("data", file_path_for_db)
+    abs_path = os.path.join(get_settings().data_dir, file_path_for_db)
     assert os.path.exists(abs_path)
 
     # Cleanup
@@ -191,7 +196,7 @@ def test_regenerate_image_sets_current_image(client: TestClient, regular_user_au
     ch1 = res_regen1.json()
     assert ch1["current_image"] is not None
     fp1 = ch1["current_image"]["file_path"]
-    assert os.path.exists(os.path.join("data", fp1))
+    assert os.path.exists(os.path.join(get_settings().data_dir, fp1))
 
     # Change the mock to produce a different byte sequence (not necessary but illustrative)
     def _fake_generate_image_v2(prompt, style, size):
@@ -210,7 +215,7 @@ def test_regenerate_image_sets_current_image(client: TestClient, regular_user_au
     ch2 = res_regen2.json()
     fp2 = ch2["current_image"]["file_path"]
     assert fp2 != fp1
-    assert os.path.exists(os.path.join("data", fp2))
+    assert os.path.exists(os.path.join(get_settings().data_dir, fp2))
 
     # Cleanup both images
     _cleanup_generated_file(fp1)
@@ -2,6 +2,8 @@ import os
 import uuid
 from datetime import UTC, datetime
 
+import pytest
+
 from backend.settings import get_settings
 from backend import crud
 from backend.database import User
@@ -9,6 +11,9 @@ from backend import schemas
 from backend.database import Story
 from fastapi.testclient import TestClient
 
+# Character images and story assets go to a temporary DATA_DIR.
+pytestmark = pytest.mark.usefixtures("data_dirs")
+
 
 def test_create_character_dedupes_by_name(client: TestClient, regular_user_auth_headers: dict):
     # Create initial character
@@ -333,3 +338,73 @@ def test_story_creation_merge_avoids_duplicate_names(
     names = [c["name"] for c in db_story.main_characters]
     assert names.count("MergeStar") == 1
     assert "NewChar" in names
+
+
+def test_batch_upsert_uses_one_insert_and_case_insensitive_key(
+    client: TestClient, db_session, regular_user_auth_headers: dict, sql_statements
+):
+    user = db_session.query(User).filter(User.username == "user@example.com").one()
+    existing = crud.upsert_character_from_detail(
+        db_session, user.id, {"name": "Mira", "description": "v1", "age": 9})
+
+    with sql_statements() as statements:
+        upserted = crud.upsert_characters_from_details(db_session, user.id, [
+            {"name": "  MIRA ", "description": None, "age": 10},
+            {"name": "Tobin", "gender": "male"},
+            {"name": "tobin", "clothing_style": "coat"},
+            {"description": "no name"},
+        ])
+    inserts = [s for s in statements if s.lstrip().upper().startswith("INSERT")]
+    assert len(inserts) == 1
+
+    assert [ch.name for ch in upserted] == ["Mira", "Tobin"]
+    assert upserted[0].id == existing.id
+    # None keeps the stored value; provided fields overwrite it.
+    assert upserted[0].description == "v1"
+    assert upserted[0].age == 10
+    assert upserted[1].gender == "male"
+    assert upserted[1].clothing_style == "coat"
+    assert crud.get_character_by_name_ci(db_session, user.id, "tOBIN").id == upserted[1].id
+
+
+def test_rename_onto_existing_name_conflicts(client: TestClient, regular_user_auth_headers: dict):
+    first = client.post("/api/v1/characters/", json={"name": "Ada"},
+                        headers=regular_user_auth_headers).json()
+    second = client.post("/api/v1/characters/", json={"name": "Bea"},
+                         headers=regular_user_auth_headers).json()
+
+    res = client.put(f"/api/v1/characters/{second['id']}", json={"name": "ADA"},
+                     headers=regular_user_auth_headers)
+    assert res.status_code == 409, res.text
+
+    # Re-casing a character's own name is allowed.
+    res = client.put(f"/api/v1/characters/{first['id']}", json={"name": "ADA"},
+                     headers=regular_user_auth_headers)
+    assert res.status_code == 200, res.text
+    assert res.json()["name"] == "ADA"
+
+
+def test_listing_reads_stored_thumbnail_without_loading_images(
+    client: TestClient,
+    db_session,
+    regular_user_auth_headers: dict,
+    sql_statements,
+):
+    user = db_session.query(User).filter(User.username == "user@example.com").one()
+    for i in range(3):
+        ch = crud.create_character(
+            db_session, user.id, schemas.CharacterCreate(name=f"Listed{i}"))
+        crud.add_character_image(
+            db_session, user.id, ch.id,
+            f"images/user_{user.id}/characters/{ch.id}/thumb.png",
+            prompt_used=None, image_style=None)
+        assert ch.thumbnail_path == f"images/user_{user.id}/characters/{ch.id}/thumb.png"
+
+    with sql_statements() as statements:
+        res = client.get("/api/v1/characters?page=1&page_size=50",
+                         headers=regular_user_auth_headers)
+    assert res.status_code == 200, res.text
+    thumbs = {i["name"]: i["thumbnail_path"] for i in res.json()["items"]}
+    assert all(thumbs[f"Listed{i}"] for i in range(3))
+    assert not any("character_images" in s for s in statements)
+    assert len(statements) == 3  # current user, count, page
@@ -347,6 +347,54 @@ def test_update_story_with_pages(db_session: Session, test_user: User):
     assert story.pages[1].page_number == 2
     assert story.pages[1].image_path == "/images/monster2.png"
 
+
+def test_build_generated_page_rows_coerces_page_numbers():
+    rows = crud.build_generated_page_rows(9, [
+        {"Page_number": "Title", "Text": "Cover", "image_url": "cover.png"},
+        {"Page_number": "2", "Text": "Two"},
+        {"Page_number": 3, "Text": "Three"},
+        {"Page_number": "bogus", "Text": "Bad"},
+        {"Text": "Missing"},
+    ])
+
+    assert [row["page_number"] for row in rows] == [0, 2, 3, 0, 0]
+    assert {row["story_id"] for row in rows} == {9}
+    assert rows[0]["editor_state"] == {
+        "original_text": "Cover", "original_image_path": "cover.png"}
+    assert len({tuple(sorted(row)) for row in rows}) == 1
+
+
+@pytest.mark.parametrize("page_count", [10, 200])
+def test_generated_content_pages_use_one_bulk_insert(
+    db_session: Session, test_user: User, sql_statements, page_count: int
+):
+    story_data = schemas.StoryBase(
+        title="Long Tale", genre="Fantasy", story_outline="Long", main_characters=[], num_pages=page_count)
+    story = crud.create_story_db_entry(
+        db=db_session, story_data=story_data, user_id=test_user.id, title="Long Tale")
+    story_id = story.id
+    content = {
+        "Title": "Long Tale",
+        "Pages": [
+            {"Page_number": "Title" if number == 0 else number,
+             "Text": f"Page {number}",
+             "image_url": f"images/page_{number}.png" if number else None}
+            for number in range(page_count + 1)
+        ],
+    }
+
+    with sql_statements() as statements:
+        crud.update_story_with_generated_content(db_session, story_id, content)
+
+    inserts = [s for s in statements if s.startswith("INSERT INTO pages")]
+    assert len(inserts) == 1
+    stored = db_session.query(Page).filter(Page.story_id == story_id).order_by(
+        Page.page_number).all()
+    assert [page.page_number for page in stored] == list(range(page_count + 1))
+    refreshed = db_session.query(Story).filter(Story.id == story_id).one()
+    assert refreshed.page_count == page_count + 1
+    assert refreshed.cover_image_path == "images/page_1.png"
+
 # Test Delete Story DB Entry
 
 
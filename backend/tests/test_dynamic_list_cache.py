@@ -0,0 +1,167 @@
+import pytest
+from sqlalchemy import text
+
+from backend import crud
+from backend.database import CacheVersion, DynamicList, DynamicListItem
+from backend.dynamic_list_cache import (
+    DYNAMIC_LISTS_VERSION_KEY,
+    DynamicListCache,
+    mark_dynamic_lists_changed,
+)
+from backend.settings import get_settings
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def genres(db_session):
+    db_session.add(DynamicList(list_name="genres", list_label="Genres"))
+    db_session.add_all([
+        DynamicListItem(list_name="genres", item_value="fantasy",
+                        item_label="Fantasy", is_active=True, sort_order=1),
+        DynamicListItem(list_name="genres", item_value="horror",
+                        item_label="Horror", is_active=False, sort_order=2),
+    ])
+    db_session.commit()
+
+
+@pytest.fixture
+def slow_version_checks(monkeypatch):
+    monkeypatch.setattr(get_settings(), "dynamic_list_cache_check_seconds", 60.0)
+
+
+def _version(db_session):
+    row = db_session.get(CacheVersion, DYNAMIC_LISTS_VERSION_KEY)
+    return row.version if row else 0
+
+
+def test_orm_writes_bump_shared_version(db_session, genres):
+    before = _version(db_session)
+    item = db_session.query(DynamicListItem).filter_by(item_value="horror").one()
+    item.is_active = True
+    db_session.commit()
+    assert _version(db_session) == before + 1
+
+
+def test_lookups_served_from_memory_between_version_checks(
+    db_session, genres, sql_statements, slow_version_checks
+):
+    assert [i.item_value for i in crud.get_active_dynamic_list_items(
+        db_session, "genres")] == ["fantasy"]
+
+    with sql_statements() as statements:
+        crud.get_active_dynamic_list_items(db_session, "genres")
+        crud.get_active_dynamic_list_item_by_value(db_session, "genres", "fantasy")
+        crud.get_public_list_items(db_session, "genres")
+    assert statements == []
+
+
+def test_commit_invalidates_local_snapshot(db_session, genres, slow_version_checks):
+    crud.get_active_dynamic_list_items(db_session, "genres")
+    db_session.add(DynamicListItem(list_name="genres", item_value="comedy",
+                                   item_label="Comedy", is_active=True,
+                                   sort_order=0))
+    db_session.commit()
+
+    assert [i.item_value for i in crud.get_active_dynamic_list_items(
+        db_session, "genres")] == ["comedy", "fantasy"]
+
+
+def test_other_worker_reloads_after_version_check(db_session, genres):
+    clock = FakeClock()
+    worker = DynamicListCache(clock=clock)  # simulates another process
+    assert [i.item_value for i in worker.get(db_session).active_items("genres")] \
+        == ["fantasy"]
+
+    # Raw SQL bypasses ORM events, so bump explicitly.
+    db_session.execute(text(
+        "UPDATE dynamic_list_items SET is_active = 1 WHERE item_value = 'horror'"))
+    mark_dynamic_lists_changed(db_session)
+    db_session.commit()
+
+    clock.now += get_settings().dynamic_list_cache_check_seconds / 2
+    assert len(worker.get(db_session).active_items("genres")) == 1
+    clock.now += get_settings().dynamic_list_cache_check_seconds
+    assert [i.item_value for i in worker.get(db_session).active_items("genres")] \
+        == ["fantasy", "horror"]
+
+
+def test_public_list_etag_and_admin_write_invalidation(
+    client, genres, admin_auth_headers
+):
+    first = client.get("/api/v1/dynamic-lists/genres/active-items")
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+    assert first.headers["cache-control"] == "public, no-cache"
+
+    not_modified = client.get("/api/v1/dynamic-lists/genres/active-items",
+                              headers={"If-None-Match": etag})
+    assert not_modified.status_code == 304
+
+    created = client.post(
+        "/api/v1/admin/dynamic-lists/genres/items",
+        json={"list_name": "genres", "item_value": "mystery",
+              "item_label": "Mystery", "sort_order": 5},
+        headers=admin_auth_headers,
+    )
+    assert created.status_code == 201, created.text
+
+    changed = client.get("/api/v1/dynamic-lists/genres/active-items",
+                         headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
+    assert [i["item_value"] for i in changed.json()] == ["fantasy", "mystery"]
+
+
+def test_bootstrap_returns_all_public_lists_compressed(
+    client, db_session, genres, sql_statements, slow_version_checks
+):
+    db_session.add(DynamicList(list_name="empty_list", list_label="Empty"))
+    db_session.commit()
+
+    response = client.get("/api/v1/dynamic-lists/bootstrap",
+                          headers={"Accept-Encoding": "gzip"})
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    body = response.json()
+    assert body["lists"] == {
+        "empty_list": [],
+        "genres": [{"item_value": "fantasy", "item_label": "Fantasy"}],
+    }
+    assert response.headers["etag"] == f'W/"{body["version"]}"'
+
+    # Precomputed: later requests do no database work between version checks.
+    with sql_statements() as statements:
+        plain = client.get("/api/v1/dynamic-lists/bootstrap",
+                           headers={"Accept-Encoding": "identity"})
+    assert statements == []
+    assert "content-encoding" not in plain.headers
+    assert plain.json() == body
+
+
+def test_bootstrap_version_changes_with_lists(client, genres, admin_auth_headers):
+    first = client.get("/api/v1/dynamic-lists/bootstrap")
+    etag = first.headers["etag"]
+    assert client.get("/api/v1/dynamic-lists/bootstrap",
+                      headers={"If-None-Match": etag}).status_code == 304
+
+    items = client.get("/api/v1/admin/dynamic-lists/genres/items",
+                       headers=admin_auth_headers).json()
+    item_id = next(i["id"] for i in items if i["item_value"] == "fantasy")
+    updated = client.put(f"/api/v1/admin/dynamic-lists/items/{item_id}",
+                         json={"item_label": "High Fantasy"},
+                         headers=admin_auth_headers)
+    assert updated.status_code == 200, updated.text
+
+    changed = client.get("/api/v1/dynamic-lists/bootstrap",
+                         headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.json()["version"] != first.json()["version"]
+    assert changed.json()["lists"]["genres"][0]["item_label"] == "High Fantasy"
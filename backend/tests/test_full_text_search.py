@@ -0,0 +1,142 @@
+from sqlalchemy import text
+
+from backend import crud
+from backend.database import Character, Page, Story, User
+
+
+def _user(db_session, username="user@example.com"):
+    return db_session.query(User).filter(User.username == username).one()
+
+
+def _story(db_session, owner_id, title, outline=None, pages=(), is_draft=False):
+    story = Story(title=title, genre="Fantasy", story_outline=outline,
+                  owner_id=owner_id, num_pages=len(pages), is_draft=is_draft)
+    db_session.add(story)
+    db_session.flush()
+    for number, page_text in enumerate(pages, start=1):
+        db_session.add(Page(story_id=story.id, page_number=number, text=page_text))
+    db_session.commit()
+    return story
+
+
+def test_story_search_ranks_title_matches_first_and_follows_page_edits(
+    client, db_session, regular_user_auth_headers
+):
+    user = _user(db_session)
+    in_page = _story(db_session, user.id, "A Quiet Night",
+                     pages=["The lighthouse keeper slept."])
+    in_title = _story(db_session, user.id, "The Lighthouse", outline="By the sea")
+    _story(db_session, user.id, "Unrelated", outline="Forest tale")
+    _story(db_session, _user(db_session, "admin@example.com").id,
+           "Lighthouse of another user")
+
+    res = client.get("/api/v1/stories/search?q=lightho",
+                     headers=regular_user_auth_headers)
+    assert res.status_code == 200, res.text
+    assert [s["id"] for s in res.json()] == [in_title.id, in_page.id]
+
+    # Page edits and story deletes keep the index in sync.
+    page = db_session.query(Page).filter(Page.story_id == in_page.id).one()
+    page.text = "The keeper slept by the harbour."
+    db_session.commit()
+    assert [s.id for s in crud.search_stories(db_session, user.id, "lighthouse")] \
+        == [in_title.id]
+    assert [s.id for s in crud.search_stories(db_session, user.id, "harbour keeper")] \
+        == [in_page.id]
+
+    db_session.delete(db_session.get(Story, in_title.id))
+    db_session.commit()
+    assert crud.search_stories(db_session, user.id, "lighthouse") == []
+
+
+def test_story_search_keyset_pages_do_not_overlap(
+    client, db_session, regular_user_auth_headers
+):
+    user = _user(db_session)
+    for i in range(5):
+        _story(db_session, user.id, f"Dragon {i}", outline="dragon " * (i + 1),
+               is_draft=(i == 0))
+
+    seen = []
+    cursor = None
+    while True:
+        params = {"q": "dragon", "limit": 2, "include_drafts": "false"}
+        if cursor:
+            params["cursor"] = cursor
+        res = client.get("/api/v1/stories/search", params=params,
+                         headers=regular_user_auth_headers)
+        assert res.status_code == 200, res.text
+        ranks = [s["rank"] for s in res.json()]
+        assert ranks == sorted(ranks)
+        seen.extend(s["id"] for s in res.json())
+        cursor = res.headers.get("x-next-cursor")
+        if not cursor:
+            break
+    assert len(seen) == len(set(seen)) == 4
+
+    bad = client.get("/api/v1/stories/search?q=dragon&cursor=garbage",
+                     headers=regular_user_auth_headers)
+    assert bad.status_code == 400
+
+
+def test_query_syntax_is_not_interpreted(db_session):
+    user = _user(db_session)
+    story = _story(db_session, user.id, "Owl NEAR the barn")
+    assert crud.search_stories(db_session, user.id, '"') == []
+    assert [s.id for s in crud.search_stories(
+        db_session, user.id, 'owl NEAR "barn')] == [story.id]
+
+
+def test_character_search_and_list_filter_use_index(
+    client, db_session, regular_user_auth_headers
+):
+    user = _user(db_session)
+    db_session.add_all([
+        Character(user_id=user.id, name="Mira", key_traits="brave, curious"),
+        Character(user_id=user.id, name="Tobin", description="A brave knight"),
+        Character(user_id=user.id, name="Brave Heart"),
+        Character(user_id=user.id, name="Quill"),
+    ])
+    db_session.commit()
+
+    res = client.get("/api/v1/characters/search?q=brave",
+                     headers=regular_user_auth_headers)
+    assert res.status_code == 200, res.text
+    names = [c["name"] for c in res.json()]
+    assert names[0] == "Brave Heart"
+    assert set(names) == {"Brave Heart", "Mira", "Tobin"}
+
+    listed = client.get("/api/v1/characters?q=brav",
+                        headers=regular_user_auth_headers).json()
+    assert listed["total"] == 3
+
+    # Raw SQL writes are indexed too.
+    db_session.execute(text("UPDATE characters SET key_traits = 'brave' "
+                            "WHERE name = 'Quill'"))
+    db_session.commit()
+    assert len(crud.search_characters(db_session, user.id, "brave")) == 4
+
+
+def test_page_writes_refresh_each_story_document_once(db_session, sql_statements):
+    user = _user(db_session)
+    story = _story(db_session, user.id, "Harbour Tales")
+    content = {"Title": "Harbour Tales", "Pages": [
+        {"Page_number": number, "Text": f"Gull number {number} sang."}
+        for number in range(1, 31)
+    ]}
+
+    with sql_statements() as statements:
+        crud.update_story_with_generated_content(db_session, story.id, content)
+    # One statement-level refresh, not one rebuild per inserted page.
+    assert len([s for s in statements if "story_search_fts" in s]) == 2
+    assert db_session.execute(text(
+        "SELECT name FROM sqlite_master WHERE type = 'trigger' "
+        "AND tbl_name = 'pages'")).all() == []
+    assert [s.id for s in crud.search_stories(db_session, user.id, "gull")] \
+        == [story.id]
+
+    # ORM page deletes are refreshed after the flush.
+    for page in db_session.query(Page).filter(Page.story_id == story.id):
+        db_session.delete(page)
+    db_session.commit()
+    assert crud.search_stories(db_session, user.id, "gull") == []
@@ -1,19 +1,25 @@
-from unittest.mock import MagicMock, call, patch
+from unittest.mock import MagicMock, patch
 import pytest
 
 from backend import ai_services
+from backend import settings as settings_mod
 from backend.ai_services import generate_character_reference_image, generate_image_for_page
 from backend.database import DynamicList, DynamicListItem
 from backend.image_style_mapping import DEFAULT_IMAGE_STYLE_MAP
 
 
+@pytest.fixture(autouse=True)
+def data_dir(monkeypatch, tmp_path):
+    """Write generated images and prompts to a temporary DATA_DIR."""
+
+    monkeypatch.setenv("DATA_DIR", str(tmp_path))
+    monkeypatch.setattr(settings_mod, "_settings_instance", None, raising=False)
+    return tmp_path
+
+
 @pytest.mark.asyncio
 @patch("backend.ai_services.asyncio.to_thread")
-@patch("backend.ai_services.os.makedirs")
-@patch("builtins.open", new_callable=MagicMock)
 async def test_generate_image_for_page_uses_dynamic_default_style_and_prompt_modifier(
-    mock_open,
-    _mock_makedirs,
     mock_to_thread,
     db_session,
 ):
@@ -46,16 +52,6 @@ async def test_generate_image_for_page_uses_dynamic_default_style_and_prompt_mod
     )
     db_session.commit()
 
-    mock_image_handle = MagicMock()
-    mock_prompt_handle = MagicMock()
-
-    def open_side_effect(path, *args, **kwargs):
-        if path == "/tmp/page.png":
-            return mock_image_handle
-        return mock_prompt_handle
-
-    mock_open.side_effect = open_side_effect
-
     result = await generate_image_for_page(
         page_content="A cat on a sofa",
         style_reference="Default",
@@ -76,11 +72,7 @@ async def test_generate_image_for_page_uses_dynamic_default_style_and_prompt_mod
 
 @pytest.mark.asyncio
 @patch("backend.ai_services.asyncio.to_thread")
-@patch("backend.ai_services.os.makedirs")
-@patch("builtins.open", new_callable=MagicMock)
 async def test_generate_character_reference_image_uses_prompt_modifier_when_enabled(
-    mock_open,
-    _mock_makedirs,
     mock_to_thread,
     db_session,
 ):
@@ -116,16 +108,6 @@ async def test_generate_character_reference_image_uses_prompt_modifier_when_enab
     mock_story_input = MagicMock()
     mock_story_input.image_style = "Fantasy"
 
-    mock_image_handle = MagicMock()
-    mock_prompt_handle = MagicMock()
-
-    def open_side_effect(path, *args, **kwargs):
-        if path == "/tmp/Anya_ref_story_1.png":
-            return mock_image_handle
-        return mock_prompt_handle
-
-    mock_open.side_effect = open_side_effect
-
     await generate_character_reference_image(
         character=mock_character,
         story_input=mock_story_input,
@@ -145,27 +127,13 @@ async def test_generate_character_reference_image_uses_prompt_modifier_when_enab
 
 @pytest.mark.asyncio
 @patch("backend.ai_services.asyncio.to_thread")
-@patch("backend.ai_services.os.makedirs")
-@patch("builtins.open", new_callable=MagicMock)
 async def test_generate_image_for_page_falls_back_to_default_map_when_dynamic_list_absent(
-    mock_open,
-    _mock_makedirs,
     mock_to_thread,
     db_session,
 ):
     ai_services._settings.enable_image_style_mapping = True
     mock_to_thread.return_value = b"img"
 
-    mock_image_handle = MagicMock()
-    mock_prompt_handle = MagicMock()
-
-    def open_side_effect(path, *args, **kwargs):
-        if path == "/tmp/fallback.png":
-            return mock_image_handle
-        return mock_prompt_handle
-
-    mock_open.side_effect = open_side_effect
-
     business_style = "Photorealistic"
     result = await generate_image_for_page(
         page_content="A cat on a sofa",
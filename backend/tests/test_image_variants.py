@@ -0,0 +1,57 @@
+import io
+
+import pytest
+from PIL import Image
+
+from backend import image_variants, storage
+
+AVIF_AND_WEBP = "image/avif,image/webp,image/*;q=0.8"
+
+
+@pytest.fixture
+def asset_storage(data_dirs, configure_settings):
+    configure_settings(IMAGE_VARIANT_WIDTHS="256,768",
+                       IMAGE_VARIANT_FORMATS="avif,webp")
+    return storage.get_storage()
+
+
+def test_save_image_writes_smaller_variants_beside_the_original(asset_storage, make_png):
+    key = "images/user_1/characters/3/0f8fad5b-d9cb-469f-a165-70867728950e.png"
+    original = make_png(1024, 1024)
+    image_variants.save_image(key, original)
+
+    assert asset_storage.get(key) == original
+    formats = image_variants.configured_formats()
+    assert "webp" in formats
+    for width in (256, 768):
+        for fmt in formats:
+            data = asset_storage.get(image_variants.variant_key(key, width, fmt))
+            with Image.open(io.BytesIO(data)) as variant:
+                assert variant.size == (width, width)
+            assert len(data) < len(original)
+
+
+def test_negotiate_picks_smallest_sufficient_width_and_best_accepted_format(asset_storage, make_png):
+    key = "images/user_1/story_2/page_1_ab12cd34_story_2_p1.png"
+    image_variants.save_image(key, make_png(1024, 1024))
+    best = "avif" if "avif" in image_variants.configured_formats() else "webp"
+
+    assert image_variants.negotiate(asset_storage, key, AVIF_AND_WEBP, 200) == (
+        f"images/user_1/story_2/page_1_ab12cd34_story_2_p1.w256.{best}")
+    assert image_variants.negotiate(asset_storage, key, "image/webp", 300) == (
+        "images/user_1/story_2/page_1_ab12cd34_story_2_p1.w768.webp")
+    # No width, a width above every variant, or no modern format: the original.
+    assert image_variants.negotiate(asset_storage, key, AVIF_AND_WEBP, None) == key
+    assert image_variants.negotiate(asset_storage, key, AVIF_AND_WEBP, 2000) == key
+    assert image_variants.negotiate(asset_storage, key, "image/png,image/webp;q=0", 256) == key
+
+
+def test_small_or_unreadable_images_get_no_variants(asset_storage, make_png):
+    small = "images/user_1/characters/3/small.png"
+    image_variants.save_image(small, make_png(200, 100))
+    assert list(asset_storage.list_keys("images")) == [small]
+
+    broken = "images/user_1/characters/3/broken.png"
+    image_variants.save_image(broken, b"not an image")
+    assert asset_storage.get(broken) == b"not an image"
+    assert image_variants.negotiate(asset_storage, broken, AVIF_AND_WEBP, 256) == broken
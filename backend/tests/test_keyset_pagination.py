@@ -0,0 +1,183 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from backend import crud, pagination
+from backend.database import Character, DynamicList, DynamicListItem, Story, User
+
+
+def _regular_user(db_session: Session) -> User:
+    return db_session.query(User).filter(User.username == "user@example.com").one()
+
+
+def _add_stories(db_session: Session, owner_id: int, count: int, same_timestamp: bool = True):
+    base = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    for index in range(count):
+        created_at = base if same_timestamp else base + timedelta(minutes=index)
+        db_session.add(Story(
+            title=f"Story {index}",
+            genre="Fantasy",
+            story_outline="An outline.",
+            main_characters=[],
+            num_pages=1,
+            owner_id=owner_id,
+            is_draft=False,
+            created_at=created_at,
+        ))
+    db_session.commit()
+
+
+def _walk_stories(db_session: Session, owner_id: int, limit: int):
+    seen = []
+    cursor = None
+    while True:
+        page = crud.get_stories_by_user(
+            db_session, user_id=owner_id, limit=limit, cursor=cursor)
+        seen.extend(story.id for story in page)
+        cursor = crud.next_page_cursor("stories", page, limit)
+        if cursor is None:
+            return seen
+
+
+@pytest.mark.parametrize("same_timestamp", [True, False])
+def test_story_cursor_walk_matches_offset_order(db_session: Session, same_timestamp: bool):
+    owner = _regular_user(db_session)
+    _add_stories(db_session, owner.id, 7, same_timestamp=same_timestamp)
+
+    offset_order = [
+        story.id for story in crud.get_stories_by_user(db_session, user_id=owner.id)
+    ]
+    assert _walk_stories(db_session, owner.id, limit=3) == offset_order
+    assert len(offset_order) == 7
+
+
+def test_cursor_survives_anchor_row_deletion(db_session: Session):
+    owner = _regular_user(db_session)
+    _add_stories(db_session, owner.id, 5, same_timestamp=False)
+
+    first_page = crud.get_stories_by_user(db_session, user_id=owner.id, limit=2)
+    cursor = crud.next_page_cursor("stories", first_page, 2)
+    anchor_id = first_page[-1].id
+    db_session.query(Story).filter(Story.id == anchor_id).delete()
+    db_session.commit()
+
+    second_page = crud.get_stories_by_user(
+        db_session, user_id=owner.id, limit=2, cursor=cursor)
+    assert [story.title for story in second_page] == ["Story 2", "Story 1"]
+
+
+def test_cursor_rejected_for_a_different_list(db_session: Session):
+    owner = _regular_user(db_session)
+    _add_stories(db_session, owner.id, 2)
+    page = crud.get_stories_by_user(db_session, user_id=owner.id, limit=1)
+    cursor = crud.next_page_cursor("stories", page, 1)
+
+    with pytest.raises(pagination.InvalidCursorError):
+        crud.list_characters(db_session, owner.id, cursor=cursor)
+    with pytest.raises(pagination.InvalidCursorError):
+        crud.get_stories_by_user(db_session, user_id=owner.id, cursor="not-a-cursor")
+
+
+def test_dynamic_list_items_cursor_keeps_sort_order(db_session: Session):
+    db_session.add(DynamicList(list_name="genres", list_label="Genres"))
+    for index, (label, sort_order) in enumerate(
+        [("Beta", 1), ("Alpha", 1), ("Gamma", 0), ("Delta", 2), ("Epsilon", 2)]
+    ):
+        db_session.add(DynamicListItem(
+            list_name="genres",
+            item_value=f"value-{index}",
+            item_label=label,
+            sort_order=sort_order,
+        ))
+    db_session.commit()
+
+    labels = []
+    cursor = None
+    while True:
+        page = crud.get_dynamic_list_items(
+            db_session, list_name="genres", limit=2, cursor=cursor)
+        labels.extend(item.item_label for item in page)
+        cursor = crud.next_page_cursor("dynamic_list_items", page, 2)
+        if cursor is None:
+            break
+    assert labels == ["Gamma", "Alpha", "Beta", "Delta", "Epsilon"]
+
+
+def test_read_user_stories_exposes_next_cursor_header(
+    client: TestClient, db_session: Session, regular_user_auth_headers: dict
+):
+    owner = _regular_user(db_session)
+    _add_stories(db_session, owner.id, 3)
+
+    first = client.get("/api/v1/stories/?limit=2",
+                       headers=regular_user_auth_headers)
+    assert first.status_code == 200, first.text
+    cursor = first.headers.get(pagination.NEXT_CURSOR_HEADER)
+    assert cursor
+
+    second = client.get(
+        "/api/v1/stories/", params={"limit": 2, "cursor": cursor},
+        headers=regular_user_auth_headers)
+    assert second.status_code == 200, second.text
+    assert pagination.NEXT_CURSOR_HEADER not in second.headers
+    ids = [item["id"] for item in first.json() + second.json()]
+    assert len(ids) == len(set(ids)) == 3
+
+    bad = client.get("/api/v1/stories/", params={"cursor": "garbage"},
+                     headers=regular_user_auth_headers)
+    assert bad.status_code == 400
+
+
+def test_characters_and_admin_lists_return_next_cursor(
+    client: TestClient,
+    db_session: Session,
+    regular_user_auth_headers: dict,
+    admin_auth_headers: dict,
+):
+    owner = _regular_user(db_session)
+    for index in range(3):
+        db_session.add(Character(user_id=owner.id, name=f"Char {index}"))
+    db_session.commit()
+
+    first = client.get("/api/v1/characters/?page_size=2",
+                       headers=regular_user_auth_headers)
+    assert first.status_code == 200, first.text
+    cursor = first.json()["next_cursor"]
+    assert cursor
+    second = client.get(
+        "/api/v1/characters/", params={"page_size": 2, "cursor": cursor},
+        headers=regular_user_auth_headers)
+    body = second.json()
+    assert body["next_cursor"] is None
+    assert body["total"] is None  # not counted again on cursor pages
+    assert first.json()["total"] == 3
+    counted = client.get(
+        "/api/v1/characters/",
+        params={"page_size": 2, "cursor": cursor, "include_total": True},
+        headers=regular_user_auth_headers)
+    assert counted.json()["total"] == 3
+    assert len(first.json()["items"]) + len(body["items"]) == 3
+
+    users_first = client.get("/api/v1/admin/management/users/?limit=1",
+                             headers=admin_auth_headers)
+    assert users_first.status_code == 200, users_first.text
+    users_cursor = users_first.headers[pagination.NEXT_CURSOR_HEADER]
+    users_second = client.get(
+        "/api/v1/admin/management/users/",
+        params={"limit": 1, "cursor": users_cursor},
+        headers=admin_auth_headers)
+    assert users_second.status_code == 200
+    assert users_second.json()[0]["id"] != users_first.json()[0]["id"]
+
+    _add_stories(db_session, owner.id, 2)
+    stories_first = client.get(
+        "/api/v1/admin/moderation/stories?page_size=1",
+        headers=admin_auth_headers)
+    stories_cursor = stories_first.json()["next_cursor"]
+    stories_second = client.get(
+        "/api/v1/admin/moderation/stories",
+        params={"page_size": 1, "cursor": stories_cursor},
+        headers=admin_auth_headers)
+    assert stories_second.json()["items"][0]["id"] != stories_first.json()["items"][0]["id"]
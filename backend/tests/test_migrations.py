@@ -0,0 +1,46 @@
+"""Round-trip checks for the Alembic revisions under alembic/versions/."""
+
+from pathlib import Path
+
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import create_engine, inspect, text
+
+from backend.database import Base
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+
+
+def _alembic_config() -> Config:
+    # No ini file: alembic/env.py would otherwise reconfigure logging.
+    config = Config()
+    config.set_main_option("script_location", str(REPO_ROOT / "alembic"))
+    return config
+
+
+def _triggers(engine) -> set:
+    with engine.connect() as conn:
+        return set(conn.scalars(text(
+            "SELECT name FROM sqlite_master WHERE type = 'trigger'")))
+
+
+def test_upgrade_downgrade_round_trip(tmp_path, monkeypatch):
+    url = f"sqlite:///{tmp_path / 'migrations.db'}"
+    monkeypatch.setenv("DATABASE_URL", url)
+    engine = create_engine(url)
+    Base.metadata.create_all(engine)
+    config = _alembic_config()
+
+    command.upgrade(config, "head")
+    upgraded = _triggers(engine)
+    assert "stories_search_ai" in upgraded
+    assert "pages_search_ai" not in upgraded
+
+    command.downgrade(config, "base")
+    assert _triggers(engine) == set()
+    assert "deleted_at" not in {
+        column["name"] for column in inspect(engine).get_columns("stories")}
+
+    command.upgrade(config, "head")
+    assert _triggers(engine) == upgraded
+    engine.dispose()
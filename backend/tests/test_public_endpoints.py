@@ -679,6 +679,88 @@ def test_story_page_image_endpoint_enforces_story_ownership(
     assert legacy_public_response.status_code == 404
 
 
+def test_story_response_embeds_signed_page_image_urls(
+    client: TestClient,
+    db_session: Session,
+    regular_user_auth_headers: dict,
+    monkeypatch,
+    tmp_path,
+):
+    monkeypatch.setenv("DATA_DIR", str(tmp_path))
+    monkeypatch.setattr(settings_mod, "_settings_instance", None, raising=False)
+    owner = db_session.query(User).filter(
+        User.username == "user@example.com").first()
+    story = Story(title="Signed", story_outline="Outline", genre="Fantasy",
+                  main_characters=[], num_pages=1, owner_id=owner.id, is_draft=False)
+    db_session.add(story)
+    db_session.commit()
+    image_rel = f"images/user_{owner.id}/story_{story.id}/page_1.png"
+    os.makedirs(tmp_path / os.path.dirname(image_rel))
+    (tmp_path / image_rel).write_bytes(b"private-image")
+    db_session.add(Page(story_id=story.id, page_number=1, text="Text",
+                        image_path=image_rel))
+    db_session.commit()
+
+    story_response = client.get(
+        f"/api/v1/stories/{story.id}", headers=regular_user_auth_headers)
+    image_url = story_response.json()["pages"][0]["image_url"]
+    assert image_url.startswith(f"/signed_content/{image_rel}?expires=")
+
+    # No auth header needed; the signature is the credential.
+    image_response = client.get(image_url)
+    assert image_response.status_code == 200
+    assert image_response.content == b"private-image"
+    assert image_response.headers["cache-control"].startswith("private, max-age=")
+
+    tampered = image_url.replace("page_1.png", "page_2.png")
+    assert client.get(tampered).status_code == 403
+    assert client.get(f"/signed_content/{image_rel}").status_code == 403
+
+    monkeypatch.setenv("SIGNED_URL_ACCEL_PREFIX", "/_protected_data/")
+    monkeypatch.setattr(settings_mod, "_settings_instance", None, raising=False)
+    accel_response = client.get(image_url)
+    assert accel_response.status_code == 200
+    assert accel_response.headers["x-accel-redirect"] == f"/_protected_data/{image_rel}"
+    assert accel_response.content == b""
+
+
+def test_story_page_image_endpoint_supports_conditional_and_range_requests(
+    client: TestClient,
+    db_session: Session,
+    regular_user_auth_headers: dict,
+    monkeypatch,
+    tmp_path,
+):
+    monkeypatch.setenv("DATA_DIR", str(tmp_path))
+    monkeypatch.setattr(settings_mod, "_settings_instance", None, raising=False)
+    owner = db_session.query(User).filter(
+        User.username == "user@example.com").first()
+    story = Story(title="Cached", story_outline="Outline", genre="Fantasy",
+                  main_characters=[], num_pages=1, owner_id=owner.id, is_draft=False)
+    db_session.add(story)
+    db_session.commit()
+    image_rel = storage_paths.page_image_paths(owner.id, story.id, 1)[1]
+    os.makedirs(tmp_path / os.path.dirname(image_rel))
+    (tmp_path / image_rel).write_bytes(b"private-image")
+    page = Page(story_id=story.id, page_number=1, text="Text", image_path=image_rel)
+    db_session.add(page)
+    db_session.commit()
+    url = f"/api/v1/stories/{story.id}/pages/{page.id}/image"
+
+    response = client.get(url, headers=regular_user_auth_headers)
+    assert response.status_code == 200
+    assert response.headers["cache-control"] == "private, max-age=31536000, immutable"
+
+    revalidated = client.get(url, headers={
+        **regular_user_auth_headers, "If-None-Match": response.headers["etag"]})
+    assert revalidated.status_code == 304
+    assert revalidated.content == b""
+
+    partial = client.get(url, headers={**regular_user_auth_headers, "Range": "bytes=0-6"})
+    assert partial.status_code == 206
+    assert partial.content == b"private"
+
+
 def test_regenerate_story_page_image_uses_text_position_guidance(
     client: TestClient,
     db_session: Session,
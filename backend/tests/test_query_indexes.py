@@ -0,0 +1,188 @@
+"""Query-plan regression tests for the composite/partial query indexes."""
+
+import pytest
+from sqlalchemy.orm import Session
+
+from backend import asset_gc, crud, database, schemas, storage
+from backend.database import Page, Story, StoryGenerationTask, User
+
+
+def _query_plan(db: Session, statement: str, parameters) -> str:
+    """Return SQLite's EXPLAIN QUERY PLAN output as one string."""
+
+    raw = db.connection().connection.driver_connection
+    rows = raw.execute(f"EXPLAIN QUERY PLAN {statement}", parameters).fetchall()
+    return "\n".join(str(row[-1]) for row in rows)
+
+
+def _plan_for(db: Session, sql_statements, table: str, call) -> str:
+    """Run `call` and return the query plan of its first SELECT on `table`."""
+
+    with sql_statements(with_parameters=True) as captured:
+        call()
+    for statement, parameters in captured:
+        if statement.lstrip().upper().startswith("SELECT") and f"FROM {table}" in statement:
+            return _query_plan(db, statement, parameters)
+    raise AssertionError(f"No SELECT on {table} was executed")
+
+
+@pytest.fixture
+def owner(db_session: Session) -> User:
+    return db_session.query(User).filter(User.username == "user@example.com").one()
+
+
+def test_query_indexes_exist_on_tables(db_session: Session):
+    names = {
+        index.name
+        for table in database.Base.metadata.sorted_tables
+        for index in table.indexes
+    }
+    assert set(database.QUERY_INDEX_NAMES) <= names
+    assert set(database.ASSET_REFERENCE_INDEX_NAMES) <= names
+
+
+def test_get_stories_by_user_uses_owner_index(
+    db_session: Session, owner: User, sql_statements
+):
+    plan = _plan_for(
+        db_session,
+        sql_statements,
+        "stories",
+        lambda: crud.get_stories_by_user(db_session, user_id=owner.id),
+    )
+    assert "ix_stories_owner_created" in plan
+    assert "TEMP B-TREE" not in plan
+
+    plan = _plan_for(
+        db_session,
+        sql_statements,
+        "stories",
+        lambda: crud.get_stories_by_user(
+            db_session, user_id=owner.id, include_drafts=False),
+    )
+    assert "ix_stories_owner_draft_created" in plan
+    assert "TEMP B-TREE" not in plan
+
+
+def test_get_story_by_title_and_owner_uses_owner_title_index(
+    db_session: Session, owner: User, sql_statements
+):
+    plan = _plan_for(
+        db_session,
+        sql_statements,
+        "stories",
+        lambda: crud.get_story_by_title_and_owner(
+            db_session, title="Any", user_id=owner.id),
+    )
+    assert "ix_stories_owner_title" in plan
+
+
+def test_list_stories_admin_uses_partial_visible_index(
+    db_session: Session, owner: User, sql_statements
+):
+    with sql_statements(with_parameters=True) as captured:
+        crud.list_stories_admin(db_session)
+    item_query = next(
+        (statement, parameters)
+        for statement, parameters in captured
+        if "ORDER BY stories.created_at DESC" in statement
+    )
+    plan = _query_plan(db_session, *item_query)
+    assert "ix_stories_visible_created" in plan
+    assert "TEMP B-TREE" not in plan
+
+    with sql_statements(with_parameters=True) as captured:
+        crud.list_stories_admin(db_session, user_id=owner.id)
+    item_query = next(
+        (statement, parameters)
+        for statement, parameters in captured
+        if "ORDER BY stories.created_at DESC" in statement
+    )
+    assert "USING INDEX ix_stories_owner_" in _query_plan(
+        db_session, *item_query)
+
+
+def test_page_lookup_by_story_and_number_uses_composite_index(
+    db_session: Session, owner: User, sql_statements
+):
+    story = Story(title="Indexed", genre="Fantasy", owner_id=owner.id)
+    db_session.add(story)
+    db_session.commit()
+    db_session.add(Page(story_id=story.id, page_number=0, text="Indexed"))
+    db_session.commit()
+
+    plan = _plan_for(
+        db_session,
+        sql_statements,
+        "pages",
+        lambda: crud.update_story_title(db_session, story.id, "Renamed"),
+    )
+    assert "ix_pages_story_page_number" in plan
+
+
+def test_task_window_queries_use_task_indexes(db_session: Session, sql_statements):
+    since = "2000-01-01"
+    plan = _plan_for(
+        db_session,
+        sql_statements,
+        "story_generation_tasks",
+        lambda: db_session.query(StoryGenerationTask.id).filter(
+            StoryGenerationTask.created_at >= since,
+            StoryGenerationTask.status
+            == schemas.GenerationTaskStatus.COMPLETED.value,
+        ).all(),
+    )
+    assert "ix_story_generation_tasks_status_created" in plan
+
+    plan = _plan_for(
+        db_session,
+        sql_statements,
+        "story_generation_tasks",
+        lambda: db_session.query(StoryGenerationTask.id).filter(
+            StoryGenerationTask.created_at >= since).all(),
+    )
+    assert "ix_story_generation_tasks_created_status" in plan
+
+
+def test_dynamic_list_usage_counts_use_the_column_index(
+    db_session: Session, sql_statements
+):
+    plan = _plan_for(
+        db_session,
+        sql_statements,
+        "stories",
+        lambda: crud.get_dynamic_list_usage_counts(
+            db_session, "genres", values=["Fantasy", "Sci-Fi"]),
+    )
+    assert "ix_stories_genre" in plan
+    assert "SCAN stories" not in plan
+
+    plan = _plan_for(
+        db_session,
+        sql_statements,
+        "stories",
+        lambda: crud.get_dynamic_list_usage_counts(db_session, "genres"),
+    )
+    assert "ix_stories_genre" in plan
+    assert "SCAN stories" not in plan
+
+
+def test_asset_gc_reference_queries_use_indexes(
+    db_session: Session, sql_statements, tmp_path
+):
+    asset_storage = storage.LocalStorage(str(tmp_path))
+    asset_storage.put("images/user_1/story_1/page_1.w256.webp", b"variant")
+
+    with sql_statements(with_parameters=True) as captured:
+        list(asset_gc.find_orphans(db_session, asset_storage, batch_size=2))
+
+    plans = [
+        _query_plan(db_session, statement, parameters)
+        for statement, parameters in captured
+        if statement.lstrip().upper().startswith("SELECT")
+    ]
+    # Per column: the keyset stream, the exact and the variant lookup.
+    assert len(plans) == 3 * len(database.ASSET_REFERENCE_INDEX_NAMES)
+    for plan in plans:
+        # An ordered index walk (SCAN ... USING INDEX) stops at the LIMIT.
+        assert "USING" in plan and "TEMP B-TREE" not in plan, plan
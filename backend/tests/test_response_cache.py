@@ -0,0 +1,137 @@
+import threading
+
+from backend import monitoring_router
+from backend.database import Story, User
+from backend.response_cache import TTLCache, compute_etag, etag_matches
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_ttl_cache_serves_fresh_then_reloads_after_expiry():
+    clock = FakeClock()
+    cache = TTLCache(clock=clock)
+    calls = []
+
+    def loader():
+        calls.append(clock.now)
+        return {"n": len(calls)}
+
+    first = cache.get("k", loader, ttl=10)
+    clock.now += 5
+    assert cache.get("k", loader, ttl=10) is first
+    clock.now += 10  # expired, no stale window
+    assert cache.get("k", loader, ttl=10).value == {"n": 2}
+    assert len(calls) == 2
+
+
+def test_ttl_cache_serves_stale_while_refreshing_in_background():
+    clock = FakeClock()
+    cache = TTLCache(clock=clock)
+    refreshed = threading.Event()
+    release = threading.Event()
+
+    def refresh():
+        release.wait(5)
+        refreshed.set()
+        return {"v": "new"}
+
+    cache.get("k", lambda: {"v": "old"}, ttl=10)
+    clock.now += 15
+
+    stale = cache.get("k", lambda: {"v": "sync"}, ttl=10,
+                      stale_ttl=30, refresh=refresh)
+    # A second stale hit while refreshing must not start another refresh.
+    again = cache.get("k", lambda: {"v": "sync"}, ttl=10,
+                      stale_ttl=30, refresh=refresh)
+    assert stale.value == again.value == {"v": "old"}
+
+    release.set()
+    assert refreshed.wait(5)
+    for _ in range(100):
+        if cache.get("k", lambda: None, ttl=10).value == {"v": "new"}:
+            break
+        threading.Event().wait(0.01)
+    assert cache.get("k", lambda: None, ttl=10).value == {"v": "new"}
+
+
+def test_zero_ttl_bypasses_cache():
+    cache = TTLCache(clock=FakeClock())
+    values = iter([1, 2])
+    assert cache.get("k", lambda: next(values), ttl=0).value == 1
+    assert cache.get("k", lambda: next(values), ttl=0).value == 2
+
+
+def test_etag_matching_is_weak_and_handles_lists():
+    etag = compute_etag({"a": 1})
+    assert etag.startswith('W/"')
+    assert compute_etag({"a": 1}) == etag
+    assert compute_etag({"a": 2}) != etag
+    assert etag_matches(etag, etag)
+    assert etag_matches(etag.removeprefix("W/"), etag)
+    assert etag_matches(f'"other", {etag}', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches('"other"', etag)
+    assert not etag_matches(None, etag)
+
+
+def test_admin_stats_cached_with_etag_revalidation(client, db_session, admin_auth_headers):
+    first = client.get("/api/v1/admin/stats", headers=admin_auth_headers)
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+    assert first.headers["cache-control"] == "private, no-cache"
+
+    admin = db_session.query(User).filter(
+        User.username == "admin@example.com").one()
+    db_session.add(Story(title="New", genre="Fantasy", owner_id=admin.id,
+                         num_pages=1, is_draft=False))
+    db_session.commit()
+
+    # Within the TTL the cached payload (and ETag) is reused.
+    cached = client.get("/api/v1/admin/stats", headers=admin_auth_headers)
+    assert cached.headers["etag"] == etag
+    assert cached.json() == first.json()
+
+    not_modified = client.get(
+        "/api/v1/admin/stats",
+        headers={**admin_auth_headers, "If-None-Match": etag},
+    )
+    assert not_modified.status_code == 304
+    assert not_modified.content == b""
+    assert not_modified.headers["etag"] == etag
+
+
+def test_monitoring_stats_scan_logs_once_per_ttl(
+    client, tmp_path, monkeypatch, admin_auth_headers
+):
+    log_dir = tmp_path / "logs"
+    log_dir.mkdir()
+    (log_dir / "app.log").write_text("x")
+    monkeypatch.setattr(monitoring_router, "LOG_DIRECTORY", str(log_dir))
+
+    real_listdir = monitoring_router.os.listdir
+    scans = []
+
+    def counting_listdir(path):
+        scans.append(path)
+        return real_listdir(path)
+
+    monkeypatch.setattr(monitoring_router.os, "listdir", counting_listdir)
+
+    first = client.get("/api/v1/admin/monitoring/stats",
+                       headers=admin_auth_headers)
+    assert first.status_code == 200
+    assert first.json()["log_files_count"] == 1
+    for _ in range(3):
+        revalidated = client.get(
+            "/api/v1/admin/monitoring/stats",
+            headers={**admin_auth_headers,
+                     "If-None-Match": first.headers["etag"]},
+        )
+        assert revalidated.status_code == 304
+    assert len(scans) == 1
@@ -0,0 +1,146 @@
+import os
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from backend import asset_reaper, crud, retention, storage_paths
+from backend.database import (
+    Character,
+    CharacterImage,
+    Page,
+    Story,
+    StoryGenerationTask,
+    StoryGenerationTaskArchive,
+    User,
+)
+
+NOW = datetime(2026, 6, 1, 12, 0, tzinfo=timezone.utc)
+
+
+def _user(db_session, username="user@example.com"):
+    return db_session.query(User).filter(User.username == username).one()
+
+
+def _story(db_session, owner_id, title, deleted_days_ago=None):
+    story = Story(title=title, genre="Fantasy", owner_id=owner_id,
+                  is_deleted=deleted_days_ago is not None,
+                  deleted_at=(NOW - timedelta(days=deleted_days_ago)
+                              if deleted_days_ago is not None else None))
+    db_session.add(story)
+    db_session.flush()
+    db_session.add(Page(story_id=story.id, page_number=1, text="Once"))
+    db_session.commit()
+    return story
+
+
+def _task(db_session, story, status, days_ago, **fields):
+    created = NOW - timedelta(days=days_ago)
+    task = StoryGenerationTask(
+        id=f"task-{story.id}-{status}-{days_ago}", story_id=story.id,
+        user_id=story.owner_id, status=status, created_at=created,
+        updated_at=created, **fields)
+    db_session.add(task)
+    db_session.commit()
+    return task
+
+
+def _story_dir(story):
+    path = storage_paths.story_images_abs(story.owner_id, story.id)
+    os.makedirs(path, exist_ok=True)
+    with open(os.path.join(path, "page_1.png"), "wb") as fh:
+        fh.write(b"png")
+    return path
+
+
+def test_archives_only_old_finished_tasks_in_batches(db_session):
+    story = _story(db_session, _user(db_session).id, "Tasks")
+    _task(db_session, story, "completed", 40, attempts=2, duration_ms=1500)
+    _task(db_session, story, "failed", 35, last_error="x" * 2000)
+    _task(db_session, story, "failed", 31, error_message="Timed out")
+    _task(db_session, story, "pending", 40)
+    _task(db_session, story, "completed", 5)
+
+    archived = retention.archive_generation_tasks(
+        db_session, retention_days=30, batch_size=2, now=NOW)
+
+    assert archived == 3
+    remaining = {t.status for t in db_session.query(StoryGenerationTask)}
+    assert remaining == {"pending", "completed"}
+    rows = {row.id: row for row in db_session.query(StoryGenerationTaskArchive)}
+    assert len(rows) == 3
+    completed = rows[f"task-{story.id}-completed-40"]
+    assert (completed.attempts, completed.duration_ms) == (2, 1500)
+    assert len(rows[f"task-{story.id}-failed-35"].error) == 500
+    assert rows[f"task-{story.id}-failed-31"].error == "Timed out"
+
+
+def test_purges_soft_deleted_stories_after_grace_period(db_session, data_dirs):
+    user_id = _user(db_session).id
+    expired = _story(db_session, user_id, "Expired", deleted_days_ago=45)
+    recent = _story(db_session, user_id, "Recent", deleted_days_ago=3)
+    live = _story(db_session, user_id, "Live")
+    _task(db_session, expired, "completed", 50)
+    expired_dir, recent_dir = _story_dir(expired), _story_dir(recent)
+    expired_id = expired.id
+
+    purged = retention.purge_deleted_stories(
+        db_session, grace_days=30, batch_size=1, now=NOW)
+
+    assert purged == 1
+    db_session.expire_all()
+    assert {s.id for s in db_session.query(Story)} == {recent.id, live.id}
+    assert db_session.query(Page).filter(Page.story_id == expired_id).count() == 0
+    assert db_session.get(StoryGenerationTaskArchive, f"task-{expired_id}-completed-50")
+    # The folder goes with the next reaper run.
+    assert os.path.exists(expired_dir)
+    assert asset_reaper.reap_tombstones(db_session) == {
+        "deleted": 1, "skipped": 0, "failed": 0}
+    assert not os.path.exists(expired_dir)
+    assert os.path.exists(recent_dir)
+
+
+def test_soft_delete_records_deletion_time(db_session):
+    user = _user(db_session)
+    story = _story(db_session, user.id, "Soon gone")
+    assert crud.soft_delete_story_admin(db_session, story.id)
+    assert crud.soft_delete_user_admin(db_session, user.id)
+    db_session.expire_all()
+    assert db_session.get(Story, story.id).deleted_at is not None
+    assert db_session.get(User, user.id).deleted_at is not None
+
+
+def test_run_retention_purges_expired_users_with_their_content(
+    db_session, data_dirs, configure_settings
+):
+    configure_settings(DELETED_CONTENT_RETENTION_DAYS=30, TASK_RETENTION_DAYS=0)
+
+    user = _user(db_session)
+    other = _user(db_session, "admin@example.com")
+    story = _story(db_session, user.id, "Theirs")
+    _task(db_session, story, "completed", 1)
+    character = Character(user_id=user.id, name="Mira")
+    db_session.add(character)
+    db_session.flush()
+    image = CharacterImage(character_id=character.id, file_path="images/x.png")
+    db_session.add(image)
+    db_session.flush()
+    character.current_image_id = image.id
+    kept_story = _story(db_session, other.id, "Kept")
+    user.is_deleted = True
+    user.deleted_at = NOW - timedelta(days=31)
+    db_session.commit()
+    user_id = user.id
+    user_dir = storage_paths.user_images_abs(user_id)
+    _story_dir(story)
+
+    counts = retention.run_retention(db_session, now=NOW)
+
+    assert counts == {"users_purged": 1, "stories_purged": 1, "tasks_archived": 0}
+    db_session.expire_all()
+    assert db_session.get(User, user_id) is None
+    assert db_session.query(Character).count() == 0
+    assert db_session.query(CharacterImage).count() == 0
+    assert [s.id for s in db_session.query(Story)] == [kept_story.id]
+    assert db_session.query(StoryGenerationTask).count() == 0
+    assert db_session.query(StoryGenerationTaskArchive).count() == 1
+    assert not os.path.exists(user_dir)
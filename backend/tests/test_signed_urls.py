@@ -0,0 +1,34 @@
+from urllib.parse import parse_qs, urlsplit
+
+from backend import signed_urls
+
+NOW = 1_800_000_000
+
+
+def _parts(url):
+    parsed = urlsplit(url)
+    query = parse_qs(parsed.query)
+    path = parsed.path[len(signed_urls.SIGNED_CONTENT_PREFIX) + 1:]
+    return path, int(query["expires"][0]), query["signature"][0]
+
+
+def test_signed_urls_verify_until_expiry_and_are_stable_within_a_period():
+    url = signed_urls.sign_path("images/user_1/story_2/page_1.png", now=NOW)
+    path, expires, signature = _parts(url)
+
+    assert signed_urls.verify(path, expires, signature, now=NOW)
+    assert signed_urls.verify(path, expires, signature, now=expires)
+    assert not signed_urls.verify(path, expires, signature, now=expires + 1)
+    assert not signed_urls.verify("images/user_1/story_2/page_2.png", expires, signature, now=NOW)
+    assert not signed_urls.verify(path, expires + 3600, signature, now=NOW)
+    assert not signed_urls.verify("../secret", expires, signature, now=NOW)
+
+    assert signed_urls.sign_path("images/user_1/story_2/page_1.png", now=NOW + 1) == url
+
+
+def test_only_private_page_images_get_signed_urls():
+    assert signed_urls.page_image_url(None) is None
+    assert signed_urls.page_image_url("images/user_1/characters/3/a.png") is None
+    assert signed_urls.page_image_url("../escape.png") is None
+    assert signed_urls.page_image_url("images/user_1/story_2/page_1.png").startswith(
+        "/signed_content/images/user_1/story_2/page_1.png?")
@@ -93,3 +93,92 @@ def test_static_content_blocks_story_image_paths_but_keeps_other_assets_public()
                     directory.rmdir()
             except Exception:
                 pass
+
+
+def test_static_content_sends_content_etags_immutable_caching_and_ranges(tmp_path):
+    from fastapi import FastAPI
+
+    from backend.main import PublicStaticContentFiles
+
+    character_dir = tmp_path / "images" / "user_1" / "characters" / "7"
+    character_dir.mkdir(parents=True)
+    fingerprinted = "0f8fad5b-d9cb-469f-a165-70867728950e.png"
+    (character_dir / fingerprinted).write_bytes(b"0123456789")
+    (character_dir / "thumb.png").write_bytes(b"0123456789")
+
+    static_app = FastAPI()
+    static_app.mount("/static_content", PublicStaticContentFiles(directory=str(tmp_path)))
+    local_client = TestClient(static_app)
+    base = "/static_content/images/user_1/characters/7"
+
+    immutable = local_client.get(f"{base}/{fingerprinted}")
+    mutable = local_client.get(f"{base}/thumb.png")
+    assert immutable.headers["cache-control"] == "public, max-age=31536000, immutable"
+    assert mutable.headers["cache-control"] == "public, no-cache"
+    # Same bytes, same ETag, regardless of path or modification time.
+    assert immutable.headers["etag"] == mutable.headers["etag"]
+
+    revalidated = local_client.get(
+        f"{base}/thumb.png", headers={"If-None-Match": mutable.headers["etag"]})
+    assert revalidated.status_code == 304
+    assert revalidated.headers["etag"] == mutable.headers["etag"]
+
+    partial = local_client.get(f"{base}/thumb.png", headers={"Range": "bytes=2-5"})
+    assert partial.status_code == 206
+    assert partial.content == b"2345"
+
+
+def test_static_content_negotiates_image_variants_by_width_and_accept(tmp_path):
+    from fastapi import FastAPI
+
+    from backend.main import PublicStaticContentFiles
+
+    character_dir = tmp_path / "images" / "user_1" / "characters" / "7"
+    character_dir.mkdir(parents=True)
+    (character_dir / "thumb.png").write_bytes(b"png")
+    (character_dir / "thumb.w256.webp").write_bytes(b"webp")
+
+    static_app = FastAPI()
+    static_app.mount("/static_content", PublicStaticContentFiles(directory=str(tmp_path)))
+    local_client = TestClient(static_app)
+    url = "/static_content/images/user_1/characters/7/thumb.png"
+
+    variant = local_client.get(f"{url}?w=200", headers={"Accept": "image/webp,*/*"})
+    assert variant.content == b"webp"
+    assert variant.headers["content-type"] == "image/webp"
+    assert variant.headers["vary"] == "Accept"
+
+    assert local_client.get(f"{url}?w=200", headers={"Accept": "image/png"}).content == b"png"
+    assert local_client.get(url, headers={"Accept": "image/webp"}).content == b"png"
+
+
+def test_static_content_hashes_files_off_the_event_loop(tmp_path, monkeypatch):
+    import asyncio
+
+    from fastapi import FastAPI
+
+    from backend import asset_caching
+    from backend.main import PublicStaticContentFiles
+
+    (tmp_path / "images").mkdir()
+    (tmp_path / "images" / "cover.png").write_bytes(b"0123456789")
+    on_event_loop = []
+    asset_headers = asset_caching.asset_headers
+
+    def recording_asset_headers(*args, **kwargs):
+        try:
+            asyncio.get_running_loop()
+            on_event_loop.append(True)
+        except RuntimeError:
+            on_event_loop.append(False)
+        return asset_headers(*args, **kwargs)
+
+    monkeypatch.setattr(asset_caching, "asset_headers", recording_asset_headers)
+    static_app = FastAPI()
+    static_app.mount("/static_content", PublicStaticContentFiles(directory=str(tmp_path)))
+
+    response = TestClient(static_app).get("/static_content/images/cover.png")
+
+    assert response.status_code == 200
+    assert response.headers["cache-control"] == "public, no-cache"
+    assert on_event_loop == [False]
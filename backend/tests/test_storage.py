@@ -0,0 +1,174 @@
+import io
+import os
+
+import pytest
+
+from backend import settings as settings_mod
+from backend import storage, storage_paths
+
+
+@pytest.fixture(params=["local", "local-dedup", "s3"])
+def asset_storage(request, tmp_path, monkeypatch):
+    """The same contract runs against local disk and an S3 stand-in (moto)."""
+
+    if request.param == "local":
+        yield storage.LocalStorage(str(tmp_path))
+        return
+    if request.param == "local-dedup":
+        yield storage.LocalStorage(str(tmp_path), dedup=True)
+        return
+
+    moto = pytest.importorskip("moto")
+    boto3 = pytest.importorskip("boto3")
+    for name in ("AWS_ACCESS_KEY_ID", "AWS_SECRET_ACCESS_KEY"):
+        monkeypatch.setenv(name, "testing")
+    with moto.mock_aws():
+        client = boto3.client("s3", region_name="us-east-1")
+        client.create_bucket(Bucket="assets")
+        yield storage.S3Storage(client, "assets", prefix="data/")
+
+
+def test_put_get_stream_and_exists(asset_storage):
+    key = "images/user_1/story_2/page_1.png"
+    assert not asset_storage.exists(key)
+    with pytest.raises(FileNotFoundError):
+        asset_storage.get(key)
+
+    asset_storage.put(key, b"first", "image/png")
+    asset_storage.put(key, io.BytesIO(b"x" * 200_000))  # file objects replace too
+    assert asset_storage.exists(key)
+    assert asset_storage.get(key) == b"x" * 200_000
+    assert b"".join(asset_storage.stream(key, chunk_size=4096)) == b"x" * 200_000
+
+    with asset_storage.local_copy(key) as path:
+        with open(path, "rb") as fh:
+            assert fh.read() == b"x" * 200_000
+
+
+def test_copy_delete_and_delete_prefix(asset_storage):
+    asset_storage.put("images/user_1/story_2/a.png", b"a")
+    asset_storage.put("images/user_1/story_2/refs/b.png", b"b")
+    asset_storage.put("images/user_1/story_20/c.png", b"c")
+
+    asset_storage.copy("images/user_1/story_2/a.png", "images/user_1/characters/1/a.png")
+    assert asset_storage.get("images/user_1/characters/1/a.png") == b"a"
+
+    asset_storage.delete("images/user_1/characters/1/a.png")
+    asset_storage.delete("images/user_1/characters/1/a.png")  # missing is fine
+    assert not asset_storage.exists("images/user_1/characters/1/a.png")
+
+    assert sorted(asset_storage.list_keys("images/user_1/story_2")) == [
+        "images/user_1/story_2/a.png", "images/user_1/story_2/refs/b.png"]
+
+    asset_storage.delete_prefix("images/user_1/story_2")
+    assert not asset_storage.exists("images/user_1/story_2/a.png")
+    assert not asset_storage.exists("images/user_1/story_2/refs/b.png")
+    # Sibling folders sharing the name prefix are untouched.
+    assert asset_storage.exists("images/user_1/story_20/c.png")
+
+
+def test_list_keys_in_string_order_and_stat(asset_storage):
+    keys = ["images/a/b.png", "images/a/b/c.png", "images/a.png", "images/a-z.png"]
+    for key in keys:
+        asset_storage.put(key, b"four")
+
+    assert list(asset_storage.list_keys("images")) == sorted(keys)
+    size, modified = asset_storage.stat("images/a.png")
+    assert size == 4 and modified > 0
+    with pytest.raises(FileNotFoundError):
+        asset_storage.stat("images/missing.png")
+
+
+def test_keys_cannot_escape_the_root(asset_storage):
+    with pytest.raises(ValueError):
+        asset_storage.put("../outside.png", b"x")
+    with pytest.raises(ValueError):
+        asset_storage.exists("images/../../outside.png")
+
+
+def test_local_storage_writes_atomically_under_root(tmp_path):
+    local = storage.LocalStorage(str(tmp_path))
+    local.put("images/a.png", b"png")
+    assert local.local_path("images/a.png") == os.path.join(
+        os.path.realpath(tmp_path), "images", "a.png")
+    assert os.listdir(tmp_path / "images") == ["a.png"]
+    assert local.presign("images/a.png") is None
+
+    (tmp_path / "images" / ".crashed.tmp").write_bytes(b"par")
+    assert list(local.list_keys("images")) == ["images/a.png"]
+    assert list(local.list_keys("images", include_partial=True)) == [
+        "images/.crashed.tmp", "images/a.png"]
+
+
+def test_s3_presign_and_prefixes_are_isolated(monkeypatch):
+    moto = pytest.importorskip("moto")
+    pytest.importorskip("boto3")
+    for name, value in {
+        "AWS_ACCESS_KEY_ID": "testing",
+        "AWS_SECRET_ACCESS_KEY": "testing",
+        "STORAGE_BACKEND": "s3",
+        "S3_BUCKET": "assets",
+        "S3_REGION": "us-east-1",
+    }.items():
+        monkeypatch.setenv(name, value)
+    monkeypatch.setattr(settings_mod, "_settings_instance", None, raising=False)
+    storage._s3_client.cache_clear()
+
+    with moto.mock_aws():
+        storage._s3_client(None, "us-east-1").create_bucket(Bucket="assets")
+        public, private = storage.get_storage(), storage.get_private_storage()
+        private.put("uploads/user_1/characters/1/photo.png", b"secret")
+
+        assert not public.exists("uploads/user_1/characters/1/photo.png")
+        public.put("images/user_1/characters/1/a.png", b"a")
+        url = public.presign("images/user_1/characters/1/a.png")
+        assert "data/images/user_1/characters/1/a.png" in url
+    storage._s3_client.cache_clear()
+
+    monkeypatch.setenv("S3_PRIVATE_PREFIX", "data/private")
+    monkeypatch.setattr(settings_mod, "_settings_instance", None, raising=False)
+    with pytest.raises(ValueError):
+        storage.get_storage()
+
+
+def test_local_dedup_links_identical_content_and_collects_orphans(tmp_path):
+    local = storage.LocalStorage(str(tmp_path), dedup=True)
+    local.put("images/user_1/story_1/page_1.png", b"same")
+    local.put("images/user_1/story_2/page_1.png", io.BytesIO(b"same"))
+    local.copy("images/user_1/story_1/page_1.png", "images/user_1/characters/1/a.png")
+
+    inodes = {os.stat(local.local_path(key)).st_ino for key in (
+        "images/user_1/story_1/page_1.png",
+        "images/user_1/story_2/page_1.png",
+        "images/user_1/characters/1/a.png",
+    )}
+    assert len(inodes) == 1
+    blobs = [name for _d, _s, names in os.walk(local.blobs_dir) for name in names]
+    assert len(blobs) == 1
+
+    # Replacing one asset leaves the others untouched.
+    local.put("images/user_1/story_2/page_1.png", b"changed")
+    assert local.get("images/user_1/story_1/page_1.png") == b"same"
+
+    local.delete_prefix("images/user_1/story_1")
+    assert local.collect_garbage() == 0  # still referenced by the character
+    local.delete("images/user_1/characters/1/a.png")
+    assert local.collect_garbage() == 1
+    assert local.get("images/user_1/story_2/page_1.png") == b"changed"
+
+
+def test_local_deduplicate_migrates_existing_files(tmp_path):
+    for name in ("a.png", "b.png"):
+        path = tmp_path / "images" / "user_1" / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(b"x" * 100)
+
+    local = storage.LocalStorage(str(tmp_path), dedup=True)
+    assert local.deduplicate("images") == {"files": 2, "linked": 2, "bytes_saved": 100}
+    assert os.stat(tmp_path / "images" / "user_1" / "a.png").st_nlink == 3
+    assert local.deduplicate("images")["linked"] == 0
+
+
+def test_blob_store_is_never_served():
+    assert storage_paths.is_private_story_asset_path(".blobs/ab/abcdef")
+    assert not storage_paths.is_private_story_asset_path("images/user_1/characters/1/a.png")
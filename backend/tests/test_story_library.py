@@ -0,0 +1,101 @@
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from backend import crud, database
+from backend.database import Page, Story, User
+
+
+def _regular_user(db_session: Session) -> User:
+    return db_session.query(User).filter(User.username == "user@example.com").one()
+
+
+def _generated_story(db_session: Session, owner_id: int, outline: str = "An outline.") -> Story:
+    story = Story(
+        title="Library Story",
+        genre="Fantasy",
+        story_outline=outline,
+        main_characters=[{"name": "Ava"}],
+        num_pages=2,
+        owner_id=owner_id,
+        is_draft=False,
+    )
+    db_session.add(story)
+    db_session.commit()
+    crud.update_story_with_generated_content(db_session, story.id, {
+        "Title": "Library Story",
+        "Pages": [
+            {"Page_number": "Title", "Text": "Library Story",
+             "image_url": "images/user_2/story_1/cover.png"},
+            {"Page_number": 1, "Text": "One",
+             "image_url": "images/user_2/story_1/page_1.png"},
+            {"Page_number": 2, "Text": "Two", "image_url": None},
+        ],
+    })
+    return story
+
+
+def test_generated_content_refreshes_library_summary(db_session: Session):
+    owner = _regular_user(db_session)
+    story = _generated_story(db_session, owner.id)
+
+    db_session.refresh(story)
+    assert story.page_count == 3
+    assert story.cover_image_path == "images/user_2/story_1/cover.png"
+
+    cover = db_session.query(Page).filter(
+        Page.story_id == story.id, Page.page_number == 0).one()
+    crud.update_page_image_path(db_session, cover.id, None)
+    db_session.refresh(story)
+    assert story.cover_image_path == "images/user_2/story_1/page_1.png"
+
+
+def test_library_query_selects_only_summary_columns(db_session: Session, sql_statements):
+    owner = _regular_user(db_session)
+    owner_id = owner.id
+    _generated_story(db_session, owner_id, outline="x" * 400)
+
+    with sql_statements() as statements:
+        rows = crud.get_story_library_by_user(db_session, user_id=owner_id)
+
+    assert len(statements) == 1
+    select_list = statements[0].split(" FROM ")[0]
+    for heavy_column in ("main_characters", "editor_settings", "stories.story_outline AS"):
+        assert heavy_column not in select_list
+    assert "FROM pages" not in statements[0]
+    assert "JOIN pages" not in statements[0]
+
+    row = rows[0]
+    assert row.page_count == 3
+    assert row.cover_image_path == "images/user_2/story_1/cover.png"
+    assert row.outline_snippet == "x" * crud.STORY_LIBRARY_OUTLINE_SNIPPET_CHARS + "..."
+
+
+def test_backfill_sql_recomputes_summary(db_session: Session):
+    owner = _regular_user(db_session)
+    story = _generated_story(db_session, owner.id)
+    db_session.query(Story).filter(Story.id == story.id).update(
+        {"page_count": 0, "cover_image_path": None}, synchronize_session=False)
+    db_session.commit()
+
+    db_session.execute(text(database.STORY_LIBRARY_SUMMARY_BACKFILL_SQL))
+    db_session.commit()
+    db_session.refresh(story)
+    assert story.page_count == 3
+    assert story.cover_image_path == "images/user_2/story_1/cover.png"
+
+
+def test_read_user_stories_returns_library_items(
+    client: TestClient, db_session: Session, regular_user_auth_headers: dict
+):
+    owner = _regular_user(db_session)
+    _generated_story(db_session, owner.id)
+
+    response = client.get("/api/v1/stories/", headers=regular_user_auth_headers)
+    assert response.status_code == 200, response.text
+    item = response.json()[0]
+    assert item["page_count"] == 3
+    assert item["cover_image_path"] == "images/user_2/story_1/cover.png"
+    assert item["outline_snippet"] == "An outline."
+    assert "main_characters" not in item
+    assert "editor_settings" not in item
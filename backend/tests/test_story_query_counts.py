@@ -0,0 +1,148 @@
+"""Pin single-story endpoints to a fixed number of SQL statements.
+
+Each endpoint is exercised against a short and a long story; the statement
+count must be identical, so pages are never lazy-loaded or saved one by one.
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from backend.database import Page, Story, User
+
+# One SELECT for the authenticated user is part of every count below.
+READ_STORY_QUERIES = 3  # user, story, pages (selectinload)
+# user, story, pages, page UPDATE, search refresh (2), story UPDATE, story, pages
+SAVE_EDITOR_QUERIES = 9
+PAGE_IMAGE_QUERIES = 3  # user, story, page
+PDF_EXPORT_QUERIES = 3  # user, story, pages (selectinload)
+
+
+def _story_with_pages(db_session: Session, page_count: int) -> int:
+    """Create a story with a title page plus `page_count` pages; return its id.
+
+    Ids (not ORM objects) are returned so the counted blocks never trigger
+    refresh SELECTs on expired test objects.
+    """
+    owner = db_session.query(User).filter(
+        User.username == "user@example.com").one()
+    story = Story(
+        title="Counted",
+        genre="Fantasy",
+        story_outline="Outline",
+        main_characters=[],
+        num_pages=page_count,
+        owner_id=owner.id,
+        is_draft=False,
+    )
+    db_session.add(story)
+    db_session.commit()
+    for page_number in range(page_count + 1):
+        db_session.add(Page(
+            story_id=story.id,
+            page_number=page_number,
+            text=f"Page {page_number}",
+            image_path=None,
+        ))
+    db_session.commit()
+    return story.id
+
+
+@pytest.mark.parametrize("page_count", [1, 6])
+def test_read_story_query_count(
+    client: TestClient,
+    db_session: Session,
+    regular_user_auth_headers: dict,
+    sql_statements,
+    page_count: int,
+):
+    story_id = _story_with_pages(db_session, page_count)
+
+    with sql_statements() as statements:
+        response = client.get(
+            f"/api/v1/stories/{story_id}", headers=regular_user_auth_headers)
+
+    assert response.status_code == 200, response.text
+    assert len(response.json()["pages"]) == page_count + 1
+    assert len(statements) == READ_STORY_QUERIES, statements
+
+
+@pytest.mark.parametrize("page_count", [1, 6])
+def test_save_story_editor_query_count(
+    client: TestClient,
+    db_session: Session,
+    regular_user_auth_headers: dict,
+    sql_statements,
+    page_count: int,
+):
+    story_id = _story_with_pages(db_session, page_count)
+    pages = db_session.query(Page).filter(Page.story_id == story_id).all()
+    payload = {
+        "title": "Edited",
+        "editor_settings": {"font_family": "classic"},
+        "pages": [
+            {"id": page.id, "text": f"Edited {page.page_number}",
+             "editor_state": {"text_position": "top-center"}}
+            for page in pages if page.page_number > 0
+        ],
+    }
+
+    with sql_statements() as statements:
+        response = client.put(
+            f"/api/v1/stories/{story_id}/editor",
+            json=payload,
+            headers=regular_user_auth_headers,
+        )
+
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert body["title"] == "Edited"
+    texts = {page["page_number"]: page["text"] for page in body["pages"]}
+    assert texts[0] == "Edited"
+    assert texts[page_count] == f"Edited {page_count}"
+    assert len(statements) == SAVE_EDITOR_QUERIES, statements
+    page_updates = [s for s in statements if s.startswith("UPDATE pages")]
+    assert len(page_updates) == 1
+
+
+@pytest.mark.parametrize("page_count", [1, 6])
+def test_page_image_lookup_query_count(
+    client: TestClient,
+    db_session: Session,
+    regular_user_auth_headers: dict,
+    sql_statements,
+    page_count: int,
+):
+    story_id = _story_with_pages(db_session, page_count)
+    page_id = db_session.query(Page.id).filter(
+        Page.story_id == story_id, Page.page_number == 1).scalar()
+
+    with sql_statements() as statements:
+        response = client.get(
+            f"/api/v1/stories/{story_id}/pages/{page_id}/image",
+            headers=regular_user_auth_headers,
+        )
+
+    # The page has no image; the lookup itself is what is being counted.
+    assert response.status_code == 404
+    assert response.json()["detail"] == "Page image not found"
+    assert len(statements) == PAGE_IMAGE_QUERIES, statements
+
+
+@pytest.mark.parametrize("page_count", [1, 6])
+def test_pdf_export_query_count(
+    client: TestClient,
+    db_session: Session,
+    regular_user_auth_headers: dict,
+    sql_statements,
+    page_count: int,
+):
+    story_id = _story_with_pages(db_session, page_count)
+
+    with sql_statements() as statements:
+        response = client.get(
+            f"/api/v1/stories/{story_id}/pdf", headers=regular_user_auth_headers)
+
+    assert response.status_code == 200, response.text
+    assert response.content.startswith(b"%PDF")
+    assert len(statements) == PDF_EXPORT_QUERIES, statements
@@ -0,0 +1,115 @@
+import asyncio
+import io
+import os
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+from PIL import Image
+from prometheus_client import REGISTRY
+
+from backend import signed_urls, storage, thumbnails
+
+
+def _requests(result):
+    return REGISTRY.get_sample_value(
+        "app_thumbnail_cache_requests_total", {"result": result}) or 0.0
+
+
+@pytest.fixture
+def data_dir(data_dirs, configure_settings, tmp_path, monkeypatch):
+    configure_settings(THUMBNAIL_CACHE_DIR=tmp_path / "cache")
+    monkeypatch.setattr(thumbnails, "_service", None)
+    return data_dirs
+
+
+def test_thumbnail_endpoint_resizes_caches_and_authorizes(client: TestClient, data_dir, make_png):
+    public_key = "images/user_1/characters/7/portrait.png"
+    private_key = "images/user_1/story_3/page_1_ab12cd34_story_3_p1.png"
+    asset_storage = storage.get_storage()
+    asset_storage.put(public_key, make_png(400, 200))
+    asset_storage.put(private_key, make_png(400, 200))
+
+    hits_before = _requests("hit")
+    response = client.get(f"/thumbnails/{public_key}?w=100", headers={"Accept": "image/webp"})
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "image/webp"
+    assert response.headers["vary"] == "Accept"
+    with Image.open(io.BytesIO(response.content)) as image:
+        assert image.size == (128, 64)  # widths snap to the 32px grid
+
+    again = client.get(f"/thumbnails/{public_key}?w=110", headers={"Accept": "image/webp"})
+    assert again.content == response.content
+    assert _requests("hit") == hits_before + 1
+    revalidated = client.get(f"/thumbnails/{public_key}?w=100", headers={
+        "Accept": "image/webp", "If-None-Match": response.headers["etag"]})
+    assert revalidated.status_code == 304
+
+    png = client.get(f"/thumbnails/{public_key}?w=100", headers={"Accept": "image/jpeg"})
+    assert png.headers["content-type"] == "image/png"
+
+    assert client.get(f"/thumbnails/{private_key}?w=100").status_code == 403
+    signed = signed_urls.sign_path(private_key).replace("/signed_content/", "/thumbnails/")
+    private_response = client.get(f"{signed}&w=100")
+    assert private_response.status_code == 200
+    assert private_response.headers["cache-control"].startswith("private, max-age=")
+
+    assert client.get("/thumbnails/images/user_1/characters/7/missing.png?w=100").status_code == 404
+    assert client.get(f"/thumbnails/{public_key}").status_code == 422
+
+
+def test_rewritten_source_gets_a_fresh_thumbnail(client: TestClient, data_dir, make_png):
+    key = "images/user_1/characters/7/portrait.png"
+    asset_storage = storage.get_storage()
+    asset_storage.put(key, make_png(400, 200))
+    first = client.get(f"/thumbnails/{key}?w=64", headers={"Accept": "image/png"})
+    asset_storage.put(key, make_png(400, 400))
+    second = client.get(f"/thumbnails/{key}?w=64", headers={"Accept": "image/png"})
+    with Image.open(io.BytesIO(second.content)) as image:
+        assert image.size == (64, 64)
+    assert first.headers["etag"] != second.headers["etag"]
+
+
+def test_cache_evicts_least_recently_used_entries(tmp_path):
+    cache = thumbnails.ThumbnailCache(str(tmp_path), max_bytes=250)
+    first = cache.store("aa" + "1" * 62, b"x" * 100)
+    second = cache.store("bb" + "2" * 62, b"x" * 100)
+    os.utime(first, (1, 1))
+    os.utime(second, (2, 2))
+    assert cache.lookup("aa" + "1" * 62) == first  # refreshes first
+
+    cache.store("cc" + "3" * 62, b"x" * 100)
+
+    assert cache.lookup("bb" + "2" * 62) is None
+    assert os.path.exists(first)
+    assert cache.lookup("cc" + "3" * 62) is not None
+
+
+async def test_concurrent_misses_render_once(tmp_path, make_png):
+    source = storage.LocalStorage(str(tmp_path / "data"))
+    source.put("images/a.png", make_png(400, 200))
+    service = thumbnails.ThumbnailService(
+        thumbnails.ThumbnailCache(str(tmp_path / "cache"), max_bytes=10**6), max_workers=2)
+    renders = []
+    release = threading.Event()
+    original = service._render_and_store
+
+    def slow_render(*args):
+        renders.append(args)
+        release.wait(5)
+        return original(*args)
+
+    service._render_and_store = slow_render
+    coalesced_before = _requests("coalesced")
+    waiters = [asyncio.create_task(service.get(source, "images/a.png", 64, "png"))
+               for _ in range(5)]
+    for _ in range(500):
+        if _requests("coalesced") >= coalesced_before + 4:
+            break
+        await asyncio.sleep(0.01)
+    release.set()
+    results = await asyncio.gather(*waiters)
+
+    assert len(renders) == 1
+    assert len({path for path, _key in results}) == 1
+    service.shutdown()
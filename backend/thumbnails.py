@@ -0,0 +1,236 @@
+"""On-demand image resizing with a bounded on-disk LRU cache.
+
+Pre-generated variants (`backend.image_variants`) only exist for configured
+widths and for images saved since they were introduced. `/thumbnails/<path>`
+renders any other width on first request:
+
+- widths are rounded up to a multiple of `WIDTH_STEP` (at most
+  `MAX_WIDTH`) so arbitrary requests cannot fill the cache with near
+  duplicates;
+- the format is the best one the client's `Accept` header allows (AVIF,
+  WebP), else PNG;
+- resizing runs in a dedicated pool of `THUMBNAIL_WORKERS` threads, off the
+  event loop;
+- results are stored under `THUMBNAIL_CACHE_DIR`, keyed by source path,
+  source fingerprint, width and format, so rewriting a source invalidates
+  its thumbnails. Reads refresh a file's mtime and the least recently used
+  files are evicted once the cache exceeds `THUMBNAIL_CACHE_MAX_BYTES`;
+- concurrent requests for the same missing thumbnail share one render
+  (single flight, per worker process).
+
+Hits, misses and coalesced requests are counted in
+`app_thumbnail_cache_requests_total`.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import io
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional, Tuple
+
+from PIL import Image
+
+from backend import image_variants, storage
+from backend.logging_config import app_logger
+from backend.metrics import (
+    THUMBNAIL_CACHE_BYTES,
+    THUMBNAIL_CACHE_EVICTIONS_TOTAL,
+    THUMBNAIL_CACHE_REQUESTS_TOTAL,
+    THUMBNAIL_RENDER_SECONDS,
+)
+from backend.settings import get_settings
+
+WIDTH_STEP = 32
+MAX_WIDTH = 2048
+
+# Evict down to this share of the limit, so eviction scans are infrequent.
+_EVICT_TARGET_RATIO = 0.9
+
+
+def normalize_width(width: int) -> int:
+    """Round a requested width up to the cache's width grid."""
+
+    stepped = -(-max(1, width) // WIDTH_STEP) * WIDTH_STEP
+    return min(stepped, MAX_WIDTH)
+
+
+def choose_format(accept: Optional[str]) -> str:
+    accepted = image_variants.accepted_formats(accept)
+    for fmt in image_variants.configured_formats():
+        if fmt in accepted:
+            return fmt
+    return "png"
+
+
+def content_type(fmt: str) -> str:
+    return "image/png" if fmt == "png" else image_variants.content_type(fmt)
+
+
+def render(image_bytes: bytes, width: int, fmt: str) -> bytes:
+    """Return `image_bytes` resized to `width` (never upscaled) as `fmt`."""
+
+    with Image.open(io.BytesIO(image_bytes)) as source:
+        # Let JPEG decoders skip detail that is about to be thrown away.
+        source.draft("RGB", (width, width))
+        image = source.convert("RGBA" if "A" in source.getbands() else "RGB")
+    if width < image.width:
+        height = max(1, round(image.height * width / image.width))
+        image = image.resize((width, height), Image.Resampling.LANCZOS)
+    if fmt == "png":
+        buffer = io.BytesIO()
+        image.save(buffer, "PNG", optimize=True)
+        return buffer.getvalue()
+    return image_variants.encode(image, fmt)
+
+
+class ThumbnailCache:
+    """Files under a directory, evicted least recently used first."""
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._total_bytes: Optional[int] = None
+
+    def path_for(self, cache_key: str) -> str:
+        return os.path.join(self.directory, cache_key[:2], cache_key)
+
+    def lookup(self, cache_key: str) -> Optional[str]:
+        path = self.path_for(cache_key)
+        try:
+            os.utime(path)  # mark as recently used
+        except FileNotFoundError:
+            return None
+        return path
+
+    def store(self, cache_key: str, data: bytes) -> str:
+        path = self.path_for(cache_key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp_path, "wb") as fh:
+            fh.write(data)
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            if self._total_bytes is None:
+                self._total_bytes = self._scan_size()
+            else:
+                self._total_bytes += len(data)
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+            THUMBNAIL_CACHE_BYTES.set(self._total_bytes)
+        return path
+
+    def _entries(self):
+        for dirpath, _dirnames, filenames in os.walk(self.directory):
+            for name in filenames:
+                if name.endswith(".tmp"):
+                    continue
+                path = os.path.join(dirpath, name)
+                try:
+                    yield path, os.stat(path)
+                except FileNotFoundError:
+                    continue
+
+    def _scan_size(self) -> int:
+        return sum(info.st_size for _path, info in self._entries())
+
+    def _evict(self) -> None:
+        entries = sorted(self._entries(), key=lambda entry: entry[1].st_mtime)
+        total = sum(info.st_size for _path, info in entries)
+        target = self.max_bytes * _EVICT_TARGET_RATIO
+        for path, info in entries:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= info.st_size
+            THUMBNAIL_CACHE_EVICTIONS_TOTAL.inc()
+        self._total_bytes = total
+
+
+class ThumbnailService:
+    """Renders thumbnails in a thread pool, through the cache, single-flight."""
+
+    def __init__(self, cache: ThumbnailCache, max_workers: int):
+        self.cache = cache
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="thumbnail")
+        self._in_flight: Dict[str, asyncio.Future] = {}
+
+    def _render_and_store(
+        self, asset_storage: storage.AssetStorage, key: str, width: int, fmt: str,
+        cache_key: str,
+    ) -> str:
+        started_at = time.perf_counter()
+        data = render(asset_storage.get(key), width, fmt)
+        path = self.cache.store(cache_key, data)
+        THUMBNAIL_RENDER_SECONDS.observe(time.perf_counter() - started_at)
+        return path
+
+    async def get(
+        self, asset_storage: storage.AssetStorage, key: str, width: int, fmt: str
+    ) -> Tuple[str, str]:
+        """Return (cached file path, cache key) for a thumbnail of `key`.
+
+        Raises FileNotFoundError when the source does not exist.
+        """
+
+        loop = asyncio.get_running_loop()
+        # Cheap calls use the default pool so cache hits never queue behind renders.
+        fingerprint = await loop.run_in_executor(None, asset_storage.fingerprint, key)
+        cache_key = hashlib.sha256(
+            f"{key}\0{fingerprint}\0{width}\0{fmt}".encode("utf-8")).hexdigest()
+
+        path = await loop.run_in_executor(None, self.cache.lookup, cache_key)
+        if path is not None:
+            THUMBNAIL_CACHE_REQUESTS_TOTAL.labels(result="hit").inc()
+            return path, cache_key
+
+        render_future = self._in_flight.get(cache_key)
+        if render_future is not None:
+            THUMBNAIL_CACHE_REQUESTS_TOTAL.labels(result="coalesced").inc()
+        else:
+            THUMBNAIL_CACHE_REQUESTS_TOTAL.labels(result="miss").inc()
+            render_future = loop.run_in_executor(
+                self._executor, self._render_and_store,
+                asset_storage, key, width, fmt, cache_key)
+            self._in_flight[cache_key] = render_future
+
+            def _done(future: asyncio.Future) -> None:
+                self._in_flight.pop(cache_key, None)
+                if not future.cancelled():
+                    future.exception()  # retrieved even if every waiter left
+
+            render_future.add_done_callback(_done)
+        # Shielded, so a disconnecting client does not cancel others' render.
+        return await asyncio.shield(render_future), cache_key
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False)
+
+
+_service: Optional[ThumbnailService] = None
+_service_lock = threading.Lock()
+
+
+def get_thumbnail_service() -> ThumbnailService:
+    global _service
+    with _service_lock:
+        if _service is None:
+            settings = get_settings()
+            _service = ThumbnailService(
+                ThumbnailCache(settings.thumbnail_cache_dir,
+                               settings.thumbnail_cache_max_bytes),
+                max_workers=settings.thumbnail_workers,
+            )
+            app_logger.info("Thumbnail cache at %s", settings.thumbnail_cache_dir)
+        return _service
@@ -1160,17 +1160,16 @@ document.addEventListener("DOMContentLoaded", function () {
                     <tbody>
             `;
 
-            const usagePromises = items.map(item =>
-                apiRequest(`/api/v1/admin/dynamic-lists/items/${item.id}/in-use`, "GET") // Corrected path
-                    .then(usageInfo => ({ itemId: item.id, isInUse: usageInfo.is_in_use, details: usageInfo.details }))
-                    .catch(err => {
-                        console.warn(`Could not fetch in-use status for item ${item.id}`, err);
-                        return { itemId: item.id, isInUse: false, details: [] }; // Default on error
-                    })
-            );
-            const usageResults = await Promise.all(usagePromises);
+            // One request for the whole list's usage instead of one per item
+            let usageResults = [];
+            try {
+                usageResults = await apiRequest(`/api/v1/admin/dynamic-lists/${listName}/usage`, "GET") || [];
+            } catch (err) {
+                console.warn(`Could not fetch in-use status for list ${listName}`, err);
+                // Default to "not in use" on error
+            }
             const usageMap = usageResults.reduce((map, current) => {
-                map[current.itemId] = { isInUse: current.isInUse, details: current.details };
+                map[current.item_id] = { isInUse: current.is_in_use, details: current.details || [] };
                 return map;
             }, {});
 
@@ -15,16 +15,25 @@ function resolveApiBaseUrl() {
 
 let API_BASE_URL = resolveApiBaseUrl();
 
-function staticContentUrl(path) {
+// Image widths served as resized WebP/AVIF variants (IMAGE_VARIANT_WIDTHS).
+const THUMBNAIL_IMAGE_WIDTH = 256;
+const READER_IMAGE_WIDTH = 768;
+
+function withImageWidth(url, width) {
+    if (!url || !width) return url;
+    return `${url}${url.includes("?") ? "&" : "?"}w=${width}`;
+}
+
+function staticContentUrl(path, width) {
     if (!path) return "";
     const p = String(path).trim();
     if (!p) return "";
     if (p.startsWith("http://") || p.startsWith("https://")) return p;
 
     const base = API_BASE_URL.replace(/\/$/, "");
-    if (p.startsWith("/static_content/")) return `${base}${p}`;
-    if (p.startsWith("static_content/")) return `${base}/${p}`;
-    return `${base}/static_content/${p.replace(/^\/+/, "")}`;
+    if (p.startsWith("/static_content/")) return withImageWidth(`${base}${p}`, width);
+    if (p.startsWith("static_content/")) return withImageWidth(`${base}/${p}`, width);
+    return withImageWidth(`${base}/static_content/${p.replace(/^\/+/, "")}`, width);
 }
 console.log("script.js file loaded and parsed by the browser.");
 
@@ -347,6 +356,7 @@ document.addEventListener("DOMContentLoaded", function () {
                 }
 
                 retryButton.addEventListener("click", async () => {
+                    invalidateDynamicListsBootstrap();
                     await populateDropdown(selectElementId, config.listName);
                 });
                 retryButton.dataset.dropdownRetryBound = "true";
@@ -354,6 +364,42 @@ document.addEventListener("DOMContentLoaded", function () {
         );
     }
 
+    // All public dynamic lists arrive in one bootstrap request that every
+    // dropdown shares; the browser revalidates it via ETag.
+    let dynamicListsBootstrapPromise = null;
+
+    function invalidateDynamicListsBootstrap() {
+        dynamicListsBootstrapPromise = null;
+    }
+
+    function loadDynamicListsBootstrap() {
+        if (!dynamicListsBootstrapPromise) {
+            dynamicListsBootstrapPromise = apiRequest(
+                "/api/v1/dynamic-lists/bootstrap",
+            ).catch((error) => {
+                // Let the next caller (e.g. a retry button) refetch.
+                invalidateDynamicListsBootstrap();
+                throw error;
+            });
+        }
+        return dynamicListsBootstrapPromise;
+    }
+
+    async function getActiveListItems(listName) {
+        try {
+            const bootstrap = await loadDynamicListsBootstrap();
+            const lists = (bootstrap && bootstrap.lists) || {};
+            if (Array.isArray(lists[listName])) {
+                return lists[listName];
+            }
+        } catch (error) {
+            console.warn("[getActiveListItems] Bootstrap unavailable, fetching list directly:", error);
+        }
+        // Older backends (or unknown lists): per-list endpoint, which 404s
+        // for lists that do not exist.
+        return apiRequest(`/api/v1/dynamic-lists/${listName}/active-items`);
+    }
+
     async function populateDropdown(selectElementId, listName) {
         const { config, selectElement } = getDropdownRecoveryElements(
             selectElementId,
@@ -368,8 +414,7 @@ document.addEventListener("DOMContentLoaded", function () {
         setDropdownRecoveryState(selectElementId, { isLoading: true });
 
         try {
-            // Use the public endpoint for fetching active items
-            const items = await apiRequest(`/api/v1/dynamic-lists/${listName}/active-items`);
+            const items = await getActiveListItems(listName);
 
             // Clear existing options (except for a potential placeholder)
             selectElement.innerHTML = '';
@@ -799,7 +844,7 @@ document.addEventListener("DOMContentLoaded", function () {
             const card = document.createElement('div');
             card.className = 'character-card';
             card.innerHTML = `
-                <div class="thumb">${item.thumbnail_path ? `<img src="${staticContentUrl(item.thumbnail_path)}" alt="${escapeHTML(item.name)} thumbnail">` : '<div class="no-thumb">No image</div>'}</div>
+                <div class="thumb">${item.thumbnail_path ? `<img src="${staticContentUrl(item.thumbnail_path, THUMBNAIL_IMAGE_WIDTH)}" alt="${escapeHTML(item.name)} thumbnail">` : '<div class="no-thumb">No image</div>'}</div>
                 <div class="meta">
                   <div class="name" style="display:flex;align-items:center;justify-content:space-between;gap:8px;">
                     <span>${escapeHTML(item.name)}</span>
@@ -2449,6 +2494,18 @@ document.addEventListener("DOMContentLoaded", function () {
             return;
         }
 
+        if (page.image_url) {
+            // Signed URL: the browser loads and caches it without an auth header.
+            setStoryPageImageSlotContent(
+                slot,
+                createStoryPageImageElement(withImageWidth(
+                    `${API_BASE_URL.replace(/\/$/, "")}${page.image_url}`,
+                    READER_IMAGE_WIDTH,
+                )),
+            );
+            return;
+        }
+
         const cachedImage = storyEditorState.pageImageObjectUrls.get(page.id);
         if (
             cachedImage
@@ -3917,12 +3974,10 @@ document.addEventListener("DOMContentLoaded", function () {
                     date.textContent = `Last updated: ${formatDate(story.updated_at || story.created_at)}`;
                     listItem.appendChild(date);
 
-                    if (story.story_outline) {
+                    if (story.outline_snippet) {
                         const snippet = document.createElement("p");
                         snippet.classList.add("story-snippet");
-                        snippet.textContent =
-                            story.story_outline.substring(0, 150) +
-                            (story.story_outline.length > 150 ? "..." : "");
+                        snippet.textContent = story.outline_snippet;
                         listItem.appendChild(snippet);
                     }
 
@@ -4386,7 +4441,7 @@ document.addEventListener("DOMContentLoaded", function () {
             }
             list.innerHTML = characterLibraryState.items.map(item => {
                 const selected = characterLibraryState.selectedIds.has(item.id);
-                const imgSrc = item.thumbnail_path ? staticContentUrl(item.thumbnail_path) : '';
+                const imgSrc = item.thumbnail_path ? staticContentUrl(item.thumbnail_path, THUMBNAIL_IMAGE_WIDTH) : '';
                 return `
                 <div class="character-card${selected ? ' selected' : ''}" data-id="${item.id}" style="border:1px solid ${selected ? '#4f8cff' : '#333'};border-radius:8px;padding:8px;cursor:pointer;background:${selected ? '#1f2937' : '#111'};">
                     ${imgSrc ? `<img src="${imgSrc}" alt="${escapeHTML(item.name)} thumbnail" style="width:100%;max-height:140px;object-fit:cover;border-radius:6px;" />` : '<div style="height:140px;background:#222;border-radius:6px;"></div>'}
@@ -4776,6 +4831,8 @@ document.addEventListener("DOMContentLoaded", function () {
 
     // --- ADMIN: LOAD DYNAMIC LIST ITEMS ---
     async function loadDynamicListItems(listName) {
+        // Called after every admin edit; later dropdowns must see the change.
+        invalidateDynamicListsBootstrap();
         const itemsDiv = document.getElementById(`dynamicListItems_${listName}`);
         if (!itemsDiv) return;
         itemsDiv.innerHTML = '<div>Loading items...</div>';
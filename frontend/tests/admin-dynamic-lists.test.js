@@ -169,6 +169,17 @@ function installApiMock(options = {}) {
       );
       return new Response('', { status: 204 });
     }
+    const listUsageMatch = url.match(/\/api\/v1\/admin\/dynamic-lists\/([^/]+)\/usage$/);
+    if (listUsageMatch) {
+      const listName = decodeURIComponent(listUsageMatch[1]);
+      const usage = (currentItemsByList[listName] || []).map((entry) => ({
+        item_id: entry.id,
+        item_value: entry.item_value,
+        usage_count: 0,
+        ...(usageByItemId[entry.id] || { is_in_use: false, details: [] })
+      }));
+      return new Response(JSON.stringify(usage), { status: 200 });
+    }
     const itemUsageMatch = url.match(/\/api\/v1\/admin\/dynamic-lists\/items\/(\d+)\/in-use$/);
     if (itemUsageMatch) {
       const itemId = Number(itemUsageMatch[1]);
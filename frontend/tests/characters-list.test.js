@@ -123,7 +123,7 @@ describe('characters page search and pagination', () => {
           const img = document.querySelector('#characters-page-list img');
           expect(img).toBeTruthy();
           expect(img.getAttribute('src')).toBe(
-            'http://127.0.0.1:8000/static_content/images/user_1/characters/7/abc.png',
+            'http://127.0.0.1:8000/static_content/images/user_1/characters/7/abc.png?w=256',
           );
         });
       });
@@ -0,0 +1,109 @@
+"""Benchmark saving generated story pages: per-row ORM adds vs the bulk path.
+
+Runs against a throwaway in-memory SQLite database, e.g.:
+
+    python -m scripts.benchmark_page_insert --pages 10 50 200 --repeat 20
+"""
+
+import argparse
+import statistics
+import time
+from typing import Callable, Dict, List
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from backend import crud
+from backend.database import Base, Page, Story, User
+
+
+def _story_content(page_count: int) -> dict:
+    """Return AI-shaped story content with a title page plus `page_count` pages."""
+
+    return {
+        "Title": "Benchmark",
+        "Pages": [
+            {
+                "Page_number": "Title" if number == 0 else number,
+                "Text": f"Page {number} " + "lorem ipsum " * 20,
+                "Image_description": f"Illustration for page {number}",
+                "image_url": f"images/user_1/story_1/page_{number}.png",
+            }
+            for number in range(page_count + 1)
+        ],
+    }
+
+
+def _save_row_by_row(db: Session, story_id: int, story_content: dict) -> None:
+    """The previous implementation: delete, then `db.add` one Page per row."""
+
+    db.query(Page).filter(Page.story_id == story_id).delete(
+        synchronize_session=False)
+    for row in crud.build_generated_page_rows(story_id, story_content["Pages"]):
+        db.add(Page(**row))
+    db.commit()
+
+
+def _save_bulk(db: Session, story_id: int, story_content: dict) -> None:
+    crud.update_story_with_generated_content(db, story_id, story_content)
+
+
+def _time(save: Callable[[Session, int, dict], None], page_count: int, repeat: int) -> List[float]:
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    try:
+        user = User(username="bench", email="bench@example.com",
+                    hashed_password="x")
+        db.add(user)
+        db.commit()
+        story = Story(title="Benchmark", genre="Fantasy",
+                      owner_id=user.id, num_pages=page_count)
+        db.add(story)
+        db.commit()
+        story_id = story.id
+
+        content = _story_content(page_count)
+        timings: List[float] = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            save(db, story_id, content)
+            timings.append((time.perf_counter() - start) * 1000)
+        return timings
+    finally:
+        db.close()
+        engine.dispose()
+
+
+def main() -> int:
+    """Print median/p95 save times per page count for both strategies."""
+
+    parser = argparse.ArgumentParser(
+        description="Benchmark generated page inserts.")
+    parser.add_argument("--pages", type=int, nargs="+", default=[10, 50, 200])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    strategies: Dict[str, Callable[[Session, int, dict], None]] = {
+        "row-by-row": _save_row_by_row,
+        "bulk": _save_bulk,
+    }
+    print(f"{'pages':>6} {'strategy':>12} {'median ms':>10} {'p95 ms':>8}")
+    for page_count in args.pages:
+        for name, save in strategies.items():
+            timings = sorted(_time(save, page_count, args.repeat))
+            p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+            print(
+                f"{page_count:>6} {name:>12} "
+                f"{statistics.median(timings):>10.2f} {p95:>8.2f}"
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,43 @@
+"""Report or delete image files no row references (see backend/asset_gc.py)."""
+
+import argparse
+
+from backend import asset_gc
+from backend.database import SessionLocal
+
+
+def main() -> int:
+    """List orphaned files under DATA_DIR/images; delete them with --delete."""
+
+    parser = argparse.ArgumentParser(
+        description="Find image files that no page or character references.",
+    )
+    parser.add_argument("--delete", action="store_true",
+                        help="Delete the orphans (default: only report them).")
+    parser.add_argument("--max-deletes-per-second", type=float, default=None,
+                        help="Deletion rate limit (default: ASSET_GC_MAX_DELETES_PER_SECOND; 0 = none).")
+    parser.add_argument("--min-age-hours", type=float, default=None,
+                        help="Skip files modified more recently (default: ASSET_GC_MIN_AGE_HOURS).")
+    args = parser.parse_args()
+
+    def report(key: str, size: int) -> None:
+        print(f"{size:>12}  {key}")
+
+    db = SessionLocal()
+    try:
+        counts = asset_gc.collect_orphans(
+            db,
+            dry_run=not args.delete,
+            report=report,
+            max_deletes_per_second=args.max_deletes_per_second,
+            min_age_hours=args.min_age_hours,
+        )
+    finally:
+        db.close()
+
+    print(counts)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
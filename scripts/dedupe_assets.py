@@ -0,0 +1,28 @@
+"""One-off migration of existing asset files into the deduplicated blob store."""
+
+import argparse
+
+from backend import storage
+
+
+def main() -> int:
+    """Hardlink existing files under DATA_DIR/<prefix> to content-addressed blobs."""
+
+    parser = argparse.ArgumentParser(
+        description="Deduplicate existing local asset files (STORAGE_DEDUP).",
+    )
+    parser.add_argument("prefix", nargs="?", default="images",
+                        help="Data-relative folder to scan (default: images).")
+    args = parser.parse_args()
+
+    asset_storage = storage.get_storage()
+    if not isinstance(asset_storage, storage.LocalStorage) or not asset_storage.dedup:
+        print("Deduplication needs STORAGE_BACKEND=local with STORAGE_DEDUP enabled.")
+        return 1
+
+    print(asset_storage.deduplicate(args.prefix))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,39 @@
+"""One-off backfill of resized WebP/AVIF variants for existing images."""
+
+import argparse
+
+from backend import image_variants, storage
+
+
+def main() -> int:
+    """Create missing image variants under a data-relative folder."""
+
+    parser = argparse.ArgumentParser(
+        description="Generate IMAGE_VARIANT_WIDTHS/FORMATS variants for existing images.",
+    )
+    parser.add_argument("prefix", nargs="?", default="images",
+                        help="Data-relative folder to scan (default: images).")
+    args = parser.parse_args()
+
+    asset_storage = storage.get_storage()
+    counts = {"images": 0, "variants_written": 0}
+    keys = set(asset_storage.list_keys(args.prefix))
+    for key in sorted(keys):
+        if not image_variants.has_variants(key):
+            continue
+        counts["images"] += 1
+        expected = {
+            image_variants.variant_key(key, width, fmt)
+            for width in image_variants.configured_widths()
+            for fmt in image_variants.configured_formats()
+        }
+        if expected and not expected <= keys:
+            counts["variants_written"] += len(
+                image_variants.generate_variants_for_key(asset_storage, key))
+
+    print(counts)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,21 @@
+"""Delete every due asset tombstone now (see backend/asset_reaper.py)."""
+
+from backend import asset_reaper
+from backend.database import SessionLocal
+
+
+def main() -> int:
+    """Run the asset reaper once, e.g. when the in-app reaper is disabled."""
+
+    db = SessionLocal()
+    try:
+        counts = asset_reaper.reap_tombstones(db)
+    finally:
+        db.close()
+
+    print(counts)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,21 @@
+"""Apply the retention policies (see backend/retention.py); run e.g. daily."""
+
+from backend import retention
+from backend.database import SessionLocal
+
+
+def main() -> int:
+    """Archive old generation tasks and purge expired soft-deleted content."""
+
+    db = SessionLocal()
+    try:
+        counts = retention.run_retention(db)
+    finally:
+        db.close()
+
+    print(counts)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())